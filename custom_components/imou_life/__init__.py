@@ -4,42 +4,77 @@
 
 import asyncio
 import logging
+from contextlib import ExitStack
+from datetime import timedelta
 
 from homeassistant.components import persistent_notification
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.device_registry import DeviceEntry
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.typing import ConfigType
-from imouapi.api import ImouAPIClient
+from imouapi.const import (
+    CAMERA_WAIT_BEFORE_DOWNLOAD,
+    DEFAULT_TIMEOUT,
+    WAIT_AFTER_WAKE_UP,
+)
 from imouapi.device import ImouDevice
 from imouapi.exceptions import ImouException
 
+from .api_client import ApiClientPool, ImouAccountAPIClient
+from .api_metrics import classify_error, get_api_metrics
+from .backoff import get_account_backoff
+from .battery_history import BatteryHistoryCache
+from .call_budget import get_call_budget
 from .const import (
+    ACCOUNT_ENTRY_RETRY_DELAY,
     CONF_API_URL,
     CONF_APP_ID,
     CONF_APP_SECRET,
     CONF_DEVICE_ID,
+    CONF_DEVICE_IDS,
     CONF_DEVICE_NAME,
     DEFAULT_API_URL,
+    DEFAULT_CALLS_PER_DAY,
+    DEFAULT_CALLS_PER_HOUR,
+    DEFAULT_DISCOVERY_INTERVAL,
     DEFAULT_ENABLE_DISCOVERY,
     DEFAULT_SCAN_INTERVAL,
     DOMAIN,
+    ENTRY_CONFIG_KEY,
+    HOT_APPLY_OPTIONS,
     OPTION_API_TIMEOUT,
     OPTION_API_URL,
+    OPTION_CALLS_PER_DAY,
+    OPTION_CALLS_PER_HOUR,
     OPTION_CAMERA_WAIT_BEFORE_DOWNLOAD,
+    OPTION_DISABLED_DEVICES,
+    OPTION_DISCOVERY_INTERVAL,
     OPTION_ENABLE_DISCOVERY,
     OPTION_SCAN_INTERVAL,
     OPTION_SETUP_TIMEOUT,
     OPTION_WAIT_AFTER_WAKE_UP,
     PLATFORMS,
 )
-from .coordinator import ImouDataUpdateCoordinator, ImouDiscoveryCoordinator
-from .helpers import exception_message
+from .coordinator import (
+    ImouAccountData,
+    ImouDataUpdateCoordinator,
+    ImouDiscoveryCoordinator,
+    get_entry_coordinator,
+    get_entry_coordinators,
+)
+from .device_snapshot import DeviceSnapshotCache
+from .helpers import exception_message, get_device_key, is_account_entry
+from .poll_scheduler import get_poll_scheduler, release_poll_scheduler
+from .power_state import release_device_power_state
+from .push_receiver import get_push_receiver, release_push_receiver
 from .rate_limit_manager import RateLimitManager
+from .startup_orchestrator import get_startup_orchestrator
+from .wake_queue import release_wake_queue
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
@@ -52,29 +87,163 @@ SETUP_TIMEOUT = 30
 
 async def async_setup(hass: HomeAssistant, config: ConfigType):
     """Set up this integration using YAML is not supported."""
+    # Restore rate limits and device details before any entry initializes, so
+    # a restart does not need to hit the API again
+    await RateLimitManager(hass).async_load()
+    await DeviceSnapshotCache(hass).async_load()
+    await BatteryHistoryCache(hass).async_load()
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Set up this integration using UI."""
     _cleanup_orphan_devices(hass, entry)
+    if is_account_entry(entry):
+        return await _async_setup_account_entry(hass, entry)
 
-    # Initialize API client and device
+    # Initialize API client (shared across the account) and device
     api_client, device = await _setup_api_client_and_device(hass, entry)
 
-    # Initialize device with timeout protection and rate limit checking
-    await _initialize_device(device, entry, hass)
-
-    # Create and configure coordinator
-    coordinator = await _setup_coordinator(hass, device, entry)
+    try:
+        coordinator = await _async_setup_device(hass, entry, api_client, device)
+    except Exception:
+        # Setup failed, give back our reference to the shared API client
+        _release_api_client(hass, entry)
+        raise
 
     # Store coordinator in runtime_data (modern HA pattern)
     entry.runtime_data = coordinator
 
+    await _async_finish_setup(hass, entry, api_client, [coordinator])
+    return True
+
+
+async def _async_setup_account_entry(hass: HomeAssistant, entry: ConfigEntry):
+    """Set up a config entry holding the devices of an Imou Account.
+
+    A device which cannot be set up does not hold the others back: the entry is
+    set up again a little later to retry it.
+    """
+    api_client = _setup_api_client(hass, entry)
+    disabled = entry.options.get(OPTION_DISABLED_DEVICES, [])
+    _remove_disabled_devices(hass, entry, disabled)
+    devices = [
+        _create_device_instance(
+            api_client, {"device_id": device_id, "name": None}, entry
+        )
+        for device_id in entry.data.get(CONF_DEVICE_IDS, [])
+        if device_id not in disabled
+    ]
+    _LOGGER.debug("Setting up %d devices of account entry", len(devices))
+
+    results = await asyncio.gather(
+        *(_async_setup_device(hass, entry, api_client, device) for device in devices),
+        return_exceptions=True,
+    )
+    account_data = ImouAccountData(api_client)
+    errors = []
+    try:
+        for device, result in zip(devices, results):
+            if isinstance(result, ConfigEntryAuthFailed):
+                raise result
+            if isinstance(result, Exception):
+                _LOGGER.warning(
+                    "Unable to set up device %s, retrying in %d seconds: %s",
+                    device.get_device_id(),
+                    ACCOUNT_ENTRY_RETRY_DELAY,
+                    result,
+                )
+                errors.append(result)
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            account_data.coordinators[device.get_device_id()] = result
+    except BaseException:
+        # The whole entry fails, release what the other devices were set up with
+        for result in results:
+            if not isinstance(result, BaseException):
+                _release_coordinator(hass, entry, result)
+        _release_api_client(hass, entry)
+        raise
+
+    if errors and not account_data.coordinators:
+        _release_api_client(hass, entry)
+        if isinstance(errors[0], ConfigEntryNotReady):
+            raise errors[0]
+        raise ConfigEntryNotReady(str(errors[0])) from errors[0]
+    if errors:
+
+        @callback
+        def _async_retry(_now) -> None:
+            """Set the entry up again to retry the devices which failed."""
+            if entry.state is ConfigEntryState.LOADED:
+                hass.config_entries.async_schedule_reload(entry.entry_id)
+
+        entry.async_on_unload(
+            async_call_later(hass, ACCOUNT_ENTRY_RETRY_DELAY, _async_retry)
+        )
+
+    entry.runtime_data = account_data
+    await _async_finish_setup(
+        hass, entry, api_client, list(account_data.coordinators.values())
+    )
+    return True
+
+
+async def _async_setup_device(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    api_client: ImouAccountAPIClient,
+    device: ImouDevice,
+) -> ImouDataUpdateCoordinator:
+    """Initialize a device of an entry and set its coordinator up."""
+    # The devices of the account are initialized a few at a time
+    key = get_device_key(entry, device)
+    orchestrator = get_startup_orchestrator(hass, api_client.get_app_id())
+    timing = orchestrator.begin(key)
+    async with orchestrator.async_device_setup(key):
+        # Initialize device with timeout protection and rate limit checking
+        with timing.step("initialize"):
+            from_snapshot = await _initialize_device(device, entry, hass)
+
+        # Create and configure coordinator
+        with timing.step("first_refresh"):
+            coordinator = await _setup_coordinator(
+                hass, device, entry, from_snapshot=from_snapshot
+            )
+    coordinator.call_budget = api_client.call_budget
+    coordinator.api_metrics = api_client.metrics
+    coordinator.startup_orchestrator = orchestrator
+    coordinator.snapshot_cache = api_client.snapshot_cache
+
+    # Follow the rate limit backoff of the account
+    entry.async_on_unload(
+        coordinator.backoff.async_add_listener(coordinator.async_apply_backoff)
+    )
+    coordinator.async_apply_backoff()
+
+    # Receive the alarms the Imou cloud pushes for this device
+    get_push_receiver(
+        hass, api_client.get_app_id(), api_client.get_app_secret()
+    ).register(coordinator)
+    return coordinator
+
+
+async def _async_finish_setup(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    api_client: ImouAccountAPIClient,
+    coordinators: list[ImouDataUpdateCoordinator],
+) -> None:
+    """Set the discovery and the platforms of an entry up, once its devices are."""
+
     # Set up stale device detection handler
     async def handle_stale_device(event):
         """Handle stale device detection."""
-        if event.data.get("entry_id") == entry.entry_id:
+        if event.data.get("entry_id") != entry.entry_id:
+            return
+        coordinator = get_entry_coordinator(entry, event.data.get("device_id"))
+        if coordinator is not None:
             await _create_stale_device_repair_issue(hass, entry, coordinator)
 
     entry.async_on_unload(
@@ -109,26 +278,35 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
             )
         )
 
-    await _setup_platforms(hass, entry, coordinator)
+    orchestrator = get_startup_orchestrator(hass, api_client.get_app_id())
+    keys = [get_device_key(entry, coordinator.device) for coordinator in coordinators]
+    with ExitStack() as stack:
+        for key in keys:
+            if (timing := orchestrator.get_timing(key)) is not None:
+                stack.enter_context(timing.step("platforms"))
+        await _setup_platforms(hass, entry, coordinators)
+    for key in keys:
+        orchestrator.finish(key)
 
     # Check for rate limiting and notify user if detected
-    _check_rate_limit_status(hass, entry, coordinator)
+    for coordinator in coordinators:
+        _check_rate_limit_status(hass, entry, coordinator)
+
+    # Option changes are applied to the entry as set up now, when they can be
+    hass.data.setdefault(DOMAIN, {}).setdefault(ENTRY_CONFIG_KEY, {})[
+        entry.entry_id
+    ] = (dict(entry.data), dict(entry.options))
+    if async_update_options not in entry.update_listeners:
+        entry.add_update_listener(async_update_options)
 
     _LOGGER.debug("Integration setup completed successfully")
-    return True
 
 
 async def _setup_api_client_and_device(hass: HomeAssistant, entry: ConfigEntry):
     """Set up API client and device instance."""
-    session = async_get_clientsession(hass)
-
-    # Extract configuration parameters
     config_data = entry.data
     device_config = {
         "name": config_data.get(CONF_DEVICE_NAME),
-        "api_url": config_data.get(CONF_API_URL),
-        "app_id": config_data.get(CONF_APP_ID),
-        "app_secret": config_data.get(CONF_APP_SECRET),
         "device_id": config_data.get(CONF_DEVICE_ID),
     }
 
@@ -136,16 +314,67 @@ async def _setup_api_client_and_device(hass: HomeAssistant, entry: ConfigEntry):
         "Setting up device %s (%s)", device_config["name"], device_config["device_id"]
     )
 
-    # Create and configure components
-    api_client = _create_api_client(device_config, session, entry)
+    api_client = _setup_api_client(hass, entry)
     device = _create_device_instance(api_client, device_config, entry)
 
     return api_client, device
 
 
+def _setup_api_client(hass: HomeAssistant, entry: ConfigEntry):
+    """Set up the API client of the entry's account.
+
+    The API client is shared by all the entries of the same Imou Account so
+    that the access token is only requested once per account.
+    """
+    session = async_get_clientsession(hass)
+
+    # Extract configuration parameters
+    config_data = entry.data
+    client_config = {
+        "api_url": config_data.get(CONF_API_URL),
+        "app_id": config_data.get(CONF_APP_ID),
+        "app_secret": config_data.get(CONF_APP_SECRET),
+    }
+
+    # Create and configure components
+    api_client = ApiClientPool(hass).acquire(
+        client_config["app_id"],
+        client_config["app_secret"],
+        client_config["api_url"],
+        lambda: _create_api_client(client_config, session, entry),
+    )
+    api_client.call_budget = _setup_call_budget(hass, entry)
+    api_client.metrics = get_api_metrics(hass, client_config["app_id"])
+    api_client.backoff = get_account_backoff(hass, client_config["app_id"])
+    api_client.snapshot_cache = DeviceSnapshotCache(hass)
+    return api_client
+
+
+def _release_api_client(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Release the entry's reference to the shared API client."""
+    ApiClientPool(hass).release(
+        entry.data.get(CONF_APP_ID), entry.data.get(CONF_API_URL)
+    )
+
+
+def _setup_call_budget(hass: HomeAssistant, entry: ConfigEntry):
+    """Return the call budget of the entry's account, applying its limits.
+
+    Like discovery, the budget is an account-wide setting: the limits are taken
+    from the options of the first config entry.
+    """
+    budget = get_call_budget(hass, entry.data.get(CONF_APP_ID))
+    if _is_first_entry(hass, entry):
+        budget.configure(
+            int(entry.options.get(OPTION_CALLS_PER_HOUR, DEFAULT_CALLS_PER_HOUR)),
+            int(entry.options.get(OPTION_CALLS_PER_DAY, DEFAULT_CALLS_PER_DAY)),
+        )
+    return budget
+
+
 def _create_api_client(device_config: dict, session, entry: ConfigEntry):
     """Create and configure the API client."""
-    api_client = ImouAPIClient(
+    api_client = ImouAccountAPIClient(
         device_config["app_id"], device_config["app_secret"], session
     )
     api_client.set_base_url(device_config["api_url"])
@@ -219,7 +448,11 @@ def _cleanup_orphan_devices(hass: HomeAssistant, entry: ConfigEntry) -> None:
             if not imou_ids:
                 continue
 
-            if not any(eid in active_entry_ids for eid in imou_ids):
+            # The devices of an account entry are keyed by entry and device ID
+            if not any(
+                ident.split("_", 1)[0] in active_entry_ids or ident in active_entry_ids
+                for ident in imou_ids
+            ):
                 _LOGGER.info(
                     "Removing orphan device '%s' (no matching config entry)",
                     device_entry.name,
@@ -229,10 +462,36 @@ def _cleanup_orphan_devices(hass: HomeAssistant, entry: ConfigEntry) -> None:
         _LOGGER.debug("Orphan device cleanup skipped: %s", err)
 
 
+def _remove_disabled_devices(
+    hass: HomeAssistant, entry: ConfigEntry, disabled: list[str]
+) -> None:
+    """Remove the devices disabled in an account entry from the registry."""
+    device_registry = dr.async_get(hass)
+    for device_id in disabled:
+        device_entry = device_registry.async_get_device(
+            identifiers={(DOMAIN, f"{entry.entry_id}_{device_id}")}
+        )
+        if device_entry is not None:
+            device_registry.async_update_device(
+                device_entry.id, remove_config_entry_id=entry.entry_id
+            )
+
+
 async def _initialize_device(
     device: ImouDevice, entry: ConfigEntry, hass: HomeAssistant
-) -> None:
-    """Initialize device with timeout protection and rate limit checking."""
+) -> bool:
+    """Initialize device with timeout protection and rate limit checking.
+
+    Returns:
+        True if the device got its last known state back from its cached
+        snapshot, its data is then fetched in the background
+
+    """
+    if await _initialize_device_from_snapshot(device, entry, hass):
+        _disable_device_sensors(device)
+        # Details just fetched by the discovery come without a state
+        return DeviceSnapshotCache(hass).restore_states(device)
+
     setup_timeout = entry.options.get(OPTION_SETUP_TIMEOUT, SETUP_TIMEOUT)
 
     # Get API credentials for rate limit checking
@@ -271,8 +530,10 @@ async def _initialize_device(
         error_msg = exception_message(exception)
         # Handle API rate limit errors (OP1013) by recording and requesting retry
         if "OP1013" in error_msg or "exceed limit" in error_msg.lower():
-            # Record the rate limit error
-            rate_limit_mgr.record_rate_limit(app_id, app_secret, error_msg)
+            # The account API client records an OP1013 through the account
+            # backoff already, count it only once
+            if classify_error(exception) != "OP1013":
+                rate_limit_mgr.record_rate_limit(app_id, app_secret, error_msg)
 
             # Get the updated state for translation placeholders
             state = rate_limit_mgr.get_state(app_id, app_secret)
@@ -299,14 +560,71 @@ async def _initialize_device(
         _LOGGER.error("Imou exception: %s", error_msg)
         raise
 
-    # Disable all sensors initially (will be enabled individually by
-    # async_added_to_hass())
+    _disable_device_sensors(device)
+    return False
+
+
+async def _initialize_device_from_snapshot(
+    device: ImouDevice, entry: ConfigEntry, hass: HomeAssistant
+) -> bool:
+    """Initialize the device from its cached details, without calling the API.
+
+    Unless they were fetched moments ago (e.g. by the discovery), the details
+    are revalidated in the background and the entry is set up again if the
+    firmware or the capabilities of the device changed.
+
+    Returns:
+        True if the device was initialized from its snapshot
+
+    """
+    device_id = device.get_device_id()
+    snapshot_cache = DeviceSnapshotCache(hass)
+    snapshot = snapshot_cache.get(device_id) if device_id else None
+    if snapshot is None:
+        return False
+    fresh = snapshot_cache.get_fresh(device_id) is not None
+
+    api_client = device.get_api_client()
+    api_client.prime_device_details(snapshot)
+    try:
+        await device.async_initialize()
+    except ImouException as exception:
+        # The device may be half built, start over from the API
+        snapshot_cache.remove(device_id)
+        raise ConfigEntryNotReady(
+            f"Invalid cached details for device {device_id}: "
+            f"{exception_message(exception)}"
+        ) from exception
+    _LOGGER.debug("Initialized device %s from its cached details", device_id)
+    if fresh:
+        return True
+
+    @callback
+    def _async_device_changed() -> None:
+        """Set the entry up again from the fresh device details."""
+        if entry.state is ConfigEntryState.LOADED:
+            hass.config_entries.async_schedule_reload(entry.entry_id)
+
+    snapshot_cache.async_schedule_revalidation(
+        api_client, device_id, _async_device_changed
+    )
+    return True
+
+
+def _disable_device_sensors(device: ImouDevice) -> None:
+    """Disable all sensors initially.
+
+    They are enabled individually by async_added_to_hass().
+    """
     for sensor_instance in device.get_all_sensors():
         sensor_instance.set_enabled(False)
 
 
 async def _setup_coordinator(
-    hass: HomeAssistant, device: ImouDevice, entry: ConfigEntry
+    hass: HomeAssistant,
+    device: ImouDevice,
+    entry: ConfigEntry,
+    from_snapshot: bool = False,
 ):
     """Set up and initialize coordinator."""
     coordinator = ImouDataUpdateCoordinator(
@@ -321,6 +639,20 @@ async def _setup_coordinator(
     app_secret = entry.data.get(CONF_APP_SECRET)
     rate_limit_mgr = RateLimitManager(hass)
 
+    # A device restored from its snapshot comes up with its last known state
+    # and fetches its data in the background. While rate limited, the account
+    # poll cycle fetches it once the limit is over
+    if from_snapshot:
+        get_poll_scheduler(hass, app_id).register(coordinator)
+        if rate_limit_mgr.is_rate_limited(app_id, app_secret)[0]:
+            _LOGGER.debug("Rate limited, deferring the initial data fetch")
+        else:
+            delay = get_startup_orchestrator(hass, app_id).async_schedule_refresh(
+                get_device_key(entry, device), coordinator
+            )
+            _LOGGER.debug("Initial data fetch in %.0f seconds", delay)
+        return coordinator
+
     # Fetch initial data with timeout protection
     setup_timeout = entry.options.get(OPTION_SETUP_TIMEOUT, SETUP_TIMEOUT)
     try:
@@ -337,12 +669,8 @@ async def _setup_coordinator(
     if not coordinator.last_update_success:
         # Check if this is a rate limit issue
         if coordinator.is_rate_limited and coordinator.last_error_message:
-            # Record the rate limit
-            rate_limit_mgr.record_rate_limit(
-                app_id, app_secret, coordinator.last_error_message
-            )
-
-            # Get state for translation placeholders
+            # The coordinator recorded the rate limit, get its state for the
+            # translation placeholders
             state = rate_limit_mgr.get_state(app_id, app_secret)
             if state:
                 placeholders = {
@@ -366,18 +694,24 @@ async def _setup_coordinator(
     # Only clear rate limit state on successful data fetch
     rate_limit_mgr.clear_rate_limit(app_id, app_secret)
 
+    # Further polls run in the account-wide poll cycle
+    get_poll_scheduler(hass, app_id).register(coordinator)
+
     return coordinator
 
 
-async def _setup_platforms(hass: HomeAssistant, entry: ConfigEntry, coordinator):
+async def _setup_platforms(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    coordinators: list[ImouDataUpdateCoordinator],
+):
     """Set up all platforms."""
-    # Add platforms to coordinator
+    # Add platforms to the runtime data, they are unloaded with the entry
     for platform in PLATFORMS:
-        coordinator.platforms.append(platform)
+        entry.runtime_data.platforms.append(platform)
 
     _LOGGER.debug("Setting up platforms: %s", PLATFORMS)
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    entry.add_update_listener(async_reload_entry)
 
 
 def _check_rate_limit_status(hass: HomeAssistant, entry: ConfigEntry, coordinator):
@@ -491,19 +825,41 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             hass.data[DOMAIN]["discovery"] = None
             _LOGGER.debug("Last entry removed, stopping discovery coordinator")
 
-    coordinator = entry.runtime_data
     unloaded = all(
         await asyncio.gather(
             *[
                 hass.config_entries.async_forward_entry_unload(entry, platform)
                 for platform in PLATFORMS
-                if platform in coordinator.platforms
+                if platform in entry.runtime_data.platforms
             ]
         )
     )
+    if unloaded:
+        hass.data[DOMAIN].get(ENTRY_CONFIG_KEY, {}).pop(entry.entry_id, None)
+        for coordinator in get_entry_coordinators(entry):
+            _release_coordinator(hass, entry, coordinator)
+        _release_api_client(hass, entry)
     return unloaded
 
 
+def _release_coordinator(
+    hass: HomeAssistant, entry: ConfigEntry, coordinator: ImouDataUpdateCoordinator
+) -> None:
+    """Release what the coordinator of a device shares with the account."""
+    DeviceSnapshotCache(hass).cancel_revalidation(
+        coordinator.device.get_api_client(),
+        coordinator.device.get_device_id(),
+    )
+    if coordinator.startup_orchestrator is not None:
+        coordinator.startup_orchestrator.cancel_refresh(
+            get_device_key(entry, coordinator.device)
+        )
+    release_poll_scheduler(hass, coordinator)
+    release_push_receiver(hass, coordinator)
+    release_device_power_state(hass, coordinator.device.get_device_id())
+    release_wake_queue(hass, coordinator.device.get_device_id())
+
+
 async def async_remove_config_entry_device(
     hass: HomeAssistant, config_entry: ConfigEntry, device_entry: DeviceEntry
 ) -> bool:
@@ -512,10 +868,32 @@ async def async_remove_config_entry_device(
     Called when the user clicks the delete button on a device.
     Returns True if the device can be removed, False otherwise.
 
-    Since each config entry corresponds to exactly one device in our integration,
+    Since each device entry corresponds to exactly one device in our integration,
     we allow removal of the device. This will also remove the config entry if
-    it's the only one associated with this device.
+    it's the only one associated with this device. A device removed from an
+    account entry is disabled in its options, so that it is not set up again.
     """
+    if is_account_entry(config_entry):
+        for device_id in config_entry.data.get(CONF_DEVICE_IDS, []):
+            if (DOMAIN, f"{config_entry.entry_id}_{device_id}") in (
+                device_entry.identifiers
+            ):
+                _LOGGER.info(
+                    "Disabling device %s of account entry %s",
+                    device_id,
+                    config_entry.entry_id,
+                )
+                disabled = config_entry.options.get(OPTION_DISABLED_DEVICES, [])
+                hass.config_entries.async_update_entry(
+                    config_entry,
+                    options={
+                        **config_entry.options,
+                        OPTION_DISABLED_DEVICES: [*disabled, device_id],
+                    },
+                )
+                return True
+        return False
+
     device_id = config_entry.data.get(CONF_DEVICE_ID)
     device_name = config_entry.data.get(CONF_DEVICE_NAME, "Unknown")
 
@@ -544,12 +922,93 @@ async def async_remove_config_entry_device(
     return False
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the cached details and battery history of the devices of an entry."""
+    device_ids = entry.data.get(CONF_DEVICE_IDS) or [entry.data.get(CONF_DEVICE_ID)]
+    for device_id in device_ids:
+        if device_id:
+            DeviceSnapshotCache(hass).remove(device_id)
+            BatteryHistoryCache(hass).remove(device_id)
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry."""
     await async_unload_entry(hass, entry)
     await async_setup_entry(hass, entry)
 
 
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply the updated options of an entry, reloading it only when needed.
+
+    Intervals, timeouts, thresholds and the like (HOT_APPLY_OPTIONS) are pushed
+    to the running coordinators and API client. Any other change, e.g. to the
+    data or the disabled devices of the entry, sets the entry up again.
+    """
+    applied = hass.data.get(DOMAIN, {}).get(ENTRY_CONFIG_KEY, {})
+    if entry.entry_id not in applied:
+        # Not set up, e.g. waiting for a retry
+        await async_reload_entry(hass, entry)
+        return
+
+    data, options = applied[entry.entry_id]
+    changed = {
+        key
+        for key in options.keys() | entry.options.keys()
+        if options.get(key) != entry.options.get(key)
+    }
+    if dict(entry.data) != data or not changed <= HOT_APPLY_OPTIONS:
+        _LOGGER.debug(
+            "Reloading entry %s to apply %s",
+            entry.entry_id,
+            ", ".join(sorted(changed - HOT_APPLY_OPTIONS)) or "its new data",
+        )
+        await async_reload_entry(hass, entry)
+        return
+
+    if changed:
+        _LOGGER.debug(
+            "Applying %s to entry %s", ", ".join(sorted(changed)), entry.entry_id
+        )
+        _async_apply_options(hass, entry, changed)
+        applied[entry.entry_id] = (data, dict(entry.options))
+
+
+@callback
+def _async_apply_options(
+    hass: HomeAssistant, entry: ConfigEntry, changed: set[str]
+) -> None:
+    """Push changed options to the running devices of an entry."""
+    options = entry.options
+    if OPTION_API_TIMEOUT in changed and (
+        api_client := ApiClientPool(hass).get(
+            entry.data.get(CONF_APP_ID), entry.data.get(CONF_API_URL)
+        )
+    ):
+        timeout = _parse_timeout_option(options.get(OPTION_API_TIMEOUT))
+        api_client.set_timeout(timeout if timeout is not None else DEFAULT_TIMEOUT)
+
+    for coordinator in get_entry_coordinators(entry):
+        if changed & {OPTION_CAMERA_WAIT_BEFORE_DOWNLOAD, OPTION_WAIT_AFTER_WAKE_UP}:
+            # Cleared options go back to the library defaults
+            coordinator.device.set_camera_wait_before_download(
+                CAMERA_WAIT_BEFORE_DOWNLOAD
+            )
+            coordinator.device.set_wait_after_wakeup(WAIT_AFTER_WAKE_UP)
+            _configure_device_options(coordinator.device, entry)
+        coordinator.async_apply_options(changed)
+
+    # Account-wide options, taken from the first entry
+    if not _is_first_entry(hass, entry):
+        return
+    if changed & {OPTION_CALLS_PER_HOUR, OPTION_CALLS_PER_DAY}:
+        _setup_call_budget(hass, entry)
+    discovery = hass.data[DOMAIN].get("discovery")
+    if OPTION_DISCOVERY_INTERVAL in changed and discovery is not None:
+        discovery.update_interval = timedelta(
+            seconds=options.get(OPTION_DISCOVERY_INTERVAL, DEFAULT_DISCOVERY_INTERVAL)
+        )
+
+
 async def async_migrate_entry(hass, config_entry: ConfigEntry) -> bool:
     """Migrate old entry."""
     _LOGGER.debug("Migrating from version %s", config_entry.version)
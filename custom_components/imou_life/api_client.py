@@ -0,0 +1,236 @@
+"""Shared API clients for Imou Accounts.
+
+Every config entry of the same Imou Account talks to the cloud through a single
+ImouAPIClient, so the access token is requested once per account instead of
+once per device. Being the one place every API call goes through, the client
+also enforces the account's call budget, records the metrics of every call,
+reports rate limits to the account backoff (which then suspends the background
+calls of the account) and keeps the device details it gets in the device
+snapshot cache.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from aiohttp import ClientSession
+from homeassistant.core import HomeAssistant
+from imouapi.api import ImouAPIClient
+
+from .api_metrics import (
+    ApiMetrics,
+    classify_error,
+    get_device_id,
+    get_payload_size,
+)
+from .backoff import AccountBackoff
+from .call_budget import CallBudget, get_call_priority
+from .const import API_CLIENT_POOL_KEY, DOMAIN
+from .device_snapshot import DeviceSnapshotCache
+
+_LOGGER = logging.getLogger(__package__)
+
+
+class ImouAccountAPIClient(ImouAPIClient):
+    """ImouAPIClient shared by all the Devices of an Imou Account."""
+
+    def __init__(self, app_id: str, app_secret: str, session: ClientSession) -> None:
+        """Initialize the client."""
+        super().__init__(app_id, app_secret, session)
+        self._connect_lock = asyncio.Lock()
+        self.call_budget: CallBudget | None = None
+        self.metrics: ApiMetrics | None = None
+        self.backoff: AccountBackoff | None = None
+        self.snapshot_cache: DeviceSnapshotCache | None = None
+        self._primed_details: dict[str, dict[str, Any]] = {}
+
+    def get_app_id(self) -> str:
+        """Return the App ID this client authenticates with."""
+        return self._app_id
+
+    def get_app_secret(self) -> str:
+        """Return the App Secret this client authenticates with."""
+        return self._app_secret
+
+    def set_app_secret(self, app_secret: str) -> None:
+        """Replace the App Secret and drop the access token obtained with it."""
+        self._app_secret = app_secret
+        self._access_token = None
+        self._access_token_expire_time = None
+        self._connected = False
+        self._retries = 0
+
+    async def async_connect(self) -> bool:
+        """Retrieve an access token, once, even when many devices ask at once."""
+        if self.is_connected():
+            return True
+        async with self._connect_lock:
+            # Another device may have connected while we were waiting for the lock
+            connected = await super().async_connect()
+            # The base client counts the connection attempts of every call and
+            # gives up past MAX_RETRIES: start over once connected
+            self._retries = 0
+            return connected
+
+    async def _async_call_api(
+        self, api: str, payload: dict, is_connect_request: bool = False
+    ) -> dict:
+        """Submit a request to the API once the call budget allows it, timing it."""
+        if self.backoff is not None:
+            self.backoff.check_call(get_call_priority())
+        if self.call_budget is not None:
+            await self.call_budget.acquire()
+
+        device_id = get_device_id(payload)
+        bytes_sent = get_payload_size(payload)
+        start = time.monotonic()
+        try:
+            data = await super()._async_call_api(api, payload, is_connect_request)
+        except Exception as exception:
+            error = classify_error(exception)
+            if error == "OP1013" and self.backoff is not None:
+                # Stop the other devices of the account before they hit it too
+                self.backoff.record_rate_limit(str(exception))
+            if self.metrics is not None:
+                self.metrics.record(
+                    api,
+                    device_id,
+                    time.monotonic() - start,
+                    error=error,
+                    bytes_sent=bytes_sent,
+                )
+            raise
+        if self.metrics is not None:
+            self.metrics.record(
+                api,
+                device_id,
+                time.monotonic() - start,
+                bytes_sent=bytes_sent,
+                bytes_received=get_payload_size(data),
+            )
+        return data
+
+    def prime_device_details(self, device_data: dict[str, Any]) -> None:
+        """Answer the next details request for a device with cached details.
+
+        Used to initialize an ImouDevice from its snapshot without calling the API.
+        """
+        self._primed_details[device_data["deviceId"]] = device_data
+
+    def clear_primed_device_details(self) -> None:
+        """Forget the cached details no request has used."""
+        self._primed_details.clear()
+
+    async def async_api_deviceBaseDetailList(  # pylint: disable=invalid-name
+        self, devices: list[str]
+    ) -> dict:
+        """Return the details of the requested devices, from cache when primed."""
+        if devices and all(device in self._primed_details for device in devices):
+            device_list = [self._primed_details.pop(device) for device in devices]
+            return {"count": len(device_list), "deviceList": device_list}
+
+        data = await super().async_api_deviceBaseDetailList(devices)
+        if self.snapshot_cache is not None:
+            for device_data in data.get("deviceList", []):
+                self.snapshot_cache.update(device_data, self._app_id)
+        return data
+
+
+@dataclass
+class PooledClient:
+    """An API client together with the number of config entries using it."""
+
+    client: ImouAPIClient
+    ref_count: int = 0
+
+
+class ApiClientPool:
+    """Hand out one shared API client per Imou Account.
+
+    Clients are keyed by (app_id, api_url) and reference-counted: the client is
+    created by the first config entry that needs it and dropped when the last
+    config entry using it is unloaded.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the pool."""
+        self.hass = hass
+        self._ensure_storage()
+
+    def _ensure_storage(self) -> None:
+        """Ensure storage exists in hass.data."""
+        if DOMAIN not in self.hass.data:
+            self.hass.data[DOMAIN] = {}
+        if API_CLIENT_POOL_KEY not in self.hass.data[DOMAIN]:
+            self.hass.data[DOMAIN][API_CLIENT_POOL_KEY] = {}
+
+    def _get_storage(self) -> dict[tuple[str, str], PooledClient]:
+        """Get the pool storage dict."""
+        return self.hass.data[DOMAIN][API_CLIENT_POOL_KEY]
+
+    def acquire(
+        self,
+        app_id: str,
+        app_secret: str,
+        api_url: str,
+        factory: Callable[[], ImouAPIClient],
+    ) -> ImouAPIClient:
+        """Return the shared client for an account, creating it if needed.
+
+        Args:
+            app_id: The Imou API App ID
+            app_secret: The Imou API App Secret
+            api_url: The API endpoint the client talks to
+            factory: Called to build the client when none exists yet
+
+        """
+        key = (app_id, api_url)
+        storage = self._get_storage()
+
+        if key not in storage:
+            storage[key] = PooledClient(client=factory())
+            _LOGGER.debug("Created shared API client for app_id %s", app_id)
+        else:
+            client = storage[key].client
+            if (
+                isinstance(client, ImouAccountAPIClient)
+                and client.get_app_secret() != app_secret
+            ):
+                # Credentials were updated (e.g. reauth), refresh the shared client
+                _LOGGER.debug("App secret changed for app_id %s", app_id)
+                client.set_app_secret(app_secret)
+
+        storage[key].ref_count += 1
+        _LOGGER.debug(
+            "Acquired shared API client for app_id %s (%d users)",
+            app_id,
+            storage[key].ref_count,
+        )
+        return storage[key].client
+
+    def release(self, app_id: str, api_url: str) -> None:
+        """Release a client previously returned by acquire().
+
+        Args:
+            app_id: The Imou API App ID
+            api_url: The API endpoint the client talks to
+
+        """
+        key = (app_id, api_url)
+        storage = self._get_storage()
+
+        if key not in storage:
+            return
+
+        storage[key].ref_count -= 1
+        if storage[key].ref_count <= 0:
+            _LOGGER.debug("Dropping shared API client for app_id %s", app_id)
+            del storage[key]
+
+    def get(self, app_id: str, api_url: str) -> ImouAPIClient | None:
+        """Return the shared client for an account without acquiring it."""
+        pooled = self._get_storage().get((app_id, api_url))
+        return pooled.client if pooled else None
@@ -0,0 +1,231 @@
+"""API call metrics for Imou Accounts.
+
+Every call made through an account API client is recorded: which API, for
+which device, how long it took, how it failed and how much data went each way.
+Per account, the metrics keep:
+
+- cumulative counters per device and per API, since Home Assistant started;
+- the last API_METRICS_BUFFER_SIZE calls in a ring buffer, from which the
+  latency percentiles are computed.
+
+They are exposed through the diagnostics and the (disabled by default) API
+calls and API latency sensors, to find out which devices and operations use
+the quota and the latency budget.
+"""
+
+import json
+import re
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import API_METRICS_BUFFER_SIZE, API_METRICS_KEY, DOMAIN
+
+# Imou API error codes, as prefixed to the message of APIError ("OP1013: ...")
+_ERROR_CODE = re.compile(r"^([A-Z]{2}\d{4}):")
+
+PERCENTILES = (50, 95, 99)
+
+
+def classify_error(exception: Exception) -> str:
+    """Return the error class of a failed call: the API error code if any."""
+    if match := _ERROR_CODE.match(str(exception)):
+        return match.group(1)
+    return type(exception).__name__
+
+
+def get_payload_size(data: Any) -> int:
+    """Return the size of a request or response payload once JSON encoded."""
+    if not data:
+        return 0
+    try:
+        return len(json.dumps(data, separators=(",", ":")))
+    except (TypeError, ValueError):
+        return 0
+
+
+def get_device_id(payload: dict[str, Any]) -> str | None:
+    """Return the device an API call is about, None for account-wide calls."""
+    if device_id := payload.get("deviceId"):
+        return device_id
+    device_list = payload.get("deviceList")
+    if isinstance(device_list, list) and len(device_list) == 1:
+        return device_list[0].get("deviceId")
+    return None
+
+
+@dataclass(slots=True)
+class ApiCallRecord:
+    """A single API call."""
+
+    api: str
+    device_id: str | None
+    duration: float
+    error: str | None = None
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    timestamp: float = field(default_factory=time.time)
+
+
+@dataclass
+class ApiCallCounters:
+    """Cumulative counters of a set of API calls."""
+
+    calls: int = 0
+    errors: Counter[str] = field(default_factory=Counter)
+    bytes_sent: int = 0
+    bytes_received: int = 0
+
+    def add(self, record: ApiCallRecord) -> None:
+        """Count a call."""
+        self.calls += 1
+        if record.error is not None:
+            self.errors[record.error] += 1
+        self.bytes_sent += record.bytes_sent
+        self.bytes_received += record.bytes_received
+
+    def merge(self, other: "ApiCallCounters") -> None:
+        """Add the counts of other to ours."""
+        self.calls += other.calls
+        self.errors.update(other.errors)
+        self.bytes_sent += other.bytes_sent
+        self.bytes_received += other.bytes_received
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters as a dict."""
+        return {
+            "calls": self.calls,
+            "errors": sum(self.errors.values()),
+            "errors_by_class": dict(self.errors),
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+        }
+
+
+def get_percentiles(durations: list[float]) -> dict[str, float | None]:
+    """Return the latency percentiles in milliseconds (nearest rank)."""
+    if not durations:
+        return {f"p{percentile}": None for percentile in PERCENTILES}
+    ordered = sorted(durations)
+    return {
+        f"p{percentile}": round(
+            ordered[max(0, -(-percentile * len(ordered) // 100) - 1)] * 1000, 1
+        )
+        for percentile in PERCENTILES
+    }
+
+
+class ApiMetrics:
+    """Call counters and latency samples of an Imou Account."""
+
+    def __init__(self, app_id: str, buffer_size: int = API_METRICS_BUFFER_SIZE):
+        """Initialize empty metrics."""
+        self.app_id = app_id
+        self._records: deque[ApiCallRecord] = deque(maxlen=buffer_size)
+        self._counters: dict[tuple[str | None, str], ApiCallCounters] = {}
+
+    def record(
+        self,
+        api: str,
+        device_id: str | None,
+        duration: float,
+        error: str | None = None,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+    ) -> ApiCallRecord:
+        """Record a call.
+
+        Args:
+            api: Name of the API called
+            device_id: Device the call was about, None for account-wide calls
+            duration: Seconds the call took
+            error: Error class if the call failed, see classify_error()
+            bytes_sent: Size of the request payload
+            bytes_received: Size of the response payload
+
+        """
+        record = ApiCallRecord(
+            api, device_id, duration, error, bytes_sent, bytes_received
+        )
+        self._records.append(record)
+        key = (device_id, api)
+        if key not in self._counters:
+            self._counters[key] = ApiCallCounters()
+        self._counters[key].add(record)
+        return record
+
+    def get_records(self, device_id: str | None = None) -> list[ApiCallRecord]:
+        """Return the recent calls, of one device or of the whole account."""
+        if device_id is None:
+            return list(self._records)
+        return [record for record in self._records if record.device_id == device_id]
+
+    def get_counters(
+        self, device_id: str | None = None, api: str | None = None
+    ) -> ApiCallCounters:
+        """Return the cumulative counters, of one device and/or API or of all."""
+        total = ApiCallCounters()
+        for (call_device_id, call_api), counters in self._counters.items():
+            if device_id is not None and call_device_id != device_id:
+                continue
+            if api is not None and call_api != api:
+                continue
+            total.merge(counters)
+        return total
+
+    def get_latency(
+        self, device_id: str | None = None, api: str | None = None
+    ) -> dict[str, float | None]:
+        """Return the latency percentiles over the recent calls."""
+        return get_percentiles(
+            [
+                record.duration
+                for record in self.get_records(device_id)
+                if api is None or record.api == api
+            ]
+        )
+
+    def get_summary(self, device_id: str | None = None) -> dict[str, Any]:
+        """Return the metrics of one device or of the whole account."""
+        records = self.get_records(device_id)
+        apis = sorted(
+            {
+                api
+                for call_device_id, api in self._counters
+                if device_id is None or call_device_id == device_id
+            }
+        )
+        summary = self.get_counters(device_id).as_dict()
+        summary["latency_ms"] = get_percentiles([r.duration for r in records])
+        summary["latency_samples"] = len(records)
+        if device_id is not None:
+            account_calls = self.get_counters().calls
+            summary["share_of_account_calls"] = (
+                round(summary["calls"] * 100 / account_calls, 1)
+                if account_calls
+                else 0.0
+            )
+        summary["apis"] = {
+            api: {
+                **self.get_counters(device_id, api).as_dict(),
+                "latency_ms": get_percentiles(
+                    [r.duration for r in records if r.api == api]
+                ),
+            }
+            for api in apis
+        }
+        return summary
+
+
+def get_api_metrics(hass: HomeAssistant, app_id: str) -> ApiMetrics:
+    """Return the API metrics of an Imou Account, creating them if needed.
+
+    Like the call budget, the metrics outlive config entry reloads.
+    """
+    metrics = hass.data.setdefault(DOMAIN, {}).setdefault(API_METRICS_KEY, {})
+    if app_id not in metrics:
+        metrics[app_id] = ApiMetrics(app_id)
+    return metrics[app_id]
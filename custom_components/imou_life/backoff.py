@@ -0,0 +1,209 @@
+"""Rate limit backoff shared by the devices of an Imou Account.
+
+When the Imou cloud answers OP1013, every device of the account is over the
+limit, not just the one which got the error. The backoff of an account is a
+multiplier applied to the scan interval of all its devices:
+
+- on a rate limit, it grows by a random factor between BACKOFF_MIN_GROWTH and
+  BACKOFF_MAX_GROWTH of its current value (decorrelated jitter), so that
+  accounts hitting the limit together do not retry in lockstep. The errors
+  received within BACKOFF_SETTLE_TIME of the last growth (e.g. from polls
+  already running) count as the same event;
+- the backed off interval is capped by BACKOFF_MAX_INTERVAL, and by the
+  estimated reset time of the RateLimitManager: there is no point in waiting
+  past it. When the account has been limited too many times in a row, devices
+  wait for the reset time instead;
+- on successful polls it steps down by BACKOFF_STEP_DOWN_FACTOR, at most once
+  every BACKOFF_STEP_DOWN_INTERVAL, rather than snapping back and hitting the
+  limit again. A success once the estimated reset time has passed means the
+  limit was lifted, and resets it at once.
+
+The first OP1013 of an account, whatever made the call (a poll, discovery, an
+entity action), also suspends the calls of the account which are not user
+actions, for as long as the RateLimitManager backs off. Without it, every
+device would get its own OP1013 before backing off. Suspended calls fail with
+CallsSuspended, which callers handle like an exhausted call budget: polls are
+skipped and keep the last known state. The poll scheduler resumes the devices
+one by one, BACKOFF_RESUME_STAGGER seconds apart.
+
+Coordinators subscribe to the backoff of their account to follow its changes.
+"""
+
+import logging
+import random
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .call_budget import CallBudgetExhausted, CallPriority
+from .const import (
+    BACKOFF_KEY,
+    BACKOFF_MAX_GROWTH,
+    BACKOFF_MAX_INTERVAL,
+    BACKOFF_MIN_GROWTH,
+    BACKOFF_SETTLE_TIME,
+    BACKOFF_STEP_DOWN_FACTOR,
+    BACKOFF_STEP_DOWN_INTERVAL,
+    DOMAIN,
+    RATE_LIMIT_MAX_PROBE_RETRIES,
+)
+from .rate_limit_manager import RateLimitManager
+
+_LOGGER = logging.getLogger(__package__)
+
+
+class CallsSuspended(CallBudgetExhausted):
+    """The calls of the account are suspended after a rate limit."""
+
+    def get_title(self) -> str:
+        """Return the title of the exception which will be then translated."""
+        return "calls_suspended"
+
+
+class AccountBackoff:
+    """Backoff of the scan interval of the devices of an Imou Account."""
+
+    def __init__(self, hass: HomeAssistant, app_id: str) -> None:
+        """Initialize the backoff, not backed off."""
+        self.hass = hass
+        self.app_id = app_id
+        self.factor = 1.0
+        self.last_change: datetime | None = None
+        self.suspended_until: datetime | None = None
+        self._listeners: list[Callable[[], None]] = []
+
+    @property
+    def is_backed_off(self) -> bool:
+        """Return True if the scan intervals are currently backed off."""
+        return self.factor > 1
+
+    def is_suspended(self) -> bool:
+        """Return True if the calls of the account are suspended."""
+        return (
+            self.suspended_until is not None and dt_util.utcnow() < self.suspended_until
+        )
+
+    def check_call(self, priority: CallPriority) -> None:
+        """Refuse the calls other than user actions while suspended.
+
+        Raises:
+            CallsSuspended: if the call must not be made
+
+        """
+        if priority > CallPriority.USER and self.is_suspended():
+            raise CallsSuspended(
+                f"API calls of app_id {self.app_id} suspended until "
+                f"{self.suspended_until.isoformat()} after a rate limit"
+            )
+
+    @callback
+    def async_add_listener(self, update_callback: Callable[[], None]) -> CALLBACK_TYPE:
+        """Call update_callback when the backoff changes."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    def get_interval(self, scan_interval: float) -> float:
+        """Return the backed off scan interval, in seconds."""
+        if not self.is_backed_off:
+            return scan_interval
+        interval = min(scan_interval * self.factor, BACKOFF_MAX_INTERVAL)
+        state = RateLimitManager(self.hass).get_state(self.app_id, "")
+        if state is not None:
+            until_reset = (
+                state.estimated_reset_time - dt_util.utcnow()
+            ).total_seconds()
+            if state.hit_count >= RATE_LIMIT_MAX_PROBE_RETRIES:
+                # Probing again is pointless, wait for the reset
+                interval = until_reset
+            else:
+                interval = min(interval, until_reset)
+        return max(interval, scan_interval)
+
+    @callback
+    def record_rate_limit(self, error_message: str) -> None:
+        """Back off after an OP1013."""
+        now = dt_util.utcnow()
+        if (
+            self.last_change is not None
+            and self.is_backed_off
+            and (now - self.last_change).total_seconds() < BACKOFF_SETTLE_TIME
+        ):
+            return
+        rate_limit_mgr = RateLimitManager(self.hass)
+        rate_limit_mgr.record_rate_limit(self.app_id, "", error_message)
+        _is_limited, limit_data = rate_limit_mgr.is_rate_limited(self.app_id, "")
+        self.suspended_until = now + timedelta(
+            seconds=limit_data["backoff_seconds"] if limit_data else 0
+        )
+        self.factor = random.uniform(
+            self.factor * BACKOFF_MIN_GROWTH, self.factor * BACKOFF_MAX_GROWTH
+        )
+        self.last_change = now
+        _LOGGER.info(
+            "Rate limited, suspending the calls of app_id %s until %s "
+            "and backing off its polls by %.1fx",
+            self.app_id,
+            self.suspended_until.isoformat(),
+            self.factor,
+        )
+        self._async_notify()
+
+    @callback
+    def record_success(self) -> None:
+        """Step the backoff down after a successful poll."""
+        now = dt_util.utcnow()
+        rate_limit_mgr = RateLimitManager(self.hass)
+        state = rate_limit_mgr.get_state(self.app_id, "")
+        # The API answers again, the account is no longer rate limited
+        rate_limit_mgr.clear_rate_limit(self.app_id, "")
+        self.suspended_until = None
+        if not self.is_backed_off:
+            return
+        if state is not None and now >= state.estimated_reset_time:
+            # The limit has been reset, no need to recover gradually
+            factor = 1.0
+        elif (
+            self.last_change is not None
+            and (now - self.last_change).total_seconds() < BACKOFF_STEP_DOWN_INTERVAL
+        ):
+            return
+        else:
+            factor = self.factor / BACKOFF_STEP_DOWN_FACTOR
+        self.factor = max(factor, 1.0)
+        self.last_change = now
+        _LOGGER.info(
+            "Stepping the polls of app_id %s down to %.1fx", self.app_id, self.factor
+        )
+        self._async_notify()
+
+    @callback
+    def _async_notify(self) -> None:
+        """Tell the coordinators of the account the backoff changed."""
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state of the backoff, for the diagnostics."""
+        return {
+            "factor": round(self.factor, 2),
+            "last_change": self.last_change.isoformat() if self.last_change else None,
+            "suspended_until": (
+                self.suspended_until.isoformat() if self.is_suspended() else None
+            ),
+        }
+
+
+def get_account_backoff(hass: HomeAssistant, app_id: str) -> AccountBackoff:
+    """Return the backoff of an Imou Account, creating it if needed."""
+    backoffs = hass.data.setdefault(DOMAIN, {}).setdefault(BACKOFF_KEY, {})
+    if app_id not in backoffs:
+        backoffs[app_id] = AccountBackoff(hass, app_id)
+    return backoffs[app_id]
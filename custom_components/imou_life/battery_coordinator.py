@@ -3,14 +3,18 @@
 import asyncio
 import logging
 from datetime import datetime, time, timedelta
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt as dt_util
 
+from .battery_history import BatteryHistoryCache
+from .call_budget import CallBudgetExhausted, CallPriority, call_priority
 from .const import (
+    BATTERY_DATA_MAX_AGE,
+    BATTERY_OPTIMIZATION_LEAD_TIME,
     DEFAULT_AUTO_SLEEP,
     DEFAULT_BATTERY_THRESHOLD,
     DEFAULT_LED_INDICATORS,
@@ -22,9 +26,45 @@ from .const import (
     RECORDING_QUALITY_OPTIONS,
     SLEEP_SCHEDULE_OPTIONS,
 )
+from .power_state import get_device_power_state
+from .wake_queue import async_run_command
+
+if TYPE_CHECKING:
+    from .coordinator import ImouDataUpdateCoordinator
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
+# Allowed values of the battery settings, and the error raised for other values
+_SETTING_VALUES = {
+    "power_mode": (POWER_MODES, "invalid_power_mode"),
+    "motion_sensitivity": (MOTION_SENSITIVITY_LEVELS, "invalid_motion_sensitivity"),
+    "recording_quality": (RECORDING_QUALITY_OPTIONS, "invalid_recording_quality"),
+}
+
+# Returned when the battery cannot be read
+_UNKNOWN_BATTERY_DATA = {
+    "level": 100,
+    "voltage": None,
+    "consumption": None,
+    "charging": False,
+}
+
+
+def get_battery_reading(device) -> Optional[Dict[str, Any]]:
+    """Return the battery data held by the battery sensor of a device.
+
+    The sensor only holds the level, None if the device has no battery sensor
+    or it was not read yet.
+    """
+    sensor = device.get_sensor_by_name("battery")
+    if sensor is None:
+        return None
+    try:
+        level = int(sensor.get_state())
+    except (TypeError, ValueError):
+        return None
+    return {**_UNKNOWN_BATTERY_DATA, "level": level}
+
 
 class BatteryOptimizationCoordinator(DataUpdateCoordinator):
     """Coordinator for battery optimization features."""
@@ -35,8 +75,19 @@ class BatteryOptimizationCoordinator(DataUpdateCoordinator):
         device,
         config_entry,
         scan_interval: int = 300,  # 5 minutes default
+        device_coordinator: Optional["ImouDataUpdateCoordinator"] = None,
     ) -> None:
-        """Initialize the battery optimization coordinator."""
+        """Initialize the battery optimization coordinator.
+
+        Args:
+            hass: Home Assistant instance
+            device: The battery powered device
+            config_entry: Config entry of the device
+            scan_interval: Seconds between two battery optimization updates
+            device_coordinator: Coordinator polling the device, whose battery
+                readings are used instead of polling the battery again
+
+        """
         super().__init__(
             hass,
             _LOGGER,
@@ -61,14 +112,37 @@ class BatteryOptimizationCoordinator(DataUpdateCoordinator):
         # Load settings from config
         self._load_settings()
 
-        # Battery monitoring
-        self._last_battery_level = None
+        # Battery monitoring, with the level history of the device predicting
+        # when the battery reaches the threshold
+        self._history_cache = BatteryHistoryCache(hass)
+        self._device_id = device.get_device_id()
+        self.history = self._history_cache.get(self._device_id)
+        self._last_reading: Optional[tuple[Dict[str, Any], datetime]] = None
+        self.device_coordinator = device_coordinator
+        self._device_reading: Optional[tuple[Dict[str, Any], datetime]] = None
+        self._unsub_device_coordinator: Optional[CALLBACK_TYPE] = None
+        if device_coordinator is not None:
+            self._unsub_device_coordinator = device_coordinator.async_add_listener(
+                self._async_handle_device_update
+            )
+            self._async_handle_device_update()
         self._battery_optimization_active = False
         self._sleep_mode_active = False
 
+        # Settings last confirmed by the device, unknown until we set them
+        self._device_settings: Dict[str, Any] = {}
+        # Settings waiting for the device to wake up, and the optimization state
+        # they put the device in
+        self._pending_settings: Dict[str, Any] = {}
+        self._pending_optimization: Optional[bool] = None
+
+        # Whether the device sleeps, shared with the device coordinator
+        self.power_state = get_device_power_state(hass, self._device_id)
+
         # State locking to prevent race conditions
         self._optimization_lock = asyncio.Lock()
         self._sleep_lock = asyncio.Lock()
+        self._settings_lock = asyncio.Lock()
 
         # Hysteresis for battery optimization
         # Prevents rapid on/off cycling when battery level hovers near threshold
@@ -111,19 +185,52 @@ class BatteryOptimizationCoordinator(DataUpdateCoordinator):
                 self._sleep_start_time = time(22, 0)
                 self._sleep_end_time = time(6, 0)
 
+    @callback
+    def async_apply_options(self) -> None:
+        """Apply changed options of the config entry, without setting it up again.
+
+        The new thresholds and sleep schedule are used from the next update.
+        """
+        self._load_settings()
+
+    @callback
+    def _async_handle_device_update(self) -> None:
+        """Keep the battery level read by a poll of the device coordinator."""
+        if not self.device_coordinator.last_update_success:
+            return
+        polled = self.device_coordinator.sensor_scheduler.get_last_poll("battery")
+        reading = get_battery_reading(self.device)
+        if polled is not None and reading is not None:
+            self._device_reading = (reading, polled)
+            self._history_cache.record(self._device_id, reading["level"], polled)
+
+    async def async_shutdown(self) -> None:
+        """Stop following the device coordinator."""
+        await super().async_shutdown()
+        if self._unsub_device_coordinator is not None:
+            self._unsub_device_coordinator()
+            self._unsub_device_coordinator = None
+
     async def _async_update_data(self):
         """Update battery optimization data."""
         try:
-            # Get current battery level
-            battery_data = await self._get_battery_data()
-
-            # Check if battery optimization should be activated
-            await self._check_battery_optimization(battery_data)
+            # Get current battery level, as background work
+            with call_priority(CallPriority.BACKGROUND):
+                battery_data = await self._get_battery_data()
+
+            # Check if battery optimization should be activated, once the
+            # level is known
+            if battery_data is None:
+                battery_data = {}
+            else:
+                await self._check_battery_optimization(battery_data)
 
             # Check sleep schedule
             await self._check_sleep_schedule()
 
             return {
+                **self.history.get_summary(),
+                "hours_to_threshold": self._get_hours_to_threshold(),
                 "battery_level": battery_data.get("level"),
                 "battery_voltage": battery_data.get("voltage"),
                 "power_consumption": battery_data.get("consumption"),
@@ -137,6 +244,13 @@ class BatteryOptimizationCoordinator(DataUpdateCoordinator):
                 "battery_optimization_active": self._battery_optimization_active,
             }
 
+        except CallBudgetExhausted as exception:
+            # Skipped (e.g. calls suspended after a rate limit), keep the last data
+            if self.data is not None:
+                _LOGGER.debug("Skipping battery update: %s", exception)
+                return self.data
+            raise UpdateFailed(str(exception)) from exception
+
         except Exception as exception:
             _LOGGER.error(
                 "Error updating battery optimization data: %s", str(exception)
@@ -144,36 +258,77 @@ class BatteryOptimizationCoordinator(DataUpdateCoordinator):
             raise
 
     async def _get_battery_data(self):
-        """Get battery data from device."""
+        """Get battery data, polling the device only when it is not fresh.
+
+        The battery of a sleeping device is not polled, its last known level
+        is used instead: None if there is none.
+        """
+        if self.power_state.is_asleep():
+            return self._get_last_battery_data()
+
+        if self._device_reading is not None:
+            reading, polled = self._device_reading
+            if dt_util.utcnow() - polled <= timedelta(seconds=BATTERY_DATA_MAX_AGE):
+                return reading
+
+        # The level of a battery discharging slowly is not polled on every update
+        now = dt_util.utcnow()
+        if self._last_reading is not None:
+            reading, read_at = self._last_reading
+            interval = self.history.get_poll_interval()
+            if now - read_at < timedelta(seconds=interval):
+                return reading
+
         try:
             # Try to get battery data from device API
             if hasattr(self.device, "async_get_battery_status"):
                 battery_status = await self.device.async_get_battery_status()
-                return {
+                reading = {
                     "level": battery_status.get("level", 100),
                     "voltage": battery_status.get("voltage"),
                     "consumption": battery_status.get("consumption"),
                     "charging": battery_status.get("charging", False),
                 }
+                if "level" not in battery_status:
+                    return reading
             else:
-                # Fallback: try to get from device data
-                device_data = await self.device.async_get_data()
-                battery_info = device_data.get("battery", {})
-                return {
-                    "level": battery_info.get("level", 100),
-                    "voltage": battery_info.get("voltage"),
-                    "consumption": battery_info.get("consumption"),
-                    "charging": battery_info.get("charging", False),
-                }
+                # Fallback: read the battery sensor only, not the whole device
+                sensor = self.device.get_sensor_by_name("battery")
+                if sensor is None:
+                    _LOGGER.debug("%s has no battery sensor", self.device.get_name())
+                    return dict(_UNKNOWN_BATTERY_DATA)
+                await sensor.async_update()
+                reading = get_battery_reading(self.device)
+                if reading is None:
+                    return dict(_UNKNOWN_BATTERY_DATA)
+            self._last_reading = (reading, now)
+            self._history_cache.record(self._device_id, reading["level"], now)
+            return reading
+        except CallBudgetExhausted:
+            raise
         except Exception as exception:
             _LOGGER.error("Error getting battery data: %s", str(exception))
             # Return safe defaults
-            return {
-                "level": 100,
-                "voltage": None,
-                "consumption": None,
-                "charging": False,
-            }
+            return dict(_UNKNOWN_BATTERY_DATA)
+
+    def _get_last_battery_data(self) -> Optional[Dict[str, Any]]:
+        """Return the last battery data read, however old it is."""
+        readings = [
+            reading
+            for reading in (self._device_reading, self._last_reading)
+            if reading is not None
+        ]
+        if readings:
+            return max(readings, key=lambda reading: reading[1])[0]
+        last = self.history.get_last()
+        if last is None:
+            return None
+        return {**_UNKNOWN_BATTERY_DATA, "level": last[1]}
+
+    def _get_hours_to_threshold(self) -> Optional[float]:
+        """Return the predicted hours until the battery reaches the threshold."""
+        hours = self.history.get_hours_to(self._battery_threshold)
+        return round(hours, 1) if hours is not None else None
 
     async def _check_battery_optimization(self, battery_data):
         """Check if battery optimization should be activated."""
@@ -181,20 +336,37 @@ class BatteryOptimizationCoordinator(DataUpdateCoordinator):
         if battery_level is None:
             return
 
+        # Optimize ahead of the threshold when the discharge model predicts it
+        hours_to_threshold = self.history.get_hours_to(self._battery_threshold)
+        reaching_threshold = (
+            hours_to_threshold is not None
+            and hours_to_threshold <= BATTERY_OPTIMIZATION_LEAD_TIME
+        )
+
+        # Settings waiting for the device to wake up count as applied
+        optimization_active = self._get_optimization_target()
+
         # Check if battery level is below threshold (with hysteresis)
-        if (
-            battery_level <= self._battery_threshold
-            and not self._battery_optimization_active
-        ):
+        if battery_level <= self._battery_threshold and not optimization_active:
             _LOGGER.info(
                 "Battery level %d%% is below threshold %d%%, activating optimization",
                 battery_level,
                 self._battery_threshold,
             )
             await self._activate_battery_optimization()
+        elif reaching_threshold and not optimization_active:
+            _LOGGER.info(
+                "Battery level %d%% is predicted to reach threshold %d%% in %.1f "
+                "hours, activating optimization",
+                battery_level,
+                self._battery_threshold,
+                hours_to_threshold,
+            )
+            await self._activate_battery_optimization()
         elif (
             battery_level > self._battery_threshold + self._battery_hysteresis
-            and self._battery_optimization_active
+            and not reaching_threshold
+            and optimization_active
         ):
             _LOGGER.info(
                 "Battery level %d%% is above threshold + hysteresis (%d%%), "
@@ -235,7 +407,9 @@ class BatteryOptimizationCoordinator(DataUpdateCoordinator):
     async def _should_sleep_battery_based(self) -> bool:
         """Check if device should sleep during battery-based schedule."""
         # Use cached battery level from coordinator data instead of making new API call
-        battery_level = self.data.get("battery_level", 100) if self.data else 100
+        battery_level = self.data.get("battery_level") if self.data else None
+        if battery_level is None:
+            battery_level = 100
 
         # Apply hysteresis to prevent rapid on/off cycling
         if self.is_sleep_mode_active():
@@ -263,31 +437,49 @@ class BatteryOptimizationCoordinator(DataUpdateCoordinator):
         elif not should_sleep and self.is_sleep_mode_active():
             await self.exit_sleep_mode()
 
+    def _get_optimization_target(self) -> bool:
+        """Return whether optimization is active, or will be once the device wakes."""
+        if self._pending_optimization is not None:
+            return self._pending_optimization
+        return self._battery_optimization_active
+
+    async def _apply_optimization(self, active: bool, settings: Dict[str, Any]):
+        """Apply the settings of an optimization state, then record the state.
+
+        While the device sleeps, the state is recorded once the deferred settings
+        are applied on wake up.
+        """
+        deferred = self.power_state.is_asleep()
+        await self.apply_settings(settings)
+        if deferred:
+            self._pending_optimization = active
+            _LOGGER.info(
+                "Battery optimization %s once the device wakes up",
+                "activated" if active else "deactivated",
+            )
+            return
+        self._pending_optimization = None
+        self._battery_optimization_active = active
+        _LOGGER.info(
+            "Battery optimization %s", "activated" if active else "deactivated"
+        )
+
     async def _activate_battery_optimization(self):
         """Activate battery optimization features."""
         async with self._optimization_lock:
-            if self._battery_optimization_active:
+            if self._get_optimization_target():
                 return  # Already active
 
             try:
-                # Reduce motion sensitivity
-                if self._motion_sensitivity != "low":
-                    await self._set_motion_sensitivity("low")
-
-                # Reduce recording quality
-                if self._recording_quality != "low":
-                    await self._set_recording_quality("low")
-
-                # Disable LED indicators
-                if self._led_indicators:
-                    await self._set_led_indicators(False)
-
-                # Set power mode to power saving
-                if self._power_mode != "power_saving":
-                    await self._set_power_mode("power_saving")
-
-                self._battery_optimization_active = True
-                _LOGGER.info("Battery optimization activated")
+                await self._apply_optimization(
+                    True,
+                    {
+                        "motion_sensitivity": "low",
+                        "recording_quality": "low",
+                        "led_indicators": False,
+                        "power_mode": "power_saving",
+                    },
+                )
 
             except Exception as exception:
                 _LOGGER.error(
@@ -297,24 +489,20 @@ class BatteryOptimizationCoordinator(DataUpdateCoordinator):
     async def _deactivate_battery_optimization(self):
         """Deactivate battery optimization features."""
         async with self._optimization_lock:
-            if not self._battery_optimization_active:
+            if not self._get_optimization_target():
                 return  # Already inactive
 
             try:
-                # Restore motion sensitivity
-                await self._set_motion_sensitivity(self._motion_sensitivity)
-
-                # Restore recording quality
-                await self._set_recording_quality(self._recording_quality)
-
-                # Restore LED indicators
-                await self._set_led_indicators(self._led_indicators)
-
-                # Restore power mode
-                await self._set_power_mode(self._power_mode)
-
-                self._battery_optimization_active = False
-                _LOGGER.info("Battery optimization deactivated")
+                # Restore the configured settings
+                await self._apply_optimization(
+                    False,
+                    {
+                        "motion_sensitivity": self._motion_sensitivity,
+                        "recording_quality": self._recording_quality,
+                        "led_indicators": self._led_indicators,
+                        "power_mode": self._power_mode,
+                    },
+                )
 
             except Exception as exception:
                 _LOGGER.error(
@@ -332,8 +520,11 @@ class BatteryOptimizationCoordinator(DataUpdateCoordinator):
                 _LOGGER.info("Entering sleep mode")
                 # Try to call device API if available
                 if hasattr(self.device, "async_enter_sleep_mode"):
-                    await self.device.async_enter_sleep_mode()
+                    await async_run_command(
+                        self.hass, self.device, self.device.async_enter_sleep_mode
+                    )
                     self._sleep_mode_active = True
+                    self.power_state.async_set_sleep_mode(True)
                 else:
                     _LOGGER.warning(
                         "Device does not support async_enter_sleep_mode - "
@@ -354,8 +545,11 @@ class BatteryOptimizationCoordinator(DataUpdateCoordinator):
                 _LOGGER.info("Exiting sleep mode")
                 # Try to call device API if available
                 if hasattr(self.device, "async_exit_sleep_mode"):
-                    await self.device.async_exit_sleep_mode()
+                    await async_run_command(
+                        self.hass, self.device, self.device.async_exit_sleep_mode
+                    )
                     self._sleep_mode_active = False
+                    self.power_state.async_set_sleep_mode(False)
                 else:
                     _LOGGER.warning(
                         "Device does not support async_exit_sleep_mode - "
@@ -369,8 +563,8 @@ class BatteryOptimizationCoordinator(DataUpdateCoordinator):
         """Check if sleep mode is currently active - public API method."""
         return self._sleep_mode_active
 
-    async def _set_motion_sensitivity(self, sensitivity: str):
-        """Set motion sensitivity level."""
+    async def _set_motion_sensitivity(self, sensitivity: str) -> bool:
+        """Set motion sensitivity level, return whether the device supports it."""
         if sensitivity not in MOTION_SENSITIVITY_LEVELS:
             raise HomeAssistantError(
                 translation_domain=DOMAIN,
@@ -381,18 +575,25 @@ class BatteryOptimizationCoordinator(DataUpdateCoordinator):
         try:
             _LOGGER.info("Setting motion sensitivity to %s", sensitivity)
             if hasattr(self.device, "async_set_motion_sensitivity"):
-                await self.device.async_set_motion_sensitivity(sensitivity)
+                await async_run_command(
+                    self.hass,
+                    self.device,
+                    self.device.async_set_motion_sensitivity,
+                    sensitivity,
+                )
+                return True
             else:
                 _LOGGER.warning(
                     "Device does not support async_set_motion_sensitivity - "
                     "motion sensitivity API not available"
                 )
+                return False
         except Exception as exception:
             _LOGGER.error("Error setting motion sensitivity: %s", str(exception))
             raise
 
-    async def _set_recording_quality(self, quality: str):
-        """Set recording quality."""
+    async def _set_recording_quality(self, quality: str) -> bool:
+        """Set recording quality, return whether the device supports it."""
         if quality not in RECORDING_QUALITY_OPTIONS:
             raise HomeAssistantError(
                 translation_domain=DOMAIN,
@@ -403,36 +604,50 @@ class BatteryOptimizationCoordinator(DataUpdateCoordinator):
         try:
             _LOGGER.info("Setting recording quality to %s", quality)
             if hasattr(self.device, "async_set_recording_quality"):
-                await self.device.async_set_recording_quality(quality)
+                await async_run_command(
+                    self.hass,
+                    self.device,
+                    self.device.async_set_recording_quality,
+                    quality,
+                )
+                return True
             else:
                 _LOGGER.warning(
                     "Device does not support async_set_recording_quality - "
                     "recording quality API not available"
                 )
+                return False
         except Exception as exception:
             _LOGGER.error("Error setting recording quality: %s", str(exception))
             raise
 
-    async def _set_led_indicators(self, enabled: bool):
-        """Set LED indicators on/off."""
+    async def _set_led_indicators(self, enabled: bool) -> bool:
+        """Set LED indicators on/off, return whether the device supports it."""
         try:
             _LOGGER.info(
                 "Setting LED indicators to %s", "enabled" if enabled else "disabled"
             )
             if hasattr(self.device, "async_set_led_indicators"):
-                await self.device.async_set_led_indicators(enabled)
+                await async_run_command(
+                    self.hass,
+                    self.device,
+                    self.device.async_set_led_indicators,
+                    enabled,
+                )
                 self._led_indicators = enabled
+                return True
             else:
                 _LOGGER.warning(
                     "Device does not support async_set_led_indicators - "
                     "LED indicators API not available"
                 )
+                return False
         except Exception as exception:
             _LOGGER.error("Error setting LED indicators: %s", str(exception))
             raise
 
-    async def _set_power_mode(self, mode: str):
-        """Set power mode."""
+    async def _set_power_mode(self, mode: str) -> bool:
+        """Set power mode, return whether the device supports it."""
         if mode not in POWER_MODES:
             raise HomeAssistantError(
                 translation_domain=DOMAIN,
@@ -443,17 +658,139 @@ class BatteryOptimizationCoordinator(DataUpdateCoordinator):
         try:
             _LOGGER.info("Setting power mode to %s", mode)
             if hasattr(self.device, "async_set_power_mode"):
-                await self.device.async_set_power_mode(mode)
+                await async_run_command(
+                    self.hass, self.device, self.device.async_set_power_mode, mode
+                )
                 self._power_mode = mode
+                return True
             else:
                 _LOGGER.warning(
                     "Device does not support async_set_power_mode - "
                     "power mode API not available"
                 )
+                return False
         except Exception as exception:
             _LOGGER.error("Error setting power mode: %s", str(exception))
             raise
 
+    async def apply_settings(self, settings: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply a change set of battery settings to the device.
+
+        Only the settings differing from the ones last confirmed by the device
+        are sent: all at once when the device has a batch setter, concurrently
+        otherwise, so that a sleeping camera is woken up once. When some of them
+        fail, the others are rolled back to their previous value. While the
+        device sleeps, the settings are kept and applied once it wakes up.
+
+        Args:
+            settings: Desired power_mode, motion_sensitivity, recording_quality
+                and/or led_indicators
+
+        Returns:
+            The settings that were sent, none while the device sleeps
+
+        Raises:
+            HomeAssistantError: if a value is invalid, before anything is sent
+
+        """
+        for setting, value in settings.items():
+            if setting not in _SETTING_VALUES:
+                continue
+            allowed, translation_key = _SETTING_VALUES[setting]
+            if value not in allowed:
+                raise HomeAssistantError(
+                    translation_domain=DOMAIN,
+                    translation_key=translation_key,
+                    translation_placeholders={"value": str(value)},
+                )
+
+        if self.power_state.is_asleep():
+            _LOGGER.debug("Battery settings %s deferred until wake up", settings)
+            self._pending_settings.update(settings)
+            self.power_state.async_defer(
+                "battery_settings", self._async_apply_pending_settings
+            )
+            return {}
+
+        async with self._settings_lock:
+            changes = {
+                setting: value
+                for setting, value in settings.items()
+                if setting not in self._device_settings
+                or self._device_settings[setting] != value
+            }
+            if not changes:
+                return changes
+
+            batch_setter = getattr(self.device, "async_set_battery_settings", None)
+            if asyncio.iscoroutinefunction(batch_setter):
+                _LOGGER.info("Setting battery settings %s", changes)
+                try:
+                    await async_run_command(
+                        self.hass, self.device, batch_setter, changes
+                    )
+                except Exception:
+                    # We cannot tell which settings the device took
+                    for setting in changes:
+                        self._device_settings.pop(setting, None)
+                    raise
+                self._device_settings.update(changes)
+                return changes
+
+            previous = dict(self._device_settings)
+            failures = await self._send_settings(changes)
+            if failures:
+                rollback = {
+                    setting: previous[setting]
+                    for setting in changes
+                    if setting not in failures and setting in previous
+                }
+                if rollback:
+                    _LOGGER.warning(
+                        "Rolling back battery settings %s after a failure", rollback
+                    )
+                    await self._send_settings(rollback)
+                raise next(iter(failures.values()))
+            return changes
+
+    async def _async_apply_pending_settings(self) -> None:
+        """Apply the settings deferred while the device was asleep."""
+        settings, self._pending_settings = self._pending_settings, {}
+        optimization, self._pending_optimization = self._pending_optimization, None
+        await self.apply_settings(settings)
+        if optimization is not None:
+            self._battery_optimization_active = optimization
+            _LOGGER.info(
+                "Battery optimization %s",
+                "activated" if optimization else "deactivated",
+            )
+
+    async def _send_settings(self, settings: Dict[str, Any]) -> Dict[str, Exception]:
+        """Send settings concurrently, recording the ones the device confirmed.
+
+        Returns:
+            The exception raised for each setting that failed
+
+        """
+        setters = {
+            "power_mode": self._set_power_mode,
+            "motion_sensitivity": self._set_motion_sensitivity,
+            "recording_quality": self._set_recording_quality,
+            "led_indicators": self._set_led_indicators,
+        }
+        results = await asyncio.gather(
+            *(setters[setting](value) for setting, value in settings.items()),
+            return_exceptions=True,
+        )
+        failures = {}
+        for (setting, value), result in zip(settings.items(), results):
+            if isinstance(result, Exception):
+                failures[setting] = result
+                self._device_settings.pop(setting, None)
+            elif result:
+                self._device_settings[setting] = value
+        return failures
+
     # Public methods for external use
     async def set_power_mode(self, mode: str):
         """Set power mode - public API method."""
@@ -479,13 +816,15 @@ class BatteryOptimizationCoordinator(DataUpdateCoordinator):
         led_indicators = kwargs.get("led_indicators", False)
 
         try:
-            await self._set_power_mode(power_mode)
-            await self._set_motion_sensitivity(motion_sensitivity)
-            await self._set_recording_quality(recording_quality)
-            await self._set_led_indicators(led_indicators)
-
-            self._battery_optimization_active = True
-            _LOGGER.info("Battery optimization applied")
+            await self._apply_optimization(
+                True,
+                {
+                    "power_mode": power_mode,
+                    "motion_sensitivity": motion_sensitivity,
+                    "recording_quality": recording_quality,
+                    "led_indicators": led_indicators,
+                },
+            )
 
         except Exception as exception:
             _LOGGER.error("Error applying battery optimization: %s", str(exception))
@@ -0,0 +1,247 @@
+"""Battery history and discharge model of battery powered Imou devices.
+
+The battery level of a device is kept in a fixed-size ring buffer of (time,
+level) samples, persisted so that the model survives a restart. A line fitted
+by least squares to the samples taken since the battery was last charged gives
+the discharge rate, from which the hours until the battery reaches the
+optimization threshold, or runs empty, are predicted.
+
+The battery optimization coordinator uses the predictions to optimize the
+battery ahead of the threshold, and polls the battery less often the slower
+its level moves.
+"""
+
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    BATTERY_CHARGE_MIN_RISE,
+    BATTERY_HISTORY_KEY,
+    BATTERY_HISTORY_MIN_SPACING,
+    BATTERY_HISTORY_SAVE_DELAY,
+    BATTERY_HISTORY_SIZE,
+    BATTERY_HISTORY_STORAGE_KEY,
+    BATTERY_HISTORY_STORAGE_VERSION,
+    BATTERY_HISTORY_STORE_KEY,
+    BATTERY_MODEL_MIN_SAMPLES,
+    BATTERY_MODEL_MIN_SPAN,
+    BATTERY_POLL_LEVEL_STEP,
+    BATTERY_POLL_MAX_INTERVAL,
+    DOMAIN,
+)
+
+_LOGGER = logging.getLogger(__package__)
+
+
+class BatteryHistory:
+    """Battery level samples of a device, oldest first."""
+
+    def __init__(self, size: int = BATTERY_HISTORY_SIZE) -> None:
+        """Initialize an empty history."""
+        # (POSIX timestamp, level) pairs
+        self._samples: deque[tuple[float, int]] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        """Return the number of samples."""
+        return len(self._samples)
+
+    def record(self, level: int, when: datetime) -> bool:
+        """Add a battery level sample.
+
+        Samples taken less than BATTERY_HISTORY_MIN_SPACING seconds after the
+        last one are dropped, unless the battery was charged in between.
+
+        Returns:
+            True if the sample was kept
+
+        """
+        timestamp = when.timestamp()
+        if self._samples:
+            last_timestamp, last_level = self._samples[-1]
+            if timestamp <= last_timestamp:
+                return False
+            if (
+                timestamp - last_timestamp < BATTERY_HISTORY_MIN_SPACING
+                and level < last_level + BATTERY_CHARGE_MIN_RISE
+            ):
+                return False
+        self._samples.append((timestamp, level))
+        return True
+
+    def get_last(self) -> tuple[datetime, int] | None:
+        """Return the time and level of the last sample."""
+        if not self._samples:
+            return None
+        timestamp, level = self._samples[-1]
+        return dt_util.utc_from_timestamp(timestamp), level
+
+    def _get_discharge_samples(self) -> list[tuple[float, int]]:
+        """Return the samples taken since the battery was last charged."""
+        samples = list(self._samples)
+        start = 0
+        for index in range(1, len(samples)):
+            if samples[index][1] >= samples[index - 1][1] + BATTERY_CHARGE_MIN_RISE:
+                start = index
+        return samples[start:]
+
+    def get_discharge_rate(self) -> float | None:
+        """Return the discharge rate in % per hour, negative while charging.
+
+        None until enough samples were taken since the last charge.
+        """
+        samples = self._get_discharge_samples()
+        if (
+            len(samples) < BATTERY_MODEL_MIN_SAMPLES
+            or samples[-1][0] - samples[0][0] < BATTERY_MODEL_MIN_SPAN
+        ):
+            return None
+        mean_time = sum(timestamp for timestamp, _ in samples) / len(samples)
+        mean_level = sum(level for _, level in samples) / len(samples)
+        covariance = sum(
+            (timestamp - mean_time) * (level - mean_level)
+            for timestamp, level in samples
+        )
+        variance = sum((timestamp - mean_time) ** 2 for timestamp, _ in samples)
+        return -covariance / variance * 3600
+
+    def get_hours_to(self, level: float, now: datetime | None = None) -> float | None:
+        """Return the predicted hours until the battery is down to a level.
+
+        None when the battery is not discharging, or the rate is not known yet.
+        """
+        rate = self.get_discharge_rate()
+        last = self.get_last()
+        if rate is None or rate <= 0 or last is None:
+            return None
+        sampled_at, last_level = last
+        elapsed = ((now or dt_util.utcnow()) - sampled_at).total_seconds() / 3600
+        return max(0.0, (last_level - level) / rate - elapsed)
+
+    def get_poll_interval(self) -> float:
+        """Return the seconds between two battery polls.
+
+        Polls are spaced for the level to move by about BATTERY_POLL_LEVEL_STEP
+        between them, up to BATTERY_POLL_MAX_INTERVAL. 0 (poll on every update)
+        while the discharge rate is not known.
+        """
+        rate = self.get_discharge_rate()
+        if rate is None:
+            return 0.0
+        if rate <= 0:
+            return float(BATTERY_POLL_MAX_INTERVAL)
+        return min(
+            float(BATTERY_POLL_MAX_INTERVAL), BATTERY_POLL_LEVEL_STEP / rate * 3600
+        )
+
+    def get_summary(self) -> dict[str, Any]:
+        """Return the model of the discharge, for the coordinator data."""
+        rate = self.get_discharge_rate()
+        return {
+            "discharge_rate": round(rate, 3) if rate is not None else None,
+            "hours_to_empty": _round_hours(self.get_hours_to(0)),
+            "history_samples": len(self._samples),
+        }
+
+    def as_list(self) -> list[list[float | int]]:
+        """Return the samples as a JSON serializable list."""
+        return [[round(timestamp), level] for timestamp, level in self._samples]
+
+    @classmethod
+    def from_list(cls, data: Any) -> "BatteryHistory":
+        """Restore a history saved with as_list(), skipping invalid samples."""
+        history = cls()
+        if not isinstance(data, list):
+            return history
+        for sample in data:
+            try:
+                timestamp, level = float(sample[0]), int(sample[1])
+            except (IndexError, TypeError, ValueError):
+                continue
+            if not history._samples or timestamp > history._samples[-1][0]:
+                history._samples.append((timestamp, level))
+        return history
+
+
+def _round_hours(hours: float | None) -> float | None:
+    """Round predicted hours for display."""
+    return round(hours, 1) if hours is not None else None
+
+
+class BatteryHistoryCache:
+    """Manage the persisted battery histories of the devices."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the battery history cache."""
+        self.hass = hass
+        self._ensure_storage()
+
+    def _ensure_storage(self) -> None:
+        """Ensure storage exists in hass.data."""
+        if DOMAIN not in self.hass.data:
+            self.hass.data[DOMAIN] = {}
+        if BATTERY_HISTORY_KEY not in self.hass.data[DOMAIN]:
+            self.hass.data[DOMAIN][BATTERY_HISTORY_KEY] = {}
+
+    def _get_storage(self) -> dict[str, BatteryHistory]:
+        """Get the history storage dict."""
+        return self.hass.data[DOMAIN][BATTERY_HISTORY_KEY]
+
+    async def async_load(self) -> None:
+        """Restore the histories saved before the last restart.
+
+        Until it has been called, histories are only kept in memory.
+        """
+        store: Store = Store(
+            self.hass, BATTERY_HISTORY_STORAGE_VERSION, BATTERY_HISTORY_STORAGE_KEY
+        )
+        self.hass.data[DOMAIN][BATTERY_HISTORY_STORE_KEY] = store
+
+        data = await store.async_load()
+        if not data:
+            return
+        storage = self._get_storage()
+        for device_id, samples in data.get("devices", {}).items():
+            storage.setdefault(device_id, BatteryHistory.from_list(samples))
+        _LOGGER.debug("Restored the battery history of %d devices", len(storage))
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Save the histories to disk, grouping changes made in a short time."""
+        store: Store | None = self.hass.data[DOMAIN].get(BATTERY_HISTORY_STORE_KEY)
+        if store is not None:
+            store.async_delay_save(self._data_to_save, BATTERY_HISTORY_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {
+            "devices": {
+                device_id: history.as_list()
+                for device_id, history in self._get_storage().items()
+            }
+        }
+
+    def get(self, device_id: str) -> BatteryHistory:
+        """Return the battery history of a device, creating it if needed."""
+        storage = self._get_storage()
+        if device_id not in storage:
+            storage[device_id] = BatteryHistory()
+        return storage[device_id]
+
+    @callback
+    def record(self, device_id: str, level: int, when: datetime) -> None:
+        """Add a battery level sample to the history of a device."""
+        if self.get(device_id).record(level, when):
+            self._async_schedule_save()
+
+    @callback
+    def remove(self, device_id: str) -> None:
+        """Forget the battery history of a device."""
+        if self._get_storage().pop(device_id, None) is not None:
+            self._async_schedule_save()
@@ -37,7 +37,7 @@ class ImouButton(ImouEntity, ButtonEntity, DeviceClassMixin):
     async def async_press(self) -> None:
         """Handle the button press."""
         # press the button
-        await self.sensor_instance.async_press()
+        await self.async_run_command(self.sensor_instance.async_press)
         _LOGGER.debug(
             "[%s] Pressed %s",
             self.device.get_name(),
@@ -45,7 +45,7 @@ class ImouButton(ImouEntity, ButtonEntity, DeviceClassMixin):
         )
         # ask the coordinator to refresh data to all the sensors
         if self.sensor_instance.get_name() == "refreshData":
-            await self.coordinator.async_request_refresh()
+            await self.coordinator.async_request_full_refresh()
         # refresh the motionAlarm sensor
         if self.sensor_instance.get_name() == "refreshAlarm":
             # update the motionAlarm sensor
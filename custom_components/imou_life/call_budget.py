@@ -0,0 +1,262 @@
+"""API call budget for Imou Accounts.
+
+The Imou cloud enforces a quota of API calls per App ID. Instead of finding out
+we exceeded it when an OP1013 comes back, every call made through the shared
+account API client takes a token from a per-account budget first. The budget is
+made of two token buckets (calls per hour and calls per day) refilling
+continuously.
+
+Calls are classified by priority: background work (coordinator polls,
+discovery) is not allowed to spend the share of the budget reserved to user
+actions (buttons, switches, PTZ, ...), so that a user pressing a button still
+gets through when polling has eaten most of the quota.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+
+from homeassistant.core import HomeAssistant
+from imouapi.exceptions import ImouException
+
+from .const import (
+    CALL_BUDGET_KEY,
+    CALL_BUDGET_MAX_WAIT,
+    CALL_BUDGET_USER_RESERVE,
+    DEFAULT_CALLS_PER_DAY,
+    DEFAULT_CALLS_PER_HOUR,
+    DOMAIN,
+)
+
+_LOGGER = logging.getLogger(__package__)
+
+
+class CallPriority(IntEnum):
+    """Priority class of an API call, lower is more important."""
+
+    USER = 0  # Actions requested by the user (entities, services)
+    SETUP = 1  # Config entry setup and device initialization
+    BACKGROUND = 2  # Coordinator polls and device discovery
+
+
+_call_priority: ContextVar[CallPriority] = ContextVar(
+    "imou_life_call_priority", default=CallPriority.USER
+)
+
+
+@contextmanager
+def call_priority(priority: CallPriority) -> Iterator[None]:
+    """Run the API calls made within the block with the given priority."""
+    token = _call_priority.set(priority)
+    try:
+        yield
+    finally:
+        _call_priority.reset(token)
+
+
+def get_call_priority() -> CallPriority:
+    """Return the priority of the API calls made by the current task."""
+    return _call_priority.get()
+
+
+class CallBudgetExhausted(ImouException):
+    """Not enough API call budget left for the call."""
+
+    def get_title(self) -> str:
+        """Return the title of the exception which will be then translated."""
+        return "call_budget_exhausted"
+
+
+class TokenBucket:
+    """A token bucket refilling continuously up to its capacity."""
+
+    def __init__(self, capacity: int, period: float, now: float) -> None:
+        """Initialize a full bucket.
+
+        Args:
+            capacity: Number of tokens granted per period, 0 for unlimited
+            period: Length of the period in seconds
+            now: Current monotonic time
+
+        """
+        self.capacity = capacity
+        self.period = period
+        self.tokens = float(capacity)
+        self._last_refill = now
+
+    @property
+    def unlimited(self) -> bool:
+        """Return True if the bucket does not limit anything."""
+        return self.capacity <= 0
+
+    def set_capacity(self, capacity: int) -> None:
+        """Change the capacity, without granting tokens already spent."""
+        self.capacity = capacity
+        self.tokens = min(self.tokens, float(capacity))
+
+    def refill(self, now: float) -> None:
+        """Add the tokens earned since the last refill."""
+        if self.unlimited:
+            return
+        elapsed = max(0.0, now - self._last_refill)
+        self.tokens = min(
+            float(self.capacity), self.tokens + elapsed * self.capacity / self.period
+        )
+        self._last_refill = now
+
+    def seconds_until(self, tokens: float) -> float:
+        """Return how long to wait until the bucket holds the given tokens."""
+        if self.unlimited or self.tokens >= tokens:
+            return 0.0
+        if tokens > self.capacity:
+            return float("inf")
+        return (tokens - self.tokens) * self.period / self.capacity
+
+
+class CallBudget:
+    """Calls per hour and calls per day budget of an Imou Account."""
+
+    def __init__(
+        self,
+        app_id: str,
+        calls_per_hour: int = DEFAULT_CALLS_PER_HOUR,
+        calls_per_day: int = DEFAULT_CALLS_PER_DAY,
+    ) -> None:
+        """Initialize the budget with full buckets."""
+        self.app_id = app_id
+        now = time.monotonic()
+        self._hourly = TokenBucket(calls_per_hour, 3600, now)
+        self._daily = TokenBucket(calls_per_day, 86400, now)
+        self._user_waiting = 0
+        self.denied_count = 0
+
+    @property
+    def calls_per_hour(self) -> int:
+        """Return the hourly budget."""
+        return self._hourly.capacity
+
+    @property
+    def calls_per_day(self) -> int:
+        """Return the daily budget."""
+        return self._daily.capacity
+
+    @property
+    def remaining_hourly(self) -> int | None:
+        """Return the calls left in the hourly budget, None if unlimited."""
+        return self._remaining(self._hourly)
+
+    @property
+    def remaining_daily(self) -> int | None:
+        """Return the calls left in the daily budget, None if unlimited."""
+        return self._remaining(self._daily)
+
+    def _remaining(self, bucket: TokenBucket) -> int | None:
+        """Return the whole tokens left in a bucket."""
+        if bucket.unlimited:
+            return None
+        bucket.refill(time.monotonic())
+        return int(bucket.tokens)
+
+    def configure(self, calls_per_hour: int, calls_per_day: int) -> None:
+        """Change the limits, keeping track of the calls already made."""
+        now = time.monotonic()
+        for bucket, capacity in (
+            (self._hourly, calls_per_hour),
+            (self._daily, calls_per_day),
+        ):
+            bucket.refill(now)
+            bucket.set_capacity(capacity)
+        _LOGGER.debug(
+            "API call budget for app_id %s: %d calls/hour, %d calls/day",
+            self.app_id,
+            calls_per_hour,
+            calls_per_day,
+        )
+
+    def _reserve(self, bucket: TokenBucket, priority: CallPriority) -> float:
+        """Return the tokens a call of this priority must leave in the bucket."""
+        if priority == CallPriority.USER:
+            return 0.0
+        reserve = bucket.capacity * CALL_BUDGET_USER_RESERVE
+        # Setup may use half of the reserve, polling none of it
+        return reserve / 2 if priority == CallPriority.SETUP else reserve
+
+    def try_acquire(self, priority: CallPriority) -> bool:
+        """Take a token for a call if the budget allows it right now."""
+        if priority > CallPriority.USER and self._user_waiting:
+            # User actions waiting for a token are served first
+            return False
+        now = time.monotonic()
+        buckets = [b for b in (self._hourly, self._daily) if not b.unlimited]
+        for bucket in buckets:
+            bucket.refill(now)
+            if bucket.tokens - 1 < self._reserve(bucket, priority):
+                return False
+        for bucket in buckets:
+            bucket.tokens -= 1
+        return True
+
+    def _seconds_until_available(self, priority: CallPriority) -> float:
+        """Return how long until a call of this priority could be made."""
+        return max(
+            bucket.seconds_until(self._reserve(bucket, priority) + 1)
+            for bucket in (self._hourly, self._daily)
+        )
+
+    async def acquire(self, priority: CallPriority | None = None) -> None:
+        """Take a token for a call, waiting a little for user actions.
+
+        Args:
+            priority: Priority of the call, defaults to the one of the current task
+
+        Raises:
+            CallBudgetExhausted: if the budget does not allow the call
+
+        """
+        if priority is None:
+            priority = get_call_priority()
+        if self.try_acquire(priority):
+            return
+
+        # Only user actions wait for the budget to refill, background work is
+        # better skipped until its next scheduled run
+        wait = self._seconds_until_available(priority)
+        if priority == CallPriority.USER and wait <= CALL_BUDGET_MAX_WAIT:
+            self._user_waiting += 1
+            try:
+                while wait <= CALL_BUDGET_MAX_WAIT:
+                    await asyncio.sleep(wait)
+                    if self.try_acquire(priority):
+                        return
+                    wait = self._seconds_until_available(priority)
+            finally:
+                self._user_waiting -= 1
+
+        self.denied_count += 1
+        _LOGGER.debug(
+            "API call budget exhausted for app_id %s (%s priority, %s/%s left)",
+            self.app_id,
+            priority.name.lower(),
+            self.remaining_hourly,
+            self.remaining_daily,
+        )
+        raise CallBudgetExhausted(
+            f"API call budget exhausted for app_id {self.app_id} "
+            f"({priority.name.lower()} priority)"
+        )
+
+
+def get_call_budget(hass: HomeAssistant, app_id: str) -> CallBudget:
+    """Return the call budget of an Imou Account, creating it if needed.
+
+    The budget outlives config entry reloads, so that reloading an entry does
+    not grant a fresh quota.
+    """
+    budgets = hass.data.setdefault(DOMAIN, {}).setdefault(CALL_BUDGET_KEY, {})
+    if app_id not in budgets:
+        budgets[app_id] = CallBudget(app_id)
+    return budgets[app_id]
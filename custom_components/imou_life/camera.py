@@ -10,8 +10,9 @@ from homeassistant.components.camera import (
     Camera,
     CameraEntityFeature,
 )
+from homeassistant.components.stream import Stream
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import entity_platform
 from imouapi.const import PTZ_OPERATIONS
@@ -23,12 +24,18 @@ from .const import (
     ATTR_PTZ_OPERATION,
     ATTR_PTZ_VERTICAL,
     ATTR_PTZ_ZOOM,
+    DEFAULT_SNAPSHOT_CACHE_TTL,
     DOMAIN,
     ENABLED_CAMERAS,
+    OPTION_SNAPSHOT_CACHE_TTL,
     SERVIZE_PTZ_LOCATION,
     SERVIZE_PTZ_MOVE,
 )
-from .helpers import camel_to_snake
+from .coordinator import get_entry_coordinators
+from .helpers import camel_to_snake, get_device_key
+from .image_cache import CameraImageCache
+from .stream_url_cache import StreamUrlCache
+from .wake_queue import async_run_command
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
@@ -67,16 +74,16 @@ async def async_setup_entry(
         "async_service_ptz_move",
     )
 
-    coordinator = entry.runtime_data
-    device = coordinator.device
     sensors = []
-    for sensor_instance in device.get_sensors_by_platform("camera"):
-        sensor = ImouCamera(coordinator, entry, sensor_instance, ENTITY_ID_FORMAT)
-        sensors.append(sensor)
-        coordinator.entities.append(sensor)
-        _LOGGER.debug(
-            "[%s] Adding %s", device.get_name(), sensor_instance.get_description()
-        )
+    for coordinator in get_entry_coordinators(entry):
+        device = coordinator.device
+        for sensor_instance in device.get_sensors_by_platform("camera"):
+            sensor = ImouCamera(coordinator, entry, sensor_instance, ENTITY_ID_FORMAT)
+            sensors.append(sensor)
+            coordinator.entities.append(sensor)
+            _LOGGER.debug(
+                "[%s] Adding %s", device.get_name(), sensor_instance.get_description()
+            )
     async_add_devices(sensors)
 
 
@@ -107,6 +114,19 @@ class ImouCamera(Camera):
         # Entity availability tracking
         self._entity_available = None
 
+        # Snapshots shared by all the clients showing the camera
+        self._image_cache = CameraImageCache(
+            coordinator.hass,
+            ttl=config_entry.options.get(
+                OPTION_SNAPSHOT_CACHE_TTL, DEFAULT_SNAPSHOT_CACHE_TTL
+            ),
+        )
+        # Live stream URL, reused across stream (re)starts
+        self._stream_url_cache = StreamUrlCache(
+            self._sensor_instance.async_get_stream_url,
+            on_refresh=self._async_update_stream_source,
+        )
+
         # Set translation key for dynamic icons
         self._attr_translation_key = camel_to_snake(self._sensor_instance.get_name())
 
@@ -115,16 +135,28 @@ class ImouCamera(Camera):
         """If the entity is enabled by default."""
         return self._sensor_instance.get_name() in ENABLED_CAMERAS
 
+    @callback
+    def async_apply_options(self, changed: set[str]) -> None:
+        """Apply changed options of the config entry."""
+        if OPTION_SNAPSHOT_CACHE_TTL in changed:
+            self._image_cache.ttl = self._config_entry.options.get(
+                OPTION_SNAPSHOT_CACHE_TTL, DEFAULT_SNAPSHOT_CACHE_TTL
+            )
+
     @property
     def unique_id(self):
         """Return a unique ID to use for this entity."""
-        return self._config_entry.entry_id + "_" + self._sensor_instance.get_name()
+        return (
+            get_device_key(self._config_entry, self._device)
+            + "_"
+            + self._sensor_instance.get_name()
+        )
 
     @property
     def device_info(self):
         """Return device information."""
         return {
-            "identifiers": {(DOMAIN, self._config_entry.entry_id)},
+            "identifiers": {(DOMAIN, get_device_key(self._config_entry, self._device))},
             "name": self._device.get_name(),
             "model": self._device.get_model(),
             "manufacturer": self._device.get_manufacturer(),
@@ -157,20 +189,75 @@ class ImouCamera(Camera):
             "[%s] requested camera image",
             self._device.get_name(),
         )
-        return await self._sensor_instance.async_get_image()
+        return await self._image_cache.async_get_image(
+            self._async_download_image, width, height
+        )
+
+    async def _async_download_image(self) -> bytes:
+        """Download a new snapshot, in a wake cycle if the camera sleeps."""
+        return await async_run_command(
+            self._coordinator.hass, self._device, self._sensor_instance.async_get_image
+        )
 
     async def stream_source(self) -> str:
         """Return the source of the stream."""
-        stream_url = await self._sensor_instance.async_get_stream_url()
+        stream_url = await self._stream_url_cache.async_get_url()
         _LOGGER.debug("Successfully got stream URL: %s", stream_url)
         return stream_url
 
+    async def async_create_stream(self) -> Stream | None:
+        """Create a Stream for stream_source, watching for playback failures."""
+        stream = await super().async_create_stream()
+        if stream is not None:
+            stream.set_update_callback(self._async_stream_state_changed)
+        return stream
+
+    @callback
+    def _async_stream_state_changed(self) -> None:
+        """Get a new stream URL when the current one cannot be played."""
+        self.async_write_ha_state()
+        if self.stream is None or self.stream.available:
+            return
+        _LOGGER.debug("[%s] live stream unavailable", self._device.get_name())
+        self._stream_url_cache.invalidate()
+        self.hass.async_create_task(self._async_renew_stream_source())
+
+    async def _async_renew_stream_source(self) -> None:
+        """Fetch a new stream URL and switch the stream to it."""
+        try:
+            stream_url = await self._stream_url_cache.async_get_url()
+        except ImouException as exception:
+            _LOGGER.debug(
+                "[%s] unable to renew the live stream URL: %s",
+                self._device.get_name(),
+                exception,
+            )
+            return
+        self._async_update_stream_source(stream_url)
+
+    @callback
+    def _async_update_stream_source(self, stream_url: str) -> None:
+        """Restart the stream if its URL changed."""
+        if self.stream is not None and stream_url and self.stream.source != stream_url:
+            self.stream.update_source(stream_url)
+
     async def async_added_to_hass(self):
         """Entity added to HA (at startup or when re-enabled)."""
         await super().async_added_to_hass()
         _LOGGER.debug("%s added to HA", self.name)
         self._sensor_instance.set_enabled(True)
-        # request an update of this sensor
+        # request an update of this sensor, in the background during a
+        # coordinated startup
+        orchestrator = self._coordinator.startup_orchestrator
+        if orchestrator is None:
+            await self._async_update_sensor()
+            return
+        orchestrator.async_schedule_update(
+            get_device_key(self._config_entry, self._device), self._async_update_sensor
+        )
+
+    async def _async_update_sensor(self) -> None:
+        """Update the sensor instance."""
         try:
             await self._sensor_instance.async_update()
         except imouapi.exceptions.ImouException as exception:
@@ -181,6 +268,7 @@ class ImouCamera(Camera):
         await super().async_will_remove_from_hass()
         _LOGGER.debug("%s removed from HA", self.name)
         self._sensor_instance.set_enabled(False)
+        self._stream_url_cache.async_cancel()
 
     async def async_service_ptz_location(self, horizontal, vertical, zoom):
         """Perform PTZ location action."""
@@ -192,7 +280,10 @@ class ImouCamera(Camera):
             zoom,
         )
         try:
-            await self._sensor_instance.async_service_ptz_location(
+            await async_run_command(
+                self._coordinator.hass,
+                self._device,
+                self._sensor_instance.async_service_ptz_location,
                 horizontal,
                 vertical,
                 zoom,
@@ -213,7 +304,10 @@ class ImouCamera(Camera):
             duration,
         )
         try:
-            await self._sensor_instance.async_service_ptz_move(
+            await async_run_command(
+                self._coordinator.hass,
+                self._device,
+                self._sensor_instance.async_service_ptz_move,
                 operation,
                 duration,
             )
@@ -6,27 +6,34 @@ from typing import Any
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from imouapi.api import ImouAPIClient
 from imouapi.device import ImouDevice, ImouDiscoverService
 from imouapi.exceptions import ImouException
 
+from .api_client import ImouAccountAPIClient
+from .api_metrics import get_api_metrics
 from .const import (
     API_SERVER_LABELS,
     API_SERVER_OPTIONS,
+    CONF_ACCOUNT_ENTRY,
     CONF_API_SERVER,
     CONF_API_URL,
     CONF_APP_ID,
     CONF_APP_SECRET,
     CONF_DEVICE_ID,
+    CONF_DEVICE_IDS,
     CONF_DEVICE_NAME,
     CONF_DISCOVERED_DEVICE,
     CONF_ENABLE_DISCOVER,
+    CONF_ENTRY_TYPE,
     DEFAULT_API_SERVER,
     DEFAULT_API_URL,
     DEFAULT_AUTO_SLEEP,
     DEFAULT_BATTERY_OPTIMIZATION,
     DEFAULT_BATTERY_THRESHOLD,
+    DEFAULT_CALLS_PER_DAY,
+    DEFAULT_CALLS_PER_HOUR,
     DEFAULT_DISCOVERY_INTERVAL,
     DEFAULT_ENABLE_DISCOVERY,
     DEFAULT_LED_INDICATORS,
@@ -34,13 +41,18 @@ from .const import (
     DEFAULT_POWER_SAVING_MODE,
     DEFAULT_RECORDING_QUALITY,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SNAPSHOT_CACHE_TTL,
+    ENTRY_TYPE_ACCOUNT,
     MOTION_SENSITIVITY_OPTIONS,
     OPTION_API_TIMEOUT,
     OPTION_AUTO_SLEEP,
     OPTION_BATTERY_OPTIMIZATION,
     OPTION_BATTERY_THRESHOLD,
     OPTION_CALLBACK_URL,
+    OPTION_CALLS_PER_DAY,
+    OPTION_CALLS_PER_HOUR,
     OPTION_CAMERA_WAIT_BEFORE_DOWNLOAD,
+    OPTION_DISABLED_DEVICES,
     OPTION_DISCOVERY_INTERVAL,
     OPTION_ENABLE_DISCOVERY,
     OPTION_LED_INDICATORS,
@@ -48,13 +60,32 @@ from .const import (
     OPTION_POWER_SAVING_MODE,
     OPTION_RECORDING_QUALITY,
     OPTION_SCAN_INTERVAL,
+    OPTION_SNAPSHOT_CACHE_TTL,
     OPTION_WAIT_AFTER_WAKE_UP,
     RECORDING_QUALITY_DISPLAY,
 )
+from .coordinator import get_entry_coordinator
+from .device_snapshot import DeviceSnapshotCache
+from .helpers import is_account_entry
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
 
+def _create_api_client(
+    hass, app_id: str, app_secret: str, api_url: str, session
+) -> ImouAccountAPIClient:
+    """Create an API client recording its calls in the account's API metrics.
+
+    The device details the client gets are kept in the device snapshots, so
+    that the entry created for a device is set up without fetching them again.
+    """
+    api_client = ImouAccountAPIClient(app_id, app_secret, session)
+    api_client.set_base_url(api_url)
+    api_client.metrics = get_api_metrics(hass, app_id)
+    api_client.snapshot_cache = DeviceSnapshotCache(hass)
+    return api_client
+
+
 class ImouFlowHandler(config_entries.ConfigFlow, domain="imou_life"):
     """Config flow for imou."""
 
@@ -74,6 +105,7 @@ class ImouFlowHandler(config_entries.ConfigFlow, domain="imou_life"):
         self._device_id = None
         self._device = None
         self._api_credentials = None
+        self._account_entry = None
 
     async def async_step_user(self, user_input=None):
         """Handle a flow initialized by the user."""
@@ -97,10 +129,13 @@ class ImouFlowHandler(config_entries.ConfigFlow, domain="imou_life"):
             # Only proceed if no errors
             if not self._errors:
                 # create an imou discovery service
-                self._api_client = ImouAPIClient(
-                    user_input[CONF_APP_ID], user_input[CONF_APP_SECRET], self._session
+                self._api_client = _create_api_client(
+                    self.hass,
+                    user_input[CONF_APP_ID],
+                    user_input[CONF_APP_SECRET],
+                    api_url,
+                    self._session,
                 )
-                self._api_client.set_base_url(api_url)
                 self._discover_service = ImouDiscoverService(self._api_client)
                 valid = False
                 # check if the provided credentials are working
@@ -146,13 +181,18 @@ class ImouFlowHandler(config_entries.ConfigFlow, domain="imou_life"):
         """Discover devices and ask the user to select one."""
         self._errors = {}
         if user_input is not None:
+            if user_input.get(CONF_ACCOUNT_ENTRY):
+                return await self._create_account_entry(user_input)
             # get the device instance from the selected input
             device = self._discovered_devices[user_input[CONF_DISCOVERED_DEVICE]]
             if device is not None:
                 # create the entry using common method
                 return await self._create_entry_from_device(device, user_input)
 
-        # discover registered devices
+        # discover registered devices, not fetching again the details of the
+        # account's devices fetched moments ago, e.g. by a previous flow
+        for device_data in self._api_client.snapshot_cache.get_all_fresh(self._app_id):
+            self._api_client.prime_device_details(device_data)
         try:
             self._discovered_devices = (
                 await self._discover_service.async_discover_devices()
@@ -171,6 +211,9 @@ class ImouFlowHandler(config_entries.ConfigFlow, domain="imou_life"):
             else:
                 self._errors["base"] = exception.get_title()
                 _LOGGER.error("Imou exception: %s", str(exception))
+        finally:
+            # a device entered manually is always validated against the API
+            self._api_client.clear_primed_device_details()
 
         # If discovery succeeded, show device selection
         if self._discovered_devices:
@@ -182,6 +225,7 @@ class ImouFlowHandler(config_entries.ConfigFlow, domain="imou_life"):
                             self._discovered_devices.keys()
                         ),
                         vol.Optional(CONF_DEVICE_NAME): str,
+                        vol.Optional(CONF_ACCOUNT_ENTRY, default=False): bool,
                     }
                 ),
                 errors=self._errors,
@@ -255,6 +299,32 @@ class ImouFlowHandler(config_entries.ConfigFlow, domain="imou_life"):
         await self.async_set_unique_id(device.get_device_id())
         return self.async_create_entry(title=name, data=data)
 
+    async def _create_account_entry(self, user_input):
+        """Create a configuration entry holding all the devices of the account."""
+        await self.async_set_unique_id(self._app_id)
+        self._abort_if_unique_id_configured()
+        # Devices which already have their own entry keep it. Ignored discoveries
+        # only have the device ID as unique ID
+        configured = {
+            entry.data.get(CONF_DEVICE_ID) or entry.unique_id
+            for entry in self._async_current_entries(include_ignore=True)
+        }
+        device_ids = [
+            device.get_device_id()
+            for device in self._discovered_devices.values()
+            if device.get_device_id() not in configured
+        ]
+        return self.async_create_entry(
+            title=user_input.get(CONF_DEVICE_NAME) or "Imou account",
+            data={
+                CONF_ENTRY_TYPE: ENTRY_TYPE_ACCOUNT,
+                CONF_API_URL: self._api_url,
+                CONF_APP_ID: self._app_id,
+                CONF_APP_SECRET: self._app_secret,
+                CONF_DEVICE_IDS: device_ids,
+            },
+        )
+
     # Step: discovery (automatic device discovery)
     async def async_step_discovery(self, discovery_info):
         """Handle discovery of a new device."""
@@ -272,6 +342,16 @@ class ImouFlowHandler(config_entries.ConfigFlow, domain="imou_life"):
         self._device_id = device_id
         self._device = device
         self._api_credentials = api_credentials
+        # Devices of an account with an account entry are added to it
+        self._account_entry = next(
+            (
+                entry
+                for entry in self._async_current_entries()
+                if is_account_entry(entry)
+                and entry.data.get(CONF_APP_ID) == api_credentials["app_id"]
+            ),
+            None,
+        )
 
         # Show confirmation to user
         return await self.async_step_discovery_confirm()
@@ -281,6 +361,19 @@ class ImouFlowHandler(config_entries.ConfigFlow, domain="imou_life"):
         self._errors = {}
 
         if user_input is not None:
+            if self._account_entry is not None:
+                self.hass.config_entries.async_update_entry(
+                    self._account_entry,
+                    data={
+                        **self._account_entry.data,
+                        CONF_DEVICE_IDS: [
+                            *self._account_entry.data.get(CONF_DEVICE_IDS, []),
+                            self._device_id,
+                        ],
+                    },
+                )
+                return self.async_abort(reason="device_added_to_account")
+
             # Create config entry with discovered device
             device_name = user_input.get(CONF_DEVICE_NAME)
             if not device_name:
@@ -347,12 +440,13 @@ class ImouFlowHandler(config_entries.ConfigFlow, domain="imou_life"):
                         existing_server, API_SERVER_OPTIONS[DEFAULT_API_SERVER]
                     )
 
-                api_client = ImouAPIClient(
+                api_client = _create_api_client(
+                    self.hass,
                     user_input[CONF_APP_ID],
                     user_input[CONF_APP_SECRET],
+                    existing_api_url,
                     async_get_clientsession(self.hass),
                 )
-                api_client.set_base_url(existing_api_url)
 
                 # Validate credentials
                 await api_client.async_connect()
@@ -460,15 +554,17 @@ class ImouFlowHandler(config_entries.ConfigFlow, domain="imou_life"):
                 try:
                     # Validate credentials with actual API call
                     session = async_get_clientsession(self.hass)
-                    api_client = ImouAPIClient(new_app_id, new_app_secret, session)
-                    api_client.set_base_url(new_api_url)
+                    api_client = _create_api_client(
+                        self.hass, new_app_id, new_app_secret, new_api_url, session
+                    )
 
                     await api_client.async_connect()
 
                     # Verify device is still accessible with new credentials
-                    device_id = self.entry.data[CONF_DEVICE_ID]
-                    device = ImouDevice(api_client, device_id)
-                    await device.async_initialize()
+                    device_id = self.entry.data.get(CONF_DEVICE_ID)
+                    if device_id:
+                        device = ImouDevice(api_client, device_id)
+                        await device.async_initialize()
 
                 except ImouException as exception:
                     error_str = str(exception).lower()
@@ -593,26 +689,40 @@ class ImouFlowHandler(config_entries.ConfigFlow, domain="imou_life"):
 
         if user_input is not None:
             action = user_input.get("action")
+            coordinator = get_entry_coordinator(entry, device_id)
 
-            if action == "remove":
+            if action == "remove" and is_account_entry(entry):
+                # Disable the device, the other devices of the account stay
+                disabled = entry.options.get(OPTION_DISABLED_DEVICES, [])
+                if device_id not in disabled:
+                    self.hass.config_entries.async_update_entry(
+                        entry,
+                        options={
+                            **entry.options,
+                            OPTION_DISABLED_DEVICES: [*disabled, device_id],
+                        },
+                    )
+                return self.async_abort(reason="device_removed")
+
+            elif action == "remove":
                 # Remove the config entry
                 await self.hass.config_entries.async_remove(entry_id)
                 return self.async_abort(reason="device_removed")
 
             elif action == "retry":
                 # Reset counter and reload the entry
-                coordinator = entry.runtime_data
-                coordinator.stale_device_failure_count = 0
-                coordinator.stale_device_suspected = False
+                if coordinator is not None:
+                    coordinator.stale_device_failure_count = 0
+                    coordinator.stale_device_suspected = False
                 await self.hass.config_entries.async_reload(entry_id)
                 return self.async_abort(reason="retrying")
 
             elif action == "ignore":
                 # Reset all stale tracking state but don't reload
-                coordinator = entry.runtime_data
-                coordinator.stale_device_failure_count = 0
-                coordinator.stale_device_suspected = False
-                coordinator.stale_device_last_error = None
+                if coordinator is not None:
+                    coordinator.stale_device_failure_count = 0
+                    coordinator.stale_device_suspected = False
+                    coordinator.stale_device_last_error = None
                 return self.async_abort(reason="ignored")
 
         return self.async_show_form(
@@ -691,6 +801,12 @@ class ImouOptionsFlowHandler(config_entries.OptionsFlow):
                     else ""
                 ),
             ): str,
+            vol.Optional(
+                OPTION_SNAPSHOT_CACHE_TTL,
+                default=self.options.get(
+                    OPTION_SNAPSHOT_CACHE_TTL, DEFAULT_SNAPSHOT_CACHE_TTL
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
             vol.Optional(
                 OPTION_WAIT_AFTER_WAKE_UP,
                 default=(
@@ -757,6 +873,36 @@ class ImouOptionsFlowHandler(config_entries.OptionsFlow):
                     ),
                 )
             ] = vol.All(vol.Coerce(int), vol.Range(min=300, max=86400))
+            schema_dict[
+                vol.Optional(
+                    OPTION_CALLS_PER_HOUR,
+                    default=self.options.get(
+                        OPTION_CALLS_PER_HOUR, DEFAULT_CALLS_PER_HOUR
+                    ),
+                )
+            ] = vol.All(vol.Coerce(int), vol.Range(min=0))
+            schema_dict[
+                vol.Optional(
+                    OPTION_CALLS_PER_DAY,
+                    default=self.options.get(
+                        OPTION_CALLS_PER_DAY, DEFAULT_CALLS_PER_DAY
+                    ),
+                )
+            ] = vol.All(vol.Coerce(int), vol.Range(min=0))
+
+        # Devices of an account entry can be disabled one by one
+        if is_account_entry(self.config_entry):
+            snapshot_cache = DeviceSnapshotCache(self.hass)
+            devices = {}
+            for device_id in self.config_entry.data.get(CONF_DEVICE_IDS, []):
+                details = snapshot_cache.get(device_id) or {}
+                devices[device_id] = details.get("name") or device_id
+            schema_dict[
+                vol.Optional(
+                    OPTION_DISABLED_DEVICES,
+                    default=self.options.get(OPTION_DISABLED_DEVICES, []),
+                )
+            ] = cv.multi_select(devices)
 
         return self.async_show_form(
             step_id="init",
@@ -12,6 +12,13 @@ CONF_APP_SECRET = "app_secret"
 CONF_ENABLE_DISCOVER = "enable_discover"
 CONF_DISCOVERED_DEVICE = "discovered_device"
 CONF_DEVICE_ID = "device_id"
+CONF_ACCOUNT_ENTRY = "account_entry"
+
+# Config entry types: one device per entry (no entry type, as the entries created
+# before account entries), or all the devices of an account
+CONF_ENTRY_TYPE = "entry_type"
+CONF_DEVICE_IDS = "device_ids"
+ENTRY_TYPE_ACCOUNT = "account"
 
 OPTION_SCAN_INTERVAL = "scan_interval"
 OPTION_API_TIMEOUT = "api_timeout"
@@ -28,11 +35,20 @@ OPTION_RECORDING_QUALITY = "recording_quality"
 OPTION_LED_INDICATORS = "led_indicators"
 OPTION_AUTO_SLEEP = "auto_sleep"
 OPTION_BATTERY_THRESHOLD = "battery_threshold"
+OPTION_SNAPSHOT_CACHE_TTL = "snapshot_cache_ttl"
+
+# Account entry options
+OPTION_DISABLED_DEVICES = "disabled_devices"
+ACCOUNT_ENTRY_RETRY_DELAY = 300  # Seconds before retrying the devices which failed
 
 # Discovery options
 OPTION_ENABLE_DISCOVERY = "enable_discovery"
 OPTION_DISCOVERY_INTERVAL = "discovery_interval"
 
+# API call budget options
+OPTION_CALLS_PER_HOUR = "calls_per_hour"
+OPTION_CALLS_PER_DAY = "calls_per_day"
+
 SERVIZE_PTZ_LOCATION = "ptz_location"
 SERVIZE_PTZ_MOVE = "ptz_move"
 ATTR_PTZ_HORIZONTAL = "horizontal"
@@ -62,6 +78,9 @@ ATTR_AUTO_SLEEP = "auto_sleep"
 
 # Defaults
 DEFAULT_SCAN_INTERVAL = 15 * 60
+DEFAULT_SNAPSHOT_CACHE_TTL = 30  # Seconds a camera snapshot is served from memory
+STREAM_URL_MAX_AGE = 3600  # Seconds a live stream URL is used before a new one
+STREAM_URL_REFRESH_MARGIN = 300  # Seconds before max age to refresh it in background
 DEFAULT_API_URL = "https://openapi.easy4ip.com/openapi"
 
 # API Server options
@@ -95,10 +114,18 @@ DEFAULT_RECORDING_QUALITY = "standard"
 DEFAULT_LED_INDICATORS = True
 DEFAULT_AUTO_SLEEP = False
 DEFAULT_BATTERY_THRESHOLD = 20
+# Seconds the battery level polled by the device coordinator is used for, above
+# the longest battery sensor poll interval, before polling the battery directly
+BATTERY_DATA_MAX_AGE = 5 * 3600
 
 # Discovery defaults
 DEFAULT_ENABLE_DISCOVERY = True
 DEFAULT_DISCOVERY_INTERVAL = 3600  # 60 minutes (conservative for rate limits)
+DISCOVERY_DEVICE_LIST_LIMIT = 50  # Devices returned by one deviceBaseList request
+
+# API call budget defaults (0 = unlimited)
+DEFAULT_CALLS_PER_HOUR = 1000
+DEFAULT_CALLS_PER_DAY = 20000
 
 # Power mode options
 POWER_MODES = ["performance", "balanced", "power_saving", "ultra_power_saving"]
@@ -143,12 +170,129 @@ RATE_LIMIT_RESET_ESTIMATE_HOURS = (
 )
 RATE_LIMIT_MAX_PROBE_RETRIES = 3  # Stop probing after this many consecutive failures
 RATE_LIMIT_CACHE_KEY = "rate_limit_state"
+RATE_LIMIT_STORE_KEY = "rate_limit_store"
+RATE_LIMIT_STORAGE_KEY = f"{DOMAIN}.rate_limit"
+RATE_LIMIT_STORAGE_VERSION = 1
+
+# Rate limit backoff — scan interval multiplier shared by the devices of an account
+BACKOFF_KEY = "backoffs"
+BACKOFF_MIN_GROWTH = 1.5  # The multiplier grows by a random factor in this range
+BACKOFF_MAX_GROWTH = 3
+BACKOFF_MAX_INTERVAL = 4 * 3600  # Seconds, cap of the backed off scan interval
+BACKOFF_SETTLE_TIME = 60  # Seconds during which further OP1013s are the same event
+BACKOFF_STEP_DOWN_FACTOR = 2  # The multiplier is divided by this on recovery...
+BACKOFF_STEP_DOWN_INTERVAL = 900  # ...at most once per this many seconds
+BACKOFF_RESUME_STAGGER = 5  # Seconds between two devices resuming after a suspension
+RATE_LIMIT_SAVE_DELAY = 10  # Seconds to group state changes into one write
+
+# Shared API clients — one per Imou Account, keyed by (app_id, api_url)
+API_CLIENT_POOL_KEY = "api_clients"
+
+# Account-wide polling — the devices of an account are polled from one scheduler,
+# each in its own phase slot of the scan interval
+POLL_SCHEDULER_KEY = "poll_schedulers"
+ACCOUNT_POLL_MAX_CONCURRENCY = 3  # Devices polled in parallel within a cycle
+ACCOUNT_POLL_BATCH_WINDOW = 5  # Devices due within this many seconds join a cycle
+ACCOUNT_POLL_MAX_JITTER = 30  # Max random seconds added to a device's slot
+
+# API call budget — token buckets per account, shared by all its devices
+CALL_BUDGET_KEY = "call_budgets"
+CALL_BUDGET_USER_RESERVE = 0.1  # Share of the budget background calls cannot use
+CALL_BUDGET_MAX_WAIT = 10  # Seconds a user action may wait for the budget to refill
+
+# Device snapshots — cached device details so restarts need no initialization calls
+DEVICE_SNAPSHOT_KEY = "device_snapshots"
+DEVICE_SNAPSHOT_STORE_KEY = "device_snapshot_store"
+DEVICE_SNAPSHOT_REVALIDATION_KEY = "device_snapshot_revalidation"
+DEVICE_SNAPSHOT_REVALIDATION_TIMER_KEY = "device_snapshot_revalidation_timers"
+DEVICE_SNAPSHOT_STORAGE_KEY = f"{DOMAIN}.device_snapshots"
+DEVICE_SNAPSHOT_STORAGE_VERSION = 1
+DEVICE_SNAPSHOT_SAVE_DELAY = 10  # Seconds to group snapshot changes into one write
+DEVICE_SNAPSHOT_REVALIDATE_DELAY = 120  # Seconds after startup to revalidate
+DEVICE_SNAPSHOT_BATCH_SIZE = 10  # Devices per deviceBaseDetailList request
+DEVICE_SNAPSHOT_FRESH_TIME = 3600  # Seconds details are used without revalidation
 
-# Tiered polling — reduce API calls by polling slow-changing sensors less often
-FULL_POLL_CYCLE_INTERVAL = (
-    4  # Full poll every 4th cycle; others are fast (critical only)
+# Battery history — battery level samples of each device, for the discharge model
+BATTERY_HISTORY_KEY = "battery_history"
+BATTERY_HISTORY_STORE_KEY = "battery_history_store"
+BATTERY_HISTORY_STORAGE_KEY = f"{DOMAIN}.battery_history"
+BATTERY_HISTORY_STORAGE_VERSION = 1
+BATTERY_HISTORY_SAVE_DELAY = 60  # Seconds to group history changes into one write
+BATTERY_HISTORY_SIZE = 192  # Samples kept per device
+BATTERY_HISTORY_MIN_SPACING = 1800  # Seconds between two samples kept
+BATTERY_CHARGE_MIN_RISE = 2  # Level rise (%) taken as the battery being charged
+BATTERY_MODEL_MIN_SAMPLES = 3  # Samples since the last charge to fit the rate
+BATTERY_MODEL_MIN_SPAN = 6 * 3600  # Seconds these samples must span
+BATTERY_OPTIMIZATION_LEAD_TIME = 24  # Hours ahead of the threshold to optimize
+BATTERY_POLL_LEVEL_STEP = 1  # Level change (%) expected between two battery polls
+BATTERY_POLL_MAX_INTERVAL = 6 * 3600  # Seconds between two battery polls at most
+
+# Adaptive per-sensor polling — (min, max) seconds between two polls of a sensor.
+# The interval grows while the value is stable and drops to min when it changes.
+# Buttons, sirens and cameras have no state to poll and are not scheduled
+SENSOR_POLL_PLATFORM_INTERVALS = {
+    "sensor": (15 * 60, 6 * 3600),
+    "binary_sensor": (15 * 60, 3600),
+    "switch": (3600, 24 * 3600),
+    "select": (3600, 24 * 3600),
+}
+SENSOR_POLL_SENSOR_INTERVALS = {
+    "motionAlarm": (0, 0),  # Polled on every update
+    "battery": (30 * 60, 4 * 3600),
+    "storageUsed": (3600, 24 * 3600),
+    "callbackUrl": (6 * 3600, 7 * 24 * 3600),
+}
+SENSOR_POLL_BACKOFF_FACTOR = 1.5  # Interval growth after each poll with no change
+SENSOR_POLL_DUE_TOLERANCE = 90  # Sensors due within this many seconds join an update
+
+# Push alarms — messages posted by the Imou cloud to the account webhook
+PUSH_RECEIVER_KEY = "push_receivers"
+PUSH_SENSOR_NAMES = {"motionAlarm"}  # Not polled while push is healthy
+PUSH_MOTION_MESSAGE_TYPES = {"videoMotion", "human", "openCamera"}
+PUSH_HEALTH_TIMEOUT = 6 * 3600  # Seconds without a message before polling again
+PUSH_MOTION_RESET_DELAY = 30  # Seconds the motion alarm stays on after a push
+
+# API metrics — per account counters and latency samples of every API call
+API_METRICS_KEY = "api_metrics"
+API_METRICS_BUFFER_SIZE = 2000  # Most recent calls kept for the latency percentiles
+
+# Coordinated startup — devices of an account set up within a concurrency window
+STARTUP_ORCHESTRATOR_KEY = "startup_orchestrators"
+STARTUP_MAX_CONCURRENCY = 4  # Devices initialized (or entities updated) at a time
+STARTUP_REFRESH_DELAY = 10  # Seconds before the first refresh of a restored device
+STARTUP_REFRESH_STAGGER = 2  # Seconds between the first refreshes of two devices
+
+# Option updates — the options applied to running entries, the others reload them
+ENTRY_CONFIG_KEY = "entry_configs"
+HOT_APPLY_OPTIONS = frozenset(
+    {
+        OPTION_SCAN_INTERVAL,
+        OPTION_API_TIMEOUT,
+        OPTION_CALLBACK_URL,
+        OPTION_CAMERA_WAIT_BEFORE_DOWNLOAD,
+        OPTION_WAIT_AFTER_WAKE_UP,
+        OPTION_SETUP_TIMEOUT,
+        OPTION_SNAPSHOT_CACHE_TTL,
+        OPTION_DISCOVERY_INTERVAL,
+        OPTION_CALLS_PER_HOUR,
+        OPTION_CALLS_PER_DAY,
+        OPTION_BATTERY_OPTIMIZATION,
+        OPTION_POWER_SAVING_MODE,
+        OPTION_SLEEP_SCHEDULE,
+        OPTION_MOTION_SENSITIVITY,
+        OPTION_RECORDING_QUALITY,
+        OPTION_LED_INDICATORS,
+        OPTION_AUTO_SLEEP,
+        OPTION_BATTERY_THRESHOLD,
+    }
 )
-CRITICAL_SENSOR_NAMES = {"motionAlarm"}  # Binary sensors polled every cycle
+
+# Device power state — whether a battery device sleeps, shared by its coordinators
+POWER_STATE_KEY = "power_states"
+POWER_STATUS_ONLINE = "1"  # onLine value of deviceOnline for an awake device
+POWER_STATUS_DORMANT = "4"  # onLine value of deviceOnline for a sleeping device
+WAKE_QUEUE_KEY = "wake_queues"
+WAKE_WINDOW_DELAY = 0.5  # Seconds commands sent together wait to share a wake up
 
 # switches which are enabled by default
 ENABLED_SWITCHES = [
@@ -1,29 +1,50 @@
 """Class to manage fetching data from the API."""
 
 import logging
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import SOURCE_IGNORE
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt as dt_util
-from imouapi.device import ImouDevice, ImouDiscoverService
+from imouapi.device import ImouDevice
 from imouapi.exceptions import ImouException
 
+from .api_metrics import classify_error
+from .backoff import get_account_backoff
+from .call_budget import CallBudgetExhausted, CallPriority, call_priority
 from .const import (
     CONF_API_URL,
     CONF_APP_ID,
     CONF_APP_SECRET,
     CONF_DEVICE_ID,
-    CRITICAL_SENSOR_NAMES,
+    CONF_DEVICE_IDS,
     DEFAULT_API_URL,
     DEFAULT_DISCOVERY_INTERVAL,
+    DEFAULT_SCAN_INTERVAL,
+    DISCOVERY_DEVICE_LIST_LIMIT,
     DOMAIN,
-    FULL_POLL_CYCLE_INTERVAL,
+    OPTION_DISABLED_DEVICES,
     OPTION_DISCOVERY_INTERVAL,
+    OPTION_SCAN_INTERVAL,
+    POWER_STATUS_ONLINE,
     STALE_DEVICE_ERROR_PATTERNS,
 )
-from .helpers import exception_message
+from .helpers import exception_message, is_account_entry
+from .power_state import DevicePowerState, get_device_power_state
+from .sensor_polling import SensorPollScheduler
+
+if TYPE_CHECKING:
+    from .api_client import ImouAccountAPIClient
+    from .api_metrics import ApiMetrics
+    from .call_budget import CallBudget
+    from .device_snapshot import DeviceSnapshotCache
+    from .poll_scheduler import AccountPollScheduler
+    from .push_receiver import AccountPushReceiver
+    from .startup_orchestrator import StartupOrchestrator
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
@@ -31,6 +52,19 @@ _LOGGER: logging.Logger = logging.getLogger(__package__)
 class ImouDataUpdateCoordinator(DataUpdateCoordinator):
     """Implement the DataUpdateCoordinator."""
 
+    # Account-wide scheduler driving our polls (None = poll on our own timer)
+    poll_scheduler: "AccountPollScheduler | None" = None
+    # API call budget of the account, exposed by the API status sensor
+    call_budget: "CallBudget | None" = None
+    # Metrics of the API calls of the account, exposed by the API metric sensors
+    api_metrics: "ApiMetrics | None" = None
+    # Receiver of the alarms pushed by the Imou cloud for our device
+    push_receiver: "AccountPushReceiver | None" = None
+    # Runs the first update of our entities in the background
+    startup_orchestrator: "StartupOrchestrator | None" = None
+    # Keeps the last known state of our device for the next start
+    snapshot_cache: "DeviceSnapshotCache | None" = None
+
     def __init__(
         self,
         hass: HomeAssistant,
@@ -53,12 +87,16 @@ class ImouDataUpdateCoordinator(DataUpdateCoordinator):
         self.rate_limit_start_time: datetime | None = None
         self.rate_limit_estimated_reset: datetime | None = None
 
-        # Scan interval management
+        # Scan interval management, backed off with the other devices of the
+        # account when rate limited
         self._original_scan_interval: int = scan_interval
         self._is_interval_adjusted: bool = False
+        self.backoff = get_account_backoff(
+            hass, config_entry.data.get(CONF_APP_ID) if config_entry else None
+        )
 
-        # Tiered polling — full poll every Nth cycle, fast poll otherwise
-        self._poll_cycle: int = -1
+        # Adaptive polling — each sensor is polled on its own interval
+        self.sensor_scheduler = SensorPollScheduler()
 
         # Stale device tracking
         self.stale_device_suspected: bool = False
@@ -79,6 +117,13 @@ class ImouDataUpdateCoordinator(DataUpdateCoordinator):
             "Initialized coordinator. Scan interval %d seconds", self.scan_inteval
         )
 
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule a refresh, unless the account poll scheduler drives us."""
+        if self.poll_scheduler is not None:
+            return
+        super()._schedule_refresh()
+
     def _is_stale_device_error(self, error_str: str) -> bool:
         """Check if error indicates device no longer exists."""
         error_lower = error_str.lower()
@@ -93,14 +138,14 @@ class ImouDataUpdateCoordinator(DataUpdateCoordinator):
 
     async def _async_update_data(self):
         """HA calls this every DEFAULT_SCAN_INTERVAL to run the update."""
-        self._poll_cycle += 1
-        is_full_cycle = self._poll_cycle % FULL_POLL_CYCLE_INTERVAL == 0
+        # Polling is background work, it gives way to user actions
+        with call_priority(CallPriority.BACKGROUND):
+            return await self._async_poll()
 
+    async def _async_poll(self):
+        """Poll the device and track API errors."""
         try:
-            if is_full_cycle:
-                data = await self.device.async_get_data()
-            else:
-                data = await self._async_fast_update()
+            data = await self._async_poll_sensors()
 
             # Update succeeded - check if recovering from rate limit
             was_rate_limited = self.is_rate_limited
@@ -114,14 +159,29 @@ class ImouDataUpdateCoordinator(DataUpdateCoordinator):
             self.stale_device_failure_count = 0
             self.stale_device_last_error = None
 
-            # Restore original scan interval if it was adjusted
-            if was_rate_limited and self._is_interval_adjusted:
-                self._restore_scan_interval()
+            # Step the scan interval back down, gradually
+            self.backoff.record_success()
+            self.async_apply_backoff()
+            if was_rate_limited:
                 self.rate_limit_start_time = None
                 self.rate_limit_estimated_reset = None
 
+            if self.snapshot_cache is not None:
+                self.snapshot_cache.update_states(self.device)
+
             return data
 
+        except CallBudgetExhausted as exception:
+            # Not an API error: skip this poll and keep the last known state
+            if self.data is not None:
+                _LOGGER.debug(
+                    "Skipping poll of %s: %s",
+                    self.device.get_name(),
+                    exception_message(exception),
+                )
+                return self.data
+            raise UpdateFailed(exception_message(exception)) from exception
+
         except ImouException as exception:
             error_str = exception_message(exception)
 
@@ -161,7 +221,10 @@ class ImouDataUpdateCoordinator(DataUpdateCoordinator):
                     if self.config_entry is not None:
                         self.hass.bus.async_fire(
                             f"{DOMAIN}_stale_device_detected",
-                            {"entry_id": self.config_entry.entry_id},
+                            {
+                                "entry_id": self.config_entry.entry_id,
+                                "device_id": self.device.get_device_id(),
+                            },
                         )
 
                 error_msg = (
@@ -192,8 +255,11 @@ class ImouDataUpdateCoordinator(DataUpdateCoordinator):
                 self.last_error_type = "rate_limit"
                 self.last_error_message = error_str
 
-                # Adjust scan interval to reduce API calls
-                self._adjust_scan_interval_for_rate_limit()
+                # Back off the scan interval of the devices of the account. The
+                # account API client records an OP1013 already, count it only once
+                if classify_error(exception) != "OP1013":
+                    self.backoff.record_rate_limit(error_str)
+                self.async_apply_backoff()
 
                 error_msg = (
                     f"Imou API rate limit exceeded (#{self.rate_limit_count}). "
@@ -210,53 +276,164 @@ class ImouDataUpdateCoordinator(DataUpdateCoordinator):
                 _LOGGER.error(error_msg)
                 raise UpdateFailed(error_msg) from exception
 
-    async def _async_fast_update(self):
-        """Poll only critical sensors (online status + motion alarm)."""
-        await self.device.async_refresh_status()
+    async def _async_poll_sensors(self):
+        """Poll the online status and the sensors which are due."""
+        now = dt_util.utcnow()
+        # Sensors updated by push messages do not need to be polled
+        pushed = (
+            self.push_receiver.get_pushed_sensors(now) if self.push_receiver else ()
+        )
+        sensors, is_full_poll = self.sensor_scheduler.get_due_sensors(
+            self.device, now, skip=pushed
+        )
 
-        if self.device.is_online():
-            for sensor in self.device.get_sensors_by_platform("binary_sensor"):
-                if sensor.get_name() in CRITICAL_SENSOR_NAMES:
+        # Only the online status can be queried without waking a sleeping
+        # device up
+        sleepable = self.device.get_sleepable() is True
+        if sleepable:
+            await self.device.async_refresh_status()
+            if self._async_defer_poll_if_asleep():
+                return True
+
+        if is_full_poll and not sleepable:
+            data = await self.device.async_get_data()
+        else:
+            data = True
+            if not sleepable:
+                await self.device.async_refresh_status()
+            if self.device.is_online():
+                # The status of a sleepable device is already fresh: on a full
+                # poll every scheduled sensor is due, update them without querying
+                # the status again
+                for sensor in sensors:
                     await sensor.async_update()
 
+        # Sensors of an offline device were not updated, they stay due
+        if self.device.is_online():
+            self.sensor_scheduler.record_poll(sensors, now)
+        return data
+
+    @property
+    def power_state(self) -> DevicePowerState:
+        """Whether our device sleeps, shared with its battery coordinator."""
+        return get_device_power_state(self.hass, self.device.get_device_id())
+
+    @callback
+    def _async_defer_poll_if_asleep(self) -> bool:
+        """Follow the power state of our device, return True if it sleeps.
+
+        The sensors of a sleeping device are not polled: they stay due, and are
+        polled once it wakes up.
+        """
+        status = self.device.get_status()
+        if status == POWER_STATUS_ONLINE:
+            # This poll does the one deferred while the device was asleep
+            self.power_state.async_cancel("poll")
+        self.power_state.async_set_status(status)
+        if not self.power_state.is_asleep():
+            return False
+        _LOGGER.debug(
+            "%s is asleep, polling its sensors once it wakes up",
+            self.device.get_name(),
+        )
+        self.power_state.async_defer("poll", self.async_request_refresh)
         return True
 
-    def _adjust_scan_interval_for_rate_limit(self):
-        """Increase scan interval when rate limited to reduce API calls."""
-        if not self._is_interval_adjusted:
-            # Double the scan interval (e.g., 15min -> 30min)
-            # This reduces API call frequency to help stay under rate limits
-            # Interval auto-restores when rate limit clears (see _async_update_data)
-            new_interval = self._original_scan_interval * 2
-            self.update_interval = timedelta(seconds=new_interval)
-            self._is_interval_adjusted = True
-
-            _LOGGER.info(
-                "Adjusted scan interval from %ds to %ds due to rate limiting",
-                self._original_scan_interval,
-                new_interval,
-            )
+    async def async_request_full_refresh(self) -> None:
+        """Request a refresh of every sensor, whatever its polling interval."""
+        self.sensor_scheduler.request_full_poll()
+        await self.async_request_refresh()
+
+    @callback
+    def async_apply_backoff(self) -> None:
+        """Follow the backoff of the account, e.g. after another device hit OP1013."""
+        interval = timedelta(
+            seconds=self.backoff.get_interval(self._original_scan_interval)
+        )
+        if interval == self.update_interval:
+            return
+        self.update_interval = interval
+        self._is_interval_adjusted = (
+            interval.total_seconds() != self._original_scan_interval
+        )
+        _LOGGER.debug(
+            "Scan interval set to %ds (%ds without rate limit backoff)",
+            interval.total_seconds(),
+            self._original_scan_interval,
+        )
+        if self.poll_scheduler is not None:
+            self.poll_scheduler.reschedule(self)
+
+    @callback
+    def async_apply_options(self, changed: set[str]) -> None:
+        """Apply changed options of our config entry, without setting it up again.
 
-    def _restore_scan_interval(self):
-        """Restore original scan interval after rate limit clears."""
-        if self._is_interval_adjusted:
-            self.update_interval = timedelta(seconds=self._original_scan_interval)
-            self._is_interval_adjusted = False
+        Args:
+            changed: Options whose value changed, all in HOT_APPLY_OPTIONS
 
-            _LOGGER.info(
-                "Restored original scan interval to %ds (rate limit cleared)",
-                self._original_scan_interval,
+        """
+        if OPTION_SCAN_INTERVAL in changed:
+            self.scan_inteval = self._original_scan_interval = (
+                self.config_entry.options.get(
+                    OPTION_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL
+                )
             )
+            # Keeps the account backoff, and our slot in the poll cycle
+            self.async_apply_backoff()
+        for entity in self.entities:
+            entity.async_apply_options(changed)
+
+
+@dataclass
+class ImouAccountData:
+    """Runtime data of a config entry holding the devices of an Imou Account.
+
+    The devices keep a coordinator each, for their entities, but share the API
+    client, the poll cycle and the config entry of the account.
+    """
+
+    api_client: "ImouAccountAPIClient"
+    coordinators: dict[str, ImouDataUpdateCoordinator] = field(default_factory=dict)
+    platforms: list = field(default_factory=list)
+
+
+def get_entry_coordinators(entry) -> list[ImouDataUpdateCoordinator]:
+    """Return the coordinators of the devices set up by a config entry."""
+    if isinstance(entry.runtime_data, ImouAccountData):
+        return list(entry.runtime_data.coordinators.values())
+    return [entry.runtime_data]
+
+
+def get_entry_coordinator(entry, device_id: str) -> ImouDataUpdateCoordinator | None:
+    """Return the coordinator of a device of a config entry, if set up."""
+    runtime_data = getattr(entry, "runtime_data", None)
+    if isinstance(runtime_data, ImouAccountData):
+        return runtime_data.coordinators.get(device_id)
+    return runtime_data
 
 
 class ImouDiscoveryCoordinator(DataUpdateCoordinator):
-    """Coordinator for discovering new devices."""
+    """Coordinator for discovering new devices.
+
+    Every poll only fetches the list of the devices of the account and compares
+    it with the previous one. Only the devices which were added are initialized
+    and offered to the user, once: devices which already have a config entry
+    (or were ignored) are looked up in an index of the configured device IDs,
+    and devices offered before are not offered again. Configured devices which
+    are no longer in the account are reported as stale right away.
+    """
 
     def __init__(self, hass: HomeAssistant, api_client, entry) -> None:
         """Initialize discovery coordinator."""
         self.api_client = api_client
         self.entry = entry
         self.discovered_devices: dict[str, ImouDevice] = {}
+        # Devices of the account at the last poll
+        self.known_device_ids: set[str] = set()
+        # Devices offered to the user, accepted or not
+        self.offered_device_ids: set[str] = set()
+        # Configured devices reported as no longer in the account
+        self.missing_device_ids: set[str] = set()
 
         # Get discovery interval from options
         discovery_interval = entry.options.get(
@@ -276,31 +453,116 @@ class ImouDiscoveryCoordinator(DataUpdateCoordinator):
         )
 
     async def _async_update_data(self):
-        """Poll for new devices."""
+        """Poll the devices of the account and act on the changes."""
         try:
             _LOGGER.debug("Polling for new Imou devices...")
-            discover_service = ImouDiscoverService(self.api_client)
-            devices = await discover_service.async_discover_devices()
-
-            # Check for new devices
-            for device_id, device in devices.items():
-                await self._handle_discovered_device(device_id, device)
-
-            return devices
+            with call_priority(CallPriority.BACKGROUND):
+                data = await self.api_client.async_api_deviceBaseList()
         except ImouException as err:
             # Log but don't fail - discovery is not critical
             _LOGGER.debug(
                 "Device discovery poll failed (will retry next cycle): %s", err
             )
-            return {}
-
-    async def _handle_discovered_device(self, device_id, device):
-        """Handle a discovered device."""
-        # Check if device already has config entry
-        existing_entries = self.hass.config_entries.async_entries(DOMAIN)
-        for entry in existing_entries:
-            if entry.data.get(CONF_DEVICE_ID) == device_id:
-                return  # Device already configured
+            return self.data or {}
+
+        device_list = data.get("deviceList", [])
+        devices = {
+            device_data["deviceId"]: device_data
+            for device_data in device_list
+            if "deviceId" in device_data
+        }
+        added = devices.keys() - self.known_device_ids
+        removed = self.known_device_ids - devices.keys()
+        self.known_device_ids = set(devices)
+        # A device removed from the account is offered again if it comes back
+        self.offered_device_ids -= removed
+        if added or removed:
+            _LOGGER.debug(
+                "Discovery: %d devices in the account, %d added, %d removed",
+                len(devices),
+                len(added),
+                len(removed),
+            )
+
+        configured = self._get_configured_entries()
+        for device_id in added:
+            if device_id in configured or device_id in self.offered_device_ids:
+                continue
+            await self._handle_discovered_device(device_id)
+
+        # The list is paginated, a full page may not hold every device
+        if len(device_list) < DISCOVERY_DEVICE_LIST_LIMIT:
+            self._check_missing_devices(devices, configured)
+
+        return devices
+
+    def _get_configured_entries(self) -> dict[str, Any]:
+        """Return the config entries of the integration by device ID."""
+        configured = {}
+        for entry in self.hass.config_entries.async_entries(DOMAIN):
+            if is_account_entry(entry):
+                for device_id in entry.data.get(CONF_DEVICE_IDS, []):
+                    configured[device_id] = entry
+                continue
+            # Ignored discoveries only have the device ID as unique ID
+            device_id = entry.data.get(CONF_DEVICE_ID) or entry.unique_id
+            if device_id:
+                configured[device_id] = entry
+        return configured
+
+    def _check_missing_devices(
+        self, devices: dict[str, Any], configured: dict[str, Any]
+    ) -> None:
+        """Report the configured devices which are no longer in the account."""
+        # Devices which came back are no longer missing
+        self.missing_device_ids &= configured.keys() - devices.keys()
+        for device_id, entry in configured.items():
+            if device_id in devices or device_id in self.missing_device_ids:
+                continue
+            if entry.source == SOURCE_IGNORE:
+                continue
+            if device_id in entry.options.get(OPTION_DISABLED_DEVICES, []):
+                continue
+            self.missing_device_ids.add(device_id)
+            _LOGGER.warning(
+                "Device %s (%s) is no longer in the Imou account",
+                entry.title,
+                device_id,
+            )
+            coordinator = get_entry_coordinator(entry, device_id)
+            if isinstance(coordinator, ImouDataUpdateCoordinator):
+                coordinator.stale_device_suspected = True
+                coordinator.stale_device_last_error = (
+                    "Device no longer in the Imou account"
+                )
+            self.hass.bus.async_fire(
+                f"{DOMAIN}_stale_device_detected",
+                {"entry_id": entry.entry_id, "device_id": device_id},
+            )
+
+    async def _handle_discovered_device(self, device_id, device=None):
+        """Offer a device added to the account, initializing it if needed."""
+        if device is None:
+            # Details fetched moments ago, e.g. by the config flow, are reused.
+            # Those fetched now are kept for the setup of the entry
+            snapshot_cache = self.api_client.snapshot_cache
+            if snapshot_cache is not None and (
+                device_data := snapshot_cache.get_fresh(device_id)
+            ):
+                self.api_client.prime_device_details(device_data)
+            device = ImouDevice(self.api_client, device_id)
+            try:
+                with call_priority(CallPriority.BACKGROUND):
+                    await device.async_initialize()
+            except ImouException as err:
+                _LOGGER.debug(
+                    "Cannot initialize discovered device %s: %s", device_id, err
+                )
+                # Consider it added again at the next poll
+                self.known_device_ids.discard(device_id)
+                return
+        self.discovered_devices[device_id] = device
+        self.offered_device_ids.add(device_id)
 
         # New device found - trigger discovery flow
         device_name = "Unknown"
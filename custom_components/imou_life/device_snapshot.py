@@ -0,0 +1,350 @@
+"""Cached device details for Imou devices.
+
+Initializing an ImouDevice asks the API for the device details
+(deviceBaseDetailList) to find out its capabilities and build its sensors. The
+details returned by the API are kept in a persisted snapshot per device ID, so
+that on the next start the device can be initialized from the snapshot without
+any API call.
+
+Snapshots are revalidated in the background shortly after startup, with a
+single batched request per account. When the firmware or the capabilities of a
+device changed, the owner of the device is notified so that it can be set up
+again from fresh details.
+
+Details fetched less than DEVICE_SNAPSHOT_FRESH_TIME ago, e.g. by the device
+discovery, are used as they are: a device discovered and then added by the user
+is set up from the details the discovery got, without any API call.
+
+The snapshot of a device also keeps the last known state of the device and of
+its sensors, as of its last successful poll. A device set up from its snapshot
+gets them back, so its entities show a state straight away while the first
+refresh runs in the background.
+"""
+
+import logging
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from imouapi.device import ImouDevice
+from imouapi.device_entity import (
+    ImouBinarySensor,
+    ImouSelect,
+    ImouSensor,
+    ImouSiren,
+    ImouSwitch,
+)
+from imouapi.exceptions import ImouException
+
+from .call_budget import CallPriority, call_priority
+from .const import (
+    DEVICE_SNAPSHOT_BATCH_SIZE,
+    DEVICE_SNAPSHOT_FRESH_TIME,
+    DEVICE_SNAPSHOT_KEY,
+    DEVICE_SNAPSHOT_REVALIDATE_DELAY,
+    DEVICE_SNAPSHOT_REVALIDATION_KEY,
+    DEVICE_SNAPSHOT_REVALIDATION_TIMER_KEY,
+    DEVICE_SNAPSHOT_SAVE_DELAY,
+    DEVICE_SNAPSHOT_STORAGE_KEY,
+    DEVICE_SNAPSHOT_STORAGE_VERSION,
+    DEVICE_SNAPSHOT_STORE_KEY,
+    DOMAIN,
+)
+from .helpers import exception_message
+
+if TYPE_CHECKING:
+    from .api_client import ImouAccountAPIClient
+
+_LOGGER = logging.getLogger(__package__)
+
+# Fields of the device details that require the device to be set up again
+SNAPSHOT_SIGNIFICANT_FIELDS = ("version", "ability")
+
+# Sensors reporting events rather than a state, not worth restoring
+SNAPSHOT_VOLATILE_SENSORS = ("motionAlarm",)
+
+
+def _get_sensor_state(sensor: Any) -> dict[str, Any] | None:
+    """Return the state of a sensor to persist, None if it has none."""
+    if isinstance(sensor, ImouSelect):
+        return {
+            "current_option": sensor.get_current_option(),
+            "available_options": sensor.get_available_options(),
+        }
+    if isinstance(sensor, (ImouSensor, ImouBinarySensor, ImouSwitch, ImouSiren)):
+        return {"state": sensor._state, "attributes": sensor.get_attributes()}
+    return None
+
+
+def _set_sensor_state(sensor: Any, state: dict[str, Any]) -> None:
+    """Give a sensor back its persisted state."""
+    # imouapi has no setters, the state is the one async_update would set
+    if isinstance(sensor, ImouSelect):
+        sensor._current_option = state.get("current_option")
+        sensor._available_options = list(state.get("available_options") or [])
+    else:
+        sensor._state = state.get("state")
+        sensor._attributes = dict(state.get("attributes") or {})
+    sensor._updated = True
+
+
+class DeviceSnapshotCache:
+    """Manage the persisted device details snapshots."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the snapshot cache."""
+        self.hass = hass
+        self._ensure_storage()
+
+    def _ensure_storage(self) -> None:
+        """Ensure storage exists in hass.data."""
+        if DOMAIN not in self.hass.data:
+            self.hass.data[DOMAIN] = {}
+        if DEVICE_SNAPSHOT_KEY not in self.hass.data[DOMAIN]:
+            self.hass.data[DOMAIN][DEVICE_SNAPSHOT_KEY] = {}
+        if DEVICE_SNAPSHOT_REVALIDATION_KEY not in self.hass.data[DOMAIN]:
+            self.hass.data[DOMAIN][DEVICE_SNAPSHOT_REVALIDATION_KEY] = {}
+        if DEVICE_SNAPSHOT_REVALIDATION_TIMER_KEY not in self.hass.data[DOMAIN]:
+            self.hass.data[DOMAIN][DEVICE_SNAPSHOT_REVALIDATION_TIMER_KEY] = {}
+
+    def _get_storage(self) -> dict[str, dict[str, Any]]:
+        """Get the snapshot storage dict."""
+        return self.hass.data[DOMAIN][DEVICE_SNAPSHOT_KEY]
+
+    async def async_load(self) -> None:
+        """Restore the snapshots saved before the last restart.
+
+        Until it has been called, snapshots are only kept in memory.
+        """
+        store: Store = Store(
+            self.hass, DEVICE_SNAPSHOT_STORAGE_VERSION, DEVICE_SNAPSHOT_STORAGE_KEY
+        )
+        self.hass.data[DOMAIN][DEVICE_SNAPSHOT_STORE_KEY] = store
+
+        data = await store.async_load()
+        if not data:
+            return
+        storage = self._get_storage()
+        for device_id, snapshot in data.get("devices", {}).items():
+            if isinstance(snapshot, dict) and isinstance(snapshot.get("detail"), dict):
+                storage.setdefault(device_id, snapshot)
+        _LOGGER.debug("Restored %d device snapshots", len(storage))
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Save the snapshots to disk, grouping changes made in a short time."""
+        store: Store | None = self.hass.data[DOMAIN].get(DEVICE_SNAPSHOT_STORE_KEY)
+        if store is not None:
+            store.async_delay_save(self._data_to_save, DEVICE_SNAPSHOT_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {"devices": self._get_storage()}
+
+    def get(self, device_id: str) -> dict[str, Any] | None:
+        """Return the cached details of a device, None if there are none."""
+        snapshot = self._get_storage().get(device_id)
+        return snapshot["detail"] if snapshot else None
+
+    def get_updated_at(self, device_id: str) -> datetime | None:
+        """Return when the details of a device were last fetched."""
+        snapshot = self._get_storage().get(device_id)
+        if not snapshot:
+            return None
+        return dt_util.parse_datetime(snapshot.get("updated_at", ""))
+
+    def get_fresh(self, device_id: str) -> dict[str, Any] | None:
+        """Return the details of a device if they need no revalidation yet."""
+        updated_at = self.get_updated_at(device_id)
+        if updated_at is None or dt_util.utcnow() - updated_at > timedelta(
+            seconds=DEVICE_SNAPSHOT_FRESH_TIME
+        ):
+            return None
+        return self.get(device_id)
+
+    def get_all_fresh(self, app_id: str | None = None) -> list[dict[str, Any]]:
+        """Return the details of all the devices which need no revalidation yet.
+
+        Args:
+            app_id: only return the details fetched with this account's app id
+
+        """
+        storage = self._get_storage()
+        return [
+            detail
+            for device_id in list(storage)
+            if app_id is None or storage[device_id].get("app_id") == app_id
+            if (detail := self.get_fresh(device_id)) is not None
+        ]
+
+    @callback
+    def update(self, device_data: dict[str, Any], app_id: str | None = None) -> None:
+        """Store the details of a device as returned by deviceBaseDetailList.
+
+        Args:
+            device_data: the details of the device
+            app_id: the app id of the account the details were fetched with
+
+        """
+        device_id = device_data.get("deviceId")
+        if not device_id:
+            return
+        storage = self._get_storage()
+        snapshot = {
+            "detail": device_data,
+            "updated_at": dt_util.utcnow().isoformat(),
+        }
+        if app_id is not None:
+            snapshot["app_id"] = app_id
+        # Fresh details do not make the last known states wrong
+        if states := (storage.get(device_id) or {}).get("states"):
+            snapshot["states"] = states
+        storage[device_id] = snapshot
+        self._async_schedule_save()
+
+    @callback
+    def update_states(self, device: ImouDevice) -> None:
+        """Store the current state of a device and of its sensors."""
+        snapshot = self._get_storage().get(device.get_device_id())
+        if snapshot is None:
+            return
+        sensors = {}
+        for sensor in device.get_all_sensors():
+            if sensor.get_name() in SNAPSHOT_VOLATILE_SENSORS:
+                continue
+            if sensor.is_updated() and (state := _get_sensor_state(sensor)):
+                sensors[sensor.get_name()] = state
+        states = {"status": device.get_status(), "sensors": sensors}
+        if snapshot.get("states") == states:
+            return
+        snapshot["states"] = states
+        self._async_schedule_save()
+
+    def restore_states(self, device: ImouDevice) -> bool:
+        """Give a device and its sensors back their last known state.
+
+        Returns:
+            True if a state was restored
+
+        """
+        snapshot = self._get_storage().get(device.get_device_id())
+        states = snapshot.get("states") if snapshot else None
+        if not isinstance(states, dict):
+            return False
+        if states.get("status") is not None:
+            device._status = states["status"]
+        sensors = states.get("sensors", {})
+        for sensor in device.get_all_sensors():
+            if isinstance(state := sensors.get(sensor.get_name()), dict):
+                _set_sensor_state(sensor, state)
+        return True
+
+    @callback
+    def remove(self, device_id: str) -> None:
+        """Forget the details of a device."""
+        if self._get_storage().pop(device_id, None) is not None:
+            self._async_schedule_save()
+
+    @callback
+    def async_schedule_revalidation(
+        self,
+        api_client: "ImouAccountAPIClient",
+        device_id: str,
+        on_change: Callable[[], None],
+    ) -> None:
+        """Refresh the details of a device restored from its snapshot.
+
+        The devices of the same account are revalidated together a little after
+        startup. on_change is called if the firmware or the capabilities of the
+        device are not the ones of the snapshot anymore.
+
+        Args:
+            api_client: The API client of the device's account
+            device_id: The device to revalidate
+            on_change: Called when the device details changed
+
+        """
+        snapshot = self.get(device_id)
+        if snapshot is None:
+            return
+        pending_by_client = self.hass.data[DOMAIN][DEVICE_SNAPSHOT_REVALIDATION_KEY]
+        pending = pending_by_client.setdefault(api_client, {})
+        first = not pending
+        pending[device_id] = (snapshot, on_change)
+        if not first:
+            return
+
+        timers = self.hass.data[DOMAIN][DEVICE_SNAPSHOT_REVALIDATION_TIMER_KEY]
+
+        async def _async_revalidate(_now: datetime) -> None:
+            timers.pop(api_client, None)
+            await self._async_revalidate(
+                api_client, pending_by_client.pop(api_client, {})
+            )
+
+        timers[api_client] = async_call_later(
+            self.hass, DEVICE_SNAPSHOT_REVALIDATE_DELAY, _async_revalidate
+        )
+
+    @callback
+    def cancel_revalidation(
+        self, api_client: "ImouAccountAPIClient", device_id: str
+    ) -> None:
+        """Drop a pending revalidation, e.g. when its entry is unloaded."""
+        pending_by_client = self.hass.data[DOMAIN][DEVICE_SNAPSHOT_REVALIDATION_KEY]
+        pending = pending_by_client.get(api_client)
+        if pending is None:
+            return
+        pending.pop(device_id, None)
+        if pending:
+            return
+        # No device of the account left to revalidate, stop the timer
+        del pending_by_client[api_client]
+        timers = self.hass.data[DOMAIN][DEVICE_SNAPSHOT_REVALIDATION_TIMER_KEY]
+        if (unsub := timers.pop(api_client, None)) is not None:
+            unsub()
+
+    async def _async_revalidate(
+        self,
+        api_client: "ImouAccountAPIClient",
+        pending: dict[str, tuple[dict[str, Any], Callable[[], None]]],
+    ) -> None:
+        """Fetch the details of the pending devices and compare them."""
+        device_ids = list(pending)
+        for start in range(0, len(device_ids), DEVICE_SNAPSHOT_BATCH_SIZE):
+            batch = device_ids[start : start + DEVICE_SNAPSHOT_BATCH_SIZE]
+            try:
+                with call_priority(CallPriority.BACKGROUND):
+                    data = await api_client.async_api_deviceBaseDetailList(batch)
+            except ImouException as exception:
+                # Keep the snapshots, they are revalidated again on next start
+                _LOGGER.debug(
+                    "Unable to revalidate device snapshots: %s",
+                    exception_message(exception),
+                )
+                return
+
+            for device_data in data.get("deviceList", []):
+                device_id = device_data.get("deviceId")
+                if device_id not in pending:
+                    continue
+                # The API client has already stored the fresh details, compare
+                # them to the snapshot the device was set up from
+                snapshot, on_change = pending[device_id]
+                changed = [
+                    field
+                    for field in SNAPSHOT_SIGNIFICANT_FIELDS
+                    if device_data.get(field) != snapshot.get(field)
+                ]
+                if changed:
+                    _LOGGER.info(
+                        "Details of device %s changed (%s), setting it up again",
+                        device_id,
+                        ", ".join(changed),
+                    )
+                    on_change()
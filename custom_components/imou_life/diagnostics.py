@@ -6,25 +6,66 @@ from homeassistant.components.diagnostics import async_redact_data
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
-from .coordinator import ImouDataUpdateCoordinator
+from .coordinator import ImouDataUpdateCoordinator, get_entry_coordinators
+from .helpers import get_device_key, is_account_entry
 
+TO_REDACT = {
+    "app_id",
+    "app_secret",
+    "access_token",
+    "device_id",
+    "device_ids",
+    "disabled_devices",
+    "entry_id",
+    "unique_id",
+}
 
-async def async_get_config_entry_diagnostics(
-    hass: HomeAssistant, entry: ConfigEntry
+
+def _get_device_diagnostics(
+    entry: ConfigEntry, coordinator: ImouDataUpdateCoordinator
 ) -> dict[str, Any]:
-    """Return diagnostics for a config entry."""
-    coordinator: ImouDataUpdateCoordinator = entry.runtime_data
-    to_redact = {
-        "app_id",
-        "app_secret",
-        "access_token",
-        "device_id",
-        "entry_id",
-        "unique_id",
-    }
-    return {
-        "entry": async_redact_data(entry.as_dict(), to_redact),
+    """Return the diagnostics of one device of a config entry."""
+    diagnostics = {
         "device_info": async_redact_data(
-            coordinator.device.get_diagnostics(), to_redact
+            coordinator.device.get_diagnostics(), TO_REDACT
         ),
     }
+    if (orchestrator := coordinator.startup_orchestrator) is not None:
+        timing = orchestrator.get_timing(get_device_key(entry, coordinator.device))
+        diagnostics["startup"] = {
+            "entry": timing.as_dict() if timing is not None else None,
+            "account": orchestrator.get_summary(),
+        }
+    if (scheduler := coordinator.poll_scheduler) is not None:
+        diagnostics["poll_schedule"] = scheduler.get_schedule(coordinator)
+        diagnostics["poll_schedule"]["backoff"] = coordinator.backoff.as_dict()
+    if (metrics := coordinator.api_metrics) is not None:
+        diagnostics["api_metrics"] = {
+            "device": metrics.get_summary(coordinator.device.get_device_id()),
+            "account": metrics.get_summary(),
+        }
+    if (receiver := coordinator.push_receiver) is not None:
+        diagnostics["push"] = {
+            "healthy": receiver.is_healthy(),
+            "last_message": (
+                receiver.last_message.isoformat() if receiver.last_message else None
+            ),
+            "message_count": receiver.message_count,
+            "pushed_sensors": sorted(receiver.get_pushed_sensors()),
+        }
+    return diagnostics
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    diagnostics = {"entry": async_redact_data(entry.as_dict(), TO_REDACT)}
+    if is_account_entry(entry):
+        diagnostics["devices"] = [
+            _get_device_diagnostics(entry, coordinator)
+            for coordinator in get_entry_coordinators(entry)
+        ]
+    else:
+        diagnostics.update(_get_device_diagnostics(entry, entry.runtime_data))
+    return diagnostics
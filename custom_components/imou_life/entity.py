@@ -1,14 +1,18 @@
 """entity sensor platform for Imou."""
 
 import logging
+from collections.abc import Awaitable, Callable
 from typing import TYPE_CHECKING, Any
 
+from homeassistant.core import callback
 from homeassistant.helpers.entity import async_generate_entity_id
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from imouapi.exceptions import ImouException
 
+from .call_budget import CallBudgetExhausted
 from .const import DOMAIN
-from .helpers import camel_to_snake
+from .helpers import camel_to_snake, get_device_key
+from .wake_queue import async_run_command
 
 if TYPE_CHECKING:
     from homeassistant.config_entries import ConfigEntry
@@ -47,16 +51,29 @@ class ImouEntity(CoordinatorEntity):
         # Set translation key for dynamic icons
         self._attr_translation_key = camel_to_snake(self.sensor_instance.get_name())
 
+    @property
+    def device_key(self) -> str:
+        """Return the key of our device in its config entry."""
+        return get_device_key(self.config_entry, self.device)
+
+    @callback
+    def async_apply_options(self, changed: set[str]) -> None:
+        """Apply changed options of the config entry.
+
+        Options are read when used, e.g. the callback URL, so there is nothing
+        to do by default.
+        """
+
     @property
     def unique_id(self):
         """Return a unique ID to use for this entity."""
-        return self.config_entry.entry_id + "_" + self.sensor_instance.get_name()
+        return self.device_key + "_" + self.sensor_instance.get_name()
 
     @property
     def device_info(self):
         """Return device information."""
         return {
-            "identifiers": {(DOMAIN, self.config_entry.entry_id)},
+            "identifiers": {(DOMAIN, self.device_key)},
             "name": self.device.get_name(),
             "model": self.device.get_model(),
             "manufacturer": self.device.get_manufacturer(),
@@ -97,16 +114,48 @@ class ImouEntity(CoordinatorEntity):
         """State attributes."""
         return self.sensor_instance.get_attributes()
 
+    async def async_run_command(
+        self, command: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any
+    ) -> Any:
+        """Send a command to our device, in a wake cycle if it sleeps."""
+        return await async_run_command(
+            self.coordinator.hass, self.device, command, *args, **kwargs
+        )
+
     async def async_added_to_hass(self):
         """Entity added to HA (at startup or when re-enabled)."""
         await super().async_added_to_hass()
         _LOGGER.debug("%s added to HA", self.name)
         self.sensor_instance.set_enabled(True)
-        # request an update of this sensor
+        # A sensor restored from the device snapshot already has its last known
+        # state, the first refresh of the coordinator updates it
+        if self.sensor_instance.is_updated() is True:
+            return
+        # request an update of this sensor, in the background if the account
+        # coordinates the startup so that the platform setup is not held up
+        orchestrator = self.coordinator.startup_orchestrator
+        if orchestrator is None:
+            await self._async_update_sensor()
+            return
+        orchestrator.async_schedule_update(self.device_key, self._async_first_update)
+
+    async def _async_update_sensor(self) -> bool:
+        """Update the sensor instance, return whether it succeeded."""
         try:
             await self.sensor_instance.async_update()
+        except CallBudgetExhausted as exception:
+            # The sensor is still due, the next poll will update it
+            _LOGGER.debug("Not updating %s: %s", self.name, exception)
+            return False
         except ImouException as exception:
             _LOGGER.error("Imou exception: %s", str(exception))
+            return False
+        return True
+
+    async def _async_first_update(self) -> None:
+        """Update the sensor scheduled at startup and show its state."""
+        if await self._async_update_sensor() and self.hass is not None:
+            self.async_write_ha_state()
 
     async def async_will_remove_from_hass(self):
         """Entity removed from HA (when disabled)."""
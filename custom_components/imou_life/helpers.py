@@ -1,9 +1,12 @@
 """Helper utilities for the Imou Life integration."""
 
 import re
+from typing import Any
 
 from imouapi.exceptions import ImouException
 
+from .const import CONF_ENTRY_TYPE, ENTRY_TYPE_ACCOUNT
+
 
 def camel_to_snake(name: str) -> str:
     """Convert camelCase to snake_case for translation keys.
@@ -31,3 +34,20 @@ def exception_message(exception: ImouException) -> str:
     """Extract a useful message from an ImouException, even if empty."""
     msg = str(exception).strip()
     return msg or f"{type(exception).__name__} ({exception.get_title()})"
+
+
+def is_account_entry(entry: Any) -> bool:
+    """Return whether a config entry holds all the devices of an Imou Account."""
+    return entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_ACCOUNT
+
+
+def get_device_key(entry: Any, device: Any) -> str:
+    """Return the key of a device in its config entry.
+
+    The key makes the unique IDs of the entities and the device registry
+    identifier of the device. The device of a device entry is keyed by the
+    entry ID, those of an account entry by the entry ID and their device ID.
+    """
+    if is_account_entry(entry):
+        return f"{entry.entry_id}_{device.get_device_id()}"
+    return entry.entry_id
@@ -0,0 +1,133 @@
+"""Snapshot cache for Imou cameras.
+
+Every snapshot downloaded from the Imou cloud costs an API call plus the
+camera_wait_before_download delay. Dashboards with several open clients ask
+for the same camera image many times within a few seconds, so each camera
+keeps its last snapshot for a configurable TTL:
+
+- requests arriving within the TTL are served from memory;
+- concurrent requests while a download is in progress wait for that download
+  instead of starting their own;
+- resized variants (width/height requested by the frontend) are computed once
+  per snapshot from the cached bytes.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from homeassistant.components.camera import Image
+from homeassistant.components.camera.img_util import scale_jpeg_camera_image
+from homeassistant.core import HomeAssistant
+
+from .const import DEFAULT_SNAPSHOT_CACHE_TTL
+
+_LOGGER = logging.getLogger(__package__)
+
+
+class CameraImageCache:
+    """Cache the last snapshot of a camera and its resized variants."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        ttl: float = DEFAULT_SNAPSHOT_CACHE_TTL,
+        content_type: str = "image/jpeg",
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            hass: Home Assistant instance, used to resize images off the loop
+            ttl: Seconds a snapshot is served from memory, 0 to only coalesce
+                concurrent requests
+            content_type: Content type of the snapshots
+
+        """
+        self.hass = hass
+        self.ttl = ttl
+        self.content_type = content_type
+        self.hits = 0
+        self.misses = 0
+        self._image: bytes | None = None
+        self._fetched_at = 0.0
+        self._resized: dict[tuple[int, int], bytes] = {}
+        self._inflight: asyncio.Task[bytes] | None = None
+
+    def is_fresh(self) -> bool:
+        """Return True if the cached snapshot can still be served."""
+        return (
+            self._image is not None and time.monotonic() - self._fetched_at < self.ttl
+        )
+
+    def invalidate(self) -> None:
+        """Drop the cached snapshot, the next request downloads a new one."""
+        self._image = None
+        self._resized.clear()
+
+    async def async_get_image(
+        self,
+        fetch: Callable[[], Awaitable[bytes]],
+        width: int | None = None,
+        height: int | None = None,
+    ) -> bytes:
+        """Return the snapshot, downloading it with fetch only if needed.
+
+        Args:
+            fetch: Coroutine function downloading a new snapshot
+            width: Requested width, the image is resized if height is set too
+            height: Requested height, the image is resized if width is set too
+
+        Raises:
+            ImouException: if the download failed, nothing is cached then
+
+        """
+        if self.is_fresh():
+            self.hits += 1
+            image = self._image
+        else:
+            self.misses += 1
+            image = await self._async_fetch(fetch)
+        if not image or width is None or height is None:
+            return image
+        return await self._async_get_resized(image, width, height)
+
+    async def _async_fetch(self, fetch: Callable[[], Awaitable[bytes]]) -> bytes:
+        """Download a snapshot, sharing a download already in progress."""
+        if self._inflight is None:
+            self._inflight = asyncio.get_running_loop().create_task(
+                self._async_download(fetch)
+            )
+        else:
+            _LOGGER.debug("Waiting for the snapshot download in progress")
+        # A request giving up (e.g. timing out) must not cancel the download
+        # other requests are waiting for
+        return await asyncio.shield(self._inflight)
+
+    async def _async_download(self, fetch: Callable[[], Awaitable[bytes]]) -> bytes:
+        """Download a snapshot and cache it."""
+        try:
+            image = await fetch()
+        finally:
+            self._inflight = None
+        if image:
+            self._image = image
+            self._fetched_at = time.monotonic()
+            self._resized.clear()
+        return image
+
+    async def _async_get_resized(self, image: bytes, width: int, height: int) -> bytes:
+        """Return the image scaled to the requested size, once per snapshot."""
+        key = (width, height)
+        if image is not self._image:
+            # A newer snapshot replaced this one meanwhile, do not keep it
+            return await self._async_scale(image, width, height)
+        if key not in self._resized:
+            self._resized[key] = await self._async_scale(image, width, height)
+        return self._resized[key]
+
+    async def _async_scale(self, image: bytes, width: int, height: int) -> bytes:
+        """Scale a JPEG image in the executor."""
+        return await self.hass.async_add_executor_job(
+            scale_jpeg_camera_image, Image(self.content_type, image), width, height
+        )
@@ -7,6 +7,7 @@ from typing import Type
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
+from .coordinator import get_entry_coordinators
 from .entity import ImouEntity
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
@@ -30,16 +31,16 @@ async def setup_platform(
         entity_id_format: Format string for entity ID
         async_add_devices: Function to add devices to HA
     """
-    coordinator = entry.runtime_data
-    device = coordinator.device
     entities = []
 
-    for sensor_instance in device.get_sensors_by_platform(platform_name):
-        entity = entity_class(coordinator, entry, sensor_instance, entity_id_format)
-        entities.append(entity)
-        coordinator.entities.append(entity)
-        _LOGGER.debug(
-            "[%s] Adding %s", device.get_name(), sensor_instance.get_description()
-        )
+    for coordinator in get_entry_coordinators(entry):
+        device = coordinator.device
+        for sensor_instance in device.get_sensors_by_platform(platform_name):
+            entity = entity_class(coordinator, entry, sensor_instance, entity_id_format)
+            entities.append(entity)
+            coordinator.entities.append(entity)
+            _LOGGER.debug(
+                "[%s] Adding %s", device.get_name(), sensor_instance.get_description()
+            )
 
     async_add_devices(entities)
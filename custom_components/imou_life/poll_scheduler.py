@@ -0,0 +1,284 @@
+"""Account-wide poll scheduler for Imou devices.
+
+Instead of every ImouDataUpdateCoordinator polling on its own timer, all the
+coordinators of the same Imou Account are driven by one scheduler, through a
+bounded number of concurrent requests.
+
+Devices set up together would all be due at the same time, every scan interval.
+To spread their polls, every device gets a phase slot within the scan
+interval: the devices are ordered by a hash of their device ID and spaced
+evenly over the interval, from an offset derived from the app ID so that
+accounts do not all poll on the hour either. A device is polled at its slot
+plus a bounded random jitter; the slots are rebalanced whenever a device is
+added or removed. Devices due within a few seconds of each other are still
+polled in the same cycle.
+
+While the calls of the account are suspended after a rate limit, no device is
+polled; once the suspension is over, the devices which were due resume one
+after the other rather than all at once.
+"""
+
+import asyncio
+import hashlib
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+from .backoff import get_account_backoff
+from .const import (
+    ACCOUNT_POLL_BATCH_WINDOW,
+    ACCOUNT_POLL_MAX_CONCURRENCY,
+    ACCOUNT_POLL_MAX_JITTER,
+    BACKOFF_RESUME_STAGGER,
+    DOMAIN,
+    POLL_SCHEDULER_KEY,
+)
+
+if TYPE_CHECKING:
+    from .coordinator import ImouDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__package__)
+
+
+def get_stable_fraction(value: str) -> float:
+    """Return a fraction in [0, 1) derived from a string, stable across restarts.
+
+    Unlike hash(), which is salted per process, the same value always maps to
+    the same fraction.
+    """
+    digest = hashlib.sha256(value.encode()).digest()
+    return int.from_bytes(digest[:8], "big") / 2**64
+
+
+class AccountPollScheduler:
+    """Poll all the devices of an Imou Account from a single timer."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        app_id: str,
+        max_concurrency: int = ACCOUNT_POLL_MAX_CONCURRENCY,
+    ) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self.app_id = app_id
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._next_due: dict["ImouDataUpdateCoordinator", datetime] = {}
+        self._last_poll: dict["ImouDataUpdateCoordinator", datetime] = {}
+        self._phases: dict["ImouDataUpdateCoordinator", float] = {}
+        self._ranks: dict["ImouDataUpdateCoordinator", int] = {}
+        self._backoff = get_account_backoff(hass, app_id)
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._cycle_running = False
+
+    @property
+    def coordinators(self) -> list["ImouDataUpdateCoordinator"]:
+        """Return the coordinators driven by this scheduler."""
+        return list(self._next_due)
+
+    def get_next_poll(self) -> datetime | None:
+        """Return when the next poll cycle is due."""
+        return min(self._next_due.values()) if self._next_due else None
+
+    def get_phase(self, coordinator: "ImouDataUpdateCoordinator") -> float | None:
+        """Return the slot of a device, as a fraction of its scan interval."""
+        return self._phases.get(coordinator)
+
+    def get_schedule(self, coordinator: "ImouDataUpdateCoordinator") -> dict[str, Any]:
+        """Return when a device is polled, for the diagnostics."""
+        phase = self._phases.get(coordinator)
+        next_due = self._next_due.get(coordinator)
+        return {
+            "devices": len(self._next_due),
+            "phase": round(phase, 4) if phase is not None else None,
+            "slot_offset": (
+                round(phase * coordinator.update_interval.total_seconds(), 1)
+                if phase is not None
+                else None
+            ),
+            "next_poll": next_due.isoformat() if next_due is not None else None,
+        }
+
+    def register(self, coordinator: "ImouDataUpdateCoordinator") -> None:
+        """Take over the polling of a coordinator.
+
+        The coordinator has just been refreshed (or restored from its snapshot)
+        by the setup, so it is next polled at its slot at least half a scan
+        interval from now.
+        """
+        coordinator.poll_scheduler = self
+        self._last_poll[coordinator] = dt_util.utcnow()
+        self._next_due[coordinator] = self._last_poll[coordinator]
+        self._rebalance()
+        _LOGGER.debug(
+            "Scheduling %s in the account poll cycle at %s (slot %.3f, %d devices)",
+            coordinator.device.get_name(),
+            self._next_due[coordinator].isoformat(),
+            self._phases[coordinator],
+            len(self._next_due),
+        )
+        self._schedule_next_cycle()
+
+    def unregister(self, coordinator: "ImouDataUpdateCoordinator") -> None:
+        """Stop polling a coordinator."""
+        self._next_due.pop(coordinator, None)
+        self._last_poll.pop(coordinator, None)
+        self._phases.pop(coordinator, None)
+        self._ranks.pop(coordinator, None)
+        coordinator.poll_scheduler = None
+        if not self._next_due:
+            self._cancel_timer()
+            return
+        self._rebalance()
+        self._schedule_next_cycle()
+
+    def reschedule(self, coordinator: "ImouDataUpdateCoordinator") -> None:
+        """Move the next poll of a coordinator after its update_interval changed."""
+        if coordinator not in self._next_due:
+            return
+        self._next_due[coordinator] = self._get_next_due(coordinator)
+        self._schedule_next_cycle()
+
+    def _rebalance(self) -> None:
+        """Spread the slots of the devices evenly over the scan interval."""
+        ordered = sorted(
+            self._next_due,
+            key=lambda coordinator: get_stable_fraction(
+                str(coordinator.device.get_device_id())
+            ),
+        )
+        offset = get_stable_fraction(str(self.app_id))
+        self._phases = {
+            coordinator: (offset + index / len(ordered)) % 1
+            for index, coordinator in enumerate(ordered)
+        }
+        self._ranks = {coordinator: index for index, coordinator in enumerate(ordered)}
+        for coordinator in ordered:
+            self._next_due[coordinator] = self._get_next_due(coordinator)
+
+    def _get_next_due(self, coordinator: "ImouDataUpdateCoordinator") -> datetime:
+        """Return the next slot of a device, plus jitter.
+
+        Slots are anchored to the clock rather than to the last poll, so a slow
+        poll or the jitter do not make the device drift out of its slot.
+        """
+        interval = coordinator.update_interval.total_seconds()
+        start = max(
+            self._last_poll[coordinator] + coordinator.update_interval / 2,
+            dt_util.utcnow(),
+        ).timestamp()
+        slot = start + (self._phases[coordinator] * interval - start) % interval
+        # Stay well within the slot, away from the neighbouring devices
+        max_jitter = min(ACCOUNT_POLL_MAX_JITTER, interval / len(self._phases) / 4)
+        due = dt_util.utc_from_timestamp(slot + random.uniform(0, max_jitter))
+
+        if self._backoff.is_suspended():
+            # Resume the devices one after the other
+            resume = self._backoff.suspended_until + timedelta(
+                seconds=BACKOFF_RESUME_STAGGER * self._ranks[coordinator]
+            )
+            due = max(due, resume)
+        return due
+
+    def _cancel_timer(self) -> None:
+        """Cancel the pending cycle, if any."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+    def _schedule_next_cycle(self) -> None:
+        """Arm the timer for the earliest due device."""
+        if self._cycle_running:
+            # The running cycle re-arms the timer when it is done
+            return
+        self._cancel_timer()
+        next_poll = self.get_next_poll()
+        if next_poll is None:
+            return
+        self._unsub_timer = async_track_point_in_utc_time(
+            self.hass, self._async_handle_timer, next_poll
+        )
+
+    async def _async_handle_timer(self, _now: datetime) -> None:
+        """Run the poll cycle when the timer fires."""
+        self._unsub_timer = None
+        await self.async_poll_due_devices()
+
+    async def async_poll_due_devices(self) -> None:
+        """Poll every device that is due, in one batch."""
+        if self._cycle_running:
+            return
+        self._cycle_running = True
+        try:
+            # Pull devices due shortly after now into this cycle as well, rather
+            # than arming a timer for each of them
+            horizon = dt_util.utcnow() + timedelta(seconds=ACCOUNT_POLL_BATCH_WINDOW)
+            due = [
+                coordinator
+                for coordinator, due_time in self._next_due.items()
+                if due_time <= horizon
+            ]
+            if due and self._backoff.is_suspended():
+                _LOGGER.debug(
+                    "Calls of app_id %s suspended, postponing %d devices",
+                    self.app_id,
+                    len(due),
+                )
+                for coordinator in due:
+                    self._next_due[coordinator] = self._get_next_due(coordinator)
+            elif due:
+                _LOGGER.debug(
+                    "Account poll cycle for app_id %s: %d/%d devices",
+                    self.app_id,
+                    len(due),
+                    len(self._next_due),
+                )
+                await asyncio.gather(
+                    *(self._async_poll_device(coordinator) for coordinator in due)
+                )
+        finally:
+            self._cycle_running = False
+        self._schedule_next_cycle()
+
+    async def _async_poll_device(
+        self, coordinator: "ImouDataUpdateCoordinator"
+    ) -> None:
+        """Refresh one coordinator within the concurrency window."""
+        entry = coordinator.config_entry
+        # Honour "disable polling" from the entry's system options
+        if entry is None or entry.pref_disable_polling is not True:
+            async with self._semaphore:
+                await coordinator.async_refresh()
+
+        # The coordinator may have been unregistered while we were polling it
+        if coordinator in self._next_due:
+            # update_interval may have been changed by the update (e.g. backoff)
+            self._last_poll[coordinator] = dt_util.utcnow()
+            self._next_due[coordinator] = self._get_next_due(coordinator)
+
+
+def get_poll_scheduler(hass: HomeAssistant, app_id: str) -> AccountPollScheduler:
+    """Return the poll scheduler of an Imou Account, creating it if needed."""
+    schedulers = hass.data.setdefault(DOMAIN, {}).setdefault(POLL_SCHEDULER_KEY, {})
+    if app_id not in schedulers:
+        schedulers[app_id] = AccountPollScheduler(hass, app_id)
+    return schedulers[app_id]
+
+
+def release_poll_scheduler(
+    hass: HomeAssistant, coordinator: "ImouDataUpdateCoordinator"
+) -> None:
+    """Unregister a coordinator and drop its scheduler once it has no devices."""
+    scheduler = coordinator.poll_scheduler
+    if scheduler is None:
+        return
+    scheduler.unregister(coordinator)
+    if not scheduler.coordinators:
+        hass.data.get(DOMAIN, {}).get(POLL_SCHEDULER_KEY, {}).pop(
+            scheduler.app_id, None
+        )
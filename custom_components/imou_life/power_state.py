@@ -0,0 +1,152 @@
+"""Power state of the battery powered Imou devices.
+
+A sleeping (dormant) battery camera is woken up by every call reading or
+changing its state: the library sends it a wake up command and waits
+wait_after_wakeup seconds before going on, which costs API calls and drains the
+battery. Only the online status query, answered by the Imou cloud, leaves it
+asleep.
+
+The coordinators of a device share its power state:
+
+- the device coordinator follows the online status it polls, and the battery
+  coordinator marks the device asleep while its sleep schedule keeps it in
+  sleep mode;
+- while the device sleeps, the coordinators only query its online status and
+  defer the calls which would wake it up. Deferred jobs are named: a job
+  deferred again replaces the one already waiting;
+- when the device wakes up, the deferred jobs run together, in one burst.
+
+User actions are not deferred, they wake the device up as requested.
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, POWER_STATE_KEY, POWER_STATUS_DORMANT, POWER_STATUS_ONLINE
+
+_LOGGER = logging.getLogger(__package__)
+
+
+class DevicePowerState:
+    """Power state of a device, and the jobs waiting for it to wake up."""
+
+    def __init__(self, hass: HomeAssistant, device_id: str) -> None:
+        """Initialize the power state of an awake device."""
+        self.hass = hass
+        self.device_id = device_id
+        # Reported dormant by the Imou cloud
+        self.dormant = False
+        # Put in sleep mode by the battery coordinator
+        self.sleep_mode = False
+        self._jobs: dict[str, Callable[[], Awaitable[Any]]] = {}
+        self._flushes: set[asyncio.Task] = set()
+
+    def is_asleep(self) -> bool:
+        """Return True if calls waking the device up must be deferred."""
+        return self.dormant or self.sleep_mode
+
+    def get_deferred_jobs(self) -> list[str]:
+        """Return the names of the jobs waiting for the device to wake up."""
+        return list(self._jobs)
+
+    @callback
+    def async_set_status(self, status: str | None) -> None:
+        """Follow the online status of the device reported by the Imou cloud.
+
+        Args:
+            status: onLine value of the device, other values than online and
+                dormant (e.g. offline) leave the power state as it is
+
+        """
+        if status == POWER_STATUS_DORMANT:
+            self._async_set(dormant=True)
+        elif status == POWER_STATUS_ONLINE:
+            self._async_set(dormant=False)
+
+    @callback
+    def async_set_sleep_mode(self, active: bool) -> None:
+        """Mark the device as put in sleep mode, or out of it."""
+        self._async_set(sleep_mode=active)
+
+    @callback
+    def _async_set(self, **state: bool) -> None:
+        """Change the power state, flushing the deferred jobs on wake up."""
+        was_asleep = self.is_asleep()
+        for name, value in state.items():
+            setattr(self, name, value)
+        if was_asleep and not self.is_asleep():
+            _LOGGER.debug("%s woke up", self.device_id)
+            self._async_flush()
+        elif not was_asleep and self.is_asleep():
+            _LOGGER.debug("%s fell asleep", self.device_id)
+
+    @callback
+    def async_defer(self, name: str, job: Callable[[], Awaitable[Any]]) -> None:
+        """Run a job once the device is awake, right away if it already is.
+
+        Args:
+            name: Name of the job, replacing a deferred job of the same name
+            job: Coroutine function making the calls which wake the device up
+
+        """
+        self._jobs[name] = job
+        if not self.is_asleep():
+            self._async_flush()
+
+    @callback
+    def async_cancel(self, name: str) -> None:
+        """Drop a deferred job, e.g. when its work was done otherwise."""
+        self._jobs.pop(name, None)
+
+    @callback
+    def async_cancel_all(self) -> None:
+        """Drop the deferred jobs and stop the ones running."""
+        self._jobs.clear()
+        for task in self._flushes:
+            task.cancel()
+
+    @callback
+    def _async_flush(self) -> None:
+        """Run the deferred jobs together in the background."""
+        if not self._jobs:
+            return
+        jobs, self._jobs = self._jobs, {}
+        task = self.hass.async_create_background_task(
+            self._async_run_jobs(jobs), f"{DOMAIN} deferred jobs of {self.device_id}"
+        )
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _async_run_jobs(
+        self, jobs: dict[str, Callable[[], Awaitable[Any]]]
+    ) -> None:
+        """Run jobs concurrently, a failing job does not stop the others."""
+        _LOGGER.debug("Running the deferred %s of %s", list(jobs), self.device_id)
+        results = await asyncio.gather(
+            *(job() for job in jobs.values()), return_exceptions=True
+        )
+        for name, result in zip(jobs, results):
+            if isinstance(result, Exception):
+                _LOGGER.warning(
+                    "Deferred %s of %s failed: %r", name, self.device_id, result
+                )
+
+
+def get_device_power_state(hass: HomeAssistant, device_id: str) -> DevicePowerState:
+    """Return the power state of a device, creating it if needed."""
+    power_states = hass.data.setdefault(DOMAIN, {}).setdefault(POWER_STATE_KEY, {})
+    if device_id not in power_states:
+        power_states[device_id] = DevicePowerState(hass, device_id)
+    return power_states[device_id]
+
+
+@callback
+def release_device_power_state(hass: HomeAssistant, device_id: str) -> None:
+    """Drop the power state of a device unloaded, with its deferred jobs."""
+    power_states = hass.data.get(DOMAIN, {}).get(POWER_STATE_KEY, {})
+    if (power_state := power_states.pop(device_id, None)) is not None:
+        power_state.async_cancel_all()
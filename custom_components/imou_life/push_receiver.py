@@ -0,0 +1,220 @@
+"""Push-based alarm ingestion for Imou devices.
+
+When the pushNotifications switch is on, the Imou cloud posts a message to the
+callback URL of the account for every alarm of its devices. Each Imou Account
+gets a webhook receiving those messages: an alarm sets the motionAlarm binary
+sensor of the matching device right away, instead of waiting for the next
+poll of getAlarmMessage.
+
+While messages keep coming in, the push channel of the account is considered
+healthy and the motion alarm is not polled anymore. Without any message for
+PUSH_HEALTH_TIMEOUT, polling takes over again.
+"""
+
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from aiohttp.web import Request
+from homeassistant.components import webhook
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    PUSH_HEALTH_TIMEOUT,
+    PUSH_MOTION_MESSAGE_TYPES,
+    PUSH_MOTION_RESET_DELAY,
+    PUSH_RECEIVER_KEY,
+    PUSH_SENSOR_NAMES,
+)
+
+if TYPE_CHECKING:
+    from .coordinator import ImouDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__package__)
+
+
+def get_webhook_id(app_id: str, app_secret: str) -> str:
+    """Return the webhook ID of an Imou Account.
+
+    The ID is derived from the credentials so that it is stable across
+    restarts without being guessable from the App ID alone.
+    """
+    digest = hashlib.sha256(f"{app_id}:{app_secret}".encode()).hexdigest()
+    return f"{DOMAIN}_{digest[:32]}"
+
+
+class AccountPushReceiver:
+    """Receive the alarm messages of all the devices of an Imou Account."""
+
+    def __init__(self, hass: HomeAssistant, app_id: str, webhook_id: str) -> None:
+        """Initialize the receiver."""
+        self.hass = hass
+        self.app_id = app_id
+        self.webhook_id = webhook_id
+        self.last_message: datetime | None = None
+        self.message_count = 0
+        self._coordinators: dict[str, "ImouDataUpdateCoordinator"] = {}
+        self._unsub_reset: dict[str, CALLBACK_TYPE] = {}
+
+    @property
+    def coordinators(self) -> list["ImouDataUpdateCoordinator"]:
+        """Return the coordinators whose device alarms are received."""
+        return list(self._coordinators.values())
+
+    def get_webhook_url(self) -> str:
+        """Return the URL to register as callback with the Imou cloud.
+
+        Raises:
+            NoURLAvailableError: if Home Assistant has no URL reachable from
+                the internet
+
+        """
+        return webhook.async_generate_url(self.hass, self.webhook_id)
+
+    def is_healthy(self, now: datetime | None = None) -> bool:
+        """Return True if messages were received recently enough."""
+        if self.last_message is None:
+            return False
+        now = now or dt_util.utcnow()
+        return now - self.last_message < timedelta(seconds=PUSH_HEALTH_TIMEOUT)
+
+    def get_pushed_sensors(self, now: datetime | None = None) -> set[str]:
+        """Return the names of the sensors kept up to date by push messages."""
+        return set(PUSH_SENSOR_NAMES) if self.is_healthy(now) else set()
+
+    @callback
+    def reset_health(self) -> None:
+        """Forget about received messages, e.g. when push is turned off."""
+        self.last_message = None
+
+    @callback
+    def register(self, coordinator: "ImouDataUpdateCoordinator") -> None:
+        """Start receiving the alarms of the device of a coordinator."""
+        if not self._coordinators:
+            webhook.async_register(
+                self.hass,
+                DOMAIN,
+                f"Imou Life ({self.app_id})",
+                self.webhook_id,
+                self._async_handle_webhook,
+                local_only=False,
+                allowed_methods=["POST"],
+            )
+            _LOGGER.debug("Registered push webhook for app_id %s", self.app_id)
+        coordinator.push_receiver = self
+        self._coordinators[coordinator.device.get_device_id()] = coordinator
+
+    @callback
+    def unregister(self, coordinator: "ImouDataUpdateCoordinator") -> None:
+        """Stop receiving the alarms of the device of a coordinator."""
+        device_id = coordinator.device.get_device_id()
+        if self._coordinators.get(device_id) is coordinator:
+            del self._coordinators[device_id]
+        if unsub := self._unsub_reset.pop(device_id, None):
+            unsub()
+        coordinator.push_receiver = None
+        if not self._coordinators:
+            webhook.async_unregister(self.hass, self.webhook_id)
+            _LOGGER.debug("Unregistered push webhook for app_id %s", self.app_id)
+
+    async def _async_handle_webhook(
+        self, hass: HomeAssistant, webhook_id: str, request: Request
+    ) -> None:
+        """Handle a message posted by the Imou cloud."""
+        try:
+            message = await request.json()
+        except ValueError:
+            _LOGGER.debug("Ignoring push message which is not JSON")
+            return None
+        if isinstance(message, dict):
+            self.async_handle_message(message)
+        return None
+
+    @callback
+    def async_handle_message(self, message: dict[str, Any]) -> bool:
+        """Apply a push message to the matching device.
+
+        Returns:
+            True if the message raised the motion alarm of a device
+
+        """
+        device_id = message.get("did") or message.get("deviceId")
+        coordinator = self._coordinators.get(device_id)
+        if coordinator is None:
+            _LOGGER.debug("Ignoring push message for unknown device %s", device_id)
+            return False
+
+        self.last_message = dt_util.utcnow()
+        self.message_count += 1
+        msg_type = message.get("msgType")
+        if msg_type not in PUSH_MOTION_MESSAGE_TYPES:
+            return False
+
+        sensor = coordinator.device.get_sensor_by_name("motionAlarm")
+        if sensor is None:
+            return False
+        alarm_time = message.get("time")
+        if isinstance(alarm_time, (int, float)):
+            # Time zone aware, in ISO format
+            alarm_time = dt_util.utc_from_timestamp(alarm_time).isoformat()
+        # imouapi has no setter, the state is the one async_update would set
+        sensor._state = True
+        sensor._attributes = {
+            "alarm_time": alarm_time,
+            "alarm_type": msg_type,
+            "alarm_code": message.get("type"),
+        }
+        _LOGGER.debug(
+            "[%s] Motion alarm pushed (%s)", coordinator.device.get_name(), msg_type
+        )
+        coordinator.async_update_listeners()
+        self._schedule_motion_reset(device_id, coordinator)
+        return True
+
+    @callback
+    def _schedule_motion_reset(
+        self, device_id: str, coordinator: "ImouDataUpdateCoordinator"
+    ) -> None:
+        """Clear the motion alarm a little after the last pushed alarm."""
+        if unsub := self._unsub_reset.pop(device_id, None):
+            unsub()
+
+        @callback
+        def _reset(_now: datetime) -> None:
+            self._unsub_reset.pop(device_id, None)
+            sensor = coordinator.device.get_sensor_by_name("motionAlarm")
+            if sensor is not None:
+                sensor._state = False
+                coordinator.async_update_listeners()
+
+        self._unsub_reset[device_id] = async_call_later(
+            self.hass, PUSH_MOTION_RESET_DELAY, _reset
+        )
+
+
+def get_push_receiver(
+    hass: HomeAssistant, app_id: str, app_secret: str
+) -> AccountPushReceiver:
+    """Return the push receiver of an Imou Account, creating it if needed."""
+    receivers = hass.data.setdefault(DOMAIN, {}).setdefault(PUSH_RECEIVER_KEY, {})
+    if app_id not in receivers:
+        receivers[app_id] = AccountPushReceiver(
+            hass, app_id, get_webhook_id(app_id, app_secret)
+        )
+    return receivers[app_id]
+
+
+def release_push_receiver(
+    hass: HomeAssistant, coordinator: "ImouDataUpdateCoordinator"
+) -> None:
+    """Unregister a coordinator and drop its receiver once it has no devices."""
+    receiver = coordinator.push_receiver
+    if receiver is None:
+        return
+    receiver.unregister(coordinator)
+    if not receiver.coordinators:
+        hass.data.get(DOMAIN, {}).get(PUSH_RECEIVER_KEY, {}).pop(receiver.app_id, None)
@@ -2,13 +2,17 @@
 
 Manages global rate limit state across all devices sharing the same API credentials.
 This prevents multiple devices from hammering the API after one hits a rate limit.
+The state is persisted, so that a restart during a rate limit window does not
+send every device straight back to the API.
 """
 
 import logging
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
 from homeassistant.util import dt as dt_util
 
 from .const import (
@@ -17,6 +21,10 @@ from .const import (
     RATE_LIMIT_CACHE_KEY,
     RATE_LIMIT_MAX_PROBE_RETRIES,
     RATE_LIMIT_RESET_ESTIMATE_HOURS,
+    RATE_LIMIT_SAVE_DELAY,
+    RATE_LIMIT_STORAGE_KEY,
+    RATE_LIMIT_STORAGE_VERSION,
+    RATE_LIMIT_STORE_KEY,
 )
 
 _LOGGER = logging.getLogger(__package__)
@@ -32,6 +40,34 @@ class RateLimitState:
     error_message: str
     hit_count: int = 1
 
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state as a JSON serializable dict."""
+        return {
+            "app_id": self.app_id,
+            "last_rate_limit_time": self.last_rate_limit_time.isoformat(),
+            "estimated_reset_time": self.estimated_reset_time.isoformat(),
+            "error_message": self.error_message,
+            "hit_count": self.hit_count,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "RateLimitState | None":
+        """Restore a state saved with as_dict(), None if it cannot be parsed."""
+        try:
+            last_rate_limit_time = dt_util.parse_datetime(data["last_rate_limit_time"])
+            estimated_reset_time = dt_util.parse_datetime(data["estimated_reset_time"])
+            if last_rate_limit_time is None or estimated_reset_time is None:
+                return None
+            return cls(
+                app_id=data["app_id"],
+                last_rate_limit_time=last_rate_limit_time,
+                estimated_reset_time=estimated_reset_time,
+                error_message=data.get("error_message", ""),
+                hit_count=int(data.get("hit_count", 1)),
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
 
 class RateLimitManager:
     """Manage rate limit state for Imou API credentials."""
@@ -52,6 +88,52 @@ class RateLimitManager:
         """Get rate limit storage dict."""
         return self.hass.data[DOMAIN][RATE_LIMIT_CACHE_KEY]
 
+    async def async_load(self) -> None:
+        """Restore the rate limit state saved before the last restart.
+
+        Must be called before any config entry is set up. Until it has been
+        called, the state is only kept in memory.
+        """
+        store: Store = Store(
+            self.hass, RATE_LIMIT_STORAGE_VERSION, RATE_LIMIT_STORAGE_KEY
+        )
+        self.hass.data[DOMAIN][RATE_LIMIT_STORE_KEY] = store
+
+        data = await store.async_load()
+        if not data:
+            return
+
+        storage = self._get_storage()
+        now = dt_util.utcnow()
+        for key, state_data in data.get("states", {}).items():
+            state = RateLimitState.from_dict(state_data)
+            # A rate limit past its reset time is of no use anymore
+            if state is None or now >= state.estimated_reset_time:
+                continue
+            storage.setdefault(key, state)
+            _LOGGER.debug(
+                "Restored rate limit for app_id %s (hit #%d, reset estimated at %s)",
+                state.app_id,
+                state.hit_count,
+                state.estimated_reset_time.isoformat(),
+            )
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Save the state to disk, grouping changes made in a short time."""
+        store: Store | None = self.hass.data[DOMAIN].get(RATE_LIMIT_STORE_KEY)
+        if store is not None:
+            store.async_delay_save(self._data_to_save, RATE_LIMIT_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {
+            "states": {
+                key: state.as_dict() for key, state in self._get_storage().items()
+            }
+        }
+
     def _get_credential_key(self, app_id: str, _app_secret: str) -> str:
         """Generate a key for API credentials.
 
@@ -102,6 +184,7 @@ class RateLimitManager:
                 error_message=error_message,
                 hit_count=1,
             )
+        self._async_schedule_save()
 
         _LOGGER.debug(
             "Recorded rate limit for app_id %s (hit #%d, reset estimated at %s)",
@@ -200,6 +283,7 @@ class RateLimitManager:
         if key in storage:
             _LOGGER.debug("Clearing rate limit state for app_id %s", app_id)
             del storage[key]
+            self._async_schedule_save()
 
     def get_state(self, app_id: str, _app_secret: str) -> RateLimitState | None:
         """Get the current rate limit state.
@@ -36,7 +36,7 @@ class ImouSelect(ImouEntity, SelectEntity):
     async def async_select_option(self, option: str) -> None:
         """Se the option."""
         # control the switch
-        await self.sensor_instance.async_select_option(option)
+        await self.async_run_command(self.sensor_instance.async_select_option, option)
         # save the new state to the state machine (otherwise will be reset by HA
         # and set to the correct value only upon the next update)
         self.async_write_ha_state()
@@ -1,13 +1,20 @@
 """Sensor platform for Imou."""
 
-from homeassistant.components.sensor import ENTITY_ID_FORMAT, SensorEntity
-from homeassistant.const import EntityCategory
+from homeassistant.components.sensor import (
+    ENTITY_ID_FORMAT,
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.const import EntityCategory, UnitOfTime
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .battery_types import get_battery_spec
 from .const import DOMAIN
+from .coordinator import get_entry_coordinators
 from .entity import ImouEntity
 from .entity_mixins import DeviceClassMixin
+from .helpers import get_device_key
 from .platform_setup import setup_platform
 
 # Serialize entity updates to prevent API rate limiting
@@ -21,9 +28,17 @@ async def async_setup_entry(hass, entry, async_add_devices):
         hass, entry, "sensor", ImouSensor, ENTITY_ID_FORMAT, async_add_devices
     )
 
-    # Add API status diagnostic sensor
-    coordinator = entry.runtime_data
-    async_add_devices([ImouAPIStatusSensor(coordinator, entry)], True)
+    for coordinator in get_entry_coordinators(entry):
+        # Add API status diagnostic sensor, the coordinator has just been refreshed
+        async_add_devices([ImouAPIStatusSensor(coordinator, entry)])
+
+        # Add API metrics diagnostic sensors
+        async_add_devices(
+            [
+                ImouAPICallsSensor(coordinator, entry),
+                ImouAPILatencySensor(coordinator, entry),
+            ]
+        )
 
 
 class ImouSensor(ImouEntity, DeviceClassMixin):
@@ -109,13 +124,14 @@ class ImouAPIStatusSensor(CoordinatorEntity, SensorEntity):
         """Initialize the API status sensor."""
         super().__init__(coordinator)
         self._config_entry = config_entry
-        self._attr_unique_id = f"{config_entry.entry_id}_api_status"
+        self._device_key = get_device_key(config_entry, coordinator.device)
+        self._attr_unique_id = f"{self._device_key}_api_status"
 
     @property
     def device_info(self):
         """Return device information."""
         return {
-            "identifiers": {(DOMAIN, self._config_entry.entry_id)},
+            "identifiers": {(DOMAIN, self._device_key)},
             "name": self.coordinator.device.get_name(),
             "manufacturer": "Imou",
             "model": self.coordinator.device.get_model(),
@@ -145,6 +161,14 @@ class ImouAPIStatusSensor(CoordinatorEntity, SensorEntity):
             "stale_device_failure_count": self.coordinator.stale_device_failure_count,
         }
 
+        budget = self.coordinator.call_budget
+        if budget is not None:
+            attrs["api_budget_calls_per_hour"] = budget.calls_per_hour
+            attrs["api_budget_calls_per_day"] = budget.calls_per_day
+            attrs["api_budget_remaining_hourly"] = budget.remaining_hourly
+            attrs["api_budget_remaining_daily"] = budget.remaining_daily
+            attrs["api_budget_denied_calls"] = budget.denied_count
+
         if self.coordinator.stale_device_last_error:
             attrs["stale_device_last_error"] = self.coordinator.stale_device_last_error
 
@@ -176,3 +200,98 @@ class ImouAPIStatusSensor(CoordinatorEntity, SensorEntity):
             )
 
         return attrs
+
+
+class ImouAPIMetricsSensor(CoordinatorEntity, SensorEntity):
+    """Base class of the diagnostic sensors showing the API calls of the device."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator, config_entry):
+        """Initialize the API metrics sensor."""
+        super().__init__(coordinator)
+        self._config_entry = config_entry
+        self._device_key = get_device_key(config_entry, coordinator.device)
+        self._attr_unique_id = f"{self._device_key}_{self._attr_translation_key}"
+
+    @property
+    def device_info(self):
+        """Return device information."""
+        return {
+            "identifiers": {(DOMAIN, self._device_key)},
+            "name": self.coordinator.device.get_name(),
+            "manufacturer": "Imou",
+            "model": self.coordinator.device.get_model(),
+        }
+
+    def _get_summary(self) -> dict | None:
+        """Return the API metrics of the device, None if not recorded."""
+        metrics = self.coordinator.api_metrics
+        if metrics is None:
+            return None
+        return metrics.get_summary(self.coordinator.device.get_device_id())
+
+
+class ImouAPICallsSensor(ImouAPIMetricsSensor):
+    """Diagnostic sensor counting the API calls made for the device."""
+
+    _attr_icon = "mdi:counter"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_translation_key = "api_calls"
+
+    @property
+    def native_value(self):
+        """Return the number of API calls since Home Assistant started."""
+        summary = self._get_summary()
+        return summary["calls"] if summary is not None else None
+
+    @property
+    def extra_state_attributes(self):
+        """Return the breakdown of the calls."""
+        summary = self._get_summary()
+        if summary is None:
+            return {}
+        return {
+            "errors": summary["errors"],
+            "errors_by_class": summary["errors_by_class"],
+            "bytes_sent": summary["bytes_sent"],
+            "bytes_received": summary["bytes_received"],
+            "share_of_account_calls": summary["share_of_account_calls"],
+            "calls_by_api": {
+                api: counters["calls"] for api, counters in summary["apis"].items()
+            },
+        }
+
+
+class ImouAPILatencySensor(ImouAPIMetricsSensor):
+    """Diagnostic sensor showing how long the API calls of the device take."""
+
+    _attr_icon = "mdi:timer-outline"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_translation_key = "api_latency"
+
+    @property
+    def native_value(self):
+        """Return the 95th percentile of the latency of the recent calls."""
+        summary = self._get_summary()
+        return summary["latency_ms"]["p95"] if summary is not None else None
+
+    @property
+    def extra_state_attributes(self):
+        """Return the other percentiles and the latency of each API."""
+        summary = self._get_summary()
+        if summary is None:
+            return {}
+        return {
+            "p50": summary["latency_ms"]["p50"],
+            "p99": summary["latency_ms"]["p99"],
+            "samples": summary["latency_samples"],
+            "p95_by_api": {
+                api: counters["latency_ms"]["p95"]
+                for api, counters in summary["apis"].items()
+            },
+        }
@@ -0,0 +1,149 @@
+"""Adaptive per-sensor polling for Imou devices.
+
+Each sensor of a device is polled on its own interval instead of all of them
+on every coordinator update. The interval of a sensor starts at the lower
+bound of its profile and adapts at runtime: it grows while the value does not
+change and drops back to the lower bound as soon as it does, always staying
+within the bounds of the profile. A sensor whose value never changes (e.g. a
+configuration switch) ends up being polled about once a day, while the motion
+alarm is polled on every update.
+
+The button, siren and camera platforms are left out on purpose: imouapi does not
+read any state for them, so scheduling them would only cost an online status call
+(and wake a sleeping device up) for nothing.
+"""
+
+from collections.abc import Collection
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+
+from imouapi.device import ImouDevice
+from imouapi.device_entity import ImouEntity
+
+from .const import (
+    SENSOR_POLL_BACKOFF_FACTOR,
+    SENSOR_POLL_DUE_TOLERANCE,
+    SENSOR_POLL_PLATFORM_INTERVALS,
+    SENSOR_POLL_SENSOR_INTERVALS,
+)
+
+# Marker for a sensor that has not been polled yet
+_NOT_POLLED = object()
+
+
+@dataclass
+class SensorPollState:
+    """Polling state of a single sensor."""
+
+    min_interval: float
+    max_interval: float
+    interval: float
+    next_due: datetime | None = None
+    last_polled: datetime | None = None
+    last_value: Any = field(default=_NOT_POLLED)
+
+
+def get_sensor_value(sensor: ImouEntity) -> Any:
+    """Return a comparable snapshot of the value of a sensor."""
+    for getter in ("get_state", "is_on", "get_current_option"):
+        if hasattr(sensor, getter):
+            return getattr(sensor, getter)(), dict(sensor.get_attributes())
+    return dict(sensor.get_attributes())
+
+
+class SensorPollScheduler:
+    """Decide which sensors of a device are due at each coordinator update."""
+
+    def __init__(self) -> None:
+        """Initialize the scheduler."""
+        self._states: dict[str, SensorPollState] = {}
+        self._full_poll_requested = True
+
+    def _get_state(self, platform: str, sensor: ImouEntity) -> SensorPollState:
+        """Return the polling state of a sensor, creating it if needed."""
+        name = sensor.get_name()
+        if name not in self._states:
+            min_interval, max_interval = SENSOR_POLL_SENSOR_INTERVALS.get(
+                name, SENSOR_POLL_PLATFORM_INTERVALS[platform]
+            )
+            self._states[name] = SensorPollState(
+                min_interval=min_interval,
+                max_interval=max_interval,
+                interval=min_interval,
+            )
+        return self._states[name]
+
+    def request_full_poll(self) -> None:
+        """Poll every sensor on the next update, whatever its interval."""
+        self._full_poll_requested = True
+
+    def get_due_sensors(
+        self, device: ImouDevice, now: datetime, skip: Collection[str] = ()
+    ) -> tuple[list[ImouEntity], bool]:
+        """Return the sensors to poll now.
+
+        Args:
+            device: The device to poll
+            now: Current time
+            skip: Names of sensors kept up to date otherwise, never due
+
+        Returns:
+            Tuple of (sensors, is_full_poll):
+            - sensors: The sensors due for polling
+            - is_full_poll: True if every sensor of the device is due
+
+        """
+        # Sensors due shortly after now are polled with this update rather than
+        # waiting for the next one
+        horizon = now + timedelta(seconds=SENSOR_POLL_DUE_TOLERANCE)
+        due = []
+        pending = 0
+        skipped = 0
+        for platform in SENSOR_POLL_PLATFORM_INTERVALS:
+            for sensor in device.get_sensors_by_platform(platform):
+                if sensor.get_name() in skip:
+                    skipped += 1
+                    continue
+                state = self._get_state(platform, sensor)
+                if (
+                    self._full_poll_requested
+                    or state.next_due is None
+                    or state.next_due <= horizon
+                ):
+                    due.append(sensor)
+                else:
+                    pending += 1
+        # A full poll would update the skipped sensors too
+        return due, pending == 0 and skipped == 0
+
+    def record_poll(self, sensors: list[ImouEntity], now: datetime) -> None:
+        """Adapt the interval of the sensors just polled to how their value moved."""
+        self._full_poll_requested = False
+        for sensor in sensors:
+            state = self._states.get(sensor.get_name())
+            if state is None:
+                continue
+            value = get_sensor_value(sensor)
+            if state.last_value is not _NOT_POLLED:
+                if value != state.last_value:
+                    # The value moves, back to polling it as often as allowed
+                    state.interval = state.min_interval
+                else:
+                    # The value is stable, poll it less often
+                    state.interval = min(
+                        state.max_interval,
+                        max(state.interval, 1) * SENSOR_POLL_BACKOFF_FACTOR,
+                    )
+            state.last_value = value
+            state.last_polled = now
+            state.next_due = now + timedelta(seconds=state.interval)
+
+    def get_last_poll(self, name: str) -> datetime | None:
+        """Return when a sensor was last polled, None if it was not yet."""
+        state = self._states.get(name)
+        return state.last_polled if state else None
+
+    def get_intervals(self) -> dict[str, int]:
+        """Return the current polling interval of each sensor, in seconds."""
+        return {name: int(state.interval) for name, state in self._states.items()}
@@ -34,7 +34,7 @@ class ImouSiren(ImouEntity, SirenEntity):
 
     async def async_turn_on(self, **kwargs):  # pylint: disable=unused-argument
         """Turn on the siren."""
-        await self.sensor_instance.async_turn_on()
+        await self.async_run_command(self.sensor_instance.async_turn_on)
         # save the new state to the state machine (otherwise will be reset by HA
         # and set to the correct value only upon the next update)
         self.async_write_ha_state()
@@ -46,7 +46,7 @@ class ImouSiren(ImouEntity, SirenEntity):
 
     async def async_turn_off(self, **kwargs):  # pylint: disable=unused-argument
         """Turn off the siren."""
-        await self.sensor_instance.async_turn_off()
+        await self.async_run_command(self.sensor_instance.async_turn_off)
         # save the new state to the state machine (otherwise will be reset by HA
         # and set to the correct value only upon the next update)
         self.async_write_ha_state()
@@ -58,7 +58,7 @@ class ImouSiren(ImouEntity, SirenEntity):
 
     async def async_toggle(self, **kwargs):  # pylint: disable=unused-argument
         """Toggle the siren."""
-        await self.sensor_instance.async_toggle()
+        await self.async_run_command(self.sensor_instance.async_toggle)
         # save the new state to the state machine (otherwise will be reset by HA
         # and set to the correct value only upon the next update)
         self.async_write_ha_state()
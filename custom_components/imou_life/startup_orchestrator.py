@@ -0,0 +1,233 @@
+"""Coordinated startup of the config entries of an Imou Account.
+
+Home Assistant sets the config entries of an integration up all at once. With
+many devices on the same account, that means a burst of initialization calls
+hitting the API together, and every entity fetching its own state while its
+platform is being set up, which makes the platform setups take long enough for
+Home Assistant to warn about them.
+
+The startup orchestrator of an account lets a bounded number of devices
+initialize at a time, and takes over the first update of the entities: they are
+added straight away and updated in the background, through the same bounded
+window. Devices set up from their snapshot come up with their last known state
+and get their first refresh in the background too, staggered so that the
+devices of the account do not all hit the API at once. Setup calls that the
+account call budget cannot afford put the entry back in the retry queue instead
+of failing it. The time every entry spent waiting for a slot and in each setup
+step is kept for the diagnostics.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.event import async_call_later
+
+from .call_budget import CallBudgetExhausted, CallPriority, call_priority
+from .const import (
+    DOMAIN,
+    STARTUP_MAX_CONCURRENCY,
+    STARTUP_ORCHESTRATOR_KEY,
+    STARTUP_REFRESH_DELAY,
+    STARTUP_REFRESH_STAGGER,
+)
+from .helpers import exception_message
+
+if TYPE_CHECKING:
+    from .coordinator import ImouDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__package__)
+
+
+@dataclass
+class EntrySetupTiming:
+    """How long the setup of a config entry took, step by step."""
+
+    entry_id: str
+    started: float = field(default_factory=time.monotonic)
+    queued: float = 0.0
+    steps: dict[str, float] = field(default_factory=dict)
+    finished: float | None = None
+
+    @property
+    def total(self) -> float:
+        """Return the seconds spent in the setup so far."""
+        end = self.finished if self.finished is not None else time.monotonic()
+        return end - self.started
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        """Time a setup step."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.steps[name] = time.monotonic() - start
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the timings in seconds."""
+        return {
+            "total": round(self.total, 3),
+            "queued": round(self.queued, 3),
+            "steps": {name: round(value, 3) for name, value in self.steps.items()},
+            "completed": self.finished is not None,
+        }
+
+
+class StartupOrchestrator:
+    """Set the devices of an Imou Account up within a concurrency window."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        app_id: str,
+        max_concurrency: int = STARTUP_MAX_CONCURRENCY,
+    ) -> None:
+        """Initialize the orchestrator."""
+        self.hass = hass
+        self.app_id = app_id
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._timings: dict[str, EntrySetupTiming] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._unsub_refresh: dict[str, CALLBACK_TYPE] = {}
+        self._next_refresh = 0.0
+
+    def begin(self, entry_id: str) -> EntrySetupTiming:
+        """Start timing the setup of an entry."""
+        timing = self._timings[entry_id] = EntrySetupTiming(entry_id)
+        return timing
+
+    def get_timing(self, entry_id: str) -> EntrySetupTiming | None:
+        """Return the timings of the last setup of an entry."""
+        return self._timings.get(entry_id)
+
+    @asynccontextmanager
+    async def async_device_setup(self, entry_id: str) -> AsyncIterator[None]:
+        """Hold one of the setup slots of the account for a device.
+
+        Raises:
+            ConfigEntryNotReady: if the call budget cannot afford the setup
+
+        """
+        timing = self._timings.get(entry_id) or self.begin(entry_id)
+        start = time.monotonic()
+        async with self._semaphore:
+            timing.queued = time.monotonic() - start
+            try:
+                with call_priority(CallPriority.SETUP):
+                    yield
+            except CallBudgetExhausted as exception:
+                raise ConfigEntryNotReady(
+                    translation_domain=DOMAIN,
+                    translation_key="call_budget_exhausted",
+                    translation_placeholders={"error": exception_message(exception)},
+                ) from exception
+
+    @callback
+    def finish(self, entry_id: str) -> None:
+        """Stop timing the setup of an entry."""
+        timing = self._timings.get(entry_id)
+        if timing is None:
+            return
+        timing.finished = time.monotonic()
+        _LOGGER.debug(
+            "Entry %s set up in %.2fs (%.2fs waiting for a slot, %s)",
+            entry_id,
+            timing.total,
+            timing.queued,
+            ", ".join(f"{name} {value:.2f}s" for name, value in timing.steps.items()),
+        )
+
+    @callback
+    def async_schedule_update(
+        self, entry_id: str, update: Callable[[], Awaitable[None]]
+    ) -> None:
+        """Run the first update of an entity in the background, within the window.
+
+        Args:
+            entry_id: Config entry of the entity
+            update: Coroutine function updating the entity
+
+        """
+        task = self.hass.async_create_background_task(
+            self._async_run_update(update),
+            f"{DOMAIN} first update of {entry_id}",
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _async_run_update(self, update: Callable[[], Awaitable[None]]) -> None:
+        """Run an entity update once a slot is free."""
+        async with self._semaphore:
+            with call_priority(CallPriority.SETUP):
+                await update()
+
+    @callback
+    def async_schedule_refresh(
+        self, entry_id: str, coordinator: "ImouDataUpdateCoordinator"
+    ) -> float:
+        """Refresh a coordinator set up from its snapshot, in the background.
+
+        The refresh runs STARTUP_REFRESH_DELAY seconds from now at the earliest,
+        and STARTUP_REFRESH_STAGGER seconds after the previous one scheduled by
+        the orchestrator, within the window.
+
+        Returns:
+            The seconds until the refresh
+
+        """
+        self.cancel_refresh(entry_id)
+        now = time.monotonic()
+        self._next_refresh = max(
+            now + STARTUP_REFRESH_DELAY, self._next_refresh + STARTUP_REFRESH_STAGGER
+        )
+        delay = self._next_refresh - now
+
+        async def _async_refresh(_now: datetime) -> None:
+            self._unsub_refresh.pop(entry_id, None)
+            async with self._semaphore:
+                await coordinator.async_refresh()
+
+        self._unsub_refresh[entry_id] = async_call_later(
+            self.hass, delay, _async_refresh
+        )
+        return delay
+
+    @callback
+    def cancel_refresh(self, entry_id: str) -> None:
+        """Cancel the pending first refresh of an entry, e.g. when it is unloaded."""
+        if unsub := self._unsub_refresh.pop(entry_id, None):
+            unsub()
+
+    async def async_wait_updates(self) -> None:
+        """Wait for the entity updates scheduled so far."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def get_summary(self) -> dict[str, Any]:
+        """Return the setup timings of the entries of the account."""
+        completed = [t for t in self._timings.values() if t.finished is not None]
+        return {
+            "entries": len(self._timings),
+            "completed": len(completed),
+            "pending_updates": len(self._tasks),
+            "pending_refreshes": len(self._unsub_refresh),
+            "slowest_setup": round(max((t.total for t in completed), default=0.0), 3),
+        }
+
+
+def get_startup_orchestrator(hass: HomeAssistant, app_id: str) -> StartupOrchestrator:
+    """Return the startup orchestrator of an Imou Account, creating it if needed."""
+    orchestrators = hass.data.setdefault(DOMAIN, {}).setdefault(
+        STARTUP_ORCHESTRATOR_KEY, {}
+    )
+    if app_id not in orchestrators:
+        orchestrators[app_id] = StartupOrchestrator(hass, app_id)
+    return orchestrators[app_id]
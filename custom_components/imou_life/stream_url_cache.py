@@ -0,0 +1,131 @@
+"""Live stream URL cache for Imou cameras.
+
+Getting the live stream URL of a camera takes up to three API calls
+(getLiveStreamInfo, then bindDeviceLive and getLiveStreamInfo again when no
+live stream exists yet), and Home Assistant asks for it on every stream
+(re)start. The URL of each camera is kept for STREAM_URL_MAX_AGE:
+
+- a URL close to its expiry is still returned, and replaced in the background;
+- a URL the stream component failed to play is dropped, and the next request
+  fetches a new one;
+- concurrent requests share the same fetch.
+
+The API does not report when a live stream URL expires, so the age is bounded
+by a fixed lifetime instead.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from homeassistant.core import callback
+
+from .const import STREAM_URL_MAX_AGE, STREAM_URL_REFRESH_MARGIN
+
+_LOGGER = logging.getLogger(__package__)
+
+
+class StreamUrlCache:
+    """Cache the live stream URL of a camera until shortly before it expires."""
+
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[str]],
+        max_age: float = STREAM_URL_MAX_AGE,
+        refresh_margin: float = STREAM_URL_REFRESH_MARGIN,
+        on_refresh: Callable[[str], None] | None = None,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            fetch: Coroutine function returning a new live stream URL
+            max_age: Seconds a URL is used before fetching a new one
+            refresh_margin: Seconds before max_age when the URL is replaced in
+                the background
+            on_refresh: Called with the new URL after a background refresh
+
+        """
+        self._fetch = fetch
+        self.max_age = max_age
+        self.refresh_margin = refresh_margin
+        self.on_refresh = on_refresh
+        self._url: str | None = None
+        self._fetched_at = 0.0
+        self._inflight: asyncio.Task[str] | None = None
+
+    @property
+    def url(self) -> str | None:
+        """Return the cached URL, if any."""
+        return self._url
+
+    def _age(self) -> float:
+        """Return the age of the cached URL in seconds."""
+        return time.monotonic() - self._fetched_at
+
+    async def async_get_url(self) -> str:
+        """Return the live stream URL, fetching it only if needed.
+
+        Raises:
+            ImouException: if no URL was cached and the fetch failed
+
+        """
+        if self._url is not None:
+            age = self._age()
+            if age < self.max_age - self.refresh_margin:
+                return self._url
+            if age < self.max_age:
+                # Still valid, replace it before it expires without waiting
+                self._async_start_refresh()
+                return self._url
+        return await asyncio.shield(self._async_start_fetch())
+
+    @callback
+    def invalidate(self) -> None:
+        """Drop the cached URL, e.g. after a playback failure."""
+        if self._url is not None:
+            _LOGGER.debug("Dropping the cached live stream URL")
+        self._url = None
+
+    @callback
+    def async_cancel(self) -> None:
+        """Cancel a fetch in progress, e.g. when the camera is removed."""
+        if self._inflight is not None:
+            self._inflight.cancel()
+            self._inflight = None
+
+    def _async_start_fetch(self) -> "asyncio.Task[str]":
+        """Return the fetch in progress, starting one if needed."""
+        if self._inflight is None:
+            self._inflight = asyncio.get_running_loop().create_task(self._async_fetch())
+        return self._inflight
+
+    @callback
+    def _async_start_refresh(self) -> None:
+        """Fetch a new URL in the background."""
+        if self._inflight is not None:
+            return
+        task = self._async_start_fetch()
+        task.add_done_callback(self._handle_refresh_done)
+
+    def _handle_refresh_done(self, task: "asyncio.Task[str]") -> None:
+        """Notify about a new URL fetched in the background."""
+        if task.cancelled():
+            return
+        if (exception := task.exception()) is not None:
+            # The cached URL is kept until it expires
+            _LOGGER.debug("Unable to refresh the live stream URL: %r", exception)
+            return
+        if self.on_refresh is not None:
+            self.on_refresh(task.result())
+
+    async def _async_fetch(self) -> str:
+        """Fetch a URL and cache it."""
+        try:
+            url = await self._fetch()
+        finally:
+            self._inflight = None
+        if url:
+            self._url = url
+            self._fetched_at = time.monotonic()
+        return url
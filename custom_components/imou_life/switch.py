@@ -7,8 +7,10 @@ from homeassistant.components.switch import ENTITY_ID_FORMAT, SwitchEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.network import NoURLAvailableError
 
 from .const import DOMAIN, ENABLED_SWITCHES, OPTION_CALLBACK_URL
+from .coordinator import get_entry_coordinators
 from .entity import ImouEntity
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
@@ -24,33 +26,9 @@ async def async_setup_entry(
     _LOGGER.debug("Setting up switch platform for entry %s", entry.entry_id)
 
     try:
-        coordinator = entry.runtime_data
-        device = coordinator.device
         sensors = []
-
-        _LOGGER.debug("Getting switch sensors for device %s", device.get_name())
-        switch_sensors = device.get_sensors_by_platform("switch")
-        _LOGGER.debug("Found %d switch sensors", len(switch_sensors))
-
-        for sensor_instance in switch_sensors:
-            try:
-                sensor = ImouSwitch(
-                    coordinator, entry, sensor_instance, ENTITY_ID_FORMAT
-                )
-                sensors.append(sensor)
-                coordinator.entities.append(sensor)
-                _LOGGER.debug(
-                    "[%s] Adding %s",
-                    device.get_name(),
-                    sensor_instance.get_description(),
-                )
-            except Exception as e:
-                _LOGGER.error(
-                    "Failed to create switch for sensor %s: %s",
-                    sensor_instance.get_description(),
-                    str(e),
-                )
-                continue
+        for coordinator in get_entry_coordinators(entry):
+            sensors.extend(_create_switches(coordinator, entry))
 
         if sensors:
             _LOGGER.debug("Adding %d switch entities", len(sensors))
@@ -65,6 +43,35 @@ async def async_setup_entry(
         raise
 
 
+def _create_switches(coordinator, entry: ConfigEntry) -> list["ImouSwitch"]:
+    """Create the switches of the device of a coordinator."""
+    device = coordinator.device
+    sensors = []
+
+    _LOGGER.debug("Getting switch sensors for device %s", device.get_name())
+    switch_sensors = device.get_sensors_by_platform("switch")
+    _LOGGER.debug("Found %d switch sensors", len(switch_sensors))
+
+    for sensor_instance in switch_sensors:
+        try:
+            sensor = ImouSwitch(coordinator, entry, sensor_instance, ENTITY_ID_FORMAT)
+            sensors.append(sensor)
+            coordinator.entities.append(sensor)
+            _LOGGER.debug(
+                "[%s] Adding %s",
+                device.get_name(),
+                sensor_instance.get_description(),
+            )
+        except Exception as e:
+            _LOGGER.error(
+                "Failed to create switch for sensor %s: %s",
+                sensor_instance.get_description(),
+                str(e),
+            )
+            continue
+    return sensors
+
+
 class ImouSwitch(ImouEntity, SwitchEntity):
     """imou switch class."""
 
@@ -89,15 +96,23 @@ class ImouSwitch(ImouEntity, SwitchEntity):
                 and self.config_entry.options[OPTION_CALLBACK_URL] != ""
             ):
                 callback_url = self.config_entry.options[OPTION_CALLBACK_URL]
+            # otherwise have the messages sent to the webhook of the integration
+            elif self.coordinator.push_receiver is not None:
+                try:
+                    callback_url = self.coordinator.push_receiver.get_webhook_url()
+                except NoURLAvailableError:
+                    callback_url = None
             if callback_url is None:
                 raise HomeAssistantError(
                     translation_domain=DOMAIN, translation_key="no_callback_url"
                 )
             _LOGGER.debug("Callback URL: %s", callback_url)
-            await self.sensor_instance.async_turn_on(url=callback_url)
+            await self.async_run_command(
+                self.sensor_instance.async_turn_on, url=callback_url
+            )
         # control all other switches
         else:
-            await self.sensor_instance.async_turn_on()
+            await self.async_run_command(self.sensor_instance.async_turn_on)
         # save the new state to the state machine (otherwise will be reset by HA
         # and set to the correct value only upon the next update)
         self.async_write_ha_state()
@@ -110,7 +125,13 @@ class ImouSwitch(ImouEntity, SwitchEntity):
     async def async_turn_off(self, **kwargs):  # pylint: disable=unused-argument
         """Turn off the switch."""
         # control the switch
-        await self.sensor_instance.async_turn_off()
+        await self.async_run_command(self.sensor_instance.async_turn_off)
+        # no more messages will come in, poll the alarms again
+        if (
+            self.sensor_instance.get_name() == "pushNotifications"
+            and self.coordinator.push_receiver is not None
+        ):
+            self.coordinator.push_receiver.reset_health()
         # save the new state to the state machine (otherwise will be reset by HA
         # and set to the correct value only upon the next update)
         self.async_write_ha_state()
@@ -122,7 +143,7 @@ class ImouSwitch(ImouEntity, SwitchEntity):
 
     async def async_toggle(self, **kwargs):  # pylint: disable=unused-argument
         """Toggle the switch."""
-        await self.sensor_instance.async_toggle()
+        await self.async_run_command(self.sensor_instance.async_toggle)
         # save the new state to the state machine (otherwise will be reset by HA
         # and set to the correct value only upon the next update)
         self.async_write_ha_state()
@@ -0,0 +1,192 @@
+"""Wake windows of the battery powered Imou devices.
+
+Every command sent to a sleeping camera (a switch turned on, an option
+selected, a snapshot, a battery setting...) wakes it up first: the library
+sends it a wake up command and waits wait_after_wakeup seconds. Commands sent
+at the same time, e.g. by an automation changing several entities of the
+camera, would each wake it up and wait.
+
+The commands of a sleepable device go through its wake queue instead. The
+commands arriving within WAKE_WINDOW_DELAY seconds of the first one share a
+wake cycle: the device is woken up once, then the commands run back-to-back
+while it is awake, each one finding it online. Commands arriving while the
+cycle runs join it, the ones sent by a command of the cycle run straight away.
+Every caller gets the result, or the exception, of its own command. The
+commands sent while the shared power state says the device is awake skip the
+queue.
+
+Waking the device up also lets the jobs deferred while it was asleep run in
+the same wake cycle.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+from homeassistant.core import HomeAssistant, callback
+from imouapi.exceptions import DeviceOffline
+
+from .call_budget import CallPriority, call_priority, get_call_priority
+from .const import DOMAIN, WAKE_QUEUE_KEY, WAKE_WINDOW_DELAY
+from .power_state import get_device_power_state
+
+_LOGGER = logging.getLogger(__package__)
+
+_T = TypeVar("_T")
+
+
+class WakeQueue:
+    """Commands of a sleepable device waiting for its next wake cycle."""
+
+    def __init__(
+        self, hass: HomeAssistant, device: Any, window: float = WAKE_WINDOW_DELAY
+    ) -> None:
+        """Initialize the queue.
+
+        Args:
+            hass: Home Assistant instance
+            device: The sleepable device the commands are sent to
+            window: Seconds the first command of a cycle waits for others
+
+        """
+        self.hass = hass
+        self.device = device
+        self.window = window
+        self._commands: deque[
+            tuple[Callable[[], Awaitable[Any]], CallPriority, asyncio.Future]
+        ] = deque()
+        self._cycle: asyncio.Task | None = None
+
+    async def async_run(self, command: Callable[[], Awaitable[_T]]) -> _T:
+        """Run a command in the next wake cycle of the device.
+
+        Args:
+            command: Coroutine function sending the command
+
+        Returns:
+            The result of the command
+
+        """
+        # Sent by a command of the cycle, while the device is awake
+        if self._cycle is not None and asyncio.current_task() is self._cycle:
+            return await command()
+        future: asyncio.Future = self.hass.loop.create_future()
+        self._commands.append((command, get_call_priority(), future))
+        if self._cycle is None:
+            self._cycle = self.hass.async_create_background_task(
+                self._async_run_cycle(),
+                f"{DOMAIN} wake cycle of {self.device.get_device_id()}",
+            )
+        return await future
+
+    @callback
+    def async_cancel(self) -> None:
+        """Cancel the wake cycle and the commands waiting for it."""
+        while self._commands:
+            self._commands.popleft()[2].cancel()
+        if self._cycle is not None:
+            self._cycle.cancel()
+
+    async def _async_run_cycle(self) -> None:
+        """Wake the device up once, then run the queued commands."""
+        power_state = get_device_power_state(self.hass, self.device.get_device_id())
+        try:
+            await asyncio.sleep(self.window)
+            # Not woken up meanwhile, e.g. by its sleep schedule
+            if power_state.is_asleep():
+                error: Exception | None = None
+                try:
+                    if not await self.device.async_wakeup():
+                        error = DeviceOffline(
+                            f"{self.device.get_name()} could not be woken up"
+                        )
+                except Exception as exception:
+                    error = exception
+                if error is not None:
+                    # None of the commands can be sent
+                    while self._commands:
+                        _, _, future = self._commands.popleft()
+                        if not future.done():
+                            future.set_exception(error)
+                    return
+                power_state.async_set_status(self.device.get_status())
+
+            count = 0
+            while self._commands:
+                command, priority, future = self._commands.popleft()
+                # The caller gave up waiting
+                if future.done():
+                    continue
+                count += 1
+                try:
+                    with call_priority(priority):
+                        result = await command()
+                except asyncio.CancelledError:
+                    future.cancel()
+                    raise
+                except Exception as exception:
+                    future.set_exception(exception)
+                else:
+                    future.set_result(result)
+            _LOGGER.debug(
+                "Ran %d commands of %s in one wake cycle",
+                count,
+                self.device.get_name(),
+            )
+        finally:
+            self._cycle = None
+            while self._commands:
+                self._commands.popleft()[2].cancel()
+
+
+def get_wake_queue(hass: HomeAssistant, device: Any) -> WakeQueue:
+    """Return the wake queue of a device, creating it if needed."""
+    queues = hass.data.setdefault(DOMAIN, {}).setdefault(WAKE_QUEUE_KEY, {})
+    device_id = device.get_device_id()
+    if device_id not in queues:
+        queues[device_id] = WakeQueue(hass, device)
+    queue = queues[device_id]
+    # The device set up again comes with a new instance, follow it between cycles
+    if queue._cycle is None:
+        queue.device = device
+    return queue
+
+
+@callback
+def release_wake_queue(hass: HomeAssistant, device_id: str) -> None:
+    """Drop the wake queue of a device unloaded, cancelling its commands."""
+    queues = hass.data.get(DOMAIN, {}).get(WAKE_QUEUE_KEY, {})
+    if (queue := queues.pop(device_id, None)) is not None:
+        queue.async_cancel()
+
+
+async def async_run_command(
+    hass: HomeAssistant,
+    device: Any,
+    command: Callable[..., Awaitable[_T]],
+    *args: Any,
+    **kwargs: Any,
+) -> _T:
+    """Send a command to a device, in a wake cycle if it is asleep.
+
+    Args:
+        hass: Home Assistant instance
+        device: The device the command is sent to
+        command: Coroutine function sending the command
+        *args: Positional arguments of the command
+        **kwargs: Keyword arguments of the command
+
+    Returns:
+        The result of the command
+
+    """
+    if (
+        device.get_sleepable() is not True
+        or not get_device_power_state(hass, device.get_device_id()).is_asleep()
+    ):
+        return await command(*args, **kwargs)
+    return await get_wake_queue(hass, device).async_run(
+        lambda: command(*args, **kwargs)
+    )
@@ -60,11 +60,13 @@ def mock_get_sensors_by_platform(platform):
         return [ImouSwitch(None, "device_id", "device_name", "motionDetect")]
 
     elif platform == "sensor":
-        return [ImouSensor(None, "device_id", "device_name", "lastAlarm")]
+        return [ImouSensor(None, "device_id", "device_name", "storageUsed")]
 
     elif platform == "binary_sensor":
         return [ImouBinarySensor(None, "device_id", "device_name", "online")]
 
+    return []
+
 
 @pytest.fixture(name="api_ok")
 def bypass_get_data_fixture():
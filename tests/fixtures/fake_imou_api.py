@@ -0,0 +1,216 @@
+"""Local fake of the Imou cloud API.
+
+Serves the endpoints the integration and imouapi use, with the same request
+and response envelope as the real API, on a local aiohttp server. Latency,
+errors and OP1013 (rate limit) responses can be injected, and every call is
+counted per benchmark phase, so the real setup and polling code can be driven
+offline at any number of devices.
+"""
+
+import asyncio
+import json
+import random
+from collections import Counter
+from collections.abc import Callable
+from typing import Any
+
+from aiohttp import web
+
+# Abilities of the fake devices, a superset of what the integration handles
+WIRED_ABILITIES = (
+    "WLAN,MT,HSEncrypt,CloudStorage,LocalStorage,PT,AlarmMD,AudioTalk,NVM,"
+    "Siren,WLM,MotionDetect,HeaderDetect,SmartTrack,CloseCamera,LinkageSiren"
+)
+BATTERY_ABILITIES = "WLAN,Dormant,AlarmMD,LocalStorage,WLM,MotionDetect,AlarmPIR"
+
+
+class FakeImouApi:
+    """Fake Imou cloud API server with fault injection."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        seed: int | None = 0,
+    ) -> None:
+        """Initialize the server.
+
+        Args:
+            latency: Seconds every call takes before answering
+            jitter: Maximum seconds randomly added to the latency
+            error_rate: Share of calls (0-1) answered with a generic API error
+            rate_limit_rate: Share of calls (0-1) answered with OP1013
+            seed: Seed of the fault injection, None for a random one
+
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.phase = "default"
+        self.devices: dict[str, dict[str, Any]] = {}
+        self.calls: Counter[tuple[str, str]] = Counter()
+        self.errors: Counter[str] = Counter()
+        self.rate_limits: Counter[str] = Counter()
+        self._random = random.Random(seed)
+        self._runner: web.AppRunner | None = None
+        self._port = 0
+        self._handlers: dict[str, Callable[[dict[str, Any]], dict[str, Any]]] = {
+            "accessToken": self._access_token,
+            "deviceBaseList": self._device_base_list,
+            "deviceBaseDetailList": self._device_base_detail_list,
+            "deviceOnline": lambda params: {"onLine": "1"},
+            "getDeviceCameraStatus": self._camera_status,
+            "deviceSdcardStatus": lambda params: {"status": "normal"},
+            "deviceStorage": lambda params: {"totalBytes": 100, "usedBytes": 42},
+            "getMessageCallback": lambda params: {
+                "callbackUrl": "",
+                "status": "off",
+            },
+            "getAlarmMessage": lambda params: {"alarms": []},
+            "getNightVisionMode": lambda params: {
+                "mode": "Intelligent",
+                "modes": ["Intelligent", "FullColor", "Infrared"],
+            },
+            "getDevicePowerInfo": lambda params: {
+                "electricitys": [{"type": "battery", "electric": 87}]
+            },
+        }
+
+    @property
+    def base_url(self) -> str:
+        """Return the URL to configure as API URL."""
+        return f"http://127.0.0.1:{self._port}/openapi"
+
+    def add_devices(self, count: int, battery_ratio: float = 0.0) -> list[str]:
+        """Register devices and return their IDs.
+
+        Args:
+            count: Number of devices to add
+            battery_ratio: Share (0-1) of battery powered (dormant) devices
+
+        """
+        battery_every = round(1 / battery_ratio) if battery_ratio > 0 else 0
+        device_ids = []
+        for index in range(len(self.devices), len(self.devices) + count):
+            device_id = f"FAKE{index:06d}"
+            battery = battery_every > 0 and index % battery_every == 0
+            self.devices[device_id] = {
+                "deviceId": device_id,
+                "name": f"Camera {index}",
+                "deviceModel": "IPC-B46LP" if battery else "IPC-C22EP",
+                "catalog": "IPC",
+                "version": "2.840.0000000.1.R",
+                "ability": BATTERY_ABILITIES if battery else WIRED_ABILITIES,
+                "status": "online",
+                "channels": [{"channelId": "0", "channelName": f"Camera {index}"}],
+            }
+            device_ids.append(device_id)
+        return device_ids
+
+    def get_calls(self, phase: str | None = None) -> dict[str, int]:
+        """Return the number of calls per API, for one phase or all of them."""
+        counts: Counter[str] = Counter()
+        for (call_phase, api), count in self.calls.items():
+            if phase is None or call_phase == phase:
+                counts[api] += count
+        return dict(counts)
+
+    def reset(self) -> None:
+        """Forget the calls counted so far."""
+        self.calls.clear()
+        self.errors.clear()
+        self.rate_limits.clear()
+
+    async def async_start(self) -> None:
+        """Start serving on a free local port."""
+        app = web.Application()
+        app.router.add_post("/openapi/{api}", self._async_handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self._port = site._server.sockets[0].getsockname()[1]
+
+    async def async_stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _async_handle(self, request: web.Request) -> web.Response:
+        """Answer an API call."""
+        api = request.match_info["api"]
+        body = await request.json()
+        params = body.get("params", {})
+        self.calls[(self.phase, api)] += 1
+
+        delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        # The access token is never refused, so faults hit the calls under test
+        if api != "accessToken":
+            draw = self._random.random()
+            if draw < self.rate_limit_rate:
+                self.rate_limits[self.phase] += 1
+                return self._result("OP1013", "exceed limit, try again later")
+            if draw < self.rate_limit_rate + self.error_rate:
+                self.errors[self.phase] += 1
+                return self._result("SN1003", "service temporarily unavailable")
+
+        handler = self._handlers.get(api)
+        if handler is None:
+            return self._result("OP1001", f"unknown api {api}")
+        try:
+            data = handler(params)
+        except KeyError as exception:
+            return self._result("DV1007", f"unknown device {exception}")
+        return self._result("0", "Operation is successful.", data)
+
+    @staticmethod
+    def _result(
+        code: str, msg: str, data: dict[str, Any] | None = None
+    ) -> web.Response:
+        """Build a response in the envelope of the Imou API."""
+        result: dict[str, Any] = {"code": code, "msg": msg}
+        if data is not None:
+            result["data"] = data
+        return web.Response(
+            text=json.dumps({"result": result, "id": "1"}),
+            content_type="application/json",
+        )
+
+    def _access_token(self, params: dict[str, Any]) -> dict[str, Any]:
+        """Return a new access token."""
+        return {"accessToken": "fake_token", "expireTime": 259200}
+
+    def _device_base_list(self, params: dict[str, Any]) -> dict[str, Any]:
+        """Return the devices of the account."""
+        return {
+            "count": len(self.devices),
+            "deviceList": [
+                {
+                    "deviceId": device["deviceId"],
+                    "channels": device["channels"],
+                }
+                for device in self.devices.values()
+            ],
+        }
+
+    def _device_base_detail_list(self, params: dict[str, Any]) -> dict[str, Any]:
+        """Return the details of the requested devices."""
+        return {
+            "count": len(params["deviceList"]),
+            "deviceList": [
+                self.devices[item["deviceId"]] for item in params["deviceList"]
+            ],
+        }
+
+    def _camera_status(self, params: dict[str, Any]) -> dict[str, Any]:
+        """Return the state of a device switch."""
+        if params["deviceId"] not in self.devices:
+            raise KeyError(params["deviceId"])
+        return {"enableType": params.get("enableType"), "status": "on"}
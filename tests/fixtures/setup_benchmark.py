@@ -0,0 +1,382 @@
+"""Setup and polling benchmark of the integration against the fake Imou API.
+
+Drives the real async_setup_entry, the platform setups, the account poll
+cycle of the ImouDataUpdateCoordinators and the BatteryOptimizationCoordinator
+for N devices of one Imou Account, on top of MockHomeAssistant and the local
+FakeImouApi server. Each phase reports its wall time, the API calls it made and
+how long it blocked the event loop.
+
+Phases:
+- setup: async_setup_entry of every entry, concurrently like HA does at startup
+- platforms: every platform set up and its entities added to HA
+- first_update: the first entity updates, run in the background by the startup
+- poll: one account poll cycle with every device due
+- full_poll: one account poll cycle with every sensor of every device due
+- battery: one refresh of a battery coordinator per dormant device, following
+  its device coordinator
+- restart: async_setup_entry of every entry again, from the device snapshots
+"""
+
+import asyncio
+import importlib
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+from aiohttp import ClientSession
+from homeassistant.util import dt as dt_util
+
+from custom_components.imou_life import async_setup_entry
+from custom_components.imou_life.battery_coordinator import (
+    BatteryOptimizationCoordinator,
+)
+from custom_components.imou_life.const import (
+    CONF_API_URL,
+    CONF_APP_ID,
+    CONF_APP_SECRET,
+    CONF_DEVICE_ID,
+    CONF_DEVICE_NAME,
+    DEVICE_SNAPSHOT_KEY,
+    DOMAIN,
+    OPTION_CALLS_PER_DAY,
+    OPTION_CALLS_PER_HOUR,
+    OPTION_ENABLE_DISCOVERY,
+    PLATFORMS,
+)
+from custom_components.imou_life.poll_scheduler import get_poll_scheduler
+from custom_components.imou_life.startup_orchestrator import get_startup_orchestrator
+from tests.fixtures.fake_imou_api import FakeImouApi
+from tests.fixtures.mocks import MockConfigEntry, create_mock_hass
+
+DEVICE_COUNTS = (1, 10, 50, 200)
+APP_ID = "benchmark_app_id"
+APP_SECRET = "benchmark_app_secret"
+
+
+@dataclass
+class PhaseResult:
+    """Measurements of one benchmark phase."""
+
+    name: str
+    wall_time: float = 0.0
+    calls: dict[str, int] = field(default_factory=dict)
+    errors: int = 0
+    rate_limits: int = 0
+    failures: int = 0
+    blocked_time: float = 0.0
+    max_stall: float = 0.0
+
+    @property
+    def total_calls(self) -> int:
+        """Return the number of API calls made during the phase."""
+        return sum(self.calls.values())
+
+
+@dataclass
+class BenchmarkResult:
+    """Measurements of a benchmark run at one number of devices."""
+
+    devices: int
+    entities: int = 0
+    phases: list[PhaseResult] = field(default_factory=list)
+
+    def get_phase(self, name: str) -> PhaseResult:
+        """Return the measurements of a phase."""
+        return next(phase for phase in self.phases if phase.name == name)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the measurements as a JSON serializable dict."""
+        data = asdict(self)
+        for phase, result in zip(data["phases"], self.phases):
+            phase["total_calls"] = result.total_calls
+        return data
+
+
+class LoopLagMonitor:
+    """Measure how long the event loop is blocked.
+
+    A sampling task sleeps for a short interval; whatever it wakes up late by
+    is time the loop spent running something else without yielding.
+    """
+
+    def __init__(self, interval: float = 0.005, tolerance: float = 0.002) -> None:
+        """Initialize the monitor.
+
+        Args:
+            interval: Seconds between two samples
+            tolerance: Lateness of a sample ignored as scheduling noise
+
+        """
+        self.interval = interval
+        self.tolerance = tolerance
+        self.blocked_time = 0.0
+        self.max_stall = 0.0
+        self._task: asyncio.Task | None = None
+
+    async def __aenter__(self) -> "LoopLagMonitor":
+        """Start sampling."""
+        self._task = asyncio.get_running_loop().create_task(self._async_sample())
+        # Let the first sample start before the measured code runs
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _async_sample(self) -> None:
+        """Record the lateness of every wake up."""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = loop.time() - start - self.interval
+            if lag > self.tolerance:
+                self.blocked_time += lag
+                self.max_stall = max(self.max_stall, lag)
+
+
+class SetupBenchmark:
+    """Run the setup and polling phases for N devices of one account."""
+
+    def __init__(
+        self, api: FakeImouApi, device_count: int, battery_ratio: float = 0.25
+    ) -> None:
+        """Initialize the benchmark.
+
+        Args:
+            api: Started fake API server
+            device_count: Number of devices of the account
+            battery_ratio: Share (0-1) of battery powered devices
+
+        """
+        self.api = api
+        self.device_ids = api.add_devices(device_count, battery_ratio)
+        self.result = BenchmarkResult(devices=device_count)
+        self.hass = self._create_hass()
+        self.entries: list[MockConfigEntry] = []
+        self.entities: list[Any] = []
+        self._session: ClientSession | None = None
+
+    @staticmethod
+    def _create_hass() -> Any:
+        """Create a mock HomeAssistant instance actually running its jobs."""
+        hass = create_mock_hass()
+
+        def async_create_task(target, *args, **kwargs) -> asyncio.Task:
+            return asyncio.get_running_loop().create_task(target)
+
+        def async_run_hass_job(job, *args):
+            return job.target(*args)
+
+        def async_create_background_task(target, name, **kwargs) -> asyncio.Task:
+            return asyncio.get_running_loop().create_task(target)
+
+        def async_add_executor_job(target, *args) -> asyncio.Future:
+            return asyncio.get_running_loop().run_in_executor(None, target, *args)
+
+        # Attributes MockHomeAssistant would create anew on every access
+        hass.bus = MagicMock()
+        hass.states = MagicMock()
+        hass.async_create_task = async_create_task
+        hass.async_create_background_task = async_create_background_task
+        hass.async_run_hass_job = async_run_hass_job
+        hass.async_add_executor_job = async_add_executor_job
+        return hass
+
+    def _create_entries(self) -> None:
+        """Create one config entry per device, like the config flow does."""
+        self.hass.config_entries.async_forward_entry_setups.side_effect = None
+        self.hass.config_entries.async_forward_entry_setups.return_value = True
+        for device_id in self.device_ids:
+            entry = MockConfigEntry(
+                domain=DOMAIN,
+                data={
+                    CONF_API_URL: self.api.base_url,
+                    CONF_APP_ID: APP_ID,
+                    CONF_APP_SECRET: APP_SECRET,
+                    CONF_DEVICE_ID: device_id,
+                    CONF_DEVICE_NAME: self.api.devices[device_id]["name"],
+                },
+                entry_id=f"entry_{device_id}",
+                version=3,
+                unique_id=device_id,
+                options={
+                    # Measure the integration, not the configured budget
+                    OPTION_CALLS_PER_HOUR: 0,
+                    OPTION_CALLS_PER_DAY: 0,
+                    OPTION_ENABLE_DISCOVERY: False,
+                },
+            )
+            entry.add_to_hass(self.hass)
+            self.hass._created_entries.append(entry)
+            self.entries.append(entry)
+
+    async def async_run(self) -> BenchmarkResult:
+        """Run every phase and return the measurements."""
+        self._session = ClientSession()
+        try:
+            with (
+                patch(
+                    "custom_components.imou_life.async_get_clientsession",
+                    return_value=self._session,
+                ),
+                patch(
+                    "homeassistant.helpers.entity_platform.async_get_current_platform"
+                ),
+            ):
+                self._create_entries()
+                await self._async_phase("setup", self._async_setup_entries)
+                await self._async_phase("platforms", self._async_setup_platforms)
+                self.result.entities = len(self.entities)
+                await self._async_phase("first_update", self._async_first_updates)
+                await self._async_phase("poll", self._async_poll_cycle)
+                await self._async_phase("full_poll", self._async_full_poll_cycle)
+                await self._async_phase("battery", self._async_refresh_batteries)
+                await self._async_phase("restart", self._async_restart)
+        finally:
+            await self._session.close()
+        return self.result
+
+    async def _async_phase(self, name: str, run) -> None:
+        """Run and measure one phase."""
+        self.api.phase = name
+        phase = PhaseResult(name)
+        async with LoopLagMonitor() as monitor:
+            start = time.perf_counter()
+            phase.failures = await run()
+            phase.wall_time = time.perf_counter() - start
+        phase.blocked_time = monitor.blocked_time
+        phase.max_stall = monitor.max_stall
+        phase.calls = self.api.get_calls(name)
+        phase.errors = self.api.errors[name]
+        phase.rate_limits = self.api.rate_limits[name]
+        self.result.phases.append(phase)
+
+    async def _async_setup_entries(self) -> int:
+        """Set every entry up concurrently, return the number of failures."""
+        results = await asyncio.gather(
+            *(async_setup_entry(self.hass, entry) for entry in self.entries),
+            return_exceptions=True,
+        )
+        for entry, result in zip(self.entries, results):
+            if result is not True:
+                entry.runtime_data = None
+        return sum(1 for result in results if result is not True)
+
+    async def _async_setup_platforms(self) -> int:
+        """Set the platforms of the loaded entries up and add their entities."""
+        entities: list[Any] = []
+        updates: list[Any] = []
+
+        def async_add_entities(new_entities, update_before_add: bool = False):
+            """Collect the entities a platform adds, like an entity platform."""
+            for entity in new_entities:
+                entity.hass = self.hass
+                entity.platform = MagicMock()
+                if not isinstance(entity.entity_id, str):
+                    entity.entity_id = f"{platform}.benchmark_{len(entities)}"
+                entities.append(entity)
+                if update_before_add:
+                    updates.append(entity.async_update())
+
+        for platform in PLATFORMS:
+            module = importlib.import_module(f"custom_components.imou_life.{platform}")
+            for entry in self.entries:
+                if entry.runtime_data is not None:
+                    await module.async_setup_entry(self.hass, entry, async_add_entities)
+        results = await asyncio.gather(*updates, return_exceptions=True)
+        results += await asyncio.gather(
+            *(entity.async_added_to_hass() for entity in entities),
+            return_exceptions=True,
+        )
+        self.entities = entities
+        return sum(1 for result in results if isinstance(result, Exception))
+
+    async def _async_first_updates(self) -> int:
+        """Wait for the first entity updates the startup runs in the background."""
+        await get_startup_orchestrator(self.hass, APP_ID).async_wait_updates()
+        return 0
+
+    def _get_coordinators(self) -> list[Any]:
+        """Return the coordinators of the loaded entries."""
+        return [entry.runtime_data for entry in self.entries if entry.runtime_data]
+
+    async def _async_poll_cycle(self) -> int:
+        """Run one account poll cycle with every device due."""
+        scheduler = get_poll_scheduler(self.hass, APP_ID)
+        now = dt_util.utcnow()
+        for coordinator in scheduler.coordinators:
+            scheduler._next_due[coordinator] = now
+        await scheduler.async_poll_due_devices()
+        return sum(
+            1
+            for coordinator in self._get_coordinators()
+            if not coordinator.last_update_success
+        )
+
+    async def _async_full_poll_cycle(self) -> int:
+        """Run one account poll cycle with every sensor due."""
+        for coordinator in self._get_coordinators():
+            coordinator.sensor_scheduler.request_full_poll()
+        return await self._async_poll_cycle()
+
+    async def _async_refresh_batteries(self) -> int:
+        """Refresh one battery coordinator per dormant device."""
+        coordinators = [
+            BatteryOptimizationCoordinator(
+                self.hass,
+                coordinator.device,
+                coordinator.config_entry,
+                device_coordinator=coordinator,
+            )
+            for coordinator in self._get_coordinators()
+            if coordinator.device.get_sleepable()
+        ]
+        await asyncio.gather(
+            *(coordinator.async_refresh() for coordinator in coordinators)
+        )
+        return sum(
+            1 for coordinator in coordinators if not coordinator.last_update_success
+        )
+
+    async def _async_restart(self) -> int:
+        """Set every entry up again in a new instance, from the snapshots."""
+        snapshots = self.hass.data[DOMAIN][DEVICE_SNAPSHOT_KEY]
+        self.hass = self._create_hass()
+        self.hass.data[DOMAIN] = {DEVICE_SNAPSHOT_KEY: dict(snapshots)}
+        entries = self.entries
+        self.entries = []
+        self._create_entries()
+        try:
+            return await self._async_setup_entries()
+        finally:
+            self.entries = entries
+
+
+async def async_run_benchmark(
+    device_counts: tuple[int, ...] = DEVICE_COUNTS,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    rate_limit_rate: float = 0.0,
+    battery_ratio: float = 0.25,
+    seed: int | None = 0,
+) -> list[BenchmarkResult]:
+    """Run the benchmark for each number of devices, on a new account each time."""
+    results = []
+    for device_count in device_counts:
+        api = FakeImouApi(latency, jitter, error_rate, rate_limit_rate, seed)
+        await api.async_start()
+        try:
+            benchmark = SetupBenchmark(api, device_count, battery_ratio)
+            results.append(await benchmark.async_run())
+        finally:
+            await api.async_stop()
+    return results
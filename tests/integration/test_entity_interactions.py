@@ -115,7 +115,7 @@ async def test_api_connection_failure_on_setup(hass):
     )
 
     # Mock API rate limit during device initialization
-    with patch("custom_components.imou_life.ImouAPIClient") as mock_api:
+    with patch("custom_components.imou_life.ImouAccountAPIClient") as mock_api:
         mock_api_instance = MagicMock()
         mock_api_instance.async_connect = AsyncMock()
         mock_api.return_value = mock_api_instance
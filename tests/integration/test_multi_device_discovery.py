@@ -38,7 +38,9 @@ async def test_discovery_coordinator_created_for_first_entry_only(
     first_entry.add_to_hass(hass)
 
     with (
-        patch("custom_components.imou_life.ImouAPIClient") as mock_api_client_class,
+        patch(
+            "custom_components.imou_life.ImouAccountAPIClient"
+        ) as mock_api_client_class,
         patch("custom_components.imou_life.ImouDevice") as mock_device_class,
     ):
         mock_api_client = MagicMock()
@@ -75,7 +77,9 @@ async def test_discovery_coordinator_created_for_first_entry_only(
     second_entry.add_to_hass(hass)
 
     with (
-        patch("custom_components.imou_life.ImouAPIClient") as mock_api_client_class,
+        patch(
+            "custom_components.imou_life.ImouAccountAPIClient"
+        ) as mock_api_client_class,
         patch("custom_components.imou_life.ImouDevice") as mock_device_class,
     ):
         mock_api_client = MagicMock()
@@ -118,7 +122,9 @@ async def test_discovery_coordinator_uses_custom_interval(
     entry.add_to_hass(hass)
 
     with (
-        patch("custom_components.imou_life.ImouAPIClient") as mock_api_client_class,
+        patch(
+            "custom_components.imou_life.ImouAccountAPIClient"
+        ) as mock_api_client_class,
         patch("custom_components.imou_life.ImouDevice") as mock_device_class,
     ):
         mock_api_client = MagicMock()
@@ -158,7 +164,9 @@ async def test_discovery_disabled_via_options(hass, api_ok, mock_imou_device):
     entry.add_to_hass(hass)
 
     with (
-        patch("custom_components.imou_life.ImouAPIClient") as mock_api_client_class,
+        patch(
+            "custom_components.imou_life.ImouAccountAPIClient"
+        ) as mock_api_client_class,
         patch("custom_components.imou_life.ImouDevice") as mock_device_class,
     ):
         mock_api_client = MagicMock()
@@ -201,7 +209,9 @@ async def test_automatic_discovery_triggers_config_flow(hass, api_ok, mock_imou_
     new_device.get_name = MagicMock(return_value="New Camera")
 
     with (
-        patch("custom_components.imou_life.ImouAPIClient") as mock_api_client_class,
+        patch(
+            "custom_components.imou_life.ImouAccountAPIClient"
+        ) as mock_api_client_class,
         patch("custom_components.imou_life.ImouDevice") as mock_device_class,
         patch(
             "imouapi.device.ImouDiscoverService.async_discover_devices",
@@ -270,7 +280,9 @@ async def test_discovery_transfer_on_first_entry_removal(
     second_entry.add_to_hass(hass)
 
     with (
-        patch("custom_components.imou_life.ImouAPIClient") as mock_api_client_class,
+        patch(
+            "custom_components.imou_life.ImouAccountAPIClient"
+        ) as mock_api_client_class,
         patch("custom_components.imou_life.ImouDevice") as mock_device_class,
     ):
         mock_api_client = MagicMock()
@@ -295,7 +307,7 @@ async def test_discovery_transfer_on_first_entry_removal(
 
     # Remove first entry
     with (
-        patch("custom_components.imou_life.ImouAPIClient"),
+        patch("custom_components.imou_life.ImouAccountAPIClient"),
         patch("custom_components.imou_life.ImouDevice"),
     ):
         assert await hass.config_entries.async_remove(first_entry.entry_id)
@@ -323,7 +335,9 @@ async def test_discovery_stops_on_last_entry_removal(hass, api_ok, mock_imou_dev
     entry.add_to_hass(hass)
 
     with (
-        patch("custom_components.imou_life.ImouAPIClient") as mock_api_client_class,
+        patch(
+            "custom_components.imou_life.ImouAccountAPIClient"
+        ) as mock_api_client_class,
         patch("custom_components.imou_life.ImouDevice") as mock_device_class,
     ):
         mock_api_client = MagicMock()
@@ -345,7 +359,7 @@ async def test_discovery_stops_on_last_entry_removal(hass, api_ok, mock_imou_dev
 
     # Remove last entry
     with (
-        patch("custom_components.imou_life.ImouAPIClient"),
+        patch("custom_components.imou_life.ImouAccountAPIClient"),
         patch("custom_components.imou_life.ImouDevice"),
     ):
         assert await hass.config_entries.async_remove(entry.entry_id)
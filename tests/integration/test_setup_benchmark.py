@@ -0,0 +1,52 @@
+"""Scaling checks of the setup and polling against the fake Imou API."""
+
+import pytest
+
+from tests.fixtures.setup_benchmark import async_run_benchmark
+
+
+@pytest.mark.asyncio
+async def test_api_calls_scale_linearly_with_devices():
+    """Test the calls per device do not grow with the size of the account."""
+    small, large = await async_run_benchmark((1, 10))
+
+    for result in (small, large):
+        assert all(phase.failures == 0 for phase in result.phases)
+        # The access token is shared by all the devices of the account
+        assert result.get_phase("setup").calls["accessToken"] == 1
+
+    for name in ("setup", "platforms", "first_update", "poll", "full_poll"):
+        per_device = small.get_phase(name).total_calls / small.devices
+        assert large.get_phase(name).total_calls / large.devices <= per_device
+
+
+@pytest.mark.asyncio
+async def test_platform_setup_makes_no_api_calls():
+    """Test the entities are updated after their platforms are set up."""
+    (result,) = await async_run_benchmark((10,))
+
+    assert result.get_phase("platforms").total_calls == 0
+    assert result.get_phase("first_update").total_calls > 0
+
+
+@pytest.mark.asyncio
+async def test_restart_initializes_devices_from_snapshots():
+    """Test a restart sets the devices up from their snapshots, without calls."""
+    (result,) = await async_run_benchmark((10,))
+
+    restart = result.get_phase("restart")
+    assert restart.failures == 0
+    # Details and last known states come from the snapshots, the first
+    # refresh runs in the background
+    assert restart.total_calls == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_account_fails_setup():
+    """Test entries are not set up while every call hits OP1013."""
+    (result,) = await async_run_benchmark((10,), rate_limit_rate=1.0)
+
+    setup = result.get_phase("setup")
+    assert setup.failures == 10
+    assert setup.rate_limits > 0
+    assert result.entities == 0
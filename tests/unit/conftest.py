@@ -12,7 +12,9 @@ from custom_components.imou_life.battery_coordinator import (
 @pytest.fixture
 def mock_hass():
     """Create a mock Home Assistant instance."""
-    return MagicMock()
+    hass = MagicMock()
+    hass.data = {}
+    return hass
 
 
 @pytest.fixture
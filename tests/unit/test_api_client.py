@@ -0,0 +1,144 @@
+"""Tests for the shared per-account API client pool."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from imouapi.exceptions import APIError
+
+from custom_components.imou_life.api_client import ApiClientPool, ImouAccountAPIClient
+from custom_components.imou_life.backoff import AccountBackoff, CallsSuspended
+from custom_components.imou_life.call_budget import CallPriority, call_priority
+from custom_components.imou_life.const import API_CLIENT_POOL_KEY, DOMAIN
+
+
+@pytest.fixture
+def pool(mock_hass: MagicMock) -> ApiClientPool:
+    """Create an API client pool."""
+    return ApiClientPool(mock_hass)
+
+
+def test_initialization(pool: ApiClientPool, mock_hass: MagicMock) -> None:
+    """Test pool initializes storage correctly."""
+    assert API_CLIENT_POOL_KEY in mock_hass.data[DOMAIN]
+
+
+def test_same_account_shares_client(pool: ApiClientPool) -> None:
+    """Test entries of the same account get the same client."""
+    factory = MagicMock(side_effect=lambda: MagicMock())
+
+    first = pool.acquire("app", "secret", "https://api", factory)
+    second = pool.acquire("app", "secret", "https://api", factory)
+
+    assert first is second
+    factory.assert_called_once()
+
+
+def test_different_api_url_gets_own_client(pool: ApiClientPool) -> None:
+    """Test the API URL is part of the pool key."""
+    factory = MagicMock(side_effect=lambda: MagicMock())
+
+    first = pool.acquire("app", "secret", "https://api-eu", factory)
+    second = pool.acquire("app", "secret", "https://api-us", factory)
+
+    assert first is not second
+    assert factory.call_count == 2
+
+
+def test_release_drops_client_after_last_user(pool: ApiClientPool) -> None:
+    """Test the client is reference counted."""
+    factory = MagicMock(side_effect=lambda: MagicMock())
+    pool.acquire("app", "secret", "https://api", factory)
+    pool.acquire("app", "secret", "https://api", factory)
+
+    pool.release("app", "https://api")
+    assert pool.get("app", "https://api") is not None
+
+    pool.release("app", "https://api")
+    assert pool.get("app", "https://api") is None
+
+    # Releasing an unknown client is a no-op
+    pool.release("app", "https://api")
+
+
+def test_changed_secret_updates_shared_client(pool: ApiClientPool) -> None:
+    """Test a new app secret is pushed into the shared client."""
+    client = ImouAccountAPIClient("app", "old_secret", MagicMock())
+    client._connected = True
+    pool.acquire("app", "old_secret", "https://api", lambda: client)
+
+    pool.acquire("app", "new_secret", "https://api", MagicMock())
+
+    assert client.get_app_secret() == "new_secret"
+    assert client.is_connected() is False
+
+
+@pytest.mark.asyncio
+async def test_concurrent_connect_requests_one_token() -> None:
+    """Test concurrent devices only trigger one access token request."""
+    client = ImouAccountAPIClient("app", "secret", MagicMock())
+
+    async def fake_call_api(api, payload, is_connect_request=False):
+        await asyncio.sleep(0.01)
+        return {"accessToken": "token", "expireTime": 3600}
+
+    with patch.object(
+        client, "_async_call_api", side_effect=fake_call_api
+    ) as mock_call_api:
+        results = await asyncio.gather(*[client.async_connect() for _ in range(10)])
+
+    assert all(results)
+    assert mock_call_api.call_count == 1
+    assert client.is_connected()
+
+
+@pytest.mark.asyncio
+async def test_reconnects_after_concurrent_calls_and_reauth() -> None:
+    """Test concurrent first calls do not use up the connection attempts."""
+    session = MagicMock()
+
+    async def request(method, url, **kwargs):
+        await asyncio.sleep(0.01)
+        data = {"accessToken": "token", "expireTime": 3600}
+        body = {"result": {"code": "0", "msg": "", "data": data}}
+        return MagicMock(status=200, text=AsyncMock(return_value=json.dumps(body)))
+
+    session.request.side_effect = request
+    client = ImouAccountAPIClient("app", "secret", session)
+
+    await asyncio.gather(
+        *(client._async_call_api("deviceOnline", {}) for _ in range(10))
+    )
+    client.set_app_secret("new_secret")
+    await client._async_call_api("deviceOnline", {})
+
+    assert client.is_connected()
+    assert client._retries <= 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_suspends_background_calls(mock_hass: MagicMock) -> None:
+    """Test the first OP1013 stops the background calls of the account."""
+    client = ImouAccountAPIClient("app", "secret", MagicMock())
+    client.backoff = AccountBackoff(mock_hass, "app")
+
+    with patch(
+        "imouapi.api.ImouAPIClient._async_call_api",
+        new=AsyncMock(side_effect=APIError("OP1013: exceed limit")),
+    ):
+        with pytest.raises(APIError):
+            await client._async_call_api("deviceOnline", {"deviceId": "device_1"})
+    assert client.backoff.is_suspended() is True
+
+    with patch(
+        "imouapi.api.ImouAPIClient._async_call_api", new=AsyncMock(return_value={})
+    ) as mock_call_api:
+        with call_priority(CallPriority.BACKGROUND):
+            with pytest.raises(CallsSuspended):
+                await client._async_call_api("deviceOnline", {"deviceId": "device_2"})
+        mock_call_api.assert_not_awaited()
+
+        # User actions still go through
+        await client._async_call_api("deviceOnline", {"deviceId": "device_2"})
+        mock_call_api.assert_awaited_once()
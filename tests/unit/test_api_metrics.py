@@ -0,0 +1,183 @@
+"""Tests for the per-account API call metrics."""
+
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from imouapi.exceptions import APIError, ConnectionFailed
+
+from custom_components.imou_life.api_client import ImouAccountAPIClient
+from custom_components.imou_life.api_metrics import (
+    ApiMetrics,
+    classify_error,
+    get_api_metrics,
+    get_device_id,
+    get_payload_size,
+    get_percentiles,
+)
+from custom_components.imou_life.const import API_METRICS_KEY, DOMAIN
+from custom_components.imou_life.sensor import (
+    ImouAPICallsSensor,
+    ImouAPILatencySensor,
+)
+from tests.fixtures.mocks import MockConfigEntry
+
+
+def test_percentiles_nearest_rank() -> None:
+    """Test the percentiles are taken from the samples, in milliseconds."""
+    durations = [index / 1000 for index in range(1, 101)]
+
+    assert get_percentiles(durations) == {"p50": 50.0, "p95": 95.0, "p99": 99.0}
+    assert get_percentiles([0.2]) == {"p50": 200.0, "p95": 200.0, "p99": 200.0}
+    assert get_percentiles([]) == {"p50": None, "p95": None, "p99": None}
+
+
+def test_classify_error() -> None:
+    """Test failed calls are classified by API error code or exception."""
+    assert classify_error(APIError("OP1013: exceed limit")) == "OP1013"
+    assert classify_error(ConnectionFailed("timeout")) == "ConnectionFailed"
+
+
+def test_get_device_id() -> None:
+    """Test calls are attributed to the device they are about."""
+    assert get_device_id({"deviceId": "device_1"}) == "device_1"
+    assert get_device_id({"deviceList": [{"deviceId": "device_1"}]}) == "device_1"
+    assert get_device_id({"deviceList": [{"deviceId": "a"}, {"deviceId": "b"}]}) is None
+    assert get_device_id({}) is None
+
+
+def test_payload_size() -> None:
+    """Test payloads are measured once JSON encoded."""
+    assert get_payload_size({"a": 1}) == len('{"a":1}')
+    assert get_payload_size(None) == 0
+    assert get_payload_size({"a": object()}) == 0
+
+
+def test_ring_buffer_is_bounded_counters_are_not() -> None:
+    """Test old samples are dropped but still counted."""
+    metrics = ApiMetrics("app", buffer_size=3)
+    for _ in range(5):
+        metrics.record("deviceOnline", "device_1", 0.1)
+
+    assert len(metrics.get_records()) == 3
+    assert metrics.get_counters().calls == 5
+
+
+def test_summary_per_device_and_api() -> None:
+    """Test the summary breaks the calls down per device and API."""
+    metrics = ApiMetrics("app")
+    metrics.record("deviceOnline", "device_1", 0.1, bytes_sent=10, bytes_received=20)
+    metrics.record("getDeviceCameraStatus", "device_1", 0.3, error="OP1013")
+    metrics.record("deviceOnline", "device_2", 0.2)
+    metrics.record("deviceBaseList", None, 0.4)
+
+    summary = metrics.get_summary("device_1")
+    assert summary["calls"] == 2
+    assert summary["errors"] == 1
+    assert summary["errors_by_class"] == {"OP1013": 1}
+    assert summary["bytes_sent"] == 10
+    assert summary["bytes_received"] == 20
+    assert summary["share_of_account_calls"] == 50.0
+    assert summary["latency_samples"] == 2
+    assert summary["latency_ms"]["p99"] == 300.0
+    assert set(summary["apis"]) == {"deviceOnline", "getDeviceCameraStatus"}
+    assert summary["apis"]["deviceOnline"]["latency_ms"]["p50"] == 100.0
+
+    account = metrics.get_summary()
+    assert account["calls"] == 4
+    assert "share_of_account_calls" not in account
+    assert account["apis"]["deviceOnline"]["calls"] == 2
+
+
+def test_get_api_metrics_per_account() -> None:
+    """Test the metrics are shared by the entries of an account."""
+    hass = MagicMock()
+    hass.data = {}
+
+    metrics = get_api_metrics(hass, "app")
+
+    assert get_api_metrics(hass, "app") is metrics
+    assert get_api_metrics(hass, "other") is not metrics
+    assert hass.data[DOMAIN][API_METRICS_KEY]["app"] is metrics
+
+
+@pytest.mark.asyncio
+async def test_account_client_records_calls() -> None:
+    """Test the account client records successful and failed calls."""
+    client = ImouAccountAPIClient("app", "secret", MagicMock())
+    client.metrics = ApiMetrics("app")
+
+    with patch(
+        "imouapi.api.ImouAPIClient._async_call_api",
+        new=AsyncMock(return_value={"onLine": "1"}),
+    ):
+        await client._async_call_api("deviceOnline", {"deviceId": "device_1"})
+    with patch(
+        "imouapi.api.ImouAPIClient._async_call_api",
+        new=AsyncMock(side_effect=APIError("OP1013: exceed limit")),
+    ):
+        with pytest.raises(APIError):
+            await client._async_call_api("deviceOnline", {"deviceId": "device_1"})
+
+    success, failure = client.metrics.get_records("device_1")
+    assert success.error is None
+    assert success.bytes_sent == len('{"deviceId":"device_1"}')
+    assert success.bytes_received == len('{"onLine":"1"}')
+    assert failure.error == "OP1013"
+    assert failure.bytes_received == 0
+
+
+class TestApiMetricsSensors:
+    """Test the API calls and API latency diagnostic sensors."""
+
+    @pytest.fixture
+    def mock_coordinator(self):
+        """Create a mock coordinator with API metrics."""
+        coordinator = MagicMock()
+        coordinator.device.get_device_id.return_value = "device_1"
+        coordinator.api_metrics = ApiMetrics("app")
+        coordinator.update_interval = timedelta(seconds=900)
+        return coordinator
+
+    @pytest.fixture
+    def config_entry(self):
+        """Create a config entry."""
+        return MockConfigEntry(domain=DOMAIN, data={}, entry_id="test_entry", version=3)
+
+    def test_unique_ids(self, mock_coordinator, config_entry) -> None:
+        """Test the sensors are unique per entry and disabled by default."""
+        calls = ImouAPICallsSensor(mock_coordinator, config_entry)
+        latency = ImouAPILatencySensor(mock_coordinator, config_entry)
+
+        assert calls.unique_id == "test_entry_api_calls"
+        assert latency.unique_id == "test_entry_api_latency"
+        assert calls.entity_registry_enabled_default is False
+        assert latency.entity_registry_enabled_default is False
+
+    def test_values(self, mock_coordinator, config_entry) -> None:
+        """Test the sensors show the metrics of their device."""
+        metrics = mock_coordinator.api_metrics
+        metrics.record("deviceOnline", "device_1", 0.1)
+        metrics.record("deviceOnline", "device_1", 0.2, error="OP1013")
+        metrics.record("deviceOnline", "device_2", 0.5)
+
+        calls = ImouAPICallsSensor(mock_coordinator, config_entry)
+        latency = ImouAPILatencySensor(mock_coordinator, config_entry)
+
+        assert calls.native_value == 2
+        assert calls.extra_state_attributes["errors_by_class"] == {"OP1013": 1}
+        assert calls.extra_state_attributes["calls_by_api"] == {"deviceOnline": 2}
+        assert latency.native_value == 200.0
+        assert latency.extra_state_attributes["p50"] == 100.0
+        assert latency.extra_state_attributes["samples"] == 2
+
+    def test_without_metrics(self, mock_coordinator, config_entry) -> None:
+        """Test the sensors have no value when no metrics are recorded."""
+        mock_coordinator.api_metrics = None
+
+        calls = ImouAPICallsSensor(mock_coordinator, config_entry)
+        latency = ImouAPILatencySensor(mock_coordinator, config_entry)
+
+        assert calls.native_value is None
+        assert calls.extra_state_attributes == {}
+        assert latency.native_value is None
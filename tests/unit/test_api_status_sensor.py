@@ -7,6 +7,7 @@ import pytest
 from homeassistant.const import EntityCategory
 from homeassistant.util import dt as dt_util
 
+from custom_components.imou_life.call_budget import CallBudget, CallPriority
 from custom_components.imou_life.const import DOMAIN
 from custom_components.imou_life.sensor import ImouAPIStatusSensor
 from tests.fixtures.mocks import MockConfigEntry
@@ -33,6 +34,7 @@ class TestImouAPIStatusSensor:
         coordinator.rate_limit_estimated_reset = None
         coordinator._is_interval_adjusted = False
         coordinator.update_interval = timedelta(seconds=900)  # 15 minutes
+        coordinator.call_budget = None
 
         # Mock hass
         coordinator.hass = MagicMock()
@@ -166,3 +168,17 @@ class TestImouAPIStatusSensor:
 
         assert attrs["last_error_type"] == "api_error"
         assert "SN1003" in attrs["last_error_message"]
+
+    def test_sensor_attributes_call_budget(self, mock_coordinator, config_entry):
+        """Test the remaining API call budget is exposed."""
+        mock_coordinator.call_budget = CallBudget("app", 100, 1000)
+        assert mock_coordinator.call_budget.try_acquire(CallPriority.USER)
+
+        sensor = ImouAPIStatusSensor(mock_coordinator, config_entry)
+        attrs = sensor.extra_state_attributes
+
+        assert attrs["api_budget_calls_per_hour"] == 100
+        assert attrs["api_budget_calls_per_day"] == 1000
+        assert attrs["api_budget_remaining_hourly"] == 99
+        assert attrs["api_budget_remaining_daily"] == 999
+        assert attrs["api_budget_denied_calls"] == 0
@@ -0,0 +1,143 @@
+"""Tests for the rate limit backoff of an account."""
+
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.imou_life.backoff import (
+    AccountBackoff,
+    CallsSuspended,
+    get_account_backoff,
+)
+from custom_components.imou_life.call_budget import CallPriority
+from custom_components.imou_life.const import (
+    BACKOFF_KEY,
+    BACKOFF_MAX_INTERVAL,
+    BACKOFF_STEP_DOWN_INTERVAL,
+    DOMAIN,
+    RATE_LIMIT_BACKOFF_SECONDS,
+    RATE_LIMIT_MAX_PROBE_RETRIES,
+)
+from custom_components.imou_life.rate_limit_manager import RateLimitManager
+
+
+def test_not_backed_off(mock_hass) -> None:
+    """Test the scan interval is left alone until a rate limit."""
+    backoff = AccountBackoff(mock_hass, "app")
+
+    assert backoff.is_backed_off is False
+    assert backoff.get_interval(900) == 900
+
+
+def test_rate_limit_recorded_once_per_event(mock_hass) -> None:
+    """Test the rate limit manager counts events, not errors."""
+    backoff = AccountBackoff(mock_hass, "app")
+
+    for _ in range(5):
+        backoff.record_rate_limit("OP1013")
+
+    assert RateLimitManager(mock_hass).get_state("app", "").hit_count == 1
+
+
+def test_rate_limit_suspends_calls(mock_hass) -> None:
+    """Test the calls other than user actions are suspended after a rate limit."""
+    backoff = AccountBackoff(mock_hass, "app")
+    backoff.record_rate_limit("OP1013")
+
+    assert backoff.is_suspended() is True
+    remaining = (backoff.suspended_until - dt_util.utcnow()).total_seconds()
+    assert remaining == pytest.approx(RATE_LIMIT_BACKOFF_SECONDS, abs=2)
+    for priority in (CallPriority.BACKGROUND, CallPriority.SETUP):
+        with pytest.raises(CallsSuspended):
+            backoff.check_call(priority)
+    backoff.check_call(CallPriority.USER)
+
+    # A successful call shows the limit is over
+    backoff.record_success()
+    assert backoff.is_suspended() is False
+    backoff.check_call(CallPriority.BACKGROUND)
+
+
+def test_interval_capped_by_reset_time(mock_hass) -> None:
+    """Test devices do not wait past the estimated reset time."""
+    backoff = AccountBackoff(mock_hass, "app")
+    backoff.record_rate_limit("OP1013")
+    backoff.factor = 1000
+    state = RateLimitManager(mock_hass).get_state("app", "")
+
+    state.estimated_reset_time = dt_util.utcnow() + timedelta(hours=5)
+    assert backoff.get_interval(900) == BACKOFF_MAX_INTERVAL
+
+    state.estimated_reset_time = dt_util.utcnow() + timedelta(hours=1)
+    assert backoff.get_interval(900) == pytest.approx(3600, abs=1)
+
+    # The reset is close, but not before the next regular poll
+    state.estimated_reset_time = dt_util.utcnow() + timedelta(minutes=5)
+    assert backoff.get_interval(900) == 900
+
+
+def test_waits_for_reset_after_repeated_limits(mock_hass) -> None:
+    """Test devices wait for the reset once probing keeps failing."""
+    backoff = AccountBackoff(mock_hass, "app")
+    backoff.record_rate_limit("OP1013")
+    state = RateLimitManager(mock_hass).get_state("app", "")
+    state.hit_count = RATE_LIMIT_MAX_PROBE_RETRIES
+    state.estimated_reset_time = dt_util.utcnow() + timedelta(hours=6)
+
+    assert backoff.get_interval(900) == pytest.approx(6 * 3600, abs=1)
+
+
+def test_recovers_at_once_after_reset(mock_hass) -> None:
+    """Test a success past the reset time ends the backoff straight away."""
+    backoff = AccountBackoff(mock_hass, "app")
+    backoff.record_rate_limit("OP1013")
+    backoff.factor = 8
+    state = RateLimitManager(mock_hass).get_state("app", "")
+    state.estimated_reset_time = dt_util.utcnow() - timedelta(seconds=1)
+
+    backoff.record_success()
+
+    assert backoff.is_backed_off is False
+    assert RateLimitManager(mock_hass).get_state("app", "") is None
+
+
+def test_gradual_step_down(mock_hass) -> None:
+    """Test the backoff steps down at most once per step down interval."""
+    backoff = AccountBackoff(mock_hass, "app")
+    backoff.record_rate_limit("OP1013")
+    backoff.factor = 8
+
+    backoff.record_success()
+    assert backoff.factor == 8
+
+    for expected in (4, 2, 1):
+        backoff.last_change -= timedelta(seconds=BACKOFF_STEP_DOWN_INTERVAL)
+        backoff.record_success()
+        assert backoff.factor == expected
+    assert backoff.is_backed_off is False
+
+
+def test_listeners_notified(mock_hass) -> None:
+    """Test the coordinators of the account follow the backoff."""
+    backoff = AccountBackoff(mock_hass, "app")
+    listener = MagicMock()
+    remove = backoff.async_add_listener(listener)
+
+    backoff.record_rate_limit("OP1013")
+    listener.assert_called_once()
+
+    remove()
+    backoff.last_change -= timedelta(seconds=BACKOFF_STEP_DOWN_INTERVAL)
+    backoff.record_success()
+    listener.assert_called_once()
+
+
+def test_get_account_backoff_per_account(mock_hass) -> None:
+    """Test the backoff is shared by the entries of an account."""
+    backoff = get_account_backoff(mock_hass, "app")
+
+    assert get_account_backoff(mock_hass, "app") is backoff
+    assert get_account_backoff(mock_hass, "other") is not backoff
+    assert mock_hass.data[DOMAIN][BACKOFF_KEY]["app"] is backoff
@@ -1,8 +1,16 @@
 """Unit tests for battery coordinator data update methods."""
 
-from unittest.mock import patch
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
 
 import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.imou_life.backoff import CallsSuspended
+from custom_components.imou_life.battery_coordinator import (
+    BatteryOptimizationCoordinator,
+)
+from custom_components.imou_life.const import BATTERY_DATA_MAX_AGE
 
 
 class TestBatteryCoordinatorData:
@@ -32,3 +40,97 @@ class TestBatteryCoordinatorData:
         ):
             with pytest.raises(Exception, match="Test error"):
                 await coordinator._async_update_data()
+
+    @pytest.mark.asyncio
+    async def test_async_update_data_suspended_keeps_data(self, coordinator):
+        """Test an update skipped after a rate limit keeps the last data."""
+        coordinator.data = {"battery_level": 85}
+        with patch.object(
+            coordinator, "_get_battery_data", side_effect=CallsSuspended("suspended")
+        ):
+            data = await coordinator._async_update_data()
+
+        assert data == {"battery_level": 85}
+
+
+class TestBatteryCoordinatorDeviceReadings:
+    """Test battery levels are taken from the device coordinator polls."""
+
+    @pytest.fixture
+    def device_coordinator(self, mock_device):
+        """Create a device coordinator which just read the battery sensor."""
+        mock_device.get_sensor_by_name.return_value.get_state.return_value = "42"
+        device_coordinator = MagicMock()
+        device_coordinator.last_update_success = True
+        device_coordinator.sensor_scheduler.get_last_poll.return_value = (
+            dt_util.utcnow()
+        )
+        return device_coordinator
+
+    @pytest.fixture
+    def battery_coordinator(
+        self, mock_hass, mock_device, mock_config_entry, device_coordinator
+    ):
+        """Create a battery coordinator following the device coordinator."""
+        return BatteryOptimizationCoordinator(
+            mock_hass,
+            mock_device,
+            mock_config_entry,
+            device_coordinator=device_coordinator,
+        )
+
+    @pytest.mark.asyncio
+    async def test_fresh_reading_used(self, battery_coordinator, mock_device):
+        """Test the battery is not polled again while the last poll is fresh."""
+        battery_data = await battery_coordinator._get_battery_data()
+
+        assert battery_data["level"] == 42
+        mock_device.async_get_battery_status.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_reading_follows_device_polls(
+        self, battery_coordinator, mock_device, device_coordinator
+    ):
+        """Test new device coordinator polls update the battery level."""
+        listener = device_coordinator.async_add_listener.call_args[0][0]
+        mock_device.get_sensor_by_name.return_value.get_state.return_value = "41"
+
+        listener()
+
+        assert (await battery_coordinator._get_battery_data())["level"] == 41
+
+        # A failed poll keeps the last reading
+        device_coordinator.last_update_success = False
+        mock_device.get_sensor_by_name.return_value.get_state.return_value = None
+        listener()
+
+        assert (await battery_coordinator._get_battery_data())["level"] == 41
+
+    @pytest.mark.asyncio
+    async def test_stale_reading_polls_battery(
+        self, mock_hass, mock_device, mock_config_entry, device_coordinator
+    ):
+        """Test the battery is polled when the device coordinator data is old."""
+        device_coordinator.sensor_scheduler.get_last_poll.return_value = (
+            dt_util.utcnow() - timedelta(seconds=BATTERY_DATA_MAX_AGE + 1)
+        )
+        battery_coordinator = BatteryOptimizationCoordinator(
+            mock_hass,
+            mock_device,
+            mock_config_entry,
+            device_coordinator=device_coordinator,
+        )
+
+        battery_data = await battery_coordinator._get_battery_data()
+
+        assert battery_data["level"] == 85
+        mock_device.async_get_battery_status.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_shutdown_stops_following(
+        self, battery_coordinator, device_coordinator
+    ):
+        """Test the battery coordinator stops listening when shut down."""
+        await battery_coordinator.async_shutdown()
+
+        device_coordinator.async_add_listener.return_value.assert_called_once()
@@ -10,29 +10,32 @@ class TestBatteryCoordinatorMethodErrorPaths:
     """Test battery coordinator method error handling and device support checks."""
 
     @pytest.mark.asyncio
-    async def test_get_battery_data_fallback_to_device_data(self, coordinator):
-        """Test fallback to device data when async_get_battery_status not available."""
-        # Remove async_get_battery_status method
+    async def test_get_battery_data_fallback_to_battery_sensor(self, coordinator):
+        """Test only the battery sensor is read without async_get_battery_status."""
         delattr(coordinator.device, "async_get_battery_status")
-
-        # Mock async_get_data instead
-        coordinator.device.async_get_data = AsyncMock(
-            return_value={
-                "battery": {
-                    "level": 85,
-                    "voltage": 4.1,
-                    "consumption": 50,
-                    "charging": False,
-                }
-            }
-        )
+        coordinator.device.async_get_data = AsyncMock()
+        sensor = coordinator.device.get_sensor_by_name.return_value
+        sensor.async_update = AsyncMock()
+        sensor.get_state.return_value = "85"
 
         battery_data = await coordinator._get_battery_data()
 
         assert battery_data["level"] == 85
-        assert battery_data["voltage"] == 4.1
-        assert battery_data["consumption"] == 50
+        assert battery_data["voltage"] is None
         assert battery_data["charging"] is False
+        coordinator.device.get_sensor_by_name.assert_called_with("battery")
+        sensor.async_update.assert_awaited_once()
+        coordinator.device.async_get_data.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_battery_data_without_battery_sensor(self, coordinator):
+        """Test devices without a battery sensor get the safe defaults."""
+        delattr(coordinator.device, "async_get_battery_status")
+        coordinator.device.get_sensor_by_name.return_value = None
+
+        battery_data = await coordinator._get_battery_data()
+
+        assert battery_data["level"] == 100
 
     @pytest.mark.asyncio
     async def test_get_battery_data_error_returns_defaults(self, coordinator):
@@ -1,8 +1,11 @@
 """Unit tests for battery coordinator optimization logic."""
 
-from unittest.mock import patch
+import asyncio
+from unittest.mock import AsyncMock, call, patch
 
 import pytest
+from homeassistant.exceptions import HomeAssistantError
+from imouapi.exceptions import ImouException
 
 
 class TestBatteryCoordinatorOptimization:
@@ -132,3 +135,108 @@ class TestBatteryCoordinatorOptimization:
                         mock_recording.assert_called_once_with("low")
                         mock_led.assert_called_once_with(False)
                         assert coordinator._battery_optimization_active is True
+
+
+class TestBatteryCoordinatorChangeSets:
+    """Test battery settings are applied as change sets."""
+
+    @pytest.fixture
+    def device(self, coordinator):
+        """Give the device setters for all the battery settings."""
+        device = coordinator.device
+        device.async_set_power_mode = AsyncMock()
+        device.async_set_motion_sensitivity = AsyncMock()
+        device.async_set_recording_quality = AsyncMock()
+        device.async_set_led_indicators = AsyncMock()
+        return device
+
+    @pytest.mark.asyncio
+    async def test_only_changed_settings_sent(self, coordinator, device):
+        """Test settings already confirmed by the device are not sent again."""
+        await coordinator.apply_settings(
+            {"power_mode": "power_saving", "motion_sensitivity": "low"}
+        )
+
+        changes = await coordinator.apply_settings(
+            {"power_mode": "power_saving", "motion_sensitivity": "medium"}
+        )
+
+        assert changes == {"motion_sensitivity": "medium"}
+        device.async_set_power_mode.assert_awaited_once_with("power_saving")
+        assert device.async_set_motion_sensitivity.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_settings_sent_concurrently(self, coordinator, device):
+        """Test the settings of a change set are not sent one after another."""
+        running = 0
+        max_running = 0
+
+        async def set_setting(_value):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        for setter in (
+            device.async_set_power_mode,
+            device.async_set_motion_sensitivity,
+            device.async_set_recording_quality,
+            device.async_set_led_indicators,
+        ):
+            setter.side_effect = set_setting
+
+        await coordinator.optimize_battery()
+
+        assert max_running == 4
+
+    @pytest.mark.asyncio
+    async def test_batch_setter_used(self, coordinator, device):
+        """Test devices with a batch setter get the change set in one call."""
+        device.async_set_battery_settings = AsyncMock()
+
+        await coordinator.apply_settings({"power_mode": "balanced"})
+        await coordinator.apply_settings(
+            {"power_mode": "balanced", "led_indicators": False}
+        )
+
+        assert device.async_set_battery_settings.await_args_list == [
+            call({"power_mode": "balanced"}),
+            call({"led_indicators": False}),
+        ]
+        device.async_set_power_mode.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_partial_failure_rolled_back(self, coordinator, device):
+        """Test the settings sent are rolled back when another one fails."""
+        await coordinator.apply_settings(
+            {"power_mode": "balanced", "motion_sensitivity": "medium"}
+        )
+        device.async_set_motion_sensitivity.side_effect = ImouException("API error")
+
+        with pytest.raises(ImouException):
+            await coordinator.apply_settings(
+                {"power_mode": "power_saving", "motion_sensitivity": "low"}
+            )
+
+        assert device.async_set_power_mode.await_args_list == [
+            call("balanced"),
+            call("power_saving"),
+            call("balanced"),
+        ]
+        # The failed setting is sent again next time
+        device.async_set_motion_sensitivity.side_effect = None
+        changes = await coordinator.apply_settings(
+            {"power_mode": "balanced", "motion_sensitivity": "medium"}
+        )
+        assert changes == {"motion_sensitivity": "medium"}
+
+    @pytest.mark.asyncio
+    async def test_invalid_value_sends_nothing(self, coordinator, device):
+        """Test a change set with an invalid value is rejected as a whole."""
+        with pytest.raises(HomeAssistantError):
+            await coordinator.apply_settings(
+                {"power_mode": "power_saving", "recording_quality": "8k"}
+            )
+
+        device.async_set_power_mode.assert_not_called()
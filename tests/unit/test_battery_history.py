@@ -0,0 +1,170 @@
+"""Tests for the battery history and discharge model."""
+
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.imou_life.battery_history import (
+    BatteryHistory,
+    BatteryHistoryCache,
+)
+from custom_components.imou_life.const import (
+    BATTERY_HISTORY_SAVE_DELAY,
+    BATTERY_OPTIMIZATION_LEAD_TIME,
+    BATTERY_POLL_MAX_INTERVAL,
+)
+from tests.unit.conftest import create_coordinator_with_options
+
+
+def make_history(levels: list[int], hours: float = 1.0) -> BatteryHistory:
+    """Create a history with a sample every given hours, the last one now."""
+    history = BatteryHistory()
+    start = dt_util.utcnow() - timedelta(hours=hours * (len(levels) - 1))
+    for index, level in enumerate(levels):
+        history.record(level, start + timedelta(hours=hours * index))
+    return history
+
+
+def test_ring_buffer_is_bounded() -> None:
+    """Test the oldest samples are dropped once the buffer is full."""
+    history = BatteryHistory(size=3)
+    start = dt_util.utcnow()
+    for index in range(5):
+        history.record(90 - index, start + timedelta(hours=index))
+
+    assert len(history) == 3
+    assert history.get_last()[1] == 86
+
+
+def test_close_samples_dropped() -> None:
+    """Test samples taken right after the last one are not kept, but charges are."""
+    history = BatteryHistory()
+    now = dt_util.utcnow()
+
+    assert history.record(80, now) is True
+    assert history.record(79, now + timedelta(minutes=5)) is False
+    assert history.record(80, now) is False
+    assert history.record(95, now + timedelta(minutes=10)) is True
+
+
+def test_discharge_rate_fitted() -> None:
+    """Test the discharge rate is fitted to the samples, in % per hour."""
+    history = make_history([80, 79, 78, 77, 76, 75, 74])
+
+    assert history.get_discharge_rate() == pytest.approx(1.0)
+    assert history.get_hours_to(20) == pytest.approx(54, abs=0.1)
+    assert history.get_hours_to(0) == pytest.approx(74, abs=0.1)
+
+
+def test_discharge_rate_needs_enough_samples() -> None:
+    """Test there is no rate until enough samples span enough time."""
+    assert make_history([80, 79]).get_discharge_rate() is None
+    assert make_history([80, 80, 79, 79], hours=0.5).get_discharge_rate() is None
+    assert make_history([80, 79]).get_hours_to(20) is None
+
+
+def test_charge_restarts_the_model() -> None:
+    """Test only the samples since the last charge are fitted."""
+    history = make_history([40, 35, 30, 25, 60, 60, 59, 59, 58, 58, 57])
+
+    assert history.get_discharge_rate() == pytest.approx(0.5)
+
+    history.record(90, dt_util.utcnow() + timedelta(hours=1))
+    assert history.get_discharge_rate() is None
+
+
+def test_poll_interval_follows_rate() -> None:
+    """Test the battery is polled less often the slower it discharges."""
+    assert make_history([80, 79]).get_poll_interval() == 0
+    assert make_history([80, 78, 76, 74, 72, 70, 68]).get_poll_interval() == (
+        pytest.approx(1800)
+    )
+    assert make_history([80] * 7).get_poll_interval() == BATTERY_POLL_MAX_INTERVAL
+
+
+def test_restored_history() -> None:
+    """Test a saved history is restored, without invalid samples."""
+    saved = make_history([80, 79, 78, 77, 76, 75, 74]).as_list()
+
+    history = BatteryHistory.from_list([*saved, ["bad"], [0, 50], None])
+
+    assert history.as_list() == saved
+    assert BatteryHistory.from_list("bad").as_list() == []
+
+
+@pytest.mark.asyncio
+async def test_histories_persisted(mock_hass: MagicMock) -> None:
+    """Test histories are saved with a delay and restored on load."""
+    saved = make_history([80, 79, 78]).as_list()
+    store = MagicMock()
+    store.async_load = AsyncMock(return_value={"devices": {"device_2": saved}})
+    cache = BatteryHistoryCache(mock_hass)
+    with patch("custom_components.imou_life.battery_history.Store", return_value=store):
+        await cache.async_load()
+
+    assert cache.get("device_2").as_list() == saved
+
+    cache.record("device_1", 80, dt_util.utcnow())
+
+    data_func, delay = store.async_delay_save.call_args[0]
+    assert delay == BATTERY_HISTORY_SAVE_DELAY
+    assert set(data_func()["devices"]) == {"device_1", "device_2"}
+
+    cache.remove("device_1")
+    assert set(data_func()["devices"]) == {"device_2"}
+
+
+class TestPredictiveOptimization:
+    """Test the battery coordinator acts on the discharge model."""
+
+    @pytest.fixture
+    def coordinator(self, mock_hass, mock_device):
+        """Create a battery coordinator with a 20% threshold."""
+        return create_coordinator_with_options(
+            mock_hass, mock_device, {"battery_threshold": 20}
+        )
+
+    @pytest.mark.asyncio
+    async def test_optimized_ahead_of_threshold(self, coordinator):
+        """Test optimization starts when the threshold is predicted to be near."""
+        # 2% per hour, 20 hours from the threshold
+        coordinator.history = make_history([72, 70, 68, 66, 64, 62, 60])
+        coordinator._activate_battery_optimization = AsyncMock()
+
+        await coordinator._check_battery_optimization({"level": 60})
+
+        coordinator._activate_battery_optimization.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_not_optimized_far_from_threshold(self, coordinator):
+        """Test a battery discharging slowly is not optimized ahead of time."""
+        coordinator.history = make_history([80, 80, 79, 79, 78, 78, 77])
+        coordinator._activate_battery_optimization = AsyncMock()
+
+        await coordinator._check_battery_optimization({"level": 77})
+
+        assert coordinator.history.get_hours_to(20) > BATTERY_OPTIMIZATION_LEAD_TIME
+        coordinator._activate_battery_optimization.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_stable_battery_polled_less_often(self, coordinator, mock_device):
+        """Test the battery is not polled again while its level is not moving."""
+        coordinator.history = make_history([80] * 7)
+
+        await coordinator._get_battery_data()
+        await coordinator._get_battery_data()
+
+        mock_device.async_get_battery_status.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_readings_recorded(self, coordinator):
+        """Test the battery levels read are recorded in the history."""
+        await coordinator._get_battery_data()
+
+        assert coordinator.history.get_last()[1] == 85
+        data = await coordinator._async_update_data()
+        assert data["history_samples"] == 1
+        assert data["discharge_rate"] is None
+        assert data["hours_to_threshold"] is None
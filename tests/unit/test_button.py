@@ -82,7 +82,7 @@ class TestImouButton:
         # Create refreshData button
         mock_sensor_instance.get_name.return_value = "refreshData"
         mock_sensor_instance.get_description.return_value = "Refresh Data"
-        mock_coordinator.async_request_refresh = AsyncMock()
+        mock_coordinator.async_request_full_refresh = AsyncMock()
 
         button = ImouButton(
             mock_coordinator, MOCK_CONFIG_ENTRY, mock_sensor_instance, "button.{}"
@@ -92,8 +92,8 @@ class TestImouButton:
 
         # Verify async_press was awaited
         mock_sensor_instance.async_press.assert_awaited_once()
-        # Verify coordinator refresh was requested (covers line 48)
-        mock_coordinator.async_request_refresh.assert_awaited_once()
+        # Verify a refresh of every sensor was requested
+        mock_coordinator.async_request_full_refresh.assert_awaited_once()
 
     @pytest.mark.asyncio
     async def test_button_press_refresh_alarm(
@@ -0,0 +1,193 @@
+"""Tests for the per-account API call budget."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.imou_life.api_client import ImouAccountAPIClient
+from custom_components.imou_life.call_budget import (
+    CallBudget,
+    CallBudgetExhausted,
+    CallPriority,
+    call_priority,
+    get_call_budget,
+    get_call_priority,
+)
+from custom_components.imou_life.const import CALL_BUDGET_KEY, DOMAIN
+
+
+@pytest.fixture
+def clock():
+    """Control the monotonic clock used by the budget."""
+    now = [1000.0]
+    with patch(
+        "custom_components.imou_life.call_budget.time.monotonic",
+        side_effect=lambda: now[0],
+    ):
+        yield now
+
+
+def test_background_calls_leave_user_reserve(clock) -> None:
+    """Test polling cannot spend the share of the budget kept for users."""
+    budget = CallBudget("app", calls_per_hour=10, calls_per_day=1000)
+
+    background = 0
+    while budget.try_acquire(CallPriority.BACKGROUND):
+        background += 1
+
+    # 10% of the hourly budget is kept for user actions
+    assert background == 9
+    assert budget.try_acquire(CallPriority.USER)
+    assert not budget.try_acquire(CallPriority.USER)
+    assert budget.remaining_hourly == 0
+    assert budget.remaining_daily == 990
+
+
+def test_budget_refills_over_time(clock) -> None:
+    """Test tokens come back at the configured rate."""
+    budget = CallBudget("app", calls_per_hour=10, calls_per_day=1000)
+    while budget.try_acquire(CallPriority.USER):
+        pass
+
+    clock[0] += 360  # One call worth of an hourly budget of 10
+
+    assert budget.remaining_hourly == 1
+    assert budget.try_acquire(CallPriority.USER)
+
+
+def test_zero_means_unlimited(clock) -> None:
+    """Test a limit of 0 disables the bucket."""
+    budget = CallBudget("app", calls_per_hour=0, calls_per_day=0)
+
+    for _ in range(100):
+        assert budget.try_acquire(CallPriority.BACKGROUND)
+    assert budget.remaining_hourly is None
+    assert budget.remaining_daily is None
+
+
+def test_configure_keeps_spent_calls(clock) -> None:
+    """Test changing the limits does not grant back calls already made."""
+    budget = CallBudget("app", calls_per_hour=100, calls_per_day=1000)
+    for _ in range(95):
+        budget.try_acquire(CallPriority.USER)
+
+    budget.configure(50, 1000)
+
+    assert budget.calls_per_hour == 50
+    assert budget.remaining_hourly == 5
+
+
+@pytest.mark.asyncio
+async def test_background_call_fails_fast(clock) -> None:
+    """Test background work is skipped instead of queued."""
+    budget = CallBudget("app", calls_per_hour=1, calls_per_day=1000)
+
+    with pytest.raises(CallBudgetExhausted):
+        await budget.acquire(CallPriority.BACKGROUND)
+    assert budget.denied_count == 1
+
+
+@pytest.mark.asyncio
+async def test_user_call_waits_for_refill(clock) -> None:
+    """Test user actions wait a short time for the budget to refill."""
+    budget = CallBudget("app", calls_per_hour=3600, calls_per_day=100000)
+    while budget.try_acquire(CallPriority.USER):
+        pass
+
+    async def fake_sleep(seconds):
+        clock[0] += seconds
+
+    with patch(
+        "custom_components.imou_life.call_budget.asyncio.sleep",
+        side_effect=fake_sleep,
+    ) as mock_sleep:
+        await budget.acquire(CallPriority.USER)
+
+    mock_sleep.assert_called_once()
+    assert mock_sleep.call_args[0][0] == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+async def test_user_call_does_not_wait_for_long_refill(clock) -> None:
+    """Test user actions fail when the wait would be too long."""
+    budget = CallBudget("app", calls_per_hour=10, calls_per_day=1000)
+    while budget.try_acquire(CallPriority.USER):
+        pass
+
+    with pytest.raises(CallBudgetExhausted):
+        await budget.acquire(CallPriority.USER)
+
+
+def test_waiting_user_preempts_background(clock) -> None:
+    """Test background calls give way while a user action waits."""
+    budget = CallBudget("app", calls_per_hour=100, calls_per_day=1000)
+    budget._user_waiting = 1
+
+    assert not budget.try_acquire(CallPriority.BACKGROUND)
+    assert budget.try_acquire(CallPriority.USER)
+
+
+@pytest.mark.asyncio
+async def test_call_priority_context() -> None:
+    """Test the priority is scoped to the block and task."""
+    assert get_call_priority() == CallPriority.USER
+
+    with call_priority(CallPriority.BACKGROUND):
+        assert get_call_priority() == CallPriority.BACKGROUND
+        # Tasks started within the block inherit its priority
+        assert (
+            await asyncio.create_task(_async_get_call_priority())
+            == CallPriority.BACKGROUND
+        )
+
+    assert get_call_priority() == CallPriority.USER
+
+
+async def _async_get_call_priority() -> CallPriority:
+    """Return the priority seen by a task."""
+    return get_call_priority()
+
+
+def test_get_call_budget_is_per_account() -> None:
+    """Test one budget is kept per app_id in hass.data."""
+    hass = MagicMock()
+    hass.data = {}
+
+    budget = get_call_budget(hass, "app")
+
+    assert get_call_budget(hass, "app") is budget
+    assert get_call_budget(hass, "other") is not budget
+    assert hass.data[DOMAIN][CALL_BUDGET_KEY]["app"] is budget
+
+
+@pytest.mark.asyncio
+async def test_account_client_spends_budget() -> None:
+    """Test every API call of the account client takes from the budget."""
+    client = ImouAccountAPIClient("app", "secret", MagicMock())
+    client.call_budget = MagicMock(acquire=AsyncMock())
+
+    with patch(
+        "imouapi.api.ImouAPIClient._async_call_api", new=AsyncMock(return_value={})
+    ) as mock_call_api:
+        await client._async_call_api("deviceOnline", {})
+
+    client.call_budget.acquire.assert_awaited_once()
+    mock_call_api.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_account_client_denied_call_is_not_sent() -> None:
+    """Test a call denied by the budget never reaches the API."""
+    client = ImouAccountAPIClient("app", "secret", MagicMock())
+    client.call_budget = MagicMock(
+        acquire=AsyncMock(side_effect=CallBudgetExhausted("no budget"))
+    )
+
+    with patch(
+        "imouapi.api.ImouAPIClient._async_call_api", new=AsyncMock(return_value={})
+    ) as mock_call_api:
+        with pytest.raises(CallBudgetExhausted):
+            await client._async_call_api("deviceOnline", {})
+
+    mock_call_api.assert_not_awaited()
@@ -5,6 +5,7 @@ from unittest.mock import AsyncMock, MagicMock
 import pytest
 
 from custom_components.imou_life.camera import ImouCamera
+from custom_components.imou_life.const import OPTION_SNAPSHOT_CACHE_TTL
 from tests.fixtures.const import MOCK_CONFIG_ENTRY
 
 
@@ -66,12 +67,62 @@ class TestImouCamera:
         image = await camera.async_camera_image()
         assert image == b"fake_image_data"
 
+    @pytest.mark.asyncio
+    async def test_camera_image_cached(self, mock_coordinator, mock_sensor_instance):
+        """Test repeated image requests share one snapshot download."""
+        config_entry = MagicMock(entry_id="test_entry", options={})
+        camera = ImouCamera(
+            mock_coordinator, config_entry, mock_sensor_instance, "camera.{}"
+        )
+
+        await camera.async_camera_image()
+        image = await camera.async_camera_image()
+
+        assert image == b"fake_image_data"
+        mock_sensor_instance.async_get_image.assert_awaited_once()
+
+    def test_camera_image_cache_ttl_option(
+        self, mock_coordinator, mock_sensor_instance
+    ):
+        """Test a new snapshot cache TTL is applied to the running camera."""
+        config_entry = MagicMock(entry_id="test_entry", options={})
+        camera = ImouCamera(
+            mock_coordinator, config_entry, mock_sensor_instance, "camera.{}"
+        )
+
+        config_entry.options = {OPTION_SNAPSHOT_CACHE_TTL: 120}
+        camera.async_apply_options({OPTION_SNAPSHOT_CACHE_TTL})
+
+        assert camera._image_cache.ttl == 120
+
     @pytest.mark.asyncio
     async def test_camera_stream_source(self, camera):
         """Test camera stream source."""
         stream_url = await camera.stream_source()
         assert stream_url == "rtsp://test.com/stream"
 
+    @pytest.mark.asyncio
+    async def test_camera_stream_source_cached(self, camera, mock_sensor_instance):
+        """Test stream restarts reuse the live stream URL."""
+        await camera.stream_source()
+        await camera.stream_source()
+
+        mock_sensor_instance.async_get_stream_url.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_camera_stream_failure_renews_url(self, camera, mock_sensor_instance):
+        """Test a stream which cannot be played switches to a new URL."""
+        await camera.stream_source()
+        mock_sensor_instance.async_get_stream_url.return_value = "rtsp://test.com/new"
+        camera.stream = MagicMock(available=False, source="rtsp://test.com/stream")
+        camera.hass = MagicMock()
+        camera.async_write_ha_state = MagicMock()
+
+        camera._async_stream_state_changed()
+        await camera.hass.async_create_task.call_args[0][0]
+
+        camera.stream.update_source.assert_called_once_with("rtsp://test.com/new")
+
     def test_camera_icon(self, camera):
         """Test camera has translation key for dynamic icons."""
         assert camera._attr_translation_key == "camera"
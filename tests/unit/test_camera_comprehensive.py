@@ -110,6 +110,7 @@ class TestCameraEntity:
         coordinator.device.get_device_id.return_value = "test_camera_123"
         coordinator.device.get_status.return_value = True
         coordinator.hass = MagicMock()
+        coordinator.startup_orchestrator = None
         return coordinator
 
     @pytest.fixture
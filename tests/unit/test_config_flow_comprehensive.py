@@ -6,29 +6,67 @@ import pytest
 from homeassistant.data_entry_flow import FlowResultType
 from imouapi.exceptions import ImouException
 
+from custom_components.imou_life.api_client import ImouAccountAPIClient
 from custom_components.imou_life.config_flow import (
     ImouFlowHandler,
     ImouOptionsFlowHandler,
+    _create_api_client,
 )
 from custom_components.imou_life.const import (
+    CONF_ACCOUNT_ENTRY,
     CONF_API_SERVER,
     CONF_API_URL,
     CONF_APP_ID,
     CONF_APP_SECRET,
     CONF_DEVICE_ID,
+    CONF_DEVICE_IDS,
     CONF_DEVICE_NAME,
     CONF_DISCOVERED_DEVICE,
     CONF_ENABLE_DISCOVER,
+    CONF_ENTRY_TYPE,
     DEFAULT_API_SERVER,
     DOMAIN,
+    ENTRY_TYPE_ACCOUNT,
     OPTION_API_TIMEOUT,
     OPTION_CALLBACK_URL,
     OPTION_CAMERA_WAIT_BEFORE_DOWNLOAD,
+    OPTION_DISABLED_DEVICES,
     OPTION_SCAN_INTERVAL,
     OPTION_WAIT_AFTER_WAKE_UP,
 )
+from custom_components.imou_life.device_snapshot import DeviceSnapshotCache
 from tests.fixtures.mocks import MockConfigEntry
 
+DEVICE_DETAIL = {
+    "deviceId": "device_123",
+    "catalog": "IPC",
+    "version": "2.840.0000000.28.R",
+    "name": "Test Camera",
+    "deviceModel": "IPC-C22EP",
+    "ability": "WLAN,MT,HSEncrypt,CloudStorage,LocalStorage,PT,NVM",
+}
+
+
+@pytest.fixture
+def snapshot_hass():
+    """Create a hass instance with fresh device snapshots of two accounts."""
+    hass = MagicMock()
+    hass.data = {}
+    hass.config_entries.async_reload = AsyncMock()
+    cache = DeviceSnapshotCache(hass)
+    cache.update(DEVICE_DETAIL, "test_id")
+    cache.update({**DEVICE_DETAIL, "deviceId": "device_456"}, "other_id")
+    return hass
+
+
+def get_detail_calls(mock_call_api: AsyncMock) -> list:
+    """Return the deviceBaseDetailList calls of a patched API client."""
+    return [
+        call
+        for call in mock_call_api.await_args_list
+        if call.args[0] == "deviceBaseDetailList"
+    ]
+
 
 class TestConfigFlowLogin:
     """Test login step of config flow."""
@@ -78,7 +116,9 @@ class TestConfigFlowLogin:
 
         with (
             patch("custom_components.imou_life.config_flow.async_get_clientsession"),
-            patch("custom_components.imou_life.config_flow.ImouAPIClient") as mock_api,
+            patch(
+                "custom_components.imou_life.config_flow.ImouAccountAPIClient"
+            ) as mock_api,
             patch(
                 "custom_components.imou_life.config_flow.ImouDiscoverService"
             ) as mock_discover,
@@ -112,7 +152,9 @@ class TestConfigFlowLogin:
 
         with (
             patch("custom_components.imou_life.config_flow.async_get_clientsession"),
-            patch("custom_components.imou_life.config_flow.ImouAPIClient") as mock_api,
+            patch(
+                "custom_components.imou_life.config_flow.ImouAccountAPIClient"
+            ) as mock_api,
             patch("custom_components.imou_life.config_flow.ImouDiscoverService"),
         ):
             api_instance = mock_api.return_value
@@ -138,7 +180,9 @@ class TestConfigFlowLogin:
 
         with (
             patch("custom_components.imou_life.config_flow.async_get_clientsession"),
-            patch("custom_components.imou_life.config_flow.ImouAPIClient") as mock_api,
+            patch(
+                "custom_components.imou_life.config_flow.ImouAccountAPIClient"
+            ) as mock_api,
         ):
             api_instance = mock_api.return_value
             api_instance.async_connect = AsyncMock(
@@ -174,6 +218,7 @@ class TestConfigFlowDiscover:
         mock_device.get_name.return_value = "Test Camera"
         mock_device.get_device_id.return_value = "device_123"
 
+        flow._api_client = MagicMock()
         flow._discover_service = MagicMock()
         flow._discover_service.async_discover_devices = AsyncMock(
             return_value={"device_123": mock_device}
@@ -191,6 +236,7 @@ class TestConfigFlowDiscover:
         flow = ImouFlowHandler()
         flow.hass = MagicMock()
 
+        flow._api_client = MagicMock()
         flow._discover_service = MagicMock()
         flow._discover_service.async_discover_devices = AsyncMock(
             side_effect=ImouException("OP1013: exceed limit")
@@ -208,6 +254,7 @@ class TestConfigFlowDiscover:
         flow = ImouFlowHandler()
         flow.hass = MagicMock()
 
+        flow._api_client = MagicMock()
         flow._discover_service = MagicMock()
         flow._discover_service.async_discover_devices = AsyncMock(return_value={})
 
@@ -244,6 +291,111 @@ class TestConfigFlowDiscover:
 
         assert result["type"] == FlowResultType.CREATE_ENTRY
 
+    @pytest.mark.asyncio
+    async def test_async_step_discover_account_entry(self):
+        """Test adding all the devices of the account in a single entry."""
+        flow = ImouFlowHandler()
+        flow.hass = MagicMock()
+        flow._api_url = "https://api.example.com"
+        flow._app_id = "test_id"
+        flow._app_secret = "test_secret"
+        flow._discovered_devices = {}
+        for device_id in ("device_1", "device_2", "device_3"):
+            device = MagicMock()
+            device.get_device_id.return_value = device_id
+            flow._discovered_devices[device_id] = device
+        device_entry = MockConfigEntry(domain=DOMAIN, data={CONF_DEVICE_ID: "device_1"})
+        ignored_entry = MagicMock(data={}, unique_id="device_3")
+
+        with (
+            patch.object(flow, "async_set_unique_id") as mock_unique_id,
+            patch.object(flow, "_abort_if_unique_id_configured"),
+            patch.object(
+                flow,
+                "_async_current_entries",
+                return_value=[device_entry, ignored_entry],
+            ),
+            patch.object(flow, "async_create_entry") as mock_create,
+        ):
+            await flow.async_step_discover(
+                {CONF_DISCOVERED_DEVICE: "device_1", CONF_ACCOUNT_ENTRY: True}
+            )
+
+        mock_unique_id.assert_awaited_once_with("test_id")
+        data = mock_create.call_args.kwargs["data"]
+        assert data[CONF_ENTRY_TYPE] == ENTRY_TYPE_ACCOUNT
+        assert data[CONF_APP_ID] == "test_id"
+        # The device with its own entry keeps it, the ignored one stays ignored
+        assert data[CONF_DEVICE_IDS] == ["device_2"]
+
+    @pytest.mark.asyncio
+    async def test_discovered_device_added_to_account_entry(self):
+        """Test a device discovered on an account with an account entry joins it."""
+        flow = ImouFlowHandler()
+        flow.hass = MagicMock()
+        account_entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={
+                CONF_ENTRY_TYPE: ENTRY_TYPE_ACCOUNT,
+                CONF_APP_ID: "test_id",
+                CONF_DEVICE_IDS: ["device_1"],
+            },
+        )
+
+        with (
+            patch.object(flow, "async_set_unique_id"),
+            patch.object(flow, "_abort_if_unique_id_configured"),
+            patch.object(flow, "_async_current_entries", return_value=[account_entry]),
+        ):
+            await flow.async_step_discovery(
+                {
+                    "device_id": "device_2",
+                    "device": MagicMock(),
+                    "api_credentials": {
+                        "app_id": "test_id",
+                        "app_secret": "test_secret",
+                        "api_url": "https://api.example.com",
+                    },
+                }
+            )
+            result = await flow.async_step_discovery_confirm({})
+
+        assert result["type"] == FlowResultType.ABORT
+        assert result["reason"] == "device_added_to_account"
+        data = flow.hass.config_entries.async_update_entry.call_args.kwargs["data"]
+        assert data[CONF_DEVICE_IDS] == ["device_1", "device_2"]
+
+    @pytest.mark.asyncio
+    async def test_repair_stale_device_of_account_entry(self):
+        """Test removing a stale device of an account entry disables it once."""
+        flow = ImouFlowHandler()
+        flow.hass = MagicMock()
+        data = {
+            CONF_ENTRY_TYPE: ENTRY_TYPE_ACCOUNT,
+            CONF_DEVICE_IDS: ["device_1", "device_2"],
+        }
+        flow.hass.config_entries.async_get_entry.return_value = MockConfigEntry(
+            domain=DOMAIN, data=data
+        )
+        flow.init_data = {"entry_id": "test", "device_id": "device_2"}
+
+        result = await flow.async_step_repair_stale_device({"action": "remove"})
+
+        assert result["reason"] == "device_removed"
+        options = flow.hass.config_entries.async_update_entry.call_args.kwargs[
+            "options"
+        ]
+        assert options[OPTION_DISABLED_DEVICES] == ["device_2"]
+
+        # Repaired again, the device is not disabled twice
+        flow.hass.config_entries.async_get_entry.return_value = MockConfigEntry(
+            domain=DOMAIN, data=data, options=options
+        )
+        flow.hass.config_entries.async_update_entry.reset_mock()
+        await flow.async_step_repair_stale_device({"action": "remove"})
+
+        flow.hass.config_entries.async_update_entry.assert_not_called()
+
 
 class TestConfigFlowManual:
     """Test manual step of config flow."""
@@ -385,6 +537,142 @@ class TestConfigFlowHelpers:
         assert call_args[1]["title"] == "Device Default Name"
 
 
+class TestConfigFlowSnapshots:
+    """Test the use of the device snapshots by the config flow."""
+
+    @pytest.mark.asyncio
+    async def test_discover_primes_account_snapshots(self, snapshot_hass):
+        """Test discovery only uses the fresh snapshots of the same account."""
+        flow = ImouFlowHandler()
+        flow.hass = snapshot_hass
+        flow._app_id = "test_id"
+        flow._api_client = _create_api_client(
+            snapshot_hass, "test_id", "test_secret", "https://api.example.com", None
+        )
+        primed = []
+
+        async def discover_devices():
+            primed.extend(flow._api_client._primed_details)
+            return {}
+
+        flow._discover_service = MagicMock()
+        flow._discover_service.async_discover_devices = AsyncMock(
+            side_effect=discover_devices
+        )
+
+        await flow.async_step_discover()
+
+        assert primed == ["device_123"]
+        assert flow._api_client._primed_details == {}
+
+    @pytest.mark.asyncio
+    async def test_manual_validated_against_api(self, snapshot_hass):
+        """Test a device entered manually is validated even if fresh."""
+        flow = ImouFlowHandler()
+        flow.hass = snapshot_hass
+        flow._api_url = "https://api.example.com"
+        flow._app_id = "test_id"
+        flow._app_secret = "test_secret"
+        flow._api_client = _create_api_client(
+            snapshot_hass, "test_id", "test_secret", "https://api.example.com", None
+        )
+        flow._discover_service = MagicMock()
+        flow._discover_service.async_discover_devices = AsyncMock(return_value={})
+
+        with (
+            patch.object(
+                ImouAccountAPIClient,
+                "_async_call_api",
+                new=AsyncMock(return_value={"count": 1, "deviceList": [DEVICE_DETAIL]}),
+            ) as mock_call_api,
+            patch.object(flow, "async_set_unique_id"),
+            patch.object(flow, "async_create_entry") as mock_create,
+        ):
+            mock_create.return_value = {"type": FlowResultType.CREATE_ENTRY}
+            await flow.async_step_discover()
+            result = await flow.async_step_manual(
+                {CONF_DEVICE_ID: "device_123", CONF_DEVICE_NAME: ""}
+            )
+
+        assert result["type"] == FlowResultType.CREATE_ENTRY
+        assert len(get_detail_calls(mock_call_api)) == 1
+
+    @pytest.mark.asyncio
+    async def test_reauth_validated_against_api(self, snapshot_hass):
+        """Test reauthentication checks the device access even if fresh."""
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={
+                CONF_APP_ID: "test_id",
+                CONF_APP_SECRET: "old_secret",
+                CONF_DEVICE_ID: "device_123",
+                CONF_API_URL: "https://api.example.com",
+            },
+            entry_id="test_entry",
+        )
+        snapshot_hass.config_entries.async_get_entry.return_value = entry
+        flow = ImouFlowHandler()
+        flow.hass = snapshot_hass
+        flow.context = {"entry_id": "test_entry"}
+
+        with (
+            patch("custom_components.imou_life.config_flow.async_get_clientsession"),
+            patch.object(ImouAccountAPIClient, "async_connect", new=AsyncMock()),
+            patch.object(
+                ImouAccountAPIClient,
+                "_async_call_api",
+                new=AsyncMock(return_value={"count": 1, "deviceList": [DEVICE_DETAIL]}),
+            ) as mock_call_api,
+        ):
+            await flow.async_step_reauth({})
+            result = await flow.async_step_reauth_confirm(
+                {CONF_APP_ID: "test_id", CONF_APP_SECRET: "new_secret"}
+            )
+
+        assert result["reason"] == "reauth_successful"
+        assert len(get_detail_calls(mock_call_api)) == 1
+
+    @pytest.mark.asyncio
+    async def test_reconfigure_validated_against_api(self, snapshot_hass):
+        """Test reconfiguration checks the device access even if fresh."""
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={
+                CONF_APP_ID: "test_id",
+                CONF_APP_SECRET: "old_secret",
+                CONF_DEVICE_ID: "device_123",
+                CONF_API_URL: "https://api.example.com",
+            },
+            entry_id="test_entry",
+        )
+        snapshot_hass.config_entries.async_get_entry.return_value = entry
+        flow = ImouFlowHandler()
+        flow.hass = snapshot_hass
+        flow.context = {"entry_id": "test_entry"}
+
+        with (
+            patch("custom_components.imou_life.config_flow.async_get_clientsession"),
+            patch.object(ImouAccountAPIClient, "async_connect", new=AsyncMock()),
+            patch.object(
+                ImouAccountAPIClient,
+                "_async_call_api",
+                new=AsyncMock(return_value={"count": 1, "deviceList": [DEVICE_DETAIL]}),
+            ) as mock_call_api,
+        ):
+            await flow.async_step_reconfigure()
+            result = await flow.async_step_reconfigure_confirm(
+                {
+                    CONF_APP_ID: "test_id",
+                    CONF_APP_SECRET: "new_secret",
+                    CONF_API_SERVER: "custom",
+                    CONF_API_URL: "https://api.example.com",
+                }
+            )
+
+        assert result["reason"] == "reconfigure_successful"
+        assert len(get_detail_calls(mock_call_api)) == 1
+
+
 class TestOptionsFlow:
     """Test options flow."""
 
@@ -413,6 +701,32 @@ class TestOptionsFlow:
         assert result["type"] == FlowResultType.FORM
         assert result["step_id"] == "init"
 
+    @pytest.mark.asyncio
+    async def test_options_flow_account_entry_disabled_devices(self):
+        """Test the devices of an account entry can be disabled."""
+        hass = MagicMock()
+        hass.data = {}
+        config_entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={
+                CONF_ENTRY_TYPE: ENTRY_TYPE_ACCOUNT,
+                CONF_DEVICE_IDS: ["device_1", "device_2"],
+            },
+            options={OPTION_DISABLED_DEVICES: ["device_2"]},
+        )
+        hass.config_entries.async_get_entry.return_value = config_entry
+
+        flow = ImouOptionsFlowHandler()
+        flow.hass = hass
+        flow.handler = config_entry.entry_id
+
+        result = await flow.async_step_init()
+
+        schema = result["data_schema"].schema
+        key = next(key for key in schema if key == OPTION_DISABLED_DEVICES)
+        assert key.default() == ["device_2"]
+        assert schema[key].options == {"device_1": "device_1", "device_2": "device_2"}
+
     @pytest.mark.asyncio
     async def test_options_flow_update_options(self):
         """Test options flow updates options."""
@@ -78,7 +78,7 @@ class TestReauthFlow:
         # Mock successful API connection
         with (
             patch(
-                "custom_components.imou_life.config_flow.ImouAPIClient"
+                "custom_components.imou_life.config_flow.ImouAccountAPIClient"
             ) as mock_api_client,
             patch("custom_components.imou_life.config_flow.ImouDevice") as mock_device,
             patch("custom_components.imou_life.config_flow.async_get_clientsession"),
@@ -133,7 +133,7 @@ class TestReauthFlow:
 
         with (
             patch(
-                "custom_components.imou_life.config_flow.ImouAPIClient"
+                "custom_components.imou_life.config_flow.ImouAccountAPIClient"
             ) as mock_api_client,
             patch("custom_components.imou_life.config_flow.async_get_clientsession"),
         ):
@@ -167,7 +167,7 @@ class TestReauthFlow:
 
         with (
             patch(
-                "custom_components.imou_life.config_flow.ImouAPIClient"
+                "custom_components.imou_life.config_flow.ImouAccountAPIClient"
             ) as mock_api_client,
             patch("custom_components.imou_life.config_flow.async_get_clientsession"),
         ):
@@ -199,7 +199,7 @@ class TestReauthFlow:
 
         with (
             patch(
-                "custom_components.imou_life.config_flow.ImouAPIClient"
+                "custom_components.imou_life.config_flow.ImouAccountAPIClient"
             ) as mock_api_client,
             patch("custom_components.imou_life.config_flow.async_get_clientsession"),
         ):
@@ -231,7 +231,7 @@ class TestReauthFlow:
 
         with (
             patch(
-                "custom_components.imou_life.config_flow.ImouAPIClient"
+                "custom_components.imou_life.config_flow.ImouAccountAPIClient"
             ) as mock_api_client,
             patch("custom_components.imou_life.config_flow.async_get_clientsession"),
         ):
@@ -265,7 +265,7 @@ class TestReauthFlow:
 
         with (
             patch(
-                "custom_components.imou_life.config_flow.ImouAPIClient"
+                "custom_components.imou_life.config_flow.ImouAccountAPIClient"
             ) as mock_api_client,
             patch("custom_components.imou_life.config_flow.ImouDevice") as mock_device,
             patch("custom_components.imou_life.config_flow.async_get_clientsession"),
@@ -376,7 +376,7 @@ class TestReauthFlow:
 
             with (
                 patch(
-                    "custom_components.imou_life.config_flow.ImouAPIClient"
+                    "custom_components.imou_life.config_flow.ImouAccountAPIClient"
                 ) as mock_api_client,
                 patch(
                     "custom_components.imou_life.config_flow.async_get_clientsession"
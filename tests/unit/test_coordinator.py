@@ -20,8 +20,10 @@ class TestImouDataUpdateCoordinator:
     @pytest.fixture
     def coordinator(self, mock_device):
         """Create a coordinator instance."""
+        hass = MagicMock()
+        hass.data = {}
         return ImouDataUpdateCoordinator(
-            hass=MagicMock(),
+            hass=hass,
             device=mock_device,
             scan_interval=30,
         )
@@ -52,6 +54,17 @@ class TestImouDataUpdateCoordinator:
 
         coordinator.device.async_get_data.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_coordinator_saves_last_known_states(self, coordinator):
+        """Test a successful poll is kept for the next start."""
+        coordinator.snapshot_cache = MagicMock()
+
+        await coordinator._async_update_data()
+
+        coordinator.snapshot_cache.update_states.assert_called_once_with(
+            coordinator.device
+        )
+
     def test_coordinator_platforms(self, coordinator):
         """Test coordinator platforms property."""
         assert coordinator.platforms == []
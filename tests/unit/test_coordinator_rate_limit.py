@@ -7,6 +7,21 @@ import pytest
 from homeassistant.helpers.update_coordinator import UpdateFailed
 from imouapi.exceptions import ImouException
 
+from custom_components.imou_life.call_budget import (
+    CallBudgetExhausted,
+    CallPriority,
+    get_call_priority,
+)
+from custom_components.imou_life.const import (
+    BACKOFF_MAX_GROWTH,
+    BACKOFF_MIN_GROWTH,
+    BACKOFF_SETTLE_TIME,
+    BACKOFF_STEP_DOWN_FACTOR,
+    BACKOFF_STEP_DOWN_INTERVAL,
+    CONF_APP_ID,
+    OPTION_SCAN_INTERVAL,
+    RATE_LIMIT_RESET_ESTIMATE_HOURS,
+)
 from custom_components.imou_life.coordinator import ImouDataUpdateCoordinator
 
 
@@ -32,16 +47,8 @@ class TestCoordinatorRateLimitHandling:
 
     @pytest.fixture
     def coordinator(self, hass, mock_device):
-        """Create a coordinator with every call forced to full cycle."""
-        coord = ImouDataUpdateCoordinator(hass, mock_device, scan_interval=900)
-        _orig = coord._async_update_data
-
-        async def _full_cycle():
-            coord._poll_cycle = -1
-            return await _orig()
-
-        coord._async_update_data = _full_cycle
-        return coord
+        """Create a coordinator."""
+        return ImouDataUpdateCoordinator(hass, mock_device, scan_interval=900)
 
     @pytest.mark.asyncio
     async def test_successful_update_clears_rate_limit(self, coordinator, mock_device):
@@ -91,21 +98,30 @@ class TestCoordinatorRateLimitHandling:
     async def test_scan_interval_adjustment_on_rate_limit(
         self, coordinator, mock_device
     ):
-        """Test that scan interval doubles when rate limited."""
+        """Test that scan interval backs off when rate limited."""
         original_interval = coordinator.update_interval.total_seconds()
 
-        # Mock rate limit error
-        mock_device.async_get_data.side_effect = ImouException(
-            "OP1013: Call interface times exceed limit"
-        )
+        # Mock rate limit error, recorded by the account API client
+        async def get_data():
+            coordinator.backoff.record_rate_limit(
+                "OP1013: Call interface times exceed limit"
+            )
+            raise ImouException("OP1013: Call interface times exceed limit")
+
+        mock_device.async_get_data.side_effect = get_data
 
         # Attempt update
         with pytest.raises(UpdateFailed):
             await coordinator._async_update_data()
 
-        # Verify interval doubled
+        # Verify interval grew by a jittered factor
         assert coordinator._is_interval_adjusted is True
-        assert coordinator.update_interval.total_seconds() == original_interval * 2
+        interval = coordinator.update_interval.total_seconds()
+        assert (
+            original_interval * BACKOFF_MIN_GROWTH
+            <= interval
+            <= original_interval * BACKOFF_MAX_GROWTH
+        )
 
     @pytest.mark.asyncio
     async def test_rate_limit_tracking(self, coordinator, mock_device):
@@ -158,27 +174,50 @@ class TestCoordinatorRateLimitHandling:
         assert coordinator._is_interval_adjusted is False
 
     @pytest.mark.asyncio
-    async def test_interval_only_adjusted_once(self, coordinator, mock_device):
-        """Test that scan interval is only adjusted once."""
-        original_interval = coordinator.update_interval.total_seconds()
-        mock_device.async_get_data.side_effect = ImouException("OP1013")
+    async def test_rate_limit_recorded_once(self, coordinator, mock_device):
+        """Test an OP1013 recorded by the account API client is not recorded again."""
+        mock_device.async_get_data.side_effect = ImouException("OP1013: exceed limit")
+        coordinator.backoff.record_rate_limit = MagicMock()
 
-        # First rate limit - interval should double
         with pytest.raises(UpdateFailed):
             await coordinator._async_update_data()
 
-        first_adjusted = coordinator.update_interval.total_seconds()
-        assert first_adjusted == original_interval * 2
+        coordinator.backoff.record_rate_limit.assert_not_called()
+        assert coordinator.is_rate_limited is True
+
+    @pytest.mark.asyncio
+    async def test_interval_grows_once_per_rate_limit_event(
+        self, coordinator, mock_device
+    ):
+        """Test errors right after a backoff do not grow it again."""
+        mock_device.async_get_data.side_effect = ImouException("OP1013")
 
-        # Second rate limit - interval should stay the same
         with pytest.raises(UpdateFailed):
             await coordinator._async_update_data()
+        first_adjusted = coordinator.update_interval.total_seconds()
 
+        # Second rate limit right away - same event, interval stays the same
+        with pytest.raises(UpdateFailed):
+            await coordinator._async_update_data()
         assert coordinator.update_interval.total_seconds() == first_adjusted
 
+        # Still rate limited later on - the interval keeps growing
+        coordinator.backoff.last_change -= timedelta(seconds=BACKOFF_SETTLE_TIME)
+        with pytest.raises(UpdateFailed):
+            await coordinator._async_update_data()
+        assert coordinator.update_interval.total_seconds() > first_adjusted
+
+        # Still rate limited after probing again - wait for the estimated reset
+        coordinator.backoff.last_change -= timedelta(seconds=BACKOFF_SETTLE_TIME)
+        with pytest.raises(UpdateFailed):
+            await coordinator._async_update_data()
+        assert coordinator.update_interval.total_seconds() == pytest.approx(
+            RATE_LIMIT_RESET_ESTIMATE_HOURS * 3600, abs=5
+        )
+
     @pytest.mark.asyncio
     async def test_recovery_workflow(self, coordinator, mock_device):
-        """Test complete rate limit and recovery workflow."""
+        """Test complete rate limit and gradual recovery workflow."""
         # Step 1: Rate limited
         mock_device.async_get_data.side_effect = ImouException("OP1013")
 
@@ -195,15 +234,99 @@ class TestCoordinatorRateLimitHandling:
 
         assert coordinator.rate_limit_count == 2
 
-        # Step 3: Recovery
+        # Step 3: Recovery, the interval does not snap back straight away
         mock_device.async_get_data.side_effect = None
         mock_device.async_get_data.return_value = {"battery_level": 90}
 
         await coordinator._async_update_data()
 
-        # Verify fully recovered
         assert coordinator.is_rate_limited is False
-        assert coordinator._is_interval_adjusted is False
-        assert coordinator.update_interval.total_seconds() < adjusted_interval
         assert coordinator.last_successful_update is not None
         assert coordinator.rate_limit_count == 2  # Count persists as history
+        assert coordinator.update_interval.total_seconds() == adjusted_interval
+
+        # Step 4: It steps down after a while of successful polls
+        coordinator.backoff.last_change -= timedelta(seconds=BACKOFF_STEP_DOWN_INTERVAL)
+        await coordinator._async_update_data()
+
+        assert coordinator.update_interval.total_seconds() == pytest.approx(
+            max(900, adjusted_interval / BACKOFF_STEP_DOWN_FACTOR)
+        )
+
+    @pytest.mark.asyncio
+    async def test_backoff_shared_by_account(self, hass, mock_device):
+        """Test a rate limit backs off the other devices of the account."""
+        entry = MagicMock(data={CONF_APP_ID: "app"})
+        coordinators = [
+            ImouDataUpdateCoordinator(hass, mock_device, 900, entry) for _ in range(2)
+        ]
+        for coordinator in coordinators:
+            coordinator.poll_scheduler = MagicMock()
+            coordinator.backoff.async_add_listener(coordinator.async_apply_backoff)
+        assert coordinators[0].backoff is coordinators[1].backoff
+
+        mock_device.async_get_data.side_effect = ImouException("OP1013")
+        with pytest.raises(UpdateFailed):
+            await coordinators[0]._async_update_data()
+
+        assert coordinators[1]._is_interval_adjusted is True
+        assert coordinators[1].update_interval == coordinators[0].update_interval
+        coordinators[1].poll_scheduler.reschedule.assert_called_once_with(
+            coordinators[1]
+        )
+
+    def test_scan_interval_option_keeps_backoff(self, hass, mock_device):
+        """Test a new scan interval is applied on top of the account backoff."""
+        entry = MagicMock(
+            data={CONF_APP_ID: "app"}, options={OPTION_SCAN_INTERVAL: 600}
+        )
+        coordinator = ImouDataUpdateCoordinator(hass, mock_device, 900, entry)
+        coordinator.poll_scheduler = MagicMock()
+        entity = MagicMock()
+        coordinator.entities.append(entity)
+        coordinator.backoff.record_rate_limit("OP1013")
+
+        coordinator.async_apply_options({OPTION_SCAN_INTERVAL})
+
+        assert coordinator._original_scan_interval == 600
+        assert coordinator._is_interval_adjusted is True
+        assert coordinator.update_interval.total_seconds() > 600
+        coordinator.poll_scheduler.reschedule.assert_called_once_with(coordinator)
+        entity.async_apply_options.assert_called_once_with({OPTION_SCAN_INTERVAL})
+
+    @pytest.mark.asyncio
+    async def test_exhausted_budget_keeps_last_data(self, coordinator, mock_device):
+        """Test a poll denied by the call budget is skipped, not failed."""
+        coordinator.data = {"battery_level": 85}
+        mock_device.async_get_data.side_effect = CallBudgetExhausted("no budget")
+
+        data = await coordinator._async_update_data()
+
+        assert data == {"battery_level": 85}
+        assert coordinator.is_rate_limited is False
+        assert coordinator.last_error_type is None
+        assert coordinator._is_interval_adjusted is False
+
+    @pytest.mark.asyncio
+    async def test_exhausted_budget_without_data_fails(self, coordinator, mock_device):
+        """Test the first poll fails when the call budget denies it."""
+        mock_device.async_get_data.side_effect = CallBudgetExhausted("no budget")
+
+        with pytest.raises(UpdateFailed):
+            await coordinator._async_update_data()
+
+    @pytest.mark.asyncio
+    async def test_polls_run_with_background_priority(self, coordinator, mock_device):
+        """Test API calls made by a poll are background calls."""
+        priorities = []
+
+        async def get_data():
+            priorities.append(get_call_priority())
+            return True
+
+        mock_device.async_get_data.side_effect = get_data
+
+        await coordinator._async_update_data()
+
+        assert priorities == [CallPriority.BACKGROUND]
+        assert get_call_priority() == CallPriority.USER
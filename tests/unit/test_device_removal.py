@@ -5,7 +5,15 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.device_registry import DeviceEntry
 
 from custom_components.imou_life import async_remove_config_entry_device
-from custom_components.imou_life.const import CONF_DEVICE_ID, CONF_DEVICE_NAME, DOMAIN
+from custom_components.imou_life.const import (
+    CONF_DEVICE_ID,
+    CONF_DEVICE_IDS,
+    CONF_DEVICE_NAME,
+    CONF_ENTRY_TYPE,
+    DOMAIN,
+    ENTRY_TYPE_ACCOUNT,
+    OPTION_DISABLED_DEVICES,
+)
 from tests.fixtures.mocks import MockConfigEntry
 
 
@@ -136,3 +144,40 @@ async def test_async_remove_config_entry_device_no_device_id(hass: HomeAssistant
     # Should return False - identifier doesn't match config_entry.entry_id
     result = await async_remove_config_entry_device(hass, config_entry, device_entry)
     assert result is False
+
+
+@pytest.mark.asyncio
+async def test_async_remove_config_entry_device_account_entry(hass: HomeAssistant):
+    """Test a device removed from an account entry is disabled in its options."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_ENTRY_TYPE: ENTRY_TYPE_ACCOUNT,
+            CONF_DEVICE_IDS: ["device_1", "device_2"],
+        },
+        entry_id="test_entry_id",
+        version=3,
+        options={OPTION_DISABLED_DEVICES: ["device_1"]},
+    )
+    device_entry = DeviceEntry(
+        id="device_entry_2",
+        identifiers={(DOMAIN, "test_entry_id_device_2")},
+        manufacturer="Imou",
+        model="Test Model",
+        name="Test Camera",
+    )
+    other_entry = DeviceEntry(
+        id="device_entry_3",
+        identifiers={(DOMAIN, "test_entry_id_device_3")},
+        manufacturer="Imou",
+        model="Test Model",
+        name="Other Camera",
+    )
+
+    assert await async_remove_config_entry_device(hass, config_entry, device_entry)
+    hass.config_entries.async_update_entry.assert_called_once_with(
+        config_entry, options={OPTION_DISABLED_DEVICES: ["device_1", "device_2"]}
+    )
+
+    # Devices not in the entry are not removed
+    assert not await async_remove_config_entry_device(hass, config_entry, other_entry)
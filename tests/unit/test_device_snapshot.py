@@ -0,0 +1,281 @@
+"""Tests for the cached device details snapshots."""
+
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.util import dt as dt_util
+from imouapi.device import ImouDevice
+from imouapi.exceptions import APIError
+
+from custom_components.imou_life.api_client import ImouAccountAPIClient
+from custom_components.imou_life.const import (
+    DEVICE_SNAPSHOT_FRESH_TIME,
+    DEVICE_SNAPSHOT_SAVE_DELAY,
+)
+from custom_components.imou_life.device_snapshot import DeviceSnapshotCache
+
+DEVICE_DETAIL = {
+    "deviceId": "device_1",
+    "catalog": "IPC",
+    "version": "2.840.0000000.28.R",
+    "name": "Front Door",
+    "deviceModel": "IPC-C22EP",
+    "ability": "WLAN,MT,HSEncrypt,CloudStorage,LocalStorage,PT,NVM",
+}
+
+
+@pytest.fixture
+def cache(mock_hass: MagicMock) -> DeviceSnapshotCache:
+    """Create a snapshot cache."""
+    return DeviceSnapshotCache(mock_hass)
+
+
+def make_store(saved_data: dict | None = None) -> MagicMock:
+    """Create a mock Store returning the given saved data."""
+    store = MagicMock()
+    store.async_load = AsyncMock(return_value=saved_data)
+    return store
+
+
+@pytest.mark.asyncio
+async def test_snapshots_persisted(cache: DeviceSnapshotCache) -> None:
+    """Test snapshots are saved with a delay and restored on load."""
+    store = make_store(
+        {"devices": {"device_2": {"detail": {"deviceId": "device_2"}}, "bad": None}}
+    )
+    with patch("custom_components.imou_life.device_snapshot.Store", return_value=store):
+        await cache.async_load()
+
+    assert cache.get("device_2") == {"deviceId": "device_2"}
+    assert cache.get("bad") is None
+
+    cache.update(DEVICE_DETAIL)
+
+    assert cache.get("device_1") == DEVICE_DETAIL
+    assert cache.get_updated_at("device_1") is not None
+    data_func, delay = store.async_delay_save.call_args[0]
+    assert delay == DEVICE_SNAPSHOT_SAVE_DELAY
+    assert set(data_func()["devices"]) == {"device_1", "device_2"}
+
+    cache.remove("device_1")
+    assert cache.get("device_1") is None
+
+
+def test_fresh_details(cache: DeviceSnapshotCache) -> None:
+    """Test details are fresh for a while after they were fetched."""
+    cache.update(DEVICE_DETAIL)
+    cache.update({"deviceId": "device_2"})
+
+    assert cache.get_fresh("device_1") == DEVICE_DETAIL
+    assert len(cache.get_all_fresh()) == 2
+
+    later = dt_util.utcnow() + timedelta(seconds=DEVICE_SNAPSHOT_FRESH_TIME + 1)
+    with patch(
+        "custom_components.imou_life.device_snapshot.dt_util.utcnow",
+        return_value=later,
+    ):
+        assert cache.get_fresh("device_1") is None
+        assert cache.get_all_fresh() == []
+    assert cache.get_fresh("unknown") is None
+
+
+@pytest.mark.asyncio
+async def test_device_initialized_from_primed_details() -> None:
+    """Test a primed client initializes a device without any API call."""
+    client = ImouAccountAPIClient("app", "secret", MagicMock())
+    client.prime_device_details(DEVICE_DETAIL)
+    device = ImouDevice(client, "device_1")
+
+    with patch.object(client, "_async_call_api", new=AsyncMock()) as mock_call_api:
+        await device.async_initialize()
+
+    mock_call_api.assert_not_awaited()
+    assert device.get_firmware() == DEVICE_DETAIL["version"]
+    assert device.get_sensor_by_name("nightVisionMode") is not None
+
+
+@pytest.mark.asyncio
+async def test_client_captures_fetched_details(cache: DeviceSnapshotCache) -> None:
+    """Test details fetched from the API are stored in the cache."""
+    client = ImouAccountAPIClient("app", "secret", MagicMock())
+    client.snapshot_cache = cache
+
+    with patch(
+        "imouapi.api.ImouAPIClient.async_api_deviceBaseDetailList",
+        new=AsyncMock(return_value={"count": 1, "deviceList": [DEVICE_DETAIL]}),
+    ) as mock_detail:
+        data = await client.async_api_deviceBaseDetailList(["device_1"])
+
+    mock_detail.assert_awaited_once()
+    assert data["deviceList"] == [DEVICE_DETAIL]
+    assert cache.get("device_1") == DEVICE_DETAIL
+
+
+async def _run_revalidation(
+    cache: DeviceSnapshotCache, client: MagicMock, callbacks: dict
+) -> None:
+    """Schedule the revalidation of devices and run the timer right away."""
+    with patch(
+        "custom_components.imou_life.device_snapshot.async_call_later"
+    ) as mock_call_later:
+        for device_id, on_change in callbacks.items():
+            cache.async_schedule_revalidation(client, device_id, on_change)
+
+    # One timer per account, whatever the number of devices
+    mock_call_later.assert_called_once()
+    await mock_call_later.call_args[0][2](None)
+
+
+@pytest.mark.asyncio
+async def test_revalidation_detects_firmware_change(
+    cache: DeviceSnapshotCache,
+) -> None:
+    """Test a firmware update triggers a new setup of the device only."""
+    cache.update(DEVICE_DETAIL)
+    cache.update({**DEVICE_DETAIL, "deviceId": "device_2"})
+    updated = {**DEVICE_DETAIL, "version": "2.900.0000000.1.R"}
+    client = MagicMock()
+    client.async_api_deviceBaseDetailList = AsyncMock(
+        return_value={
+            "count": 2,
+            "deviceList": [updated, {**DEVICE_DETAIL, "deviceId": "device_2"}],
+        }
+    )
+    callbacks = {"device_1": MagicMock(), "device_2": MagicMock()}
+
+    await _run_revalidation(cache, client, callbacks)
+
+    # Both devices revalidated with a single request
+    client.async_api_deviceBaseDetailList.assert_awaited_once_with(
+        ["device_1", "device_2"]
+    )
+    callbacks["device_1"].assert_called_once()
+    callbacks["device_2"].assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_revalidation_failure_keeps_snapshot(
+    cache: DeviceSnapshotCache,
+) -> None:
+    """Test an API error during revalidation is not fatal."""
+    cache.update(DEVICE_DETAIL)
+    client = MagicMock()
+    client.async_api_deviceBaseDetailList = AsyncMock(side_effect=APIError("OP1013"))
+    on_change = MagicMock()
+
+    await _run_revalidation(cache, client, {"device_1": on_change})
+
+    on_change.assert_not_called()
+    assert cache.get("device_1") == DEVICE_DETAIL
+
+
+@pytest.mark.asyncio
+async def test_cancelled_revalidation(cache: DeviceSnapshotCache) -> None:
+    """Test an unloaded device is not revalidated."""
+    cache.update(DEVICE_DETAIL)
+    client = MagicMock()
+    client.async_api_deviceBaseDetailList = AsyncMock()
+
+    with patch(
+        "custom_components.imou_life.device_snapshot.async_call_later"
+    ) as mock_call_later:
+        cache.async_schedule_revalidation(client, "device_1", MagicMock())
+        cache.cancel_revalidation(client, "device_1")
+
+    # The timer is stopped with the last device of the account
+    mock_call_later.return_value.assert_called_once_with()
+    await mock_call_later.call_args[0][2](None)
+    client.async_api_deviceBaseDetailList.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_revalidation_kept_for_other_devices(
+    cache: DeviceSnapshotCache,
+) -> None:
+    """Test the timer keeps running while devices of the account are pending."""
+    cache.update(DEVICE_DETAIL)
+    cache.update({**DEVICE_DETAIL, "deviceId": "device_2"})
+    client = MagicMock()
+    client.async_api_deviceBaseDetailList = AsyncMock(return_value={})
+
+    with patch(
+        "custom_components.imou_life.device_snapshot.async_call_later"
+    ) as mock_call_later:
+        cache.async_schedule_revalidation(client, "device_1", MagicMock())
+        cache.async_schedule_revalidation(client, "device_2", MagicMock())
+        cache.cancel_revalidation(client, "device_1")
+
+    mock_call_later.return_value.assert_not_called()
+    await mock_call_later.call_args[0][2](None)
+    client.async_api_deviceBaseDetailList.assert_awaited_once_with(["device_2"])
+
+
+async def _create_device(detail: dict) -> ImouDevice:
+    """Create a device initialized from its details, without API calls."""
+    client = ImouAccountAPIClient("app", "secret", MagicMock())
+    client.prime_device_details(detail)
+    device = ImouDevice(client, detail["deviceId"])
+    await device.async_initialize()
+    return device
+
+
+@pytest.mark.asyncio
+async def test_last_known_states_restored(cache: DeviceSnapshotCache) -> None:
+    """Test a device gets back the states of its last poll."""
+    detail = {**DEVICE_DETAIL, "ability": f"{DEVICE_DETAIL['ability']},AlarmMD"}
+    cache.update(detail)
+    device = await _create_device(detail)
+    device._status = "1"
+    storage = device.get_sensor_by_name("storageUsed")
+    storage._state, storage._updated = 42, True
+    night_vision = device.get_sensor_by_name("nightVisionMode")
+    night_vision._current_option = "Infrared"
+    night_vision._available_options = ["Infrared", "Intelligent"]
+    night_vision._updated = True
+    motion = device.get_sensor_by_name("motionAlarm")
+    motion._state, motion._updated = True, True
+
+    cache.update_states(device)
+    # Fresh details keep the states
+    cache.update(detail)
+
+    restored = await _create_device(detail)
+    assert cache.restore_states(restored) is True
+    assert restored.get_status() == "1"
+    assert restored.get_sensor_by_name("storageUsed").get_state() == 42
+    assert restored.get_sensor_by_name("storageUsed").is_updated()
+    restored_night_vision = restored.get_sensor_by_name("nightVisionMode")
+    assert restored_night_vision.get_current_option() == "Infrared"
+    assert restored_night_vision.get_available_options() == ["Infrared", "Intelligent"]
+    # Events are not restored
+    assert not restored.get_sensor_by_name("motionAlarm").is_updated()
+    # Sensors never polled are left alone
+    assert not restored.get_sensor_by_name("callbackUrl").is_updated()
+
+
+@pytest.mark.asyncio
+async def test_unchanged_states_not_saved(mock_hass: MagicMock) -> None:
+    """Test the snapshot is only saved when the states changed."""
+    store = make_store()
+    with patch("custom_components.imou_life.device_snapshot.Store", return_value=store):
+        cache = DeviceSnapshotCache(mock_hass)
+        await cache.async_load()
+    cache.update(DEVICE_DETAIL)
+    device = await _create_device(DEVICE_DETAIL)
+    store.async_delay_save.reset_mock()
+
+    cache.update_states(device)
+    cache.update_states(device)
+
+    store.async_delay_save.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_no_states_to_restore(cache: DeviceSnapshotCache) -> None:
+    """Test devices without saved states are left alone."""
+    device = await _create_device(DEVICE_DETAIL)
+
+    assert cache.restore_states(device) is False
+    cache.update(DEVICE_DETAIL)
+    assert cache.restore_states(device) is False
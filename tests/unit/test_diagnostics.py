@@ -1,10 +1,20 @@
 """Tests for the Imou Life Diagnostics."""
 
-from unittest.mock import MagicMock
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
 
 import pytest
 
+from custom_components.imou_life.api_metrics import ApiMetrics
+from custom_components.imou_life.const import (
+    CONF_DEVICE_IDS,
+    CONF_ENTRY_TYPE,
+    ENTRY_TYPE_ACCOUNT,
+)
+from custom_components.imou_life.coordinator import ImouAccountData
 from custom_components.imou_life.diagnostics import async_get_config_entry_diagnostics
+from custom_components.imou_life.poll_scheduler import AccountPollScheduler
+from custom_components.imou_life.startup_orchestrator import StartupOrchestrator
 
 
 class TestDiagnostics:
@@ -14,6 +24,7 @@ class TestDiagnostics:
     def mock_hass(self):
         """Create a mock Home Assistant instance."""
         hass = MagicMock()
+        hass.data = {}
         return hass
 
     @pytest.fixture
@@ -109,3 +120,115 @@ class TestDiagnostics:
         device_info_keys = ["device_id", "device_name", "device_type"]
         for key in device_info_keys:
             assert key in result["device_info"]
+
+    @pytest.mark.asyncio
+    async def test_diagnostics_push_receiver(
+        self, mock_hass, mock_config_entry, mock_coordinator
+    ):
+        """Test diagnostics report the health of push messages."""
+        mock_config_entry.runtime_data = mock_coordinator
+        mock_coordinator.device.get_diagnostics.return_value = {}
+        receiver = mock_coordinator.push_receiver
+        receiver.is_healthy.return_value = True
+        receiver.last_message = None
+        receiver.message_count = 3
+        receiver.get_pushed_sensors.return_value = {"motionAlarm"}
+
+        result = await async_get_config_entry_diagnostics(mock_hass, mock_config_entry)
+
+        assert result["push"] == {
+            "healthy": True,
+            "last_message": None,
+            "message_count": 3,
+            "pushed_sensors": ["motionAlarm"],
+        }
+
+    @pytest.mark.asyncio
+    async def test_diagnostics_api_metrics(
+        self, mock_hass, mock_config_entry, mock_coordinator
+    ):
+        """Test diagnostics report the API calls of the device and account."""
+        mock_config_entry.runtime_data = mock_coordinator
+        mock_coordinator.device.get_diagnostics.return_value = {}
+        mock_coordinator.device.get_device_id.return_value = "device_1"
+        metrics = ApiMetrics("app_id")
+        metrics.record("deviceOnline", "device_1", 0.1)
+        metrics.record("deviceOnline", "device_2", 0.2, error="OP1013")
+        mock_coordinator.api_metrics = metrics
+
+        result = await async_get_config_entry_diagnostics(mock_hass, mock_config_entry)
+
+        assert result["api_metrics"]["device"]["calls"] == 1
+        assert result["api_metrics"]["device"]["share_of_account_calls"] == 50.0
+        assert result["api_metrics"]["account"]["calls"] == 2
+        assert result["api_metrics"]["account"]["errors_by_class"] == {"OP1013": 1}
+
+    @pytest.mark.asyncio
+    async def test_diagnostics_startup_timing(
+        self, mock_hass, mock_config_entry, mock_coordinator
+    ):
+        """Test diagnostics report how long the setup of the entry took."""
+        mock_config_entry.runtime_data = mock_coordinator
+        mock_coordinator.device.get_diagnostics.return_value = {}
+        orchestrator = StartupOrchestrator(mock_hass, "app_id")
+        timing = orchestrator.begin("test_entry_id")
+        with timing.step("initialize"):
+            pass
+        orchestrator.finish("test_entry_id")
+        mock_coordinator.startup_orchestrator = orchestrator
+
+        result = await async_get_config_entry_diagnostics(mock_hass, mock_config_entry)
+
+        assert result["startup"]["entry"]["completed"] is True
+        assert set(result["startup"]["entry"]["steps"]) == {"initialize"}
+        assert result["startup"]["account"]["entries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_diagnostics_poll_schedule(
+        self, mock_hass, mock_config_entry, mock_coordinator
+    ):
+        """Test diagnostics report the poll slot of the device."""
+        mock_config_entry.runtime_data = mock_coordinator
+        mock_coordinator.device.get_diagnostics.return_value = {}
+        mock_coordinator.update_interval = timedelta(seconds=900)
+        scheduler = AccountPollScheduler(mock_hass, "app_id")
+        with patch(
+            "custom_components.imou_life.poll_scheduler.async_track_point_in_utc_time"
+        ):
+            scheduler.register(mock_coordinator)
+
+        result = await async_get_config_entry_diagnostics(mock_hass, mock_config_entry)
+
+        schedule = result["poll_schedule"]
+        assert schedule["devices"] == 1
+        assert 0 <= schedule["slot_offset"] < 900
+        assert schedule["next_poll"] is not None
+        assert schedule["backoff"] is mock_coordinator.backoff.as_dict.return_value
+
+    @pytest.mark.asyncio
+    async def test_diagnostics_account_entry(self, mock_hass):
+        """Test the diagnostics of an account entry list its devices."""
+        entry = MagicMock()
+        entry.data = {CONF_ENTRY_TYPE: ENTRY_TYPE_ACCOUNT, CONF_DEVICE_IDS: ["a", "b"]}
+        entry.as_dict.return_value = {"data": dict(entry.data)}
+        coordinators = {}
+        for device_id in ("a", "b"):
+            coordinator = MagicMock()
+            coordinator.device.get_diagnostics.return_value = {"device_name": device_id}
+            coordinator.startup_orchestrator = None
+            coordinator.poll_scheduler = None
+            coordinator.api_metrics = None
+            coordinator.push_receiver = None
+            coordinators[device_id] = coordinator
+        entry.runtime_data = ImouAccountData(MagicMock(), coordinators)
+
+        result = await async_get_config_entry_diagnostics(mock_hass, entry)
+
+        assert result["entry"]["data"][CONF_DEVICE_IDS] == "**REDACTED**"
+        assert [
+            device["device_info"]["device_name"] for device in result["devices"]
+        ] == [
+            "a",
+            "b",
+        ]
+        assert "device_info" not in result
@@ -10,12 +10,20 @@ from custom_components.imou_life.const import (
     CONF_APP_ID,
     CONF_APP_SECRET,
     CONF_DEVICE_ID,
+    CONF_DEVICE_IDS,
+    CONF_ENTRY_TYPE,
     DEFAULT_API_URL,
     DEFAULT_DISCOVERY_INTERVAL,
+    DISCOVERY_DEVICE_LIST_LIMIT,
     DOMAIN,
+    ENTRY_TYPE_ACCOUNT,
+    OPTION_DISABLED_DEVICES,
     OPTION_DISCOVERY_INTERVAL,
 )
-from custom_components.imou_life.coordinator import ImouDiscoveryCoordinator
+from custom_components.imou_life.coordinator import (
+    ImouDataUpdateCoordinator,
+    ImouDiscoveryCoordinator,
+)
 
 
 class TestImouDiscoveryCoordinator:
@@ -43,6 +51,7 @@ class TestImouDiscoveryCoordinator:
     def mock_hass(self):
         """Create a mock Home Assistant instance."""
         hass = MagicMock()
+        hass.data = {}
         hass.config_entries.async_entries = MagicMock(return_value=[])
         hass.config_entries.flow.async_init = AsyncMock()
         return hass
@@ -79,105 +88,245 @@ class TestImouDiscoveryCoordinator:
         )
         assert coordinator.update_interval == timedelta(seconds=1800)
 
+    @staticmethod
+    def set_devices(mock_api_client, *device_ids):
+        """Make the account hold the given devices."""
+        mock_api_client.async_api_deviceBaseList = AsyncMock(
+            return_value={
+                "count": len(device_ids),
+                "deviceList": [{"deviceId": device_id} for device_id in device_ids],
+            }
+        )
+
+    @pytest.fixture
+    def mock_device_class(self):
+        """Patch the devices initialized by discovery."""
+        with patch(
+            "custom_components.imou_life.coordinator.ImouDevice"
+        ) as mock_device_class:
+            mock_device_class.side_effect = lambda api_client, device_id: MagicMock(
+                async_initialize=AsyncMock(),
+                get_name=MagicMock(return_value=f"Camera {device_id}"),
+            )
+            yield mock_device_class
+
     @pytest.mark.asyncio
-    async def test_async_update_data_no_devices(self, coordinator):
+    async def test_async_update_data_no_devices(self, coordinator, mock_api_client):
         """Test update when no devices are discovered."""
-        with patch(
-            "custom_components.imou_life.coordinator.ImouDiscoverService"
-        ) as mock_discover_service_class:
-            mock_discover_service = MagicMock()
-            mock_discover_service.async_discover_devices = AsyncMock(return_value={})
-            mock_discover_service_class.return_value = mock_discover_service
+        self.set_devices(mock_api_client)
 
-            result = await coordinator._async_update_data()
+        result = await coordinator._async_update_data()
 
-            assert result == {}
-            mock_discover_service.async_discover_devices.assert_called_once()
+        assert result == {}
+        mock_api_client.async_api_deviceBaseList.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_async_update_data_with_new_device(self, coordinator, mock_hass):
+    async def test_async_update_data_with_new_device(
+        self, coordinator, mock_hass, mock_api_client, mock_device_class
+    ):
         """Test update when a new device is discovered."""
-        mock_device = MagicMock()
-        mock_device.get_name = MagicMock(return_value="Test Camera")
+        self.set_devices(mock_api_client, "device_123")
 
-        with patch(
-            "custom_components.imou_life.coordinator.ImouDiscoverService"
-        ) as mock_discover_service_class:
-            mock_discover_service = MagicMock()
-            mock_discover_service.async_discover_devices = AsyncMock(
-                return_value={"device_123": mock_device}
-            )
-            mock_discover_service_class.return_value = mock_discover_service
-
-            result = await coordinator._async_update_data()
+        result = await coordinator._async_update_data()
 
-            assert result == {"device_123": mock_device}
-            mock_discover_service.async_discover_devices.assert_called_once()
-            # Should trigger discovery flow
-            mock_hass.config_entries.flow.async_init.assert_called_once()
+        assert result == {"device_123": {"deviceId": "device_123"}}
+        # Should initialize the device and trigger discovery flow
+        mock_device_class.assert_called_once_with(mock_api_client, "device_123")
+        mock_hass.config_entries.flow.async_init.assert_called_once()
+        data = mock_hass.config_entries.flow.async_init.call_args[1]["data"]
+        assert data["device_id"] == "device_123"
+        assert coordinator.discovered_devices["device_123"] is data["device"]
 
     @pytest.mark.asyncio
-    async def test_async_update_data_with_existing_device(self, coordinator, mock_hass):
+    async def test_async_update_data_with_existing_device(
+        self, coordinator, mock_hass, mock_api_client, mock_device_class
+    ):
         """Test update when discovered device already has a config entry."""
-        mock_device = MagicMock()
-        mock_device.get_name = MagicMock(return_value="Existing Camera")
-
         # Mock existing config entry
         existing_entry = MagicMock()
         existing_entry.data = {CONF_DEVICE_ID: "device_123"}
         mock_hass.config_entries.async_entries = MagicMock(
             return_value=[existing_entry]
         )
+        self.set_devices(mock_api_client, "device_123")
 
-        with patch(
-            "custom_components.imou_life.coordinator.ImouDiscoverService"
-        ) as mock_discover_service_class:
-            mock_discover_service = MagicMock()
-            mock_discover_service.async_discover_devices = AsyncMock(
-                return_value={"device_123": mock_device}
-            )
-            mock_discover_service_class.return_value = mock_discover_service
+        result = await coordinator._async_update_data()
+
+        assert result == {"device_123": {"deviceId": "device_123"}}
+        # Should NOT initialize nor trigger discovery flow for existing device
+        mock_device_class.assert_not_called()
+        mock_hass.config_entries.flow.async_init.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_account_entry_devices_not_offered(
+        self, coordinator, mock_hass, mock_api_client, mock_device_class
+    ):
+        """Test the devices of an account entry count as configured."""
+        account_entry = MagicMock(
+            data={
+                CONF_ENTRY_TYPE: ENTRY_TYPE_ACCOUNT,
+                CONF_DEVICE_IDS: ["device_1", "device_2"],
+            },
+            options={OPTION_DISABLED_DEVICES: ["device_2"]},
+            source="user",
+        )
+        mock_hass.config_entries.async_entries = MagicMock(return_value=[account_entry])
+        self.set_devices(mock_api_client, "device_1", "device_3")
+
+        await coordinator._async_update_data()
+
+        mock_device_class.assert_called_once_with(mock_api_client, "device_3")
+        # A disabled device missing from the account is not reported
+        mock_hass.bus.async_fire.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_ignored_device_not_offered(
+        self, coordinator, mock_hass, mock_api_client, mock_device_class
+    ):
+        """Test a discovery the user ignored is not offered again."""
+        ignored_entry = MagicMock(data={}, unique_id="device_123")
+        mock_hass.config_entries.async_entries = MagicMock(return_value=[ignored_entry])
+        self.set_devices(mock_api_client, "device_123")
+
+        await coordinator._async_update_data()
+
+        mock_hass.config_entries.flow.async_init.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_only_added_devices_are_offered(
+        self, coordinator, mock_hass, mock_api_client, mock_device_class
+    ):
+        """Test later polls only act on the devices added to the account."""
+        self.set_devices(mock_api_client, "device_1")
+        await coordinator._async_update_data()
+
+        # Not configured by the user: offered once, not at every poll
+        await coordinator._async_update_data()
+        assert mock_hass.config_entries.flow.async_init.call_count == 1
+
+        self.set_devices(mock_api_client, "device_1", "device_2")
+        await coordinator._async_update_data()
+
+        assert mock_hass.config_entries.flow.async_init.call_count == 2
+        assert mock_device_class.call_count == 2
+        call_args = mock_hass.config_entries.flow.async_init.call_args
+        assert call_args[1]["data"]["device_id"] == "device_2"
+
+    @pytest.mark.asyncio
+    async def test_re_added_device_offered_again(
+        self, coordinator, mock_hass, mock_api_client, mock_device_class
+    ):
+        """Test a device removed from the account is offered again once re-added."""
+        self.set_devices(mock_api_client, "device_1")
+        await coordinator._async_update_data()
+
+        self.set_devices(mock_api_client)
+        await coordinator._async_update_data()
+        assert "device_1" not in coordinator.offered_device_ids
 
-            result = await coordinator._async_update_data()
+        self.set_devices(mock_api_client, "device_1")
+        await coordinator._async_update_data()
 
-            assert result == {"device_123": mock_device}
-            # Should NOT trigger discovery flow for existing device
-            mock_hass.config_entries.flow.async_init.assert_not_called()
+        assert mock_hass.config_entries.flow.async_init.call_count == 2
 
     @pytest.mark.asyncio
-    async def test_async_update_data_api_exception(self, coordinator):
+    async def test_fresh_details_reused(
+        self, coordinator, mock_api_client, mock_device_class
+    ):
+        """Test a device whose details were just fetched is not fetched again."""
+        details = {"deviceId": "device_1"}
+        mock_api_client.snapshot_cache.get_fresh.return_value = details
+        self.set_devices(mock_api_client, "device_1")
+
+        await coordinator._async_update_data()
+
+        mock_api_client.prime_device_details.assert_called_once_with(details)
+
+    @pytest.mark.asyncio
+    async def test_failed_initialization_retried(
+        self, coordinator, mock_hass, mock_api_client, mock_device_class
+    ):
+        """Test a new device which cannot be initialized is retried next poll."""
+        mock_device_class.side_effect = lambda api_client, device_id: MagicMock(
+            async_initialize=AsyncMock(side_effect=ImouException("error"))
+        )
+        self.set_devices(mock_api_client, "device_1")
+
+        await coordinator._async_update_data()
+
+        mock_hass.config_entries.flow.async_init.assert_not_called()
+        assert "device_1" not in coordinator.known_device_ids
+
+    @pytest.mark.asyncio
+    async def test_removed_device_reported_stale(
+        self, coordinator, mock_hass, mock_api_client
+    ):
+        """Test a configured device no longer in the account is reported once."""
+        entry = MagicMock(
+            entry_id="entry_2", data={CONF_DEVICE_ID: "device_2"}, source="user"
+        )
+        entry.runtime_data = ImouDataUpdateCoordinator(
+            mock_hass, MagicMock(), 900, entry
+        )
+        mock_hass.config_entries.async_entries = MagicMock(return_value=[entry])
+        self.set_devices(mock_api_client, "device_2")
+        await coordinator._async_update_data()
+        mock_hass.bus.async_fire.assert_not_called()
+
+        self.set_devices(mock_api_client)
+        await coordinator._async_update_data()
+        await coordinator._async_update_data()
+
+        mock_hass.bus.async_fire.assert_called_once_with(
+            f"{DOMAIN}_stale_device_detected",
+            {"entry_id": "entry_2", "device_id": "device_2"},
+        )
+        assert entry.runtime_data.stale_device_suspected is True
+
+    @pytest.mark.asyncio
+    async def test_removal_not_checked_on_full_page(
+        self, coordinator, mock_hass, mock_api_client
+    ):
+        """Test devices beyond the first page are not reported as removed."""
+        entry = MagicMock(data={CONF_DEVICE_ID: "device_x"}, source="user")
+        mock_hass.config_entries.async_entries = MagicMock(return_value=[entry])
+        self.set_devices(
+            mock_api_client,
+            *(f"device_{index}" for index in range(DISCOVERY_DEVICE_LIST_LIMIT)),
+        )
+        coordinator.offered_device_ids = set(coordinator.known_device_ids)
+
+        with patch.object(coordinator, "_handle_discovered_device", AsyncMock()):
+            await coordinator._async_update_data()
+
+        mock_hass.bus.async_fire.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_async_update_data_api_exception(self, coordinator, mock_api_client):
         """Test update handles API exceptions gracefully."""
-        with patch(
-            "custom_components.imou_life.coordinator.ImouDiscoverService"
-        ) as mock_discover_service_class:
-            mock_discover_service = MagicMock()
-            mock_discover_service.async_discover_devices = AsyncMock(
-                side_effect=ImouException("API error")
-            )
-            mock_discover_service_class.return_value = mock_discover_service
+        mock_api_client.async_api_deviceBaseList = AsyncMock(
+            side_effect=ImouException("API error")
+        )
 
-            # Should not raise, just return empty dict
-            result = await coordinator._async_update_data()
+        # Should not raise, just return empty dict
+        result = await coordinator._async_update_data()
 
-            assert result == {}
-            mock_discover_service.async_discover_devices.assert_called_once()
+        assert result == {}
+        mock_api_client.async_api_deviceBaseList.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_async_update_data_rate_limit_exception(self, coordinator):
+    async def test_async_update_data_rate_limit_exception(
+        self, coordinator, mock_api_client
+    ):
         """Test update handles rate limit exceptions gracefully."""
-        with patch(
-            "custom_components.imou_life.coordinator.ImouDiscoverService"
-        ) as mock_discover_service_class:
-            mock_discover_service = MagicMock()
-            mock_discover_service.async_discover_devices = AsyncMock(
-                side_effect=ImouException("OP1013 exceed limit")
-            )
-            mock_discover_service_class.return_value = mock_discover_service
+        mock_api_client.async_api_deviceBaseList = AsyncMock(
+            side_effect=ImouException("OP1013 exceed limit")
+        )
 
-            # Should not raise, just return empty dict
-            result = await coordinator._async_update_data()
+        # Should not raise, just return empty dict
+        result = await coordinator._async_update_data()
 
-            assert result == {}
+        assert result == {}
 
     @pytest.mark.asyncio
     async def test_handle_discovered_device_triggers_flow(self, coordinator, mock_hass):
@@ -232,65 +381,35 @@ class TestImouDiscoveryCoordinator:
         mock_hass.config_entries.flow.async_init.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_multiple_devices_discovered(self, coordinator, mock_hass):
+    async def test_multiple_devices_discovered(
+        self, coordinator, mock_hass, mock_api_client, mock_device_class
+    ):
         """Test discovering multiple new devices in one poll."""
-        mock_device_1 = MagicMock()
-        mock_device_1.get_name = MagicMock(return_value="Camera 1")
-        mock_device_2 = MagicMock()
-        mock_device_2.get_name = MagicMock(return_value="Camera 2")
-        mock_device_3 = MagicMock()
-        mock_device_3.get_name = MagicMock(return_value="Camera 3")
-
-        with patch(
-            "custom_components.imou_life.coordinator.ImouDiscoverService"
-        ) as mock_discover_service_class:
-            mock_discover_service = MagicMock()
-            mock_discover_service.async_discover_devices = AsyncMock(
-                return_value={
-                    "device_1": mock_device_1,
-                    "device_2": mock_device_2,
-                    "device_3": mock_device_3,
-                }
-            )
-            mock_discover_service_class.return_value = mock_discover_service
+        self.set_devices(mock_api_client, "device_1", "device_2", "device_3")
 
-            result = await coordinator._async_update_data()
+        result = await coordinator._async_update_data()
 
-            assert len(result) == 3
-            # Should trigger discovery flow for each device
-            assert mock_hass.config_entries.flow.async_init.call_count == 3
+        assert len(result) == 3
+        # Should trigger discovery flow for each device
+        assert mock_hass.config_entries.flow.async_init.call_count == 3
 
     @pytest.mark.asyncio
-    async def test_mixed_new_and_existing_devices(self, coordinator, mock_hass):
+    async def test_mixed_new_and_existing_devices(
+        self, coordinator, mock_hass, mock_api_client, mock_device_class
+    ):
         """Test discovering mix of new and existing devices."""
-        mock_device_new = MagicMock()
-        mock_device_new.get_name = MagicMock(return_value="New Camera")
-        mock_device_existing = MagicMock()
-        mock_device_existing.get_name = MagicMock(return_value="Existing Camera")
-
         # Mock existing config entry
         existing_entry = MagicMock()
         existing_entry.data = {CONF_DEVICE_ID: "device_existing"}
         mock_hass.config_entries.async_entries = MagicMock(
             return_value=[existing_entry]
         )
+        self.set_devices(mock_api_client, "device_new", "device_existing")
 
-        with patch(
-            "custom_components.imou_life.coordinator.ImouDiscoverService"
-        ) as mock_discover_service_class:
-            mock_discover_service = MagicMock()
-            mock_discover_service.async_discover_devices = AsyncMock(
-                return_value={
-                    "device_new": mock_device_new,
-                    "device_existing": mock_device_existing,
-                }
-            )
-            mock_discover_service_class.return_value = mock_discover_service
-
-            result = await coordinator._async_update_data()
+        result = await coordinator._async_update_data()
 
-            assert len(result) == 2
-            # Should only trigger discovery flow for new device
-            assert mock_hass.config_entries.flow.async_init.call_count == 1
-            call_args = mock_hass.config_entries.flow.async_init.call_args
-            assert call_args[1]["data"]["device_id"] == "device_new"
+        assert len(result) == 2
+        # Should only trigger discovery flow for new device
+        assert mock_hass.config_entries.flow.async_init.call_count == 1
+        call_args = mock_hass.config_entries.flow.async_init.call_args
+        assert call_args[1]["data"]["device_id"] == "device_new"
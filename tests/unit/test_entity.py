@@ -4,6 +4,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from custom_components.imou_life.call_budget import CallBudgetExhausted
 from custom_components.imou_life.entity import ImouEntity
 from tests.fixtures.const import MOCK_CONFIG_ENTRY
 
@@ -23,6 +24,7 @@ class TestImouEntity:
         coordinator.device.get_device_id.return_value = "test_entity_123"
         coordinator.device.get_status.return_value = True
         coordinator.hass = MagicMock()
+        coordinator.startup_orchestrator = None
         return coordinator
 
     @pytest.fixture
@@ -95,6 +97,40 @@ class TestImouEntity:
         entity.sensor_instance.set_enabled.assert_called_once_with(True)
         entity.sensor_instance.async_update.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_entity_first_update_deferred_to_orchestrator(self, entity):
+        """Test the first update runs in the background during startup."""
+        orchestrator = MagicMock()
+        entity.coordinator.startup_orchestrator = orchestrator
+
+        await entity.async_added_to_hass()
+
+        entity.sensor_instance.set_enabled.assert_called_once_with(True)
+        entity.sensor_instance.async_update.assert_not_called()
+        orchestrator.async_schedule_update.assert_called_once_with(
+            MOCK_CONFIG_ENTRY.entry_id, entity._async_first_update
+        )
+
+    @pytest.mark.asyncio
+    async def test_entity_restored_state_not_updated(self, entity):
+        """Test a sensor restored from the snapshot waits for the refresh."""
+        entity.sensor_instance.is_updated.return_value = True
+
+        await entity.async_added_to_hass()
+
+        entity.sensor_instance.set_enabled.assert_called_once_with(True)
+        entity.sensor_instance.async_update.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_entity_first_update_skipped_without_budget(self, entity):
+        """Test a first update denied by the call budget is left to the polls."""
+        entity.sensor_instance.async_update.side_effect = CallBudgetExhausted("none")
+        entity.async_write_ha_state = MagicMock()
+
+        await entity._async_first_update()
+
+        entity.async_write_ha_state.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_entity_async_will_remove_from_hass(self, entity):
         """Test entity removed from hass."""
@@ -1,6 +1,20 @@
 """Tests for helper utilities."""
 
-from custom_components.imou_life.helpers import camel_to_snake
+from unittest.mock import MagicMock
+
+from custom_components.imou_life.const import (
+    CONF_DEVICE_ID,
+    CONF_DEVICE_IDS,
+    CONF_ENTRY_TYPE,
+    DOMAIN,
+    ENTRY_TYPE_ACCOUNT,
+)
+from custom_components.imou_life.helpers import (
+    camel_to_snake,
+    get_device_key,
+    is_account_entry,
+)
+from tests.fixtures.mocks import MockConfigEntry
 
 
 class TestCamelToSnake:
@@ -39,3 +53,30 @@ class TestCamelToSnake:
         """Test leading capital letter."""
         assert camel_to_snake("BatteryLevel") == "battery_level"
         assert camel_to_snake("MotionDetect") == "motion_detect"
+
+
+class TestDeviceKey:
+    """Test the keys of the devices of device and account entries."""
+
+    def test_device_entry(self):
+        """Test the device of a device entry is keyed by the entry."""
+        entry = MockConfigEntry(
+            domain=DOMAIN, data={CONF_DEVICE_ID: "device_1"}, entry_id="entry"
+        )
+        device = MagicMock()
+
+        assert is_account_entry(entry) is False
+        assert get_device_key(entry, device) == "entry"
+
+    def test_account_entry(self):
+        """Test the devices of an account entry are keyed by entry and device."""
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={CONF_ENTRY_TYPE: ENTRY_TYPE_ACCOUNT, CONF_DEVICE_IDS: ["device_1"]},
+            entry_id="entry",
+        )
+        device = MagicMock()
+        device.get_device_id.return_value = "device_1"
+
+        assert is_account_entry(entry) is True
+        assert get_device_key(entry, device) == "entry_device_1"
@@ -0,0 +1,128 @@
+"""Tests for the camera snapshot cache."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from imouapi.exceptions import ImouException
+
+from custom_components.imou_life.image_cache import CameraImageCache
+
+
+@pytest.fixture
+def mock_hass() -> MagicMock:
+    """Create a mock HomeAssistant instance running executor jobs inline."""
+    hass = MagicMock()
+
+    async def _run(func, *args):
+        return func(*args)
+
+    hass.async_add_executor_job = AsyncMock(side_effect=_run)
+    return hass
+
+
+@pytest.mark.asyncio
+async def test_snapshot_served_from_cache_within_ttl(mock_hass) -> None:
+    """Test a second request within the TTL does not download again."""
+    cache = CameraImageCache(mock_hass, ttl=30)
+    fetch = AsyncMock(return_value=b"image")
+
+    assert await cache.async_get_image(fetch) == b"image"
+    assert await cache.async_get_image(fetch) == b"image"
+
+    fetch.assert_awaited_once()
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_downloaded_again_after_ttl(mock_hass) -> None:
+    """Test an expired snapshot is replaced."""
+    cache = CameraImageCache(mock_hass, ttl=30)
+    fetch = AsyncMock(side_effect=[b"old", b"new"])
+
+    assert await cache.async_get_image(fetch) == b"old"
+    cache._fetched_at -= 31
+    assert await cache.async_get_image(fetch) == b"new"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_download(mock_hass) -> None:
+    """Test requests arriving during a download wait for it."""
+    cache = CameraImageCache(mock_hass, ttl=0)
+    release = asyncio.Event()
+
+    async def slow_fetch() -> bytes:
+        await release.wait()
+        return b"image"
+
+    fetch = AsyncMock(side_effect=slow_fetch)
+    requests = [asyncio.create_task(cache.async_get_image(fetch)) for _ in range(12)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*requests) == [b"image"] * 12
+    fetch.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_request_does_not_cancel_download(mock_hass) -> None:
+    """Test a request giving up leaves the shared download running."""
+    cache = CameraImageCache(mock_hass, ttl=30)
+    release = asyncio.Event()
+
+    async def slow_fetch() -> bytes:
+        await release.wait()
+        return b"image"
+
+    first = asyncio.create_task(cache.async_get_image(slow_fetch))
+    second = asyncio.create_task(cache.async_get_image(slow_fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == b"image"
+    assert cache.is_fresh()
+
+
+@pytest.mark.asyncio
+async def test_failed_download_is_not_cached(mock_hass) -> None:
+    """Test errors reach the callers and the next request retries."""
+    cache = CameraImageCache(mock_hass, ttl=30)
+    fetch = AsyncMock(side_effect=[ImouException("failed"), b"image"])
+
+    with pytest.raises(ImouException):
+        await cache.async_get_image(fetch)
+
+    assert await cache.async_get_image(fetch) == b"image"
+
+
+@pytest.mark.asyncio
+async def test_resized_variant_computed_once(mock_hass) -> None:
+    """Test each requested size is scaled once per snapshot."""
+    cache = CameraImageCache(mock_hass, ttl=30)
+    fetch = AsyncMock(return_value=b"image")
+
+    with patch(
+        "custom_components.imou_life.image_cache.scale_jpeg_camera_image",
+        side_effect=lambda image, width, height: f"{width}x{height}".encode(),
+    ) as mock_scale:
+        assert await cache.async_get_image(fetch, 640, 360) == b"640x360"
+        assert await cache.async_get_image(fetch, 640, 360) == b"640x360"
+        assert await cache.async_get_image(fetch, 320, 180) == b"320x180"
+        assert await cache.async_get_image(fetch) == b"image"
+
+    assert mock_scale.call_count == 2
+    fetch.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_invalidate(mock_hass) -> None:
+    """Test an invalidated snapshot is downloaded again."""
+    cache = CameraImageCache(mock_hass, ttl=30)
+    fetch = AsyncMock(return_value=b"image")
+    await cache.async_get_image(fetch)
+
+    cache.invalidate()
+    await cache.async_get_image(fetch)
+
+    assert fetch.await_count == 2
@@ -4,7 +4,8 @@ import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
+from imouapi.exceptions import ImouException, InvalidResponse
 
 from custom_components.imou_life import (
     _check_rate_limit_status,
@@ -13,15 +14,29 @@ from custom_components.imou_life import (
     _parse_timeout_option,
     _setup_coordinator,
     async_setup,
+    async_setup_entry,
+    async_update_options,
 )
+from custom_components.imou_life.backoff import get_account_backoff
 from custom_components.imou_life.const import (
+    ACCOUNT_ENTRY_RETRY_DELAY,
+    CONF_DEVICE_IDS,
+    CONF_ENTRY_TYPE,
     DEFAULT_API_URL,
+    DEVICE_SNAPSHOT_KEY,
     DOMAIN,
+    ENTRY_CONFIG_KEY,
+    ENTRY_TYPE_ACCOUNT,
     OPTION_API_TIMEOUT,
     OPTION_CAMERA_WAIT_BEFORE_DOWNLOAD,
+    OPTION_DISABLED_DEVICES,
+    OPTION_SCAN_INTERVAL,
     OPTION_SETUP_TIMEOUT,
     OPTION_WAIT_AFTER_WAKE_UP,
 )
+from custom_components.imou_life.device_snapshot import DeviceSnapshotCache
+from custom_components.imou_life.rate_limit_manager import RateLimitManager
+from tests.fixtures.mocks import MockConfigEntry
 
 
 class TestAsyncSetup:
@@ -32,8 +47,26 @@ class TestAsyncSetup:
         """Test async_setup returns True (YAML not supported)."""
         hass = MagicMock()
         config = {}
-        result = await async_setup(hass, config)
+        with (
+            patch(
+                "custom_components.imou_life.RateLimitManager.async_load",
+                new_callable=AsyncMock,
+            ) as mock_load,
+            patch(
+                "custom_components.imou_life.DeviceSnapshotCache.async_load",
+                new_callable=AsyncMock,
+            ) as mock_load_snapshots,
+            patch(
+                "custom_components.imou_life.BatteryHistoryCache.async_load",
+                new_callable=AsyncMock,
+            ) as mock_load_history,
+        ):
+            result = await async_setup(hass, config)
         assert result is True
+        # State saved before a restart is restored before any entry
+        mock_load.assert_awaited_once()
+        mock_load_snapshots.assert_awaited_once()
+        mock_load_history.assert_awaited_once()
 
 
 class TestTimeoutParsing:
@@ -159,6 +192,112 @@ class TestDeviceInitialization:
         with pytest.raises(ConfigEntryNotReady):
             await _initialize_device(device, entry, hass)
 
+    @pytest.mark.asyncio
+    async def test_initialize_device_rate_limit_counted_once(self):
+        """Test an OP1013 recorded by the account API client is not counted again."""
+        hass = MagicMock()
+        hass.data = {}
+        device = MagicMock()
+        device.get_device_id.return_value = None
+        api_client = device.get_api_client.return_value
+        api_client.backoff = get_account_backoff(hass, "test_app_id")
+
+        async def initialize():
+            api_client.backoff.record_rate_limit("OP1013: exceed limit")
+            raise ImouException("OP1013: exceed limit")
+
+        device.async_initialize = AsyncMock(side_effect=initialize)
+        entry = MagicMock()
+        entry.options = {}
+        entry.data = {"app_id": "test_app_id", "app_secret": "test_secret"}
+
+        with pytest.raises(ConfigEntryNotReady):
+            await _initialize_device(device, entry, hass)
+
+        state = RateLimitManager(hass).get_state("test_app_id", "test_secret")
+        assert state.hit_count == 1
+
+    @pytest.mark.asyncio
+    async def test_initialize_device_from_snapshot_while_rate_limited(self):
+        """Test a cached device comes up without API calls, even rate limited."""
+        device = MagicMock()
+        device.get_device_id.return_value = "device_1"
+        device.async_initialize = AsyncMock()
+        device.get_all_sensors.return_value = [MagicMock()]
+        api_client = device.get_api_client.return_value
+        entry = MagicMock()
+        entry.options = {}
+        entry.data = {
+            "app_id": "test_app_id",
+            "app_secret": "test_secret",
+            "device_id": "device_1",
+        }
+        hass = MagicMock()
+        hass.data = {}
+        snapshot = {"deviceId": "device_1", "version": "1.0"}
+        DeviceSnapshotCache(hass).update(snapshot)
+        hass.data[DOMAIN][DEVICE_SNAPSHOT_KEY]["device_1"].update(
+            updated_at="2024-01-01T00:00:00+00:00",
+            states={"status": "online", "sensors": {}},
+        )
+        RateLimitManager(hass).record_rate_limit("test_app_id", "", "OP1013")
+
+        with patch(
+            "custom_components.imou_life.device_snapshot.async_call_later"
+        ) as mock_call_later:
+            from_snapshot = await _initialize_device(device, entry, hass)
+
+        assert from_snapshot is True
+        api_client.prime_device_details.assert_called_once_with(snapshot)
+        device.async_initialize.assert_awaited_once()
+        device.get_all_sensors()[0].set_enabled.assert_called_once_with(False)
+        # Details are revalidated in the background
+        mock_call_later.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_initialize_discovered_device(self):
+        """Test a device added from a discovery reuses the details it fetched."""
+        device = MagicMock()
+        device.get_device_id.return_value = "device_1"
+        device.async_initialize = AsyncMock()
+        api_client = device.get_api_client.return_value
+        entry = MagicMock()
+        entry.options = {}
+        entry.data = {"app_id": "test_app_id", "device_id": "device_1"}
+        hass = MagicMock()
+        hass.data = {}
+        snapshot = {"deviceId": "device_1", "version": "1.0"}
+        DeviceSnapshotCache(hass).update(snapshot)
+
+        with patch(
+            "custom_components.imou_life.device_snapshot.async_call_later"
+        ) as mock_call_later:
+            from_snapshot = await _initialize_device(device, entry, hass)
+
+        api_client.prime_device_details.assert_called_once_with(snapshot)
+        # Fresh details need no revalidation
+        mock_call_later.assert_not_called()
+        # No state to restore, the first refresh is not deferred
+        assert from_snapshot is False
+
+    @pytest.mark.asyncio
+    async def test_initialize_device_invalid_snapshot(self):
+        """Test an unusable snapshot is dropped and setup retried."""
+        device = MagicMock()
+        device.get_device_id.return_value = "device_1"
+        device.async_initialize = AsyncMock(side_effect=InvalidResponse("bad"))
+        entry = MagicMock()
+        entry.options = {}
+        entry.data = {"app_id": "test_app_id", "device_id": "device_1"}
+        hass = MagicMock()
+        hass.data = {}
+        DeviceSnapshotCache(hass).update({"deviceId": "device_1"})
+
+        with pytest.raises(ConfigEntryNotReady):
+            await _initialize_device(device, entry, hass)
+
+        assert DeviceSnapshotCache(hass).get("device_1") is None
+
 
 class TestCoordinatorSetup:
     """Test coordinator setup."""
@@ -180,6 +319,65 @@ class TestCoordinatorSetup:
             with pytest.raises(ConfigEntryNotReady):
                 await _setup_coordinator(hass, device, entry)
 
+    @pytest.mark.asyncio
+    async def test_setup_coordinator_from_snapshot_while_rate_limited(self):
+        """Test the initial fetch is deferred for cached devices when limited."""
+        hass = MagicMock()
+        hass.data = {}
+        device = MagicMock()
+        entry = MagicMock()
+        entry.options = {}
+        entry.data = {"app_id": "test_app_id", "app_secret": "test_secret"}
+        RateLimitManager(hass).record_rate_limit("test_app_id", "", "OP1013")
+
+        with (
+            patch(
+                "custom_components.imou_life.ImouDataUpdateCoordinator"
+            ) as MockCoordinator,
+            patch("custom_components.imou_life.get_poll_scheduler") as mock_scheduler,
+        ):
+            coordinator = MockCoordinator.return_value
+            coordinator.async_refresh = AsyncMock()
+
+            result = await _setup_coordinator(hass, device, entry, from_snapshot=True)
+
+        assert result is coordinator
+        coordinator.async_refresh.assert_not_awaited()
+        mock_scheduler.return_value.register.assert_called_once_with(coordinator)
+
+    @pytest.mark.asyncio
+    async def test_setup_coordinator_from_snapshot_refreshes_in_background(self):
+        """Test a cached device does not wait for its first refresh."""
+        hass = MagicMock()
+        hass.data = {}
+        device = MagicMock()
+        entry = MagicMock()
+        entry.entry_id = "entry_1"
+        entry.options = {}
+        entry.data = {"app_id": "test_app_id", "app_secret": "test_secret"}
+
+        with (
+            patch(
+                "custom_components.imou_life.ImouDataUpdateCoordinator"
+            ) as MockCoordinator,
+            patch("custom_components.imou_life.get_poll_scheduler") as mock_scheduler,
+            patch(
+                "custom_components.imou_life.get_startup_orchestrator"
+            ) as mock_orchestrator,
+        ):
+            coordinator = MockCoordinator.return_value
+            coordinator.async_refresh = AsyncMock()
+            mock_orchestrator.return_value.async_schedule_refresh.return_value = 10
+
+            result = await _setup_coordinator(hass, device, entry, from_snapshot=True)
+
+        assert result is coordinator
+        coordinator.async_refresh.assert_not_awaited()
+        mock_scheduler.return_value.register.assert_called_once_with(coordinator)
+        mock_orchestrator.return_value.async_schedule_refresh.assert_called_once_with(
+            "entry_1", coordinator
+        )
+
 
 class TestRateLimitNotification:
     """Test rate limit notification."""
@@ -237,7 +435,7 @@ class TestAPIClientSetup:
         }
         session = MagicMock()
 
-        with patch("custom_components.imou_life.ImouAPIClient") as MockAPIClient:
+        with patch("custom_components.imou_life.ImouAccountAPIClient") as MockAPIClient:
             api_client = MockAPIClient.return_value
 
             _create_api_client(device_config, session, entry)
@@ -258,7 +456,7 @@ class TestAPIClientSetup:
         }
         session = MagicMock()
 
-        with patch("custom_components.imou_life.ImouAPIClient") as MockAPIClient:
+        with patch("custom_components.imou_life.ImouAccountAPIClient") as MockAPIClient:
             api_client = MockAPIClient.return_value
 
             _create_api_client(device_config, session, entry)
@@ -266,6 +464,286 @@ class TestAPIClientSetup:
             # Should not set timeout
             api_client.set_timeout.assert_not_called()
 
+    @pytest.mark.asyncio
+    async def test_entries_of_same_account_share_api_client(self):
+        """Test entries with the same credentials reuse one API client."""
+        from custom_components.imou_life import (
+            _release_api_client,
+            _setup_api_client_and_device,
+        )
+
+        hass = MagicMock()
+        hass.data = {}
+        entries = []
+        for device_id in ("device_1", "device_2"):
+            entry = MagicMock()
+            entry.options = {}
+            entry.data = {
+                "api_url": DEFAULT_API_URL,
+                "app_id": "test_id",
+                "app_secret": "test_secret",
+                "device_id": device_id,
+                "device_name": device_id,
+            }
+            entries.append(entry)
+
+        with (
+            patch("custom_components.imou_life.async_get_clientsession"),
+            patch("custom_components.imou_life.ImouAccountAPIClient") as MockAPIClient,
+            patch("custom_components.imou_life.ImouDevice"),
+        ):
+            first_client, _ = await _setup_api_client_and_device(hass, entries[0])
+            second_client, _ = await _setup_api_client_and_device(hass, entries[1])
+
+        assert first_client is second_client
+        MockAPIClient.assert_called_once()
+
+        _release_api_client(hass, entries[0])
+        _release_api_client(hass, entries[1])
+        assert hass.data[DOMAIN]["api_clients"] == {}
+
+
+class TestAccountEntrySetup:
+    """Test the setup of an entry holding all the devices of an account."""
+
+    @pytest.fixture
+    def entry(self):
+        """Create an account entry with a disabled device."""
+        return MockConfigEntry(
+            domain=DOMAIN,
+            data={
+                CONF_ENTRY_TYPE: ENTRY_TYPE_ACCOUNT,
+                "api_url": DEFAULT_API_URL,
+                "app_id": "test_id",
+                "app_secret": "test_secret",
+                CONF_DEVICE_IDS: ["device_1", "device_2", "device_3"],
+            },
+            entry_id="account",
+            version=3,
+            options={OPTION_DISABLED_DEVICES: ["device_3"]},
+        )
+
+    @staticmethod
+    def create_device(api_client, device_config, entry):
+        """Create a mock device of the account."""
+        device = MagicMock()
+        device.get_device_id.return_value = device_config["device_id"]
+        return device
+
+    async def _setup(self, entry, results):
+        """Set the entry up, the device setups returning or raising results."""
+        hass = MagicMock()
+        hass.data = {}
+
+        async def setup_device(hass, entry, api_client, device):
+            result = results[device.get_device_id()]
+            if isinstance(result, BaseException):
+                raise result
+            return result
+
+        with (
+            patch("custom_components.imou_life._cleanup_orphan_devices"),
+            patch("custom_components.imou_life._setup_api_client"),
+            patch("custom_components.imou_life._remove_disabled_devices"),
+            patch(
+                "custom_components.imou_life._create_device_instance",
+                side_effect=self.create_device,
+            ) as mock_create_device,
+            patch(
+                "custom_components.imou_life._async_setup_device",
+                side_effect=setup_device,
+            ),
+            patch(
+                "custom_components.imou_life._async_finish_setup",
+                new_callable=AsyncMock,
+            ) as mock_finish,
+            patch("custom_components.imou_life._release_api_client") as mock_release,
+            patch(
+                "custom_components.imou_life._release_coordinator"
+            ) as mock_release_coordinator,
+            patch("custom_components.imou_life.async_call_later") as mock_call_later,
+        ):
+            try:
+                await async_setup_entry(hass, entry)
+            finally:
+                self.created = [
+                    call.args[1]["device_id"] for call in mock_create_device.mock_calls
+                ]
+                self.finish = mock_finish
+                self.release = mock_release
+                self.release_coordinator = mock_release_coordinator
+                self.call_later = mock_call_later
+
+    @pytest.mark.asyncio
+    async def test_devices_set_up(self, entry):
+        """Test every enabled device of the account gets a coordinator."""
+        coordinators = {"device_1": MagicMock(), "device_2": MagicMock()}
+
+        await self._setup(entry, coordinators)
+
+        assert self.created == ["device_1", "device_2"]
+        assert entry.runtime_data.coordinators == coordinators
+        assert self.finish.await_args.args[3] == list(coordinators.values())
+        self.call_later.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failed_device_retried_later(self, entry):
+        """Test a device failing does not hold the others back."""
+        coordinator = MagicMock()
+
+        await self._setup(
+            entry, {"device_1": coordinator, "device_2": ConfigEntryNotReady("busy")}
+        )
+
+        assert entry.runtime_data.coordinators == {"device_1": coordinator}
+        assert self.call_later.call_args.args[1] == ACCOUNT_ENTRY_RETRY_DELAY
+        self.release.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_all_devices_failed(self, entry):
+        """Test the entry is retried when none of its devices could be set up."""
+        with pytest.raises(ConfigEntryNotReady):
+            await self._setup(
+                entry,
+                {
+                    "device_1": InvalidResponse("bad"),
+                    "device_2": InvalidResponse("bad"),
+                },
+            )
+
+        self.finish.assert_not_awaited()
+        self.release.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_auth_failure_raised(self, entry):
+        """Test invalid credentials fail the whole entry."""
+        coordinator = MagicMock()
+        with pytest.raises(ConfigEntryAuthFailed):
+            await self._setup(
+                entry,
+                {"device_1": ConfigEntryAuthFailed("auth"), "device_2": coordinator},
+            )
+
+        # The devices set up anyway are released with the entry
+        self.release_coordinator.assert_called_once()
+        assert self.release_coordinator.call_args.args[1:] == (entry, coordinator)
+        self.release.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_setup_released(self, entry):
+        """Test the devices already set up are released when the setup is cancelled."""
+        coordinator = MagicMock()
+        with pytest.raises(asyncio.CancelledError):
+            await self._setup(
+                entry,
+                {"device_1": coordinator, "device_2": asyncio.CancelledError()},
+            )
+
+        self.release_coordinator.assert_called_once()
+        assert self.release_coordinator.call_args.args[1:] == (entry, coordinator)
+        self.finish.assert_not_awaited()
+        self.release.assert_called_once()
+
+
+class TestOptionsUpdate:
+    """Test option changes are applied without reloading when they can be."""
+
+    @pytest.fixture
+    def hass(self):
+        """Create a mock hass with the entry set up with no options."""
+        hass = MagicMock()
+        hass.data = {DOMAIN: {ENTRY_CONFIG_KEY: {"entry": ({"app_id": "app"}, {})}}}
+        hass.config_entries.async_entries.return_value = []
+        return hass
+
+    @pytest.fixture
+    def entry(self):
+        """Create a device entry with a running coordinator."""
+        entry = MockConfigEntry(domain=DOMAIN, data={"app_id": "app"}, entry_id="entry")
+        entry.runtime_data = MagicMock()
+        return entry
+
+    @pytest.mark.asyncio
+    async def test_hot_options_applied(self, hass, entry):
+        """Test an interval change is pushed to the running coordinator."""
+        entry.options = {OPTION_SCAN_INTERVAL: 600, OPTION_API_TIMEOUT: 20}
+        api_client = MagicMock()
+
+        with (
+            patch("custom_components.imou_life.async_reload_entry") as mock_reload,
+            patch(
+                "custom_components.imou_life.ApiClientPool.get",
+                return_value=api_client,
+            ),
+        ):
+            await async_update_options(hass, entry)
+
+        mock_reload.assert_not_called()
+        entry.runtime_data.async_apply_options.assert_called_once_with(
+            {OPTION_SCAN_INTERVAL, OPTION_API_TIMEOUT}
+        )
+        api_client.set_timeout.assert_called_once_with(20)
+        assert hass.data[DOMAIN][ENTRY_CONFIG_KEY]["entry"][1] == entry.options
+
+        # Cleared options go back to their default
+        entry.options = {OPTION_SCAN_INTERVAL: 600}
+        with (
+            patch(
+                "custom_components.imou_life.ApiClientPool.get",
+                return_value=api_client,
+            ),
+            patch("custom_components.imou_life.DEFAULT_TIMEOUT", 10),
+        ):
+            await async_update_options(hass, entry)
+
+        api_client.set_timeout.assert_called_with(10)
+
+    @pytest.mark.asyncio
+    async def test_other_changes_reload(self, hass, entry):
+        """Test the options that change the devices set up reload the entry."""
+        entry.options = {OPTION_SCAN_INTERVAL: 600, OPTION_DISABLED_DEVICES: ["a"]}
+
+        with patch(
+            "custom_components.imou_life.async_reload_entry", new_callable=AsyncMock
+        ) as mock_reload:
+            await async_update_options(hass, entry)
+
+        mock_reload.assert_awaited_once_with(hass, entry)
+        entry.runtime_data.async_apply_options.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_data_change_reloads(self, hass, entry):
+        """Test a change to the data of the entry reloads it."""
+        hass.data[DOMAIN][ENTRY_CONFIG_KEY]["entry"] = ({"app_id": "old"}, {})
+
+        with patch(
+            "custom_components.imou_life.async_reload_entry", new_callable=AsyncMock
+        ) as mock_reload:
+            await async_update_options(hass, entry)
+
+        mock_reload.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_no_change_no_reload(self, hass, entry):
+        """Test an update which changes nothing we use, e.g. the title, is ignored."""
+        with patch("custom_components.imou_life.async_reload_entry") as mock_reload:
+            await async_update_options(hass, entry)
+
+        mock_reload.assert_not_called()
+        entry.runtime_data.async_apply_options.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_entry_not_set_up_reloads(self, hass, entry):
+        """Test an entry which is not set up is set up with its new options."""
+        hass.data[DOMAIN][ENTRY_CONFIG_KEY] = {}
+
+        with patch(
+            "custom_components.imou_life.async_reload_entry", new_callable=AsyncMock
+        ) as mock_reload:
+            await async_update_options(hass, entry)
+
+        mock_reload.assert_awaited_once()
+
 
 # Note: Migration tests are skipped because MockConfigEntry doesn't allow
 # direct version assignment like the real ConfigEntry does. Migration code
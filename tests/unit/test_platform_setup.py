@@ -4,6 +4,8 @@ from unittest.mock import MagicMock
 
 import pytest
 
+from custom_components.imou_life.const import CONF_ENTRY_TYPE, ENTRY_TYPE_ACCOUNT
+from custom_components.imou_life.coordinator import ImouAccountData
 from custom_components.imou_life.entity import ImouEntity
 from custom_components.imou_life.platform_setup import setup_platform
 
@@ -192,3 +194,38 @@ class TestPlatformSetup:
 
         # Verify both entities were added to coordinator.entities
         assert len(mock_coordinator.entities) == 2
+
+    @pytest.mark.asyncio
+    async def test_setup_platform_account_entry(self, mock_entity_class):
+        """Test the entities of every device of an account entry are added."""
+        coordinators = {}
+        for device_id in ("device_1", "device_2"):
+            coordinator = MagicMock()
+            coordinator.device.get_device_id.return_value = device_id
+            sensor = MagicMock()
+            sensor.get_name.return_value = "motionDetect"
+            coordinator.device.get_sensors_by_platform.return_value = [sensor]
+            coordinator.entities = []
+            coordinators[device_id] = coordinator
+        config_entry = MagicMock()
+        config_entry.entry_id = "account"
+        config_entry.data = {CONF_ENTRY_TYPE: ENTRY_TYPE_ACCOUNT}
+        config_entry.runtime_data = ImouAccountData(MagicMock(), coordinators)
+        async_add_devices = MagicMock()
+
+        await setup_platform(
+            MagicMock(),
+            config_entry,
+            "switch",
+            mock_entity_class,
+            "switch.{}",
+            async_add_devices,
+        )
+
+        added_devices = async_add_devices.call_args[0][0]
+        assert [entity.unique_id for entity in added_devices] == [
+            "account_device_1_motionDetect",
+            "account_device_2_motionDetect",
+        ]
+        for coordinator in coordinators.values():
+            assert len(coordinator.entities) == 1
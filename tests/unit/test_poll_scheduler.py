@@ -0,0 +1,242 @@
+"""Tests for the account-wide poll scheduler."""
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.imou_life.backoff import get_account_backoff
+from custom_components.imou_life.const import (
+    ACCOUNT_POLL_MAX_JITTER,
+    BACKOFF_RESUME_STAGGER,
+    DOMAIN,
+    POLL_SCHEDULER_KEY,
+)
+from custom_components.imou_life.coordinator import ImouDataUpdateCoordinator
+from custom_components.imou_life.poll_scheduler import (
+    AccountPollScheduler,
+    get_poll_scheduler,
+    get_stable_fraction,
+    release_poll_scheduler,
+)
+
+
+@pytest.fixture(autouse=True)
+def mock_track_point_in_time():
+    """Capture timers armed by the scheduler."""
+    with patch(
+        "custom_components.imou_life.poll_scheduler.async_track_point_in_utc_time"
+    ) as mock_track:
+        yield mock_track
+
+
+def make_coordinator(
+    scan_interval: int = 900, device_id: str | None = None
+) -> MagicMock:
+    """Create a mock device coordinator."""
+    coordinator = MagicMock()
+    if device_id is not None:
+        coordinator.device.get_device_id.return_value = device_id
+    coordinator.update_interval = timedelta(seconds=scan_interval)
+    coordinator.config_entry = None
+    coordinator.async_refresh = AsyncMock()
+    return coordinator
+
+
+def test_register_takes_over_polling(mock_hass, mock_track_point_in_time) -> None:
+    """Test registering a coordinator arms the account timer."""
+    scheduler = AccountPollScheduler(mock_hass, "app")
+    coordinator = make_coordinator()
+
+    scheduler.register(coordinator)
+
+    assert coordinator.poll_scheduler is scheduler
+    assert scheduler.coordinators == [coordinator]
+    mock_track_point_in_time.assert_called_once()
+    assert mock_track_point_in_time.call_args[0][2] == scheduler.get_next_poll()
+
+
+def test_stable_fraction() -> None:
+    """Test the hash of a device ID does not change between runs."""
+    assert get_stable_fraction("device_1") == get_stable_fraction("device_1")
+    assert get_stable_fraction("device_1") != get_stable_fraction("device_2")
+    assert 0 <= get_stable_fraction("device_1") < 1
+
+
+def test_slots_spread_evenly_over_interval(mock_hass) -> None:
+    """Test devices registered together get evenly spaced slots."""
+    scheduler = AccountPollScheduler(mock_hass, "app")
+    coordinators = [make_coordinator(900, f"device_{index}") for index in range(4)]
+    for coordinator in coordinators:
+        scheduler.register(coordinator)
+
+    phases = sorted(scheduler.get_phase(coordinator) for coordinator in coordinators)
+    gaps = [(b - a) for a, b in zip(phases, phases[1:])] + [phases[0] + 1 - phases[-1]]
+    assert gaps == pytest.approx([0.25] * 4)
+
+    # Every device is due at its own slot, not all at once
+    due = sorted(scheduler._next_due[coordinator] for coordinator in coordinators)
+    for previous, current in zip(due, due[1:]):
+        gap = (current - previous).total_seconds()
+        assert 225 - ACCOUNT_POLL_MAX_JITTER <= gap <= 225 + ACCOUNT_POLL_MAX_JITTER
+
+
+def test_slots_are_deterministic(mock_hass) -> None:
+    """Test the same devices get the same slots, whatever the setup order."""
+    first = AccountPollScheduler(mock_hass, "app")
+    second = AccountPollScheduler(mock_hass, "app")
+    device_ids = [f"device_{index}" for index in range(3)]
+    for device_id in device_ids:
+        first.register(make_coordinator(900, device_id))
+    for device_id in reversed(device_ids):
+        second.register(make_coordinator(900, device_id))
+
+    def phases(scheduler):
+        return {
+            coordinator.device.get_device_id(): scheduler.get_phase(coordinator)
+            for coordinator in scheduler.coordinators
+        }
+
+    assert phases(first) == phases(second)
+
+
+def test_slots_rebalanced_on_removal(mock_hass) -> None:
+    """Test the remaining devices are spread again when one is removed."""
+    scheduler = AccountPollScheduler(mock_hass, "app")
+    coordinators = [make_coordinator(900, f"device_{index}") for index in range(3)]
+    for coordinator in coordinators:
+        scheduler.register(coordinator)
+
+    scheduler.unregister(coordinators[1])
+
+    first, second = (scheduler.get_phase(c) for c in scheduler.coordinators)
+    assert abs(first - second) == pytest.approx(0.5)
+    assert scheduler.get_phase(coordinators[1]) is None
+
+
+def test_next_poll_anchored_to_slot(mock_hass) -> None:
+    """Test a device is polled at its slot plus bounded jitter."""
+    scheduler = AccountPollScheduler(mock_hass, "app")
+    coordinator = make_coordinator(900, "device_1")
+    scheduler.register(coordinator)
+
+    now = dt_util.utcnow()
+    due = scheduler._next_due[coordinator]
+    offset = scheduler.get_phase(coordinator) * 900
+    jitter = (due.timestamp() - offset) % 900
+    assert 0 <= jitter <= ACCOUNT_POLL_MAX_JITTER
+    # The first poll after setup is at least half an interval away
+    assert now + timedelta(seconds=449) <= due <= now + timedelta(seconds=1351)
+
+
+@pytest.mark.asyncio
+async def test_poll_cycle_only_polls_due_devices(mock_hass) -> None:
+    """Test a cycle refreshes due devices and reschedules them."""
+    scheduler = AccountPollScheduler(mock_hass, "app")
+    due = make_coordinator()
+    not_due = make_coordinator()
+    scheduler.register(due)
+    scheduler.register(not_due)
+    scheduler._next_due[due] = dt_util.utcnow()
+    scheduler._next_due[not_due] = dt_util.utcnow() + timedelta(hours=1)
+
+    await scheduler.async_poll_due_devices()
+
+    due.async_refresh.assert_awaited_once()
+    not_due.async_refresh.assert_not_awaited()
+    # Rescheduled to its next slot, at least half a scan interval away
+    assert scheduler._next_due[due] > dt_util.utcnow() + timedelta(seconds=449)
+
+
+@pytest.mark.asyncio
+async def test_poll_cycle_bounded_concurrency(mock_hass) -> None:
+    """Test no more than max_concurrency devices are polled at once."""
+    scheduler = AccountPollScheduler(mock_hass, "app", max_concurrency=2)
+    running = 0
+    peak = 0
+
+    async def slow_refresh():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    coordinators = []
+    for _ in range(6):
+        coordinator = make_coordinator()
+        coordinator.async_refresh = AsyncMock(side_effect=slow_refresh)
+        scheduler.register(coordinator)
+        coordinators.append(coordinator)
+    for coordinator in coordinators:
+        scheduler._next_due[coordinator] = dt_util.utcnow()
+
+    await scheduler.async_poll_due_devices()
+
+    assert peak == 2
+    for coordinator in coordinators:
+        coordinator.async_refresh.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_suspended_account_resumes_staggered(mock_hass) -> None:
+    """Test no device is polled while suspended, and they resume one by one."""
+    scheduler = AccountPollScheduler(mock_hass, "app")
+    coordinators = [make_coordinator(900, f"device_{index}") for index in range(3)]
+    for coordinator in coordinators:
+        scheduler.register(coordinator)
+    for coordinator in coordinators:
+        scheduler._next_due[coordinator] = dt_util.utcnow()
+    suspended_until = dt_util.utcnow() + timedelta(minutes=5)
+    get_account_backoff(mock_hass, "app").suspended_until = suspended_until
+
+    await scheduler.async_poll_due_devices()
+
+    for coordinator in coordinators:
+        coordinator.async_refresh.assert_not_awaited()
+    due = sorted(scheduler._next_due.values())
+    assert due[0] >= suspended_until
+    for previous, current in zip(due, due[1:]):
+        assert (current - previous).total_seconds() >= BACKOFF_RESUME_STAGGER
+
+
+@pytest.mark.asyncio
+async def test_poll_cycle_skips_entries_with_polling_disabled(mock_hass) -> None:
+    """Test the entry's disable polling system option is honoured."""
+    scheduler = AccountPollScheduler(mock_hass, "app")
+    coordinator = make_coordinator()
+    coordinator.config_entry = MagicMock(pref_disable_polling=True)
+    scheduler.register(coordinator)
+    scheduler._next_due[coordinator] = dt_util.utcnow()
+
+    await scheduler.async_poll_due_devices()
+
+    coordinator.async_refresh.assert_not_awaited()
+
+
+def test_release_drops_empty_scheduler(mock_hass) -> None:
+    """Test the account scheduler is removed with its last device."""
+    scheduler = get_poll_scheduler(mock_hass, "app")
+    assert get_poll_scheduler(mock_hass, "app") is scheduler
+    coordinator = make_coordinator()
+    scheduler.register(coordinator)
+
+    release_poll_scheduler(mock_hass, coordinator)
+
+    assert coordinator.poll_scheduler is None
+    assert "app" not in mock_hass.data[DOMAIN][POLL_SCHEDULER_KEY]
+
+
+def test_coordinator_does_not_self_schedule_when_driven(mock_hass) -> None:
+    """Test a coordinator driven by the scheduler has no timer of its own."""
+    coordinator = ImouDataUpdateCoordinator(mock_hass, MagicMock(), 900)
+    coordinator.poll_scheduler = MagicMock()
+
+    with patch(
+        "homeassistant.helpers.update_coordinator.DataUpdateCoordinator._schedule_refresh"
+    ) as mock_schedule:
+        coordinator._schedule_refresh()
+
+    mock_schedule.assert_not_called()
@@ -0,0 +1,304 @@
+"""Tests for the power state shared by the coordinators of a device."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.imou_life.const import (
+    DOMAIN,
+    POWER_STATE_KEY,
+    POWER_STATUS_DORMANT,
+    POWER_STATUS_ONLINE,
+)
+from custom_components.imou_life.coordinator import ImouDataUpdateCoordinator
+from custom_components.imou_life.power_state import (
+    DevicePowerState,
+    get_device_power_state,
+    release_device_power_state,
+)
+from tests.unit.conftest import create_coordinator_with_options
+
+
+@pytest.fixture
+def mock_hass() -> MagicMock:
+    """Create a mock HomeAssistant instance running background tasks."""
+    hass = MagicMock()
+    hass.data = {}
+    hass.async_create_background_task.side_effect = (
+        lambda target, name: asyncio.get_running_loop().create_task(target)
+    )
+    return hass
+
+
+async def wait_background_tasks() -> None:
+    """Let the background tasks started by the power state run."""
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_deferred_jobs_flushed_on_wake(mock_hass: MagicMock) -> None:
+    """Test jobs deferred while asleep run once, together, on wake up."""
+    power_state = DevicePowerState(mock_hass, "device")
+    power_state.async_set_status(POWER_STATUS_DORMANT)
+    replaced = AsyncMock()
+    poll = AsyncMock()
+    settings = AsyncMock(side_effect=Exception("failed"))
+
+    power_state.async_defer("poll", replaced)
+    power_state.async_defer("poll", poll)
+    power_state.async_defer("settings", settings)
+    await wait_background_tasks()
+
+    assert power_state.get_deferred_jobs() == ["poll", "settings"]
+    poll.assert_not_called()
+
+    power_state.async_set_status(POWER_STATUS_ONLINE)
+    await wait_background_tasks()
+
+    replaced.assert_not_called()
+    poll.assert_awaited_once()
+    settings.assert_awaited_once()
+    assert power_state.get_deferred_jobs() == []
+
+
+@pytest.mark.asyncio
+async def test_sleep_mode_keeps_device_asleep(mock_hass: MagicMock) -> None:
+    """Test a device in sleep mode stays asleep while the cloud reports it online."""
+    power_state = DevicePowerState(mock_hass, "device")
+    power_state.async_set_sleep_mode(True)
+    job = AsyncMock()
+    power_state.async_defer("poll", job)
+
+    power_state.async_set_status(POWER_STATUS_ONLINE)
+    power_state.async_set_status("0")
+    await wait_background_tasks()
+
+    assert power_state.is_asleep() is True
+    job.assert_not_called()
+
+    power_state.async_set_sleep_mode(False)
+    await wait_background_tasks()
+    job.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_job_deferred_while_awake_runs(mock_hass: MagicMock) -> None:
+    """Test a job deferred while the device is awake runs right away."""
+    power_state = DevicePowerState(mock_hass, "device")
+    job = AsyncMock()
+
+    power_state.async_defer("poll", job)
+    await wait_background_tasks()
+
+    job.assert_awaited_once()
+
+
+def test_get_device_power_state_per_device(mock_hass: MagicMock) -> None:
+    """Test the power state is shared by the coordinators of a device."""
+    power_state = get_device_power_state(mock_hass, "device")
+
+    assert get_device_power_state(mock_hass, "device") is power_state
+    assert get_device_power_state(mock_hass, "other") is not power_state
+    assert mock_hass.data[DOMAIN][POWER_STATE_KEY]["device"] is power_state
+
+
+@pytest.mark.asyncio
+async def test_release_device_power_state(mock_hass: MagicMock) -> None:
+    """Test the jobs of a released device are dropped, the running ones stopped."""
+    power_state = get_device_power_state(mock_hass, "device")
+    started = asyncio.Event()
+    stopped = asyncio.Event()
+
+    async def running():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        finally:
+            stopped.set()
+
+    power_state.async_defer("poll", running)
+    await started.wait()
+    power_state.async_set_status(POWER_STATUS_DORMANT)
+    deferred = AsyncMock()
+    power_state.async_defer("settings", deferred)
+
+    release_device_power_state(mock_hass, "device")
+    power_state.async_set_status(POWER_STATUS_ONLINE)
+    await wait_background_tasks()
+
+    deferred.assert_not_called()
+    await asyncio.wait_for(stopped.wait(), 1)
+    assert "device" not in mock_hass.data[DOMAIN][POWER_STATE_KEY]
+    release_device_power_state(mock_hass, "device")
+
+
+class TestSleepingDevicePolls:
+    """Test the device coordinator does not wake a sleeping device up."""
+
+    @pytest.fixture
+    def sensor(self):
+        """Create a sensor of the device."""
+        sensor = MagicMock()
+        sensor.get_name.return_value = "battery"
+        sensor.get_state.return_value = 80
+        sensor.async_update = AsyncMock()
+        return sensor
+
+    @pytest.fixture
+    def device(self, sensor):
+        """Create a sleepable device."""
+        device = MagicMock()
+        device.get_device_id.return_value = "device"
+        device.get_sleepable.return_value = True
+        device.get_status.return_value = POWER_STATUS_DORMANT
+        device.async_get_data = AsyncMock(return_value=True)
+        device.async_refresh_status = AsyncMock()
+        device.get_sensors_by_platform.side_effect = lambda platform: (
+            [sensor] if platform == "sensor" else []
+        )
+        return device
+
+    @pytest.fixture
+    def coordinator(self, mock_hass, device):
+        """Create a coordinator of the device."""
+        coordinator = ImouDataUpdateCoordinator(mock_hass, device, scan_interval=900)
+        coordinator.async_request_refresh = AsyncMock()
+        return coordinator
+
+    @pytest.mark.asyncio
+    async def test_asleep_only_status_polled(self, coordinator, device, sensor):
+        """Test only the online status of a sleeping device is polled."""
+        await coordinator._async_update_data()
+        await wait_background_tasks()
+
+        device.async_refresh_status.assert_awaited_once()
+        device.async_get_data.assert_not_called()
+        sensor.async_update.assert_not_called()
+        assert coordinator.power_state.get_deferred_jobs() == ["poll"]
+
+    @pytest.mark.asyncio
+    async def test_sensors_polled_on_wake(self, coordinator, device, sensor):
+        """Test the sensors left due are polled by the poll seeing the device awake."""
+        await coordinator._async_update_data()
+        device.get_status.return_value = POWER_STATUS_ONLINE
+
+        await coordinator._async_update_data()
+        await wait_background_tasks()
+
+        # The status of the device is queried once per poll
+        assert device.async_refresh_status.await_count == 2
+        device.async_get_data.assert_not_called()
+        sensor.async_update.assert_awaited_once()
+        # That poll replaced the deferred one
+        coordinator.async_request_refresh.assert_not_called()
+        assert coordinator.power_state.is_asleep() is False
+
+    @pytest.mark.asyncio
+    async def test_deferred_poll_runs_on_wake(self, coordinator):
+        """Test the deferred poll runs when the device is woken up otherwise."""
+        coordinator.power_state.async_set_sleep_mode(True)
+        await coordinator._async_update_data()
+
+        coordinator.power_state.async_set_status(POWER_STATUS_ONLINE)
+        coordinator.power_state.async_set_sleep_mode(False)
+        await wait_background_tasks()
+
+        coordinator.async_request_refresh.assert_awaited_once()
+
+
+class TestSleepingBatteryCoordinator:
+    """Test the battery coordinator does not wake a sleeping device up."""
+
+    @pytest.fixture
+    def coordinator(self, mock_hass, mock_device):
+        """Create a battery coordinator of a sleeping device."""
+        mock_device.async_set_power_mode = AsyncMock()
+        coordinator = create_coordinator_with_options(
+            mock_hass, mock_device, {"battery_threshold": 20}
+        )
+        coordinator.power_state.async_set_status(POWER_STATUS_DORMANT)
+        return coordinator
+
+    @pytest.mark.asyncio
+    async def test_battery_not_polled(self, coordinator, mock_device):
+        """Test the last battery level is used while the device sleeps."""
+        assert await coordinator._get_battery_data() is None
+
+        coordinator.power_state.async_set_status(POWER_STATUS_ONLINE)
+        await coordinator._get_battery_data()
+        coordinator.power_state.async_set_status(POWER_STATUS_DORMANT)
+
+        assert (await coordinator._get_battery_data())["level"] == 85
+        mock_device.async_get_battery_status.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_unknown_level_keeps_optimization(self, coordinator):
+        """Test optimization is not changed while the battery level is unknown."""
+        coordinator._check_battery_optimization = AsyncMock()
+
+        data = await coordinator._async_update_data()
+
+        assert data["battery_level"] is None
+        coordinator._check_battery_optimization.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_settings_applied_on_wake(self, coordinator, mock_device):
+        """Test settings changed while the device sleeps are applied on wake up."""
+        assert await coordinator.apply_settings({"power_mode": "balanced"}) == {}
+        assert await coordinator.apply_settings({"power_mode": "power_saving"}) == {}
+        await wait_background_tasks()
+        mock_device.async_set_power_mode.assert_not_called()
+
+        coordinator.power_state.async_set_status(POWER_STATUS_ONLINE)
+        await wait_background_tasks()
+
+        mock_device.async_set_power_mode.assert_awaited_once_with("power_saving")
+
+    @pytest.mark.asyncio
+    async def test_optimization_active_once_applied(self, coordinator, mock_device):
+        """Test optimization deferred while asleep is only active once applied."""
+        mock_device.async_set_motion_sensitivity = AsyncMock()
+        mock_device.async_set_recording_quality = AsyncMock()
+        mock_device.async_set_led_indicators = AsyncMock()
+        await coordinator._activate_battery_optimization()
+        await wait_background_tasks()
+
+        assert coordinator.get_battery_optimization_status()["active"] is False
+        # Not activated again on the next update
+        await coordinator._activate_battery_optimization()
+        assert coordinator._pending_settings["power_mode"] == "power_saving"
+
+        coordinator.power_state.async_set_status(POWER_STATUS_ONLINE)
+        # The settings are sent concurrently
+        for _ in range(2):
+            await wait_background_tasks()
+
+        mock_device.async_set_power_mode.assert_awaited_once_with("power_saving")
+        assert coordinator.get_battery_optimization_status()["active"] is True
+
+    @pytest.mark.asyncio
+    async def test_failed_optimization_not_active(self, coordinator, mock_device):
+        """Test optimization stays inactive when the settings fail on wake up."""
+        mock_device.async_set_power_mode.side_effect = Exception("failed")
+        await coordinator._activate_battery_optimization()
+
+        coordinator.power_state.async_set_status(POWER_STATUS_ONLINE)
+        await wait_background_tasks()
+
+        assert coordinator.get_battery_optimization_status()["active"] is False
+        assert coordinator._get_optimization_target() is False
+
+    @pytest.mark.asyncio
+    async def test_sleep_mode_shared(self, coordinator, mock_device):
+        """Test the sleep mode of the battery coordinator puts the device asleep."""
+        mock_device.async_enter_sleep_mode = AsyncMock()
+        mock_device.async_exit_sleep_mode = AsyncMock()
+        coordinator.power_state.async_set_status(POWER_STATUS_ONLINE)
+
+        await coordinator.enter_sleep_mode()
+        assert coordinator.power_state.is_asleep() is True
+
+        await coordinator.exit_sleep_mode()
+        assert coordinator.power_state.is_asleep() is False
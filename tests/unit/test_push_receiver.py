@@ -0,0 +1,176 @@
+"""Tests for the push-based alarm ingestion."""
+
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.imou_life.const import (
+    DOMAIN,
+    PUSH_HEALTH_TIMEOUT,
+    PUSH_RECEIVER_KEY,
+)
+from custom_components.imou_life.coordinator import ImouDataUpdateCoordinator
+from custom_components.imou_life.push_receiver import (
+    AccountPushReceiver,
+    get_push_receiver,
+    get_webhook_id,
+    release_push_receiver,
+)
+
+
+@pytest.fixture(autouse=True)
+def mock_webhook():
+    """Capture the webhook registrations."""
+    with patch("custom_components.imou_life.push_receiver.webhook") as mock_webhook:
+        yield mock_webhook
+
+
+@pytest.fixture(autouse=True)
+def mock_call_later():
+    """Capture the timers clearing the motion alarm."""
+    with patch(
+        "custom_components.imou_life.push_receiver.async_call_later"
+    ) as mock_call_later:
+        yield mock_call_later
+
+
+def make_coordinator(device_id: str = "device_1") -> MagicMock:
+    """Create a mock device coordinator with a motion alarm sensor."""
+    coordinator = MagicMock()
+    coordinator.device.get_device_id.return_value = device_id
+    motion = MagicMock()
+    motion._state = False
+    motion._attributes = {}
+    coordinator.device.get_sensor_by_name.return_value = motion
+    return coordinator
+
+
+def test_webhook_id_is_stable_and_secret() -> None:
+    """Test the webhook ID does not leak the credentials."""
+    webhook_id = get_webhook_id("app", "secret")
+
+    assert webhook_id == get_webhook_id("app", "secret")
+    assert webhook_id != get_webhook_id("app", "other")
+    assert "app" not in webhook_id.removeprefix(DOMAIN)
+    assert "secret" not in webhook_id
+
+
+def test_webhook_registered_once_per_account(mock_hass, mock_webhook) -> None:
+    """Test the webhook lives as long as a device of the account is loaded."""
+    receiver = AccountPushReceiver(mock_hass, "app", "hook")
+    first = make_coordinator("device_1")
+    second = make_coordinator("device_2")
+
+    receiver.register(first)
+    receiver.register(second)
+    assert mock_webhook.async_register.call_count == 1
+    assert first.push_receiver is receiver
+
+    receiver.unregister(first)
+    mock_webhook.async_unregister.assert_not_called()
+    receiver.unregister(second)
+    mock_webhook.async_unregister.assert_called_once_with(mock_hass, "hook")
+
+
+def test_motion_message_raises_alarm(mock_hass, mock_call_later) -> None:
+    """Test a motion message turns the alarm of the matching device on."""
+    receiver = AccountPushReceiver(mock_hass, "app", "hook")
+    coordinator = make_coordinator()
+    receiver.register(coordinator)
+    motion = coordinator.device.get_sensor_by_name.return_value
+
+    assert receiver.async_handle_message(
+        {"did": "device_1", "msgType": "human", "type": 1, "time": 1700000000}
+    )
+
+    assert motion._state is True
+    assert motion._attributes == {
+        "alarm_time": "2023-11-14T22:13:20+00:00",
+        "alarm_type": "human",
+        "alarm_code": 1,
+    }
+    coordinator.async_update_listeners.assert_called_once()
+
+    # The alarm is cleared by the timer
+    reset = mock_call_later.call_args[0][2]
+    reset(dt_util.utcnow())
+    assert motion._state is False
+
+
+def test_other_messages_only_mark_push_healthy(mock_hass) -> None:
+    """Test messages which are not alarms do not touch the sensors."""
+    receiver = AccountPushReceiver(mock_hass, "app", "hook")
+    coordinator = make_coordinator()
+    receiver.register(coordinator)
+
+    assert not receiver.async_handle_message({"did": "device_1", "msgType": "online"})
+    assert not receiver.async_handle_message({"did": "unknown", "msgType": "human"})
+
+    coordinator.async_update_listeners.assert_not_called()
+    assert receiver.message_count == 1
+    assert receiver.is_healthy()
+
+
+def test_health_times_out(mock_hass) -> None:
+    """Test polling takes over again without messages for a while."""
+    receiver = AccountPushReceiver(mock_hass, "app", "hook")
+    assert receiver.get_pushed_sensors() == set()
+
+    receiver.last_message = dt_util.utcnow()
+    assert receiver.get_pushed_sensors() == {"motionAlarm"}
+
+    later = receiver.last_message + timedelta(seconds=PUSH_HEALTH_TIMEOUT + 1)
+    assert not receiver.is_healthy(later)
+
+    receiver.reset_health()
+    assert not receiver.is_healthy()
+
+
+@pytest.mark.asyncio
+async def test_webhook_ignores_invalid_payload(mock_hass) -> None:
+    """Test a payload which is not JSON is ignored."""
+    receiver = AccountPushReceiver(mock_hass, "app", "hook")
+    request = MagicMock()
+    request.json = AsyncMock(side_effect=ValueError)
+
+    assert await receiver._async_handle_webhook(mock_hass, "hook", request) is None
+    assert receiver.message_count == 0
+
+
+def test_release_drops_empty_receiver(mock_hass) -> None:
+    """Test the account receiver is removed with its last device."""
+    receiver = get_push_receiver(mock_hass, "app", "secret")
+    assert get_push_receiver(mock_hass, "app", "secret") is receiver
+    coordinator = make_coordinator()
+    receiver.register(coordinator)
+
+    release_push_receiver(mock_hass, coordinator)
+
+    assert coordinator.push_receiver is None
+    assert "app" not in mock_hass.data[DOMAIN][PUSH_RECEIVER_KEY]
+
+
+@pytest.mark.asyncio
+async def test_motion_not_polled_while_push_healthy(mock_hass) -> None:
+    """Test the coordinator stops polling the motion alarm while push works."""
+    motion = MagicMock()
+    motion.get_name.return_value = "motionAlarm"
+    motion.async_update = AsyncMock()
+    device = MagicMock()
+    device.get_sensors_by_platform = MagicMock(
+        side_effect=lambda platform: [motion] if platform == "binary_sensor" else []
+    )
+    device.is_online = MagicMock(return_value=True)
+    device.async_get_data = AsyncMock(return_value=True)
+    device.async_refresh_status = AsyncMock()
+    coordinator = ImouDataUpdateCoordinator(mock_hass, device, 900)
+    coordinator.push_receiver = AccountPushReceiver(mock_hass, "app", "hook")
+    coordinator.push_receiver.last_message = dt_util.utcnow()
+
+    await coordinator._async_update_data()
+
+    device.async_get_data.assert_not_awaited()
+    device.async_refresh_status.assert_awaited_once()
+    motion.async_update.assert_not_awaited()
@@ -27,13 +27,16 @@ async def test_rate_limit_during_initialization(hass):
 
     # Mock the API client and device to raise rate limit error on initialization
     with (
-        patch("custom_components.imou_life.ImouAPIClient") as mock_api_client_class,
+        patch(
+            "custom_components.imou_life.ImouAccountAPIClient"
+        ) as mock_api_client_class,
         patch("custom_components.imou_life.ImouDevice") as mock_device_class,
     ):
         mock_api_instance = MagicMock()
         mock_api_client_class.return_value = mock_api_instance
 
         mock_device = AsyncMock()
+        mock_device.get_device_id = MagicMock(return_value="test_device")
         # Simulate rate limit error during initialization
         mock_device.async_initialize.side_effect = APIError(
             "OP1013: Call interface times exceed limit (total)"
@@ -53,6 +56,8 @@ async def test_rate_limit_during_coordinator_update(hass):
     """Test that OP1013 rate limit errors during updates are handled gracefully."""
     # Create a mock device that raises rate limit error
     mock_device = AsyncMock()
+    mock_device.get_sensors_by_platform = MagicMock(return_value=[])
+    mock_device.get_sleepable = MagicMock(return_value=False)
     mock_device.async_get_data.side_effect = APIError(
         "OP1013: Call interface times exceed limit (total)"
     )
@@ -63,7 +68,6 @@ async def test_rate_limit_during_coordinator_update(hass):
     )
 
     # Update should raise UpdateFailed (not the raw APIError)
-    coordinator._poll_cycle = -1
     with pytest.raises(UpdateFailed):
         await coordinator._async_update_data()
 
@@ -79,13 +83,16 @@ async def test_other_api_errors_still_raised(hass):
     )
 
     with (
-        patch("custom_components.imou_life.ImouAPIClient") as mock_api_client_class,
+        patch(
+            "custom_components.imou_life.ImouAccountAPIClient"
+        ) as mock_api_client_class,
         patch("custom_components.imou_life.ImouDevice") as mock_device_class,
     ):
         mock_api_instance = MagicMock()
         mock_api_client_class.return_value = mock_api_instance
 
         mock_device = AsyncMock()
+        mock_device.get_device_id = MagicMock(return_value="test_device")
         # Simulate a different API error (not rate limit)
         mock_device.async_initialize.side_effect = APIError("OP9999: Some other error")
         mock_device_class.return_value = mock_device
@@ -104,6 +111,8 @@ async def test_other_api_errors_still_raised(hass):
 async def test_rate_limit_variations(hass):
     """Test that various rate limit error messages are detected."""
     mock_device = AsyncMock()
+    mock_device.get_sensors_by_platform = MagicMock(return_value=[])
+    mock_device.get_sleepable = MagicMock(return_value=False)
     coordinator = ImouDataUpdateCoordinator(
         hass=hass, device=mock_device, scan_interval=60
     )
@@ -118,7 +127,6 @@ async def test_rate_limit_variations(hass):
 
     for error_msg in rate_limit_messages:
         mock_device.async_get_data.side_effect = APIError(error_msg)
-        coordinator._poll_cycle = -1
 
         with pytest.raises(UpdateFailed):
             await coordinator._async_update_data()
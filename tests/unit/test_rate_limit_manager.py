@@ -1,7 +1,7 @@
 """Test rate limit manager."""
 
 from datetime import timedelta
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
 from homeassistant.util import dt as dt_util
@@ -10,6 +10,7 @@ from custom_components.imou_life.const import (
     RATE_LIMIT_BACKOFF_SECONDS,
     RATE_LIMIT_MAX_PROBE_RETRIES,
     RATE_LIMIT_RESET_ESTIMATE_HOURS,
+    RATE_LIMIT_SAVE_DELAY,
 )
 from custom_components.imou_life.rate_limit_manager import RateLimitManager
 
@@ -250,3 +251,87 @@ def test_message_content(rate_limit_mgr: RateLimitManager) -> None:
     assert "reset_time" in data  # Should show reset time
     assert "error" in data
     assert data["error"] == error_msg
+
+
+def make_store(saved_data: dict | None = None) -> MagicMock:
+    """Create a mock Store returning the given saved data."""
+    store = MagicMock()
+    store.async_load = AsyncMock(return_value=saved_data)
+    return store
+
+
+@pytest.mark.asyncio
+async def test_state_restored_after_restart(mock_hass: Mock) -> None:
+    """Test an active rate limit survives a restart."""
+    before_restart = RateLimitManager(mock_hass)
+    before_restart.record_rate_limit("test_app_id", "secret", "OP1013")
+    saved = {
+        "states": {
+            key: state.as_dict() for key, state in before_restart._get_storage().items()
+        }
+    }
+
+    # Restart: fresh hass.data, state comes back from the store
+    mock_hass.data = {}
+    with patch(
+        "custom_components.imou_life.rate_limit_manager.Store",
+        return_value=make_store(saved),
+    ):
+        await RateLimitManager(mock_hass).async_load()
+
+    is_limited, _ = RateLimitManager(mock_hass).is_rate_limited("test_app_id", "secret")
+    assert is_limited is True
+
+
+@pytest.mark.asyncio
+async def test_expired_state_not_restored(mock_hass: Mock) -> None:
+    """Test rate limits past their reset time are dropped on load."""
+    now = dt_util.utcnow()
+    saved = {
+        "states": {
+            "test_app_id": {
+                "app_id": "test_app_id",
+                "last_rate_limit_time": (now - timedelta(hours=7)).isoformat(),
+                "estimated_reset_time": (now - timedelta(hours=1)).isoformat(),
+                "error_message": "OP1013",
+                "hit_count": 2,
+            },
+            "broken": {"app_id": "broken"},
+        }
+    }
+    mgr = RateLimitManager(mock_hass)
+    with patch(
+        "custom_components.imou_life.rate_limit_manager.Store",
+        return_value=make_store(saved),
+    ):
+        await mgr.async_load()
+
+    assert mgr.get_state("test_app_id", "secret") is None
+    assert mgr.get_state("broken", "secret") is None
+
+
+@pytest.mark.asyncio
+async def test_changes_are_saved_with_delay(mock_hass: Mock) -> None:
+    """Test recording and clearing schedule a debounced write."""
+    store = make_store()
+    mgr = RateLimitManager(mock_hass)
+    with patch(
+        "custom_components.imou_life.rate_limit_manager.Store", return_value=store
+    ):
+        await mgr.async_load()
+
+    mgr.record_rate_limit("test_app_id", "secret", "OP1013")
+    mgr.clear_rate_limit("test_app_id", "secret")
+
+    assert store.async_delay_save.call_count == 2
+    data_func, delay = store.async_delay_save.call_args[0]
+    assert delay == RATE_LIMIT_SAVE_DELAY
+    assert data_func() == {"states": {}}
+
+
+def test_not_saved_before_load(rate_limit_mgr: RateLimitManager) -> None:
+    """Test the state is only kept in memory until async_load() is called."""
+    with patch("custom_components.imou_life.rate_limit_manager.Store") as mock_store:
+        rate_limit_mgr.record_rate_limit("test_app_id", "secret", "OP1013")
+
+    mock_store.assert_not_called()
@@ -45,11 +45,17 @@ class TestSensorPlatformSetup:
             mock_setup.assert_called_once()
 
             # Should also add API status sensor
-            async_add_devices.assert_called_once()
-            added_entities = async_add_devices.call_args[0][0]
+            added_entities = async_add_devices.call_args_list[0][0][0]
             assert len(added_entities) == 1
             assert added_entities[0].__class__.__name__ == "ImouAPIStatusSensor"
 
+            # And the API metrics sensors
+            added_entities = async_add_devices.call_args_list[1][0][0]
+            assert [entity.__class__.__name__ for entity in added_entities] == [
+                "ImouAPICallsSensor",
+                "ImouAPILatencySensor",
+            ]
+
 
 class TestButtonPlatformSetup:
     """Test button platform setup."""
@@ -0,0 +1,206 @@
+"""Tests for the adaptive per-sensor polling."""
+
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.imou_life.const import (
+    SENSOR_POLL_BACKOFF_FACTOR,
+    SENSOR_POLL_PLATFORM_INTERVALS,
+)
+from custom_components.imou_life.coordinator import ImouDataUpdateCoordinator
+from custom_components.imou_life.sensor_polling import SensorPollScheduler
+
+
+def make_sensor(name: str, value=None) -> MagicMock:
+    """Create a mock sensor returning the given value."""
+    sensor = MagicMock()
+    sensor.get_name.return_value = name
+    sensor.get_state.return_value = value
+    sensor.get_attributes.return_value = {}
+    sensor.async_update = AsyncMock()
+    return sensor
+
+
+def make_device(sensors_by_platform: dict) -> MagicMock:
+    """Create a mock device exposing the given sensors."""
+    device = MagicMock()
+    device.get_sensors_by_platform = MagicMock(
+        side_effect=lambda platform: sensors_by_platform.get(platform, [])
+    )
+    device.is_online = MagicMock(return_value=True)
+    device.async_get_data = AsyncMock(return_value=True)
+    device.async_refresh_status = AsyncMock()
+    return device
+
+
+def test_first_poll_is_full() -> None:
+    """Test every sensor is due on the first update."""
+    storage = make_sensor("storageUsed", 10)
+    device = make_device({"sensor": [storage]})
+    scheduler = SensorPollScheduler()
+
+    sensors, is_full_poll = scheduler.get_due_sensors(device, dt_util.utcnow())
+
+    assert sensors == [storage]
+    assert is_full_poll is True
+
+
+def test_stateless_platforms_never_due() -> None:
+    """Test the sensors of platforms without a state to poll are never due."""
+    storage = make_sensor("storageUsed", 10)
+    device = make_device(
+        {
+            "sensor": [storage],
+            "button": [make_sensor("restartDevice")],
+            "siren": [make_sensor("siren")],
+            "camera": [make_sensor("camera")],
+        }
+    )
+    scheduler = SensorPollScheduler()
+
+    sensors, is_full_poll = scheduler.get_due_sensors(device, dt_util.utcnow())
+
+    assert sensors == [storage]
+    assert is_full_poll is True
+
+
+def test_stable_value_backs_off_up_to_max() -> None:
+    """Test the interval of a sensor grows while its value does not change."""
+    sensor = make_sensor("status", "online")
+    device = make_device({"sensor": [sensor]})
+    scheduler = SensorPollScheduler()
+    min_interval, max_interval = SENSOR_POLL_PLATFORM_INTERVALS["sensor"]
+    now = dt_util.utcnow()
+
+    scheduler.get_due_sensors(device, now)
+    scheduler.record_poll([sensor], now)
+    assert scheduler.get_intervals()["status"] == min_interval
+
+    scheduler.record_poll([sensor], now)
+    assert scheduler.get_intervals()["status"] == int(
+        min_interval * SENSOR_POLL_BACKOFF_FACTOR
+    )
+
+    for _ in range(20):
+        scheduler.record_poll([sensor], now)
+    assert scheduler.get_intervals()["status"] == max_interval
+
+
+def test_changed_value_resets_to_min() -> None:
+    """Test a sensor whose value moves is polled as often as allowed again."""
+    sensor = make_sensor("status", "online")
+    device = make_device({"sensor": [sensor]})
+    scheduler = SensorPollScheduler()
+    min_interval, _ = SENSOR_POLL_PLATFORM_INTERVALS["sensor"]
+    now = dt_util.utcnow()
+
+    scheduler.get_due_sensors(device, now)
+    for _ in range(5):
+        scheduler.record_poll([sensor], now)
+    sensor.get_state.return_value = "offline"
+    scheduler.record_poll([sensor], now)
+
+    assert scheduler.get_intervals()["status"] == min_interval
+
+
+def test_only_due_sensors_are_returned() -> None:
+    """Test sensors are not polled again before their interval elapsed."""
+    motion = make_sensor("motionAlarm", False)
+    storage = make_sensor("storageUsed", 10)
+    device = make_device({"binary_sensor": [motion], "sensor": [storage]})
+    scheduler = SensorPollScheduler()
+    now = dt_util.utcnow()
+
+    sensors, _ = scheduler.get_due_sensors(device, now)
+    scheduler.record_poll(sensors, now)
+    later = now + timedelta(minutes=15)
+    sensors, is_full_poll = scheduler.get_due_sensors(device, later)
+
+    assert sensors == [motion]
+    assert is_full_poll is False
+
+
+def test_sensors_due_shortly_join_the_update() -> None:
+    """Test a sensor due within the tolerance is polled with this update."""
+    storage = make_sensor("storageUsed", 10)
+    device = make_device({"sensor": [storage]})
+    scheduler = SensorPollScheduler()
+    now = dt_util.utcnow()
+
+    scheduler.get_due_sensors(device, now)
+    scheduler.record_poll([storage], now)
+    almost = now + timedelta(seconds=3600 - 30)
+    sensors, _ = scheduler.get_due_sensors(device, almost)
+
+    assert sensors == [storage]
+
+
+def test_request_full_poll() -> None:
+    """Test a full poll makes every sensor due once."""
+    storage = make_sensor("storageUsed", 10)
+    device = make_device({"sensor": [storage]})
+    scheduler = SensorPollScheduler()
+    now = dt_util.utcnow()
+    scheduler.get_due_sensors(device, now)
+    scheduler.record_poll([storage], now)
+
+    scheduler.request_full_poll()
+    sensors, is_full_poll = scheduler.get_due_sensors(device, now)
+
+    assert sensors == [storage]
+    assert is_full_poll is True
+
+
+def test_last_poll() -> None:
+    """Test the time of the last poll of a sensor is kept."""
+    battery = make_sensor("battery", 80)
+    device = make_device({"sensor": [battery]})
+    scheduler = SensorPollScheduler()
+    now = dt_util.utcnow()
+
+    scheduler.get_due_sensors(device, now)
+    assert scheduler.get_last_poll("battery") is None
+
+    scheduler.record_poll([battery], now)
+    assert scheduler.get_last_poll("battery") == now
+    assert scheduler.get_last_poll("storageUsed") is None
+
+
+@pytest.mark.asyncio
+async def test_coordinator_updates_only_due_sensors() -> None:
+    """Test a partial poll refreshes the status and the due sensors only."""
+    hass = MagicMock()
+    hass.data = {}
+    motion = make_sensor("motionAlarm", False)
+    storage = make_sensor("storageUsed", 10)
+    device = make_device({"binary_sensor": [motion], "sensor": [storage]})
+    coordinator = ImouDataUpdateCoordinator(hass, device, 900)
+
+    await coordinator._async_update_data()
+    device.async_get_data.assert_awaited_once()
+
+    await coordinator._async_update_data()
+    device.async_get_data.assert_awaited_once()
+    device.async_refresh_status.assert_awaited_once()
+    motion.async_update.assert_awaited_once()
+    storage.async_update.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_offline_device_keeps_sensors_due() -> None:
+    """Test sensors of an offline device are polled again on the next update."""
+    hass = MagicMock()
+    hass.data = {}
+    storage = make_sensor("storageUsed", 10)
+    device = make_device({"sensor": [storage]})
+    device.is_online.return_value = False
+    coordinator = ImouDataUpdateCoordinator(hass, device, 900)
+
+    await coordinator._async_update_data()
+    device.is_online.return_value = True
+    await coordinator._async_update_data()
+
+    assert device.async_get_data.await_count == 2
@@ -42,27 +42,13 @@ def mock_config_entry():
 
 @pytest.fixture
 def coordinator(hass: HomeAssistant, mock_device, mock_config_entry):
-    """Create a coordinator instance for testing.
-
-    Sets _poll_cycle so every _async_update_data() call is a full cycle,
-    ensuring async_get_data() is always called (not fast-cycle shortcut).
-    """
-    coord = ImouDataUpdateCoordinator(
+    """Create a coordinator instance for testing."""
+    return ImouDataUpdateCoordinator(
         hass,
         mock_device,
         900,
         mock_config_entry,
     )
-    coord._poll_cycle = -1
-    # Ensure every call triggers a full cycle by wrapping update
-    _orig_update = coord._async_update_data
-
-    async def _full_cycle_update():
-        coord._poll_cycle = -1
-        return await _orig_update()
-
-    coord._async_update_data = _full_cycle_update
-    return coord
 
 
 async def test_is_stale_device_error_detects_patterns(hass: HomeAssistant, coordinator):
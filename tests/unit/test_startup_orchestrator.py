@@ -0,0 +1,166 @@
+"""Tests for the coordinated startup of the entries of an account."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.exceptions import ConfigEntryNotReady
+
+from custom_components.imou_life.call_budget import (
+    CallBudgetExhausted,
+    CallPriority,
+    get_call_priority,
+)
+from custom_components.imou_life.const import (
+    DOMAIN,
+    STARTUP_ORCHESTRATOR_KEY,
+    STARTUP_REFRESH_DELAY,
+    STARTUP_REFRESH_STAGGER,
+)
+from custom_components.imou_life.startup_orchestrator import (
+    StartupOrchestrator,
+    get_startup_orchestrator,
+)
+
+
+@pytest.fixture
+def mock_hass() -> MagicMock:
+    """Create a mock HomeAssistant instance running background tasks."""
+    hass = MagicMock()
+    hass.data = {}
+    hass.async_create_background_task.side_effect = (
+        lambda target, name: asyncio.get_running_loop().create_task(target)
+    )
+    return hass
+
+
+@pytest.mark.asyncio
+async def test_device_setups_limited_to_window(mock_hass: MagicMock) -> None:
+    """Test only max_concurrency devices are set up at a time."""
+    orchestrator = StartupOrchestrator(mock_hass, "app", max_concurrency=2)
+    running = 0
+    max_running = 0
+
+    async def setup(entry_id: str) -> None:
+        nonlocal running, max_running
+        orchestrator.begin(entry_id)
+        async with orchestrator.async_device_setup(entry_id):
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+        orchestrator.finish(entry_id)
+
+    await asyncio.gather(*(setup(f"entry_{index}") for index in range(6)))
+
+    assert max_running == 2
+    summary = orchestrator.get_summary()
+    assert summary["entries"] == summary["completed"] == 6
+    # The last devices waited for the first ones
+    assert max(orchestrator.get_timing(f"entry_{i}").queued for i in range(6)) > 0
+
+
+@pytest.mark.asyncio
+async def test_timing_steps(mock_hass: MagicMock) -> None:
+    """Test the setup steps of an entry are timed."""
+    orchestrator = StartupOrchestrator(mock_hass, "app")
+    timing = orchestrator.begin("entry")
+
+    async with orchestrator.async_device_setup("entry"):
+        with timing.step("initialize"):
+            await asyncio.sleep(0.01)
+    assert orchestrator.get_timing("entry").as_dict()["completed"] is False
+
+    orchestrator.finish("entry")
+
+    result = orchestrator.get_timing("entry").as_dict()
+    assert result["completed"] is True
+    assert result["steps"]["initialize"] >= 0.01
+    assert result["total"] >= result["steps"]["initialize"]
+
+
+@pytest.mark.asyncio
+async def test_device_setup_calls_have_setup_priority(mock_hass: MagicMock) -> None:
+    """Test the calls made in a setup slot have the setup priority."""
+    orchestrator = StartupOrchestrator(mock_hass, "app")
+
+    async with orchestrator.async_device_setup("entry"):
+        assert get_call_priority() == CallPriority.SETUP
+    assert get_call_priority() == CallPriority.USER
+
+
+@pytest.mark.asyncio
+async def test_exhausted_budget_retries_setup(mock_hass: MagicMock) -> None:
+    """Test a setup the budget cannot afford is retried later."""
+    orchestrator = StartupOrchestrator(mock_hass, "app")
+
+    with pytest.raises(ConfigEntryNotReady):
+        async with orchestrator.async_device_setup("entry"):
+            raise CallBudgetExhausted("no budget")
+
+
+@pytest.mark.asyncio
+async def test_scheduled_updates_run_in_window(mock_hass: MagicMock) -> None:
+    """Test the entity updates run in the background, a few at a time."""
+    orchestrator = StartupOrchestrator(mock_hass, "app", max_concurrency=2)
+    running = 0
+    max_running = 0
+    priorities = []
+
+    async def update() -> None:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        priorities.append(get_call_priority())
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    for _ in range(5):
+        orchestrator.async_schedule_update("entry", update)
+    assert orchestrator.get_summary()["pending_updates"] == 5
+
+    await orchestrator.async_wait_updates()
+
+    assert len(priorities) == 5
+    assert set(priorities) == {CallPriority.SETUP}
+    assert max_running == 2
+    assert orchestrator.get_summary()["pending_updates"] == 0
+
+
+@pytest.mark.asyncio
+async def test_first_refreshes_staggered(mock_hass: MagicMock) -> None:
+    """Test the first refreshes of restored devices are spread out."""
+    orchestrator = StartupOrchestrator(mock_hass, "app")
+    coordinators = [MagicMock(async_refresh=AsyncMock()) for _ in range(3)]
+
+    with patch(
+        "custom_components.imou_life.startup_orchestrator.async_call_later"
+    ) as mock_call_later:
+        delays = [
+            orchestrator.async_schedule_refresh(f"entry_{index}", coordinator)
+            for index, coordinator in enumerate(coordinators)
+        ]
+
+    assert delays[0] == pytest.approx(STARTUP_REFRESH_DELAY, abs=0.1)
+    for previous, delay in zip(delays, delays[1:]):
+        assert delay - previous == pytest.approx(STARTUP_REFRESH_STAGGER, abs=0.1)
+    assert orchestrator.get_summary()["pending_refreshes"] == 3
+
+    # The refresh runs when the timer fires
+    refresh = mock_call_later.call_args_list[1][0][2]
+    await refresh(None)
+    coordinators[1].async_refresh.assert_awaited_once()
+    assert orchestrator.get_summary()["pending_refreshes"] == 2
+
+    # Unloaded entries are not refreshed
+    orchestrator.cancel_refresh("entry_2")
+    mock_call_later.return_value.assert_called_once()
+
+
+def test_get_startup_orchestrator_per_account(mock_hass: MagicMock) -> None:
+    """Test the orchestrator is shared by the entries of an account."""
+    orchestrator = get_startup_orchestrator(mock_hass, "app")
+
+    assert get_startup_orchestrator(mock_hass, "app") is orchestrator
+    assert get_startup_orchestrator(mock_hass, "other") is not orchestrator
+    assert mock_hass.data[DOMAIN][STARTUP_ORCHESTRATOR_KEY]["app"] is orchestrator
@@ -0,0 +1,101 @@
+"""Tests for the live stream URL cache."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from imouapi.exceptions import APIError
+
+from custom_components.imou_life.stream_url_cache import StreamUrlCache
+
+
+@pytest.mark.asyncio
+async def test_url_reused_until_refresh_margin() -> None:
+    """Test a fresh URL is returned without calling the API."""
+    fetch = AsyncMock(return_value="https://hls/1.m3u8")
+    cache = StreamUrlCache(fetch, max_age=3600, refresh_margin=300)
+
+    assert await cache.async_get_url() == "https://hls/1.m3u8"
+    assert await cache.async_get_url() == "https://hls/1.m3u8"
+
+    fetch.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_url_refreshed_in_background_before_expiry() -> None:
+    """Test a URL close to its expiry is returned and replaced meanwhile."""
+    fetch = AsyncMock(side_effect=["https://hls/1.m3u8", "https://hls/2.m3u8"])
+    on_refresh = MagicMock()
+    cache = StreamUrlCache(
+        fetch, max_age=3600, refresh_margin=300, on_refresh=on_refresh
+    )
+    await cache.async_get_url()
+    cache._fetched_at -= 3400
+
+    assert await cache.async_get_url() == "https://hls/1.m3u8"
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert cache.url == "https://hls/2.m3u8"
+    on_refresh.assert_called_once_with("https://hls/2.m3u8")
+
+
+@pytest.mark.asyncio
+async def test_expired_url_fetched_again() -> None:
+    """Test an expired URL is not returned anymore."""
+    fetch = AsyncMock(side_effect=["https://hls/1.m3u8", "https://hls/2.m3u8"])
+    cache = StreamUrlCache(fetch, max_age=3600, refresh_margin=300)
+    await cache.async_get_url()
+    cache._fetched_at -= 3600
+
+    assert await cache.async_get_url() == "https://hls/2.m3u8"
+
+
+@pytest.mark.asyncio
+async def test_failed_background_refresh_keeps_url() -> None:
+    """Test a failing background refresh keeps the still valid URL."""
+    fetch = AsyncMock(side_effect=["https://hls/1.m3u8", APIError("failed")])
+    on_refresh = MagicMock()
+    cache = StreamUrlCache(
+        fetch, max_age=3600, refresh_margin=300, on_refresh=on_refresh
+    )
+    await cache.async_get_url()
+    cache._fetched_at -= 3400
+
+    await cache.async_get_url()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert cache.url == "https://hls/1.m3u8"
+    on_refresh.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_invalidate_after_playback_failure() -> None:
+    """Test an invalidated URL is fetched again."""
+    fetch = AsyncMock(side_effect=["https://hls/1.m3u8", "https://hls/2.m3u8"])
+    cache = StreamUrlCache(fetch)
+    await cache.async_get_url()
+
+    cache.invalidate()
+
+    assert await cache.async_get_url() == "https://hls/2.m3u8"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_fetch() -> None:
+    """Test stream starts arriving together cause a single fetch."""
+    release = asyncio.Event()
+
+    async def slow_fetch() -> str:
+        await release.wait()
+        return "https://hls/1.m3u8"
+
+    fetch = AsyncMock(side_effect=slow_fetch)
+    cache = StreamUrlCache(fetch)
+    requests = [asyncio.create_task(cache.async_get_url()) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*requests) == ["https://hls/1.m3u8"] * 3
+    fetch.assert_awaited_once()
@@ -24,6 +24,7 @@ class TestImouSwitch:
         coordinator.device.get_device_id.return_value = "test_device_123"
         coordinator.device.get_status.return_value = True
         coordinator.hass = MagicMock()
+        coordinator.push_receiver = None
         return coordinator
 
     @pytest.fixture
@@ -113,6 +114,28 @@ class TestImouSwitch:
 
         mock_sensor_instance.async_turn_on.assert_called_once_with()
 
+    @pytest.mark.asyncio
+    async def test_switch_async_turn_on_sleepable_device(
+        self, switch_entity, mock_coordinator, mock_sensor_instance
+    ):
+        """Test a switch of a sleepable device is turned on in a wake cycle."""
+        mock_coordinator.device.get_sleepable.return_value = True
+
+        with (
+            patch.object(switch_entity, "async_write_ha_state"),
+            patch("custom_components.imou_life.wake_queue.get_wake_queue") as get_queue,
+        ):
+            get_queue.return_value.async_run = AsyncMock()
+            await switch_entity.async_turn_on()
+
+        get_queue.assert_called_once_with(
+            mock_coordinator.hass, mock_coordinator.device
+        )
+        command = get_queue.return_value.async_run.call_args[0][0]
+        mock_sensor_instance.async_turn_on.assert_not_called()
+        await command()
+        mock_sensor_instance.async_turn_on.assert_awaited_once_with()
+
     @pytest.mark.asyncio
     async def test_switch_async_turn_on_push_notifications(
         self, mock_coordinator, mock_config_entry, mock_sensor_instance
@@ -174,6 +197,52 @@ class TestImouSwitch:
         with pytest.raises(HomeAssistantError):
             await switch.async_turn_on()
 
+    @pytest.mark.asyncio
+    async def test_switch_async_turn_on_push_notifications_webhook(
+        self, mock_coordinator, mock_config_entry, mock_sensor_instance
+    ):
+        """Test push notifications default to the webhook of the integration."""
+        mock_sensor_instance.get_name.return_value = "pushNotifications"
+        mock_config_entry.options = {OPTION_CALLBACK_URL: ""}
+        mock_coordinator.push_receiver = MagicMock()
+        mock_coordinator.push_receiver.get_webhook_url.return_value = (
+            "https://ha.example.com/api/webhook/imou_life_abc"
+        )
+
+        switch = ImouSwitch(
+            mock_coordinator,
+            mock_config_entry,
+            mock_sensor_instance,
+            "switch.{}",
+        )
+
+        with patch.object(switch, "async_write_ha_state"):
+            await switch.async_turn_on()
+
+        mock_sensor_instance.async_turn_on.assert_called_once_with(
+            url="https://ha.example.com/api/webhook/imou_life_abc"
+        )
+
+    @pytest.mark.asyncio
+    async def test_switch_async_turn_off_push_notifications(
+        self, mock_coordinator, mock_config_entry, mock_sensor_instance
+    ):
+        """Test turning push notifications off resumes alarm polling."""
+        mock_sensor_instance.get_name.return_value = "pushNotifications"
+        mock_coordinator.push_receiver = MagicMock()
+
+        switch = ImouSwitch(
+            mock_coordinator,
+            mock_config_entry,
+            mock_sensor_instance,
+            "switch.{}",
+        )
+
+        with patch.object(switch, "async_write_ha_state"):
+            await switch.async_turn_off()
+
+        mock_coordinator.push_receiver.reset_health.assert_called_once()
+
     @pytest.mark.asyncio
     async def test_switch_async_turn_off(self, switch_entity, mock_sensor_instance):
         """Test turning off switch."""
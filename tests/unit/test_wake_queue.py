@@ -0,0 +1,241 @@
+"""Tests for the wake cycles of sleeping devices."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from imouapi.exceptions import DeviceOffline
+
+from custom_components.imou_life.call_budget import (
+    CallPriority,
+    call_priority,
+    get_call_priority,
+)
+from custom_components.imou_life.const import (
+    DOMAIN,
+    POWER_STATUS_DORMANT,
+    POWER_STATUS_ONLINE,
+    WAKE_QUEUE_KEY,
+)
+from custom_components.imou_life.power_state import get_device_power_state
+from custom_components.imou_life.wake_queue import (
+    WakeQueue,
+    async_run_command,
+    get_wake_queue,
+    release_wake_queue,
+)
+
+
+@pytest.fixture
+async def mock_hass() -> MagicMock:
+    """Create a mock HomeAssistant instance running background tasks."""
+    hass = MagicMock()
+    hass.data = {}
+    hass.loop = asyncio.get_running_loop()
+    hass.async_create_background_task.side_effect = (
+        lambda target, name: asyncio.get_running_loop().create_task(target)
+    )
+    return hass
+
+
+@pytest.fixture
+def device() -> MagicMock:
+    """Create a sleepable device, online once woken up."""
+    device = MagicMock()
+    device.get_device_id.return_value = "device"
+    device.get_sleepable.return_value = True
+    device.get_status.return_value = POWER_STATUS_ONLINE
+    device.async_wakeup = AsyncMock(return_value=True)
+    return device
+
+
+@pytest.fixture
+def queue(mock_hass: MagicMock, device: MagicMock) -> WakeQueue:
+    """Create the wake queue of the device, asleep, with a short window."""
+    get_device_power_state(mock_hass, "device").async_set_status(POWER_STATUS_DORMANT)
+    queue = get_wake_queue(mock_hass, device)
+    queue.window = 0.01
+    return queue
+
+
+@pytest.mark.asyncio
+async def test_commands_share_a_wake_cycle(queue, device) -> None:
+    """Test commands sent together wake the device up once and run one by one."""
+    running = 0
+    max_running = 0
+
+    async def command(result):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0)
+        running -= 1
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    results = await asyncio.gather(
+        queue.async_run(lambda: command("on")),
+        queue.async_run(lambda: command(ValueError("failed"))),
+        queue.async_run(lambda: command("off")),
+        return_exceptions=True,
+    )
+
+    assert results[0] == "on"
+    assert isinstance(results[1], ValueError)
+    assert results[2] == "off"
+    device.async_wakeup.assert_awaited_once()
+    assert max_running == 1
+
+
+@pytest.mark.asyncio
+async def test_command_sent_during_cycle_joins_it(queue, device) -> None:
+    """Test commands sent while the cycle runs are run in the same cycle."""
+    joined = []
+
+    async def first():
+        joined.append(asyncio.ensure_future(queue.async_run(AsyncMock())))
+        await asyncio.sleep(0)
+        return await queue.async_run(AsyncMock(return_value="nested"))
+
+    assert await queue.async_run(first) == "nested"
+    await joined[0]
+    device.async_wakeup.assert_awaited_once()
+
+    # The next command sent once the device is asleep again starts a new cycle
+    get_device_power_state(queue.hass, "device").async_set_status(POWER_STATUS_DORMANT)
+    await queue.async_run(AsyncMock())
+    assert device.async_wakeup.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_wake_up_fails_commands(queue, device) -> None:
+    """Test the commands fail with the error raised waking the device up."""
+    device.async_wakeup.side_effect = ValueError("unreachable")
+    command = AsyncMock()
+
+    with pytest.raises(ValueError):
+        await queue.async_run(command)
+
+    command.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_device_not_woken_up_fails_commands(queue, device) -> None:
+    """Test the commands fail when the device could not be woken up."""
+    device.async_wakeup.return_value = False
+    command = AsyncMock()
+
+    with pytest.raises(DeviceOffline):
+        await queue.async_run(command)
+
+    command.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_commands_keep_caller_priority(queue) -> None:
+    """Test every command runs with the call priority of its caller."""
+    priorities = []
+
+    async def command():
+        priorities.append(get_call_priority())
+
+    with call_priority(CallPriority.BACKGROUND):
+        background = asyncio.ensure_future(queue.async_run(command))
+    await asyncio.gather(background, queue.async_run(command))
+
+    assert priorities == [CallPriority.BACKGROUND, CallPriority.USER]
+
+
+@pytest.mark.asyncio
+async def test_wake_up_runs_deferred_jobs(mock_hass, queue) -> None:
+    """Test the jobs deferred while the device slept run once it is woken up."""
+    power_state = get_device_power_state(mock_hass, "device")
+    job = AsyncMock()
+    power_state.async_defer("poll", job)
+
+    await queue.async_run(AsyncMock())
+    await asyncio.sleep(0)
+
+    assert power_state.is_asleep() is False
+    job.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_run_command(mock_hass, device) -> None:
+    """Test only the commands of sleepable devices go through a wake cycle."""
+    get_device_power_state(mock_hass, "device").async_set_status(POWER_STATUS_DORMANT)
+    get_wake_queue(mock_hass, device).window = 0
+    command = AsyncMock(return_value="done")
+
+    assert await async_run_command(mock_hass, device, command, 1, option="a") == (
+        "done"
+    )
+    command.assert_awaited_once_with(1, option="a")
+    device.async_wakeup.assert_awaited_once()
+
+    device.get_sleepable.return_value = False
+    await async_run_command(mock_hass, device, command)
+    device.async_wakeup.assert_awaited_once()
+    assert list(mock_hass.data[DOMAIN][WAKE_QUEUE_KEY]) == ["device"]
+
+
+@pytest.mark.asyncio
+async def test_run_command_device_awake(mock_hass, device) -> None:
+    """Test the commands of an awake sleepable device are sent straight away."""
+    get_wake_queue(mock_hass, device).window = 60
+    command = AsyncMock(return_value="done")
+
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            async_run_command(mock_hass, device, command, 1),
+            async_run_command(mock_hass, device, command, 2),
+        ),
+        timeout=1,
+    )
+
+    assert results == ["done", "done"]
+    assert command.await_count == 2
+    device.async_wakeup.assert_not_called()
+    device.get_status.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_cycle_of_device_woken_up_meanwhile(mock_hass, queue, device) -> None:
+    """Test a cycle does not wake up a device which woke up in its window."""
+    command = AsyncMock()
+    waiting = asyncio.ensure_future(queue.async_run(command))
+    await asyncio.sleep(0)
+
+    get_device_power_state(mock_hass, "device").async_set_status(POWER_STATUS_ONLINE)
+    await waiting
+
+    command.assert_awaited_once()
+    device.async_wakeup.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_queue_follows_device_set_up_again(mock_hass, queue, device) -> None:
+    """Test the queue of a device sends the commands to its latest instance."""
+    new_device = MagicMock()
+    new_device.get_device_id.return_value = "device"
+
+    assert get_wake_queue(mock_hass, new_device) is queue
+    assert queue.device is new_device
+
+
+@pytest.mark.asyncio
+async def test_release_wake_queue(mock_hass, queue, device) -> None:
+    """Test releasing the queue of a device cancels its waiting commands."""
+    command = AsyncMock()
+    waiting = asyncio.ensure_future(queue.async_run(command))
+    await asyncio.sleep(0)
+
+    release_wake_queue(mock_hass, "device")
+
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    command.assert_not_called()
+    device.async_wakeup.assert_not_called()
+    assert "device" not in mock_hass.data[DOMAIN][WAKE_QUEUE_KEY]
+    release_wake_queue(mock_hass, "device")
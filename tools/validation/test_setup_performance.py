@@ -1,120 +1,130 @@
 """
-Test script to diagnose setup performance issues with imou_life integration.
-This script helps identify which part of the setup process is taking too long.
-"""
-
-import asyncio
-import logging
-import time
-
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
-logger = logging.getLogger(__name__)
-
-
-def get_setup_steps():
-    """Return the setup steps configuration with simulated times."""
-    return {
-        "Device Creation": 0.1,
-        "Device Initialization": 15.0,  # This is likely the bottleneck
-        "Sensor Discovery": 0.5,
-        "Coordinator Creation": 0.1,
-        "Initial Data Fetch": 5.0,  # This could also be slow
-        "Platform Setup": 1.0,
-        "Entity Creation": 0.5,
-    }
-
-
-async def simulate_setup_step(step_name, simulated_time):
-    """Simulate a single setup step and return timing results."""
-    print(f"Testing {step_name}...")
-    start_time = time.time()
-
-    # Simulate the actual operation
-    await asyncio.sleep(simulated_time)
-
-    elapsed = time.time() - start_time
-    print(f"  ✓ {step_name}: {elapsed:.2f}s")
-
-    # Check if this step is taking too long
-    if elapsed > 10:
-        print(f"  ⚠️  WARNING: {step_name} is taking over 10 seconds!")
-    elif elapsed > 5:
-        print(f"  ⚠️  CAUTION: {step_name} is taking over 5 seconds")
-
-    return elapsed
-
-
-def print_results_summary(total_time, results):
-    """Print the results summary and identify bottlenecks."""
-    print("\n=== Results Summary ===")
-    print(f"Total setup time: {total_time:.2f}s")
-
-    # Identify bottlenecks
-    bottlenecks = [step for step, time_taken in results.items() if time_taken > 5]
-    if bottlenecks:
-        print("\n🚨 Performance bottlenecks detected:")
-        for bottleneck in bottlenecks:
-            print(f"  - {bottleneck}: {results[bottleneck]:.2f}s")
+Benchmark the setup and polling of the imou_life integration.
 
-    return bottlenecks
+Runs the real integration code (async_setup_entry, platform setup, account poll
+cycle, battery coordinator) against a local fake Imou API server, for an
+increasing number of devices, and reports per phase:
+- the wall time
+- the API calls made, per endpoint with --details
+- how long the event loop was blocked (total and longest stall)
 
+Latency, errors and OP1013 rate limits can be injected in the fake API. Run it
+before and after a change to catch scaling regressions, e.g.:
 
-def print_device_initialization_recommendations():
-    """Print recommendations for device initialization issues."""
-    print("1. Check network connectivity to Imou API servers")
-    print("2. Verify API credentials and permissions")
-    print("3. Consider increasing setup timeout in configuration")
-    print("4. Check if Imou servers are experiencing issues")
+    python tools/validation/test_setup_performance.py --latency 0.05 --json out.json
 
+The fake API and Home Assistant run in the same process and event loop, so
+absolute blocking times include their overhead: compare runs with each other
+rather than against real installations.
+"""
 
-def print_data_fetch_recommendations():
-    """Print recommendations for data fetch issues."""
-    print("1. Check device connectivity and status")
-    print("2. Verify device is online and responding")
-    print("3. Consider increasing scan interval")
-    print("4. Check API rate limits")
-
-
-def print_general_recommendations():
-    """Print general troubleshooting recommendations."""
-    print("\n5. Enable debug logging in Home Assistant for more details")
-    print("6. Check Home Assistant logs for specific error messages")
-
-
-def print_recommendations(bottlenecks):
-    """Print specific recommendations based on detected bottlenecks."""
-    print("\n=== Recommendations ===")
-
-    if "Device Initialization" in bottlenecks:
-        print_device_initialization_recommendations()
-
-    if "Initial Data Fetch" in bottlenecks:
-        print_data_fetch_recommendations()
-
-    print_general_recommendations()
-
-
-async def test_setup_performance():
-    """Test the performance of different setup steps."""
-    print("=== Imou Life Integration Setup Performance Test ===\n")
-
-    # Get setup steps configuration
-    setup_steps = get_setup_steps()
-
-    # Execute setup steps and collect results
-    total_time = 0
-    results = {}
-
-    for step_name, simulated_time in setup_steps.items():
-        elapsed = await simulate_setup_step(step_name, simulated_time)
-        total_time += elapsed
-        results[step_name] = elapsed
-
-    # Analyze results and provide recommendations
-    bottlenecks = print_results_summary(total_time, results)
-    print_recommendations(bottlenecks)
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from tests.fixtures.setup_benchmark import (  # noqa: E402
+    DEVICE_COUNTS,
+    BenchmarkResult,
+    async_run_benchmark,
+)
+
+
+def parse_args(argv=None):
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--devices",
+        type=int,
+        nargs="+",
+        default=list(DEVICE_COUNTS),
+        help="numbers of devices to benchmark (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds per API call"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="max random seconds added"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="share of calls failing (0-1)"
+    )
+    parser.add_argument(
+        "--rate-limit-rate",
+        type=float,
+        default=0.0,
+        help="share of calls answered with OP1013 (0-1)",
+    )
+    parser.add_argument(
+        "--battery-ratio",
+        type=float,
+        default=0.25,
+        help="share of battery powered devices (0-1, default: %(default)s)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="fault injection seed")
+    parser.add_argument(
+        "--details", action="store_true", help="print the calls per endpoint"
+    )
+    parser.add_argument("--json", metavar="FILE", help="also write results as JSON")
+    parser.add_argument("--log-level", default="critical", help="integration log level")
+    return parser.parse_args(argv)
+
+
+def print_result(result: BenchmarkResult, details: bool = False):
+    """Print the measurements of one run."""
+    print(f"\n=== {result.devices} devices, {result.entities} entities ===")
+    print(
+        f"{'phase':<12} {'wall s':>8} {'calls':>7} {'calls/dev':>9} "
+        f"{'errors':>6} {'OP1013':>6} {'failed':>6} {'blocked s':>9} {'stall ms':>8}"
+    )
+    for phase in result.phases:
+        print(
+            f"{phase.name:<12} {phase.wall_time:>8.3f} {phase.total_calls:>7} "
+            f"{phase.total_calls / result.devices:>9.1f} {phase.errors:>6} "
+            f"{phase.rate_limits:>6} {phase.failures:>6} "
+            f"{phase.blocked_time:>9.3f} {phase.max_stall * 1000:>8.1f}"
+        )
+        if details:
+            for api, count in sorted(phase.calls.items()):
+                print(f"    {api:<28} {count:>7}")
+
+
+def main(argv=None):
+    """Run the benchmark."""
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper())
+
+    print("=== Imou Life Integration Setup Performance ===")
+    print(
+        f"latency {args.latency}s (+{args.jitter}s), error rate {args.error_rate}, "
+        f"OP1013 rate {args.rate_limit_rate}, battery ratio {args.battery_ratio}"
+    )
+    results = asyncio.run(
+        async_run_benchmark(
+            tuple(args.devices),
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+            battery_ratio=args.battery_ratio,
+            seed=args.seed,
+        )
+    )
+    for result in results:
+        print_result(result, args.details)
+
+    if args.json:
+        Path(args.json).write_text(
+            json.dumps([result.as_dict() for result in results], indent=2)
+        )
+        print(f"\nResults written to {args.json}")
 
 
 if __name__ == "__main__":
-    asyncio.run(test_setup_performance())
+    main()